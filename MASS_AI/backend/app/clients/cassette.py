@@ -0,0 +1,162 @@
+"""
+Record/replay cassettes for provider calls.
+
+With CASSETTE_MODE=record every provider response that goes through the
+shared HTTP layer (and Mistral's chat calls) is appended to CASSETTE_PATH, a
+gzipped JSON-lines file with one request/response pair per line. With
+CASSETTE_MODE=replay those calls are answered from the cassette instead of
+the network, so a production-shaped enrichment run can be repeated offline
+and its mapping, merge and research CPU cost profiled on its own.
+
+Requests are matched on provider, method, URL, query parameters and body.
+Headers and credential parameters are left out, so cassettes hold no API keys
+and replay with any key. A request recorded several times replays its
+responses in recorded order and then keeps returning the last one.
+
+CASSETTE_REPLAY_LATENCY is "recorded" (sleep for the time the live call took)
+or "zero". Replayed calls skip breakers, scheduling and rate limits; a request
+missing from the cassette raises CassetteMissError.
+"""
+import asyncio
+import gzip
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from ..core.config import settings
+
+# Query parameters that carry credentials (Hunter passes its key as ?api_key=)
+_SECRET_PARAMS = {"api_key", "apikey", "key", "token"}
+# Response headers worth keeping; the rest is noise in a compact cassette
+_KEPT_HEADERS = ("content-type", "retry-after")
+
+
+class CassetteMissError(httpx.TransportError):
+    """Replay mode got a request the cassette has no recording of (handled like an unreachable provider)."""
+
+
+def _public_params(params: Any) -> Any:
+    if isinstance(params, dict):
+        return sorted((str(k), str(v)) for k, v in params.items() if str(k).lower() not in _SECRET_PARAMS)
+    if isinstance(params, (list, tuple)):
+        return sorted((str(k), str(v)) for k, v in params if str(k).lower() not in _SECRET_PARAMS)
+    return params
+
+
+def request_key(provider: str, method: str, url: str, params: Any = None, json_body: Any = None, data: Any = None) -> str:
+    """Stable key of a request: provider, method, URL, params (without credentials) and body."""
+    parts = [provider, method.upper(), url, _public_params(params), json_body, data]
+    return hashlib.sha1(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class Cassette:
+    """A cassette file and the recordings loaded from it."""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._entries: Optional[Dict[str, List[Dict[str, Any]]]] = None
+        self._played: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def mode(self) -> str:
+        return (settings.CASSETTE_MODE or "off").lower()
+
+    @property
+    def recording(self) -> bool:
+        return self.mode == "record"
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == "replay"
+
+    def _file(self) -> str:
+        return self.path or settings.CASSETTE_PATH
+
+    def _load(self) -> Dict[str, List[Dict[str, Any]]]:
+        if self._entries is None:
+            entries: Dict[str, List[Dict[str, Any]]] = {}
+            path = self._file()
+            if os.path.exists(path):
+                with gzip.open(path, "rt", encoding="utf-8") as f:
+                    for line in f:
+                        if line.strip():
+                            entry = json.loads(line)
+                            entries.setdefault(entry["key"], []).append(entry)
+            print(f"[Cassette] Loaded {sum(len(v) for v in entries.values())} recordings from {path}")
+            self._entries = entries
+        return self._entries
+
+    def record(self, provider: str, method: str, url: str, status_code: int, headers: Any, body: str,
+               elapsed: float, params: Any = None, json_body: Any = None, data: Any = None) -> None:
+        """Append one request/response pair to the cassette."""
+        entry = {
+            "key": request_key(provider, method, url, params, json_body, data),
+            "provider": provider,
+            "method": method.upper(),
+            "url": url,
+            "status": status_code,
+            "headers": {name: headers[name] for name in _KEPT_HEADERS if name in headers},
+            "body": body,
+            "elapsed": round(elapsed, 4),
+        }
+        path = self._file()
+        with self._lock:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # Each append is its own gzip member; readers see one continuous stream
+            with gzip.open(path, "at", encoding="utf-8") as f:
+                f.write(json.dumps(entry, default=str) + "\n")
+            if self._entries is not None:
+                self._entries.setdefault(entry["key"], []).append(entry)
+
+    def capture(self, provider: str, method: str, url: str, response: Any, elapsed: float, **kwargs: Any) -> None:
+        """Record a response when recording (no-op otherwise)."""
+        if not self.recording:
+            return
+        try:
+            self.record(provider, method, url, response.status_code, response.headers, response.text, elapsed,
+                        params=kwargs.get("params"), json_body=kwargs.get("json"), data=kwargs.get("data"))
+        except OSError as e:
+            print(f"[Cassette] Could not record {provider} {method} {url}: {e}")
+
+    def lookup(self, provider: str, method: str, url: str, params: Any = None, json_body: Any = None,
+               data: Any = None) -> Dict[str, Any]:
+        """Next recording of a request. Raises CassetteMissError when there is none."""
+        key = request_key(provider, method, url, params, json_body, data)
+        with self._lock:
+            recordings = self._load().get(key)
+            if not recordings:
+                raise CassetteMissError(f"No cassette recording for {provider} {method.upper()} {url}")
+            played = self._played.get(key, 0)
+            self._played[key] = played + 1
+        return recordings[min(played, len(recordings) - 1)]
+
+    def _delay(self, entry: Dict[str, Any]) -> float:
+        return entry["elapsed"] if settings.CASSETTE_REPLAY_LATENCY == "recorded" else 0.0
+
+    async def replay(self, provider: str, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        """Recorded response to a request."""
+        entry = self.lookup(provider, method, url, kwargs.get("params"), kwargs.get("json"), kwargs.get("data"))
+        delay = self._delay(entry)
+        if delay:
+            await asyncio.sleep(delay)
+        return httpx.Response(
+            entry["status"], headers=entry["headers"], content=entry["body"].encode("utf-8"),
+            request=httpx.Request(method, url),
+        )
+
+    def reset(self) -> None:
+        """Forget loaded recordings and replay positions (the file is re-read on next use)."""
+        with self._lock:
+            self._entries = None
+            self._played.clear()
+
+
+# Global cassette (mode and path come from settings)
+cassette = Cassette()
@@ -1,10 +1,13 @@
 """
 CoreSignal API client for company enrichment.
 """
+import re
 import httpx
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 
 from ..core.config import settings
+from ..core.metrics import endpoint_label
+from .http import provider_request
 
 
 class CoreSignalClient:
@@ -36,7 +39,7 @@ class CoreSignalClient:
         
         async with httpx.AsyncClient() as client:
             try:
-                response = await client.get(url, headers=headers, timeout=self.timeout)
+                response = await provider_request(client, "coresignal", "GET", url, timeout=self.timeout, hedge=True, headers=headers)
                 response.raise_for_status()
                 
                 data = response.json()
@@ -100,11 +103,11 @@ class CoreSignalClient:
         
         async with httpx.AsyncClient() as client:
             try:
-                response = await client.post(
-                    self.search_url,
+                response = await provider_request(
+                    client, "coresignal", "POST", self.search_url,
+                    timeout=self.timeout,
                     headers=headers,
-                    json=search_body,
-                    timeout=self.timeout
+                    json=search_body
                 )
                 
                 if response.status_code == 200:
@@ -155,7 +158,10 @@ class CoreSignalClient:
         async with httpx.AsyncClient() as client:
             try:
                 print(f"[CoreSignal] 📡 Making GET request...")
-                response = await client.get(url, headers=headers, timeout=self.timeout)
+                response = await provider_request(
+                    client, "coresignal", "GET", url, timeout=self.timeout, hedge=True, headers=headers,
+                    endpoint=endpoint_label(self.collect_url)
+                )
                 print(f"[CoreSignal] 📊 Response status: {response.status_code}")
                 
                 if response.status_code == 200:
@@ -215,11 +221,11 @@ class CoreSignalClient:
         async with httpx.AsyncClient() as client:
             try:
                 print(f"[CoreSignal] 📡 Making POST request to ES DSL endpoint...")
-                response = await client.post(
-                    self.es_dsl_url,
+                response = await provider_request(
+                    client, "coresignal", "POST", self.es_dsl_url,
+                    timeout=self.timeout,
                     headers=headers,
-                    json=search_body,
-                    timeout=self.timeout
+                    json=search_body
                 )
                 print(f"[CoreSignal] 📊 Response status: {response.status_code}")
                 
@@ -262,3 +268,124 @@ class CoreSignalClient:
             except Exception as e:
                 print(f"[CoreSignal] ❌ LinkedIn URL search failed: {str(e)}")
                 return None
+    
+    async def resolve_companies_batch(self, companies: List[Dict[str, Optional[str]]]) -> List[Optional[Dict[str, Any]]]:
+        """
+        Resolve many companies (typically the domain-less rows of one Apollo page)
+        with one ES DSL query per CORESIGNAL_BATCH_SIZE inputs.
+        
+        Each input is a dict with "name", "linkedin_url" and "location". The query
+        is a bool/should with a LinkedIn URL term clause and a name phrase clause
+        per input, and asks for _BATCH_HITS_PER_COMPANY hits per input so common
+        names cannot crowd the others out. Hits are mapped back to inputs by
+        LinkedIn URL (confidence 1.0) or by normalized name; a name match alone
+        stays below the threshold and only passes with a matching location.
+        
+        Returns:
+            One entry per input: {"data", "website", "confidence", "matched_by"}
+            for the best hit at or above CORESIGNAL_BATCH_MIN_CONFIDENCE, else None
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(companies)
+        if not self.api_key or not companies:
+            return results
+        
+        batch_size = max(1, settings.CORESIGNAL_BATCH_SIZE)
+        for start in range(0, len(companies), batch_size):
+            chunk = companies[start:start + batch_size]
+            hits = await self._search_batch(chunk)
+            for offset, company in enumerate(chunk):
+                best = None
+                for hit in hits:
+                    match = self._score_batch_hit(company, hit)
+                    if match and (best is None or match["confidence"] > best["confidence"]):
+                        best = match
+                if best and best["confidence"] >= settings.CORESIGNAL_BATCH_MIN_CONFIDENCE:
+                    results[start + offset] = best
+        
+        resolved = sum(1 for r in results if r)
+        print(f"[CoreSignal] Batch resolve: {resolved}/{len(companies)} companies matched")
+        return results
+    
+    async def _search_batch(self, companies: List[Dict[str, Optional[str]]]) -> List[Dict[str, Any]]:
+        """One ES DSL request covering every company in the chunk."""
+        should = []
+        for company in companies:
+            if company.get("linkedin_url"):
+                should.append({"term": {"websites_professional_network": company["linkedin_url"]}})
+            if company.get("name"):
+                should.append({"match_phrase": {"name": company["name"]}})
+        if not should:
+            return []
+        
+        search_body = {
+            "query": {"bool": {"should": should, "minimum_should_match": 1}},
+            "size": len(companies) * self._BATCH_HITS_PER_COMPANY,
+            "_source": ["name", "website", "location", "location_hq_raw_address", "websites_professional_network"]
+        }
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        }
+        
+        print(f"[CoreSignal] 🔍 Batch ES DSL search for {len(companies)} companies ({len(should)} clauses)")
+        async with httpx.AsyncClient() as client:
+            try:
+                response = await provider_request(client, "coresignal", "POST", self.es_dsl_url, timeout=self.timeout, headers=headers, json=search_body)
+                if response.status_code != 200:
+                    print(f"[CoreSignal] ❌ Batch ES DSL search returned status: {response.status_code}")
+                    print(f"[CoreSignal] 📄 Response: {response.text[:500]}")
+                    return []
+                hits = response.json().get("hits", {}).get("hits", [])
+                return [hit.get("_source", {}) for hit in hits if hit.get("_source", {}).get("website")]
+            except Exception as e:
+                print(f"[CoreSignal] ❌ Batch ES DSL search failed: {str(e)}")
+                return []
+    
+    def _score_batch_hit(self, company: Dict[str, Optional[str]], hit: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Confidence that a search hit is the given input company."""
+        wanted_slug = self._linkedin_slug(company.get("linkedin_url"))
+        hit_slug = self._linkedin_slug(hit.get("websites_professional_network"))
+        if wanted_slug and wanted_slug == hit_slug:
+            return {"data": hit, "website": hit["website"], "confidence": 1.0, "matched_by": "linkedin_url"}
+        if wanted_slug and hit_slug:
+            # Same name, different LinkedIn company
+            return None
+        
+        wanted_tokens = self._name_tokens(company.get("name"))
+        hit_tokens = self._name_tokens(hit.get("name"))
+        if not wanted_tokens or not hit_tokens:
+            return None
+        
+        # Uncorroborated, even an exact name match stays below CORESIGNAL_BATCH_MIN_CONFIDENCE
+        if wanted_tokens == hit_tokens:
+            confidence = 0.75
+        else:
+            overlap = len(wanted_tokens & hit_tokens) / len(wanted_tokens | hit_tokens)
+            confidence = 0.6 * overlap
+        
+        location = (company.get("location") or "").lower()
+        hit_location = f"{hit.get('location') or ''} {hit.get('location_hq_raw_address') or ''}".lower()
+        if location and hit_location.strip():
+            location_tokens = set(re.findall(r"[a-z]+", location))
+            if location_tokens & set(re.findall(r"[a-z]+", hit_location)):
+                confidence += 0.2
+        
+        return {"data": hit, "website": hit["website"], "confidence": round(min(confidence, 0.95), 3), "matched_by": "name"}
+    
+    # Hits requested per input company in a batch search
+    _BATCH_HITS_PER_COMPANY = 5
+    
+    _NAME_SUFFIXES = {"inc", "llc", "ltd", "corp", "corporation", "co", "company", "gmbh", "plc", "the", "limited"}
+    
+    @classmethod
+    def _name_tokens(cls, name: Optional[str]) -> set:
+        if not name:
+            return set()
+        return {t for t in re.findall(r"[a-z0-9]+", name.lower()) if t not in cls._NAME_SUFFIXES}
+    
+    @staticmethod
+    def _linkedin_slug(url: Optional[str]) -> Optional[str]:
+        if not url:
+            return None
+        match = re.search(r"linkedin\.com/company/([^/?#]+)", url.lower())
+        return match.group(1).strip() if match else None
@@ -5,6 +5,9 @@ import os
 import httpx
 from dotenv import load_dotenv
 
+from ..core.config import settings
+from .http import provider_request
+
 load_dotenv()
 
 class EnrichLayerClient:
@@ -32,7 +35,7 @@ class EnrichLayerClient:
             return {"success": False, "error": "ENRICH_LAYER API key not configured"}
 
         # Use the correct v2 endpoint for company enrichment
-        base_url = "https://enrichlayer.com/api/v2/company"
+        base_url = settings.ENRICHLAYER_API_URL
         params = {}
 
         # Accept either 'url' (preferred) or 'domain' as input
@@ -74,7 +77,10 @@ class EnrichLayerClient:
 
         try:
             async with httpx.AsyncClient() as client:
-                response = await client.get(base_url, params=params, headers=headers, timeout=15)
+                response = await provider_request(
+                    client, "enrichlayer", "GET", base_url,
+                    timeout=settings.ENRICHLAYER_TIMEOUT, hedge=True, params=params, headers=headers
+                )
                 logging.info(f"[EnrichLayer] Response status: {response.status_code}")
                 response.raise_for_status()
                 return response.json()
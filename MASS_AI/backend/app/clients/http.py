@@ -0,0 +1,180 @@
+"""
+Shared HTTP layer for provider clients.
+
+provider_request() wraps a single outbound call with the provider's circuit
+breaker (app/core/circuit_breaker.py), a priority-scheduled slot
+(app/core/scheduler.py), adaptive timeout and latency recording, and optionally
+hedges idempotent GETs (see app/core/latency.py). Clients keep their own
+response handling; they only route the actual send through here. Responses
+are recorded to, or replayed from, a cassette when CASSETTE_MODE is set (see
+cassette.py). Every call is a "provider" span in its session's trace
+(app/core/tracing.py), with its status and response size.
+
+Failed attempts (429, 5xx, connection errors) are resent according to the
+shared retry policy (app/core/retry.py); a 429 also pauses the provider's rate
+limiter for every caller. Clients only see the final attempt's outcome.
+Identical idempotent calls made at the same time share one upstream call
+(app/core/coalescing.py).
+"""
+import asyncio
+import time
+from typing import Any, Optional
+
+import httpx
+
+from ..core.circuit_breaker import CircuitOpenError, provider_breakers
+from ..core.coalescing import record_sent, request_coalescer, request_key
+from ..core.latency import provider_latency
+from ..core.metrics import endpoint_label, provider_request_duration, provider_requests, status_outcome
+from ..core.rate_limiter import AsyncRateLimiter, get_rate_limiter
+from ..core.retry import retry_policy
+from ..core.scheduler import provider_scheduler
+from ..core.tracing import tracer
+from .cassette import cassette
+
+
+def _is_provider_failure(status_code: int) -> bool:
+    """Rate limiting and server errors count against the breaker; other 4xx are the caller's problem."""
+    return status_code == 429 or status_code >= 500
+
+
+async def _timed_request(client: httpx.AsyncClient, provider: str, method: str, url: str, endpoint: str,
+                         timeout: float, **kwargs: Any) -> httpx.Response:
+    start = time.monotonic()
+    try:
+        response = await client.request(method, url, timeout=timeout, **kwargs)
+    except httpx.TimeoutException:
+        provider_latency.record(provider, timeout, timed_out=True)
+        raise
+    elapsed = time.monotonic() - start
+    provider_latency.record(provider, elapsed)
+    provider_request_duration.observe(elapsed, provider, endpoint)
+    return response
+
+
+async def provider_request(client: httpx.AsyncClient, provider: str, method: str, url: str, *,
+                           timeout: float, hedge: bool = False, rate_limiter: Optional[AsyncRateLimiter] = None,
+                           idempotent: Optional[bool] = None, endpoint: Optional[str] = None,
+                           **kwargs: Any) -> httpx.Response:
+    """
+    Send one request to a provider.
+
+    Args:
+        client: Open httpx client
+        provider: Provider name used for latency tracking (e.g. "coresignal")
+        method: HTTP method
+        url: Request URL
+        timeout: Configured timeout; the adaptive timeout never exceeds it
+        hedge: Allow a hedged duplicate request (only honoured for GET)
+        rate_limiter: Provider rate limit, waited on after the scheduler admitted the call
+            (defaults to the provider's shared limiter)
+        idempotent: Whether the request may be resent after failures the provider may
+            have acted on (defaults to RetryPolicy.is_idempotent)
+        endpoint: Metrics label for the URL's path template (defaults to endpoint_label(url);
+            pass one when the path carries a value, e.g. a slug)
+        **kwargs: Passed to httpx (headers, params, json, ...)
+
+    Returns:
+        The first response received by the last attempt
+
+    Raises:
+        CircuitOpenError: The provider's breaker is open; nothing was sent
+        CassetteMissError: Replaying and the cassette has no such request
+    """
+    if idempotent is None:
+        idempotent = retry_policy.is_idempotent(provider, method)
+    endpoint = endpoint or endpoint_label(url)
+
+    async def send() -> httpx.Response:
+        with tracer.span(provider, kind="provider", provider=provider, method=method.upper(), url=url) as span:
+            response = await _provider_request(client, provider, method, url, endpoint, timeout=timeout, hedge=hedge,
+                                               rate_limiter=rate_limiter, idempotent=idempotent, **kwargs)
+            _annotate(span, response)
+            return response
+
+    key = request_key(provider, method, url, **kwargs) if idempotent else None
+    return await request_coalescer.run(provider, key, send)
+
+
+def _annotate(span, response) -> None:
+    if span is not None:
+        span.set(status_code=response.status_code, bytes=len(response.content or b""))
+        if _is_provider_failure(response.status_code):
+            span.status = "error"
+
+
+async def _provider_request(client: httpx.AsyncClient, provider: str, method: str, url: str, endpoint: str, *,
+                            timeout: float, hedge: bool, rate_limiter: Optional[AsyncRateLimiter],
+                            idempotent: bool, **kwargs: Any) -> httpx.Response:
+    record_sent(provider, endpoint)
+    if cassette.replaying:
+        return await cassette.replay(provider, method, url, **kwargs)
+
+    limiter = rate_limiter or get_rate_limiter(provider)
+    return await retry_policy.run(
+        provider, lambda: _attempt(client, provider, method, url, endpoint, timeout, hedge, limiter, **kwargs),
+        idempotent=idempotent, limiter=limiter,
+    )
+
+
+async def _attempt(client: httpx.AsyncClient, provider: str, method: str, url: str, endpoint: str,
+                   timeout: float, hedge: bool, limiter: AsyncRateLimiter, **kwargs: Any) -> httpx.Response:
+    breaker = provider_breakers.get(provider)
+    if not breaker.allow_request():
+        raise CircuitOpenError(provider)
+    try:
+        async with provider_scheduler.slot(provider):
+            await limiter.acquire()
+            start = time.monotonic()
+            response = await _send(client, provider, method, url, endpoint, timeout, hedge, **kwargs)
+            cassette.capture(provider, method, url, response, time.monotonic() - start, **kwargs)
+    except asyncio.CancelledError:
+        # No outcome; a half-open breaker must not wait forever on a cancelled probe
+        breaker.release_probe()
+        raise
+    except httpx.TimeoutException as e:
+        breaker.record_failure(f"timeout: {type(e).__name__}", timed_out=True)
+        provider_requests.inc(provider, endpoint, "timeout")
+        raise
+    except Exception as e:
+        breaker.record_failure(type(e).__name__)
+        provider_requests.inc(provider, endpoint, "error")
+        raise
+    provider_requests.inc(provider, endpoint, status_outcome(response.status_code))
+    if _is_provider_failure(response.status_code):
+        breaker.record_failure(f"HTTP {response.status_code}")
+    else:
+        breaker.record_success()
+    return response
+
+
+async def _send(client: httpx.AsyncClient, provider: str, method: str, url: str, endpoint: str,
+                timeout: float, hedge: bool, **kwargs: Any) -> httpx.Response:
+    request_timeout = provider_latency.timeout_for(provider, timeout)
+    delay = provider_latency.hedge_delay(provider) if hedge and method.upper() == "GET" else None
+    if delay is None:
+        return await _timed_request(client, provider, method, url, endpoint, request_timeout, **kwargs)
+
+    primary = asyncio.ensure_future(_timed_request(client, provider, method, url, endpoint, request_timeout, **kwargs))
+    done, _ = await asyncio.wait({primary}, timeout=delay)
+    if done:
+        return primary.result()
+
+    print(f"[HTTP] Hedging slow {provider} GET after {delay:.2f}s")
+    backup = asyncio.ensure_future(_timed_request(client, provider, method, url, endpoint, request_timeout, **kwargs))
+    pending = {primary, backup}
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    provider_latency.record_hedge(provider, won=task is backup)
+                    return task.result()
+        # Both attempts failed: surface the original request's error
+        provider_latency.record_hedge(provider, won=False)
+        return primary.result()
+    finally:
+        for task in (primary, backup):
+            if not task.done():
+                task.cancel()
+
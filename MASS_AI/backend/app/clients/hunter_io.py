@@ -1,7 +1,9 @@
 import os
 import logging
 from typing import Optional, Any, Dict
-import requests
+import httpx
+
+from .http import provider_request
 
 logger = logging.getLogger(__name__)
 
@@ -14,7 +16,7 @@ class HunterIoClient:
       - Email Verifier (verify deliverability of an email)
     """
 
-    BASE_URL = "https://api.hunter.io/v2"
+    BASE_URL = os.getenv("HUNTER_API_URL", "https://api.hunter.io/v2")
 
     def __init__(self, api_key: Optional[str] = None, timeout: int = 10):
         """
@@ -31,12 +33,11 @@ class HunterIoClient:
             logger.error("Hunter.io API key not found in environment variable 'HUNTER_IO_API_KEY'.")
             raise ValueError("Hunter.io API key not found in environment variable 'HUNTER_IO_API_KEY'.")
         self.timeout = timeout
-        self.session = requests.Session()
-        self.session.headers.update({
+        self.headers = {
             "Accept": "application/json"
-        })
+        }
 
-    def domain_search(self, domain: str, **kwargs) -> Optional[Dict[str, Any]]:
+    async def domain_search(self, domain: str, **kwargs) -> Optional[Dict[str, Any]]:
         """
         Find all emails for a given domain using Hunter.io Domain Search.
 
@@ -51,18 +52,19 @@ class HunterIoClient:
         params = {"domain": domain, "api_key": self.api_key}
         params.update(kwargs)
         try:
-            response = self.session.get(url, params=params, timeout=self.timeout)
+            async with httpx.AsyncClient(timeout=self.timeout) as client:
+                response = await provider_request(client, "hunter", "GET", url, timeout=self.timeout, params=params, headers=self.headers)
             if response.status_code == 200:
                 return response.json()
             elif response.status_code == 429:
                 logger.warning("Hunter.io rate limit exceeded (HTTP 429) on domain search.")
             else:
                 logger.error(f"Hunter.io domain search error: {response.status_code} - {response.text}")
-        except requests.RequestException as e:
+        except httpx.HTTPError as e:
             logger.error(f"Hunter.io domain search request failed: {e}")
         return None
 
-    def email_finder(self, domain: str, first_name: str, last_name: str, **kwargs) -> Optional[Dict[str, Any]]:
+    async def email_finder(self, domain: str, first_name: str, last_name: str, **kwargs) -> Optional[Dict[str, Any]]:
         """
         Find the most likely email for a person at a domain using Hunter.io Email Finder.
 
@@ -84,18 +86,19 @@ class HunterIoClient:
         }
         params.update(kwargs)
         try:
-            response = self.session.get(url, params=params, timeout=self.timeout)
+            async with httpx.AsyncClient(timeout=self.timeout) as client:
+                response = await provider_request(client, "hunter", "GET", url, timeout=self.timeout, params=params, headers=self.headers)
             if response.status_code == 200:
                 return response.json()
             elif response.status_code == 429:
                 logger.warning("Hunter.io rate limit exceeded (HTTP 429) on email finder.")
             else:
                 logger.error(f"Hunter.io email finder error: {response.status_code} - {response.text}")
-        except requests.RequestException as e:
+        except httpx.HTTPError as e:
             logger.error(f"Hunter.io email finder request failed: {e}")
         return None
 
-    def email_verifier(self, email: str) -> Optional[Dict[str, Any]]:
+    async def email_verifier(self, email: str) -> Optional[Dict[str, Any]]:
         """
         Verify the deliverability of an email address using Hunter.io Email Verifier.
 
@@ -108,13 +111,14 @@ class HunterIoClient:
         url = f"{self.BASE_URL}/email-verifier"
         params = {"email": email, "api_key": self.api_key}
         try:
-            response = self.session.get(url, params=params, timeout=self.timeout)
+            async with httpx.AsyncClient(timeout=self.timeout) as client:
+                response = await provider_request(client, "hunter", "GET", url, timeout=self.timeout, params=params, headers=self.headers)
             if response.status_code == 200:
                 return response.json()
             elif response.status_code == 429:
                 logger.warning("Hunter.io rate limit exceeded (HTTP 429) on email verifier.")
             else:
                 logger.error(f"Hunter.io email verifier error: {response.status_code} - {response.text}")
-        except requests.RequestException as e:
+        except httpx.HTTPError as e:
             logger.error(f"Hunter.io email verifier request failed: {e}")
         return None
\ No newline at end of file
@@ -1,12 +1,78 @@
 """
 Mistral AI API client for ICP normalization.
 """
+import asyncio
 import json
+import re
 import time
 import httpx
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Awaitable, Callable
 
 from ..core.config import settings
+from ..core.metrics import endpoint_label, mistral_queue_wait, provider_request_duration, provider_requests, status_outcome
+from ..core.rate_limiter import get_rate_limiter
+from ..core.retry import retry_policy
+from ..core.scheduler import provider_scheduler
+from ..core.tracing import tracer
+from .cassette import cassette
+
+
+class JSONFieldStreamReader:
+    """
+    Pulls the value of one JSON string field out of a document that arrives in
+    chunks, so it can be shown before the rest of the JSON is complete.
+    """
+    
+    _ESCAPES = {"n": "\n", "t": "\t", "r": "\r", "b": "\b", "f": "\f"}
+    
+    def __init__(self, field: str):
+        self._marker = re.compile(r'"%s"\s*:\s*"' % re.escape(field))
+        self._buffer = ""
+        self._pos = 0
+        self._in_value = False
+        self._done = False
+    
+    def feed(self, chunk: str) -> str:
+        """Add a chunk and return any newly decoded characters of the field value."""
+        self._buffer += chunk
+        if self._done:
+            return ""
+        
+        if not self._in_value:
+            match = self._marker.search(self._buffer)
+            if not match:
+                return ""
+            self._in_value = True
+            self._pos = match.end()
+        
+        out = []
+        buffer = self._buffer
+        while self._pos < len(buffer):
+            ch = buffer[self._pos]
+            if ch == "\\":
+                # Wait for the rest of the escape sequence
+                if self._pos + 1 >= len(buffer):
+                    break
+                nxt = buffer[self._pos + 1]
+                if nxt == "u":
+                    if self._pos + 6 > len(buffer):
+                        break
+                    try:
+                        out.append(chr(int(buffer[self._pos + 2:self._pos + 6], 16)))
+                    except ValueError:
+                        pass
+                    self._pos += 6
+                    continue
+                out.append(self._ESCAPES.get(nxt, nxt))
+                self._pos += 2
+                continue
+            if ch == '"':
+                self._done = True
+                break
+            out.append(ch)
+            self._pos += 1
+        
+        return "".join(out)
 
 
 class MistralClient:
@@ -15,8 +81,11 @@ class MistralClient:
     def __init__(self):
         self.api_key = settings.MISTRAL_API_KEY
         self.api_url = settings.MISTRAL_API_URL
+        self.endpoint = endpoint_label(self.api_url)
         self.last_call_time = 0
         self.rate_limit_seconds = settings.MISTRAL_RATE_LIMIT_SECONDS
+        # Paused by the retry policy when Mistral answers 429
+        self.rate_limiter = get_rate_limiter("mistral")
     
     def create_icp_normalization_prompt(self, icp_text: str) -> str:
         """Create a prompt for MISTRAL to normalize ICP text into structured format."""
@@ -229,23 +298,22 @@ ICP_JSON:
 
 RESPOND WITH ONLY THE JSON - START WITH {{ AND END WITH }}:"""
 
-    async def call_api(self, prompt: str) -> Dict[str, Any]:
-        """Call MISTRAL API to process the ICP normalization."""
-        if not self.api_key:
-            raise Exception("MISTRAL API key not configured")
-        
-        # Rate limiting: ensure minimum time between calls
+    async def _wait_for_rate_limit(self):
+        """Ensure minimum time between calls."""
+        if cassette.replaying:
+            return
         current_time = time.time()
         time_since_last_call = current_time - self.last_call_time
         
         if time_since_last_call < self.rate_limit_seconds:
             wait_time = self.rate_limit_seconds - time_since_last_call
             print(f"[MISTRAL] Rate limiting: waiting {wait_time:.1f} seconds...")
-            import asyncio
             await asyncio.sleep(wait_time)
         
         self.last_call_time = time.time()
-        
+    
+    def _build_request(self, prompt: str, stream: bool = False) -> tuple:
+        """Build headers and payload for a chat completion request."""
         headers = {
             "Content-Type": "application/json",
             "Authorization": f"Bearer {self.api_key}"
@@ -262,58 +330,170 @@ RESPOND WITH ONLY THE JSON - START WITH {{ AND END WITH }}:"""
             "temperature": 0.1,
             "max_tokens": 2000
         }
+        if stream:
+            payload["stream"] = True
         
-        # Retry logic for rate limiting and connection errors
-        max_retries = 3
-        retry_delay = 10  # seconds
+        return headers, payload
+    
+    async def call_api(self, prompt: str) -> Dict[str, Any]:
+        """Call MISTRAL API to process the ICP normalization."""
+        if not self.api_key and not cassette.replaying:
+            raise Exception("MISTRAL API key not configured")
         
-        for attempt in range(max_retries):
-            try:
-                async with httpx.AsyncClient() as client:
-                    response = await client.post(
-                        self.api_url, 
-                        headers=headers, 
-                        json=payload, 
-                        timeout=settings.DEFAULT_TIMEOUT
-                    )
-                    
-                    # Handle rate limiting
-                    if response.status_code == 429:
-                        if attempt < max_retries - 1:
-                            wait = retry_delay * (attempt + 1)
-                            print(f"[MISTRAL] Rate limited (429). Retrying in {wait} seconds... (attempt {attempt + 1}/{max_retries})")
-                            import asyncio
-                            await asyncio.sleep(wait)
-                            continue
-                        else:
-                            raise Exception(f"Rate limit exceeded after {max_retries} retries. Please wait a few minutes and try again.")
-                    
-                    response.raise_for_status()
-                    
-                    result = response.json()
-                    content = result["choices"][0]["message"]["content"].strip()
-                    
-                    # Log the raw response for debugging
-                    print(f"[MISTRAL] Raw response content: {content[:1000]}...")
-                    
-                    # Clean and parse JSON response
-                    return self._parse_json_response(content)
-                    
-            except httpx.ConnectError as e:
-                if attempt < max_retries - 1:
-                    wait = retry_delay * (attempt + 1)
-                    print(f"[MISTRAL] Connection error. Retrying in {wait} seconds... (attempt {attempt + 1}/{max_retries})")
-                    import asyncio
-                    await asyncio.sleep(wait)
-                    continue
-                else:
-                    raise Exception(f"Connection failed after {max_retries} retries: {str(e)}")
-            
-            except Exception as e:
-                # For other errors, don't retry
-                raise e
+        queued = time.monotonic()
+        await self._wait_for_rate_limit()
+        headers, payload = self._build_request(prompt)
+        
+        async def send() -> httpx.Response:
+            nonlocal queued
+            async with httpx.AsyncClient() as client, provider_scheduler.slot("mistral"):
+                if queued is not None:
+                    mistral_queue_wait.observe(time.monotonic() - queued)
+                    queued = None
+                await self.rate_limiter.acquire()
+                start = time.monotonic()
+                response = await client.post(
+                    self.api_url, 
+                    headers=headers, 
+                    json=payload, 
+                    timeout=settings.DEFAULT_TIMEOUT
+                )
+                elapsed = time.monotonic() - start
+                provider_request_duration.observe(elapsed, "mistral", self.endpoint)
+                provider_requests.inc("mistral", self.endpoint, status_outcome(response.status_code))
+                cassette.capture("mistral", "POST", self.api_url, response, elapsed, json=payload)
+                return response
+        
+        with tracer.span("mistral", kind="provider", provider="mistral", method="POST", url=self.api_url) as span:
+            if cassette.replaying:
+                response = await cassette.replay("mistral", "POST", self.api_url, json=payload)
+            else:
+                # 429s and connection errors are retried with the shared policy (app/core/retry.py)
+                try:
+                    response = await retry_policy.run("mistral", send, idempotent=True, limiter=self.rate_limiter)
+                except httpx.ConnectError as e:
+                    raise Exception(f"Connection failed after {settings.RETRY_MAX_ATTEMPTS} attempts: {str(e)}")
+            if span is not None:
+                span.set(status_code=response.status_code, bytes=len(response.content))
+        
+        if response.status_code == 429:
+            raise Exception("Rate limit exceeded after retries. Please wait a few minutes and try again.")
+        
+        response.raise_for_status()
+        
+        result = response.json()
+        content = result["choices"][0]["message"]["content"].strip()
+        
+        # Log the raw response for debugging
+        print(f"[MISTRAL] Raw response content: {content[:1000]}...")
+        
+        # Clean and parse JSON response
+        return self._parse_json_response(content)
+    
+    async def call_api_streaming(
+        self,
+        prompt: str,
+        on_token: Callable[[str], Awaitable[None]],
+        stream_field: str = "message"
+    ) -> Dict[str, Any]:
+        """
+        Call MISTRAL API with streaming enabled.
+        
+        The value of the JSON string field `stream_field` is forwarded to
+        `on_token` as it arrives; the complete response is parsed exactly
+        like call_api and returned.
+        """
+        if not self.api_key and not cassette.replaying:
+            raise Exception("MISTRAL API key not configured")
+        
+        queued = time.monotonic()
+        await self._wait_for_rate_limit()
+        headers, payload = self._build_request(prompt, stream=True)
+        
+        reader = JSONFieldStreamReader(stream_field)
+        content_parts = []
+        
+        lines: List[str] = []
+        
+        async def send() -> httpx.Response:
+            nonlocal queued, lines
+            async with httpx.AsyncClient() as client, provider_scheduler.slot("mistral"):
+                if queued is not None:
+                    mistral_queue_wait.observe(time.monotonic() - queued)
+                    queued = None
+                await self.rate_limiter.acquire()
+                start = time.monotonic()
+                async with client.stream(
+                    "POST",
+                    self.api_url,
+                    headers=headers,
+                    json=payload,
+                    timeout=settings.DEFAULT_TIMEOUT
+                ) as response:
+                    if response.status_code == 200:
+                        lines = await self._read_stream(response, reader, content_parts, on_token)
+                    else:
+                        # Rejected before streaming: leave it to the retry policy
+                        await response.aread()
+                        lines = response.text.splitlines()
+                provider_request_duration.observe(time.monotonic() - start, "mistral", self.endpoint)
+                provider_requests.inc("mistral", self.endpoint, status_outcome(response.status_code))
+                # The cassette keeps the raw event stream so replay goes through the same parsing
+                if cassette.recording:
+                    cassette.record("mistral", "POST", self.api_url, response.status_code, response.headers,
+                                    "\n".join(lines), time.monotonic() - start, json_body=payload)
+                return response
+        
+        with tracer.span("mistral", kind="provider", provider="mistral", method="POST",
+                         url=self.api_url, streamed=True) as span:
+            if cassette.replaying:
+                response = await cassette.replay("mistral", "POST", self.api_url, json=payload)
+                lines = await self._read_stream(response, reader, content_parts, on_token)
+            else:
+                # Not idempotent once tokens went out: only rejections and failed connects are resent
+                response = await retry_policy.run("mistral", send, idempotent=False, limiter=self.rate_limiter)
+                if response.status_code != 200:
+                    await self._read_stream(response, reader, content_parts, on_token)
+            if span is not None:
+                span.set(status_code=response.status_code, bytes=sum(len(line) + 1 for line in lines))
+        
+        content = "".join(content_parts).strip()
+        print(f"[MISTRAL] Raw streamed content: {content[:1000]}...")
         
-        raise Exception("Mistral API call failed after all retries")
+        return self._parse_json_response(content)
+    
+    async def _read_stream(
+        self,
+        response: httpx.Response,
+        reader: "JSONFieldStreamReader",
+        content_parts: List[str],
+        on_token: Callable[[str], Awaitable[None]]
+    ) -> List[str]:
+        """Consume a streamed completion into content_parts; returns the raw lines read."""
+        if response.status_code == 429:
+            raise Exception("Rate limit exceeded. Please wait a few minutes and try again.")
+        response.raise_for_status()
+        
+        lines = []
+        async for line in response.aiter_lines():
+            lines.append(line)
+            if not line.startswith("data:"):
+                continue
+            data = line[5:].strip()
+            if data == "[DONE]":
+                break
+            
+            chunk = json.loads(data)
+            choices = chunk.get("choices") or []
+            delta = (choices[0].get("delta") or {}).get("content") if choices else None
+            if not delta:
+                continue
+            
+            content_parts.append(delta)
+            text = reader.feed(delta)
+            if text:
+                await on_token(text)
+        return lines
     
     def _parse_json_response(self, content: str) -> Dict[str, Any]:
         """Parse and clean JSON response from Mistral."""
@@ -445,6 +625,60 @@ Now write a short, conversational message asking for the missing details above.
 Respond with ONLY JSON, starting with {{ and ending with }}.
 """
     
+    def create_conversation_turn_prompt(self, user_input: str, known_fields: Dict[str, Any]) -> str:
+        """
+        Create prompt that extracts fields from the user's answer AND writes the
+        next question in a single call (one Mistral round trip per turn).
+        """
+        known_fields_str = json.dumps(known_fields, indent=2) if known_fields else "{}"
+
+        return f"""You are a friendly assistant helping a user define their Ideal Customer Profile (ICP).
+In ONE response you must (1) extract ICP fields from the user's latest answer and (2) write the next question.
+
+EXISTING KNOWN FIELDS:
+{known_fields_str}
+
+USER'S LATEST INPUT:
+"{user_input}"
+
+STEP 1 - EXTRACTION
+Return ONLY the NEW or UPDATED fields mentioned in the user's input.
+Personas MUST be objects, never strings:
+CORRECT: {{"personas": [{{"name": "CEO", "title_regex": ["^CEO.*$"], "seniority": ["Executive"]}}]}}
+WRONG: {{"personas": ["CEO"]}}
+
+FIELD MAPPING:
+- Job titles/roles → {{"personas": [{{"name": "...", "title_regex": [...], "seniority": [...], "functions": [...]}}]}}
+- Technologies → {{"company_filters": {{"technologies": ["Python", "AWS"]}}}}
+- Company size text → {{"company_filters": {{"company_size": "small|medium|large"}}}}
+- Employee count → {{"company_filters": {{"employee_count": {{"min": X, "max": Y}}}}}}
+- Revenue/ARR → {{"company_filters": {{"arr_usd": {{"min": X, "max": Y}}}}}}
+- Industries → {{"company_filters": {{"industries": ["SaaS", "FinTech"]}}}}
+- Locations → {{"company_filters": {{"states": ["CA"], "cities": [...], "countries": [...]}}}}
+- Funding → {{"company_filters": {{"funding_stage": ["Series A"]}}}}
+- Founded year → {{"company_filters": {{"founded_year_min": 2020}}}}
+If nothing new can be extracted, use: {{"_no_new_fields": true}}
+
+STEP 2 - NEXT QUESTION
+After merging your extraction into the known fields, decide what is still missing:
+- Required first: person_titles, person_seniorities, company_size, revenue_range
+- Only when ALL required fields are present: technologies, industries
+Write a short, warm, conversational message asking for exactly those missing fields, with simple examples.
+List the field names you asked about in "asks_about" (use the names above).
+If nothing is missing, set "message" to "" and "asks_about" to [].
+
+Return JSON with this structure:
+{{
+  "extracted": {{ ... fields from step 1 ... }},
+  "question": {{
+    "message": "...",
+    "asks_about": ["field_name"]
+  }}
+}}
+
+Respond with ONLY JSON, starting with {{ and ending with }}.
+"""
+
     def create_completeness_evaluation_prompt(self, parsed_data: Dict[str, Any]) -> str:
         """Create prompt to evaluate if parsed ICP is complete enough to proceed."""
         parsed_str = json.dumps(parsed_data, indent=2)
@@ -1,7 +1,9 @@
 import os
 import logging
 from typing import Optional, Any, Dict
-import requests
+import httpx
+
+from .http import provider_request
 
 logger = logging.getLogger(__name__)
 
@@ -11,9 +13,10 @@ class SerperApiClient:
     Used for company data supplementation and enrichment fallback.
     """
 
-    API_URL = "https://google.serper.dev/search"
-    LOCATION_URL = "https://google.serper.dev/location"
-    NEWS_URL = "https://google.serper.dev/news"
+    BASE_URL = os.getenv("SERPER_API_URL", "https://google.serper.dev")
+    API_URL = f"{BASE_URL}/search"
+    LOCATION_URL = f"{BASE_URL}/location"
+    NEWS_URL = f"{BASE_URL}/news"
 
     def __init__(self, api_key: Optional[str] = None, timeout: int = 10):
         self.api_key = api_key or os.environ.get("SERPER_API_KEY")
@@ -21,13 +24,12 @@ class SerperApiClient:
             logger.error("SerperAPI key not found in environment variable 'SERPER_API_KEY'.")
             raise ValueError("SerperAPI key not found in environment variable 'SERPER_API_KEY'.")
         self.timeout = timeout
-        self.session = requests.Session()
-        self.session.headers.update({
+        self.headers = {
             "X-API-KEY": self.api_key,
             "Content-Type": "application/json"
-        })
+        }
 
-    def search(self, query: str) -> Optional[Dict[str, Any]]:
+    async def search(self, query: str) -> Optional[Dict[str, Any]]:
         """
         Perform a Google search using SerperAPI.
         Returns parsed JSON results, or None on error.
@@ -36,7 +38,8 @@ class SerperApiClient:
         payload = {"q": query}
         logger.info(f"[SerperAPI] Performing search for query: '{query}'")
         try:
-            response = self.session.post(self.API_URL, json=payload, timeout=self.timeout)
+            async with httpx.AsyncClient(timeout=self.timeout) as client:
+                response = await provider_request(client, "serper", "POST", self.API_URL, timeout=self.timeout, json=payload, headers=self.headers)
             logger.info(f"[SerperAPI] Search response status: {response.status_code}")
             if response.status_code == 200:
                 logger.info(f"[SerperAPI] Search response: {response.json()}")
@@ -45,11 +48,11 @@ class SerperApiClient:
                 logger.warning("[SerperAPI] Rate limit exceeded (HTTP 429).")
             else:
                 logger.error(f"[SerperAPI] Error: {response.status_code} - {response.text}")
-        except requests.RequestException as e:
+        except httpx.HTTPError as e:
             logger.error(f"[SerperAPI] Request failed: {e}")
         return None
 
-    def location(self, query: str) -> Optional[Dict[str, Any]]:
+    async def location(self, query: str) -> Optional[Dict[str, Any]]:
         """
         Perform a location search using SerperAPI.
         Returns parsed JSON results, or None on error.
@@ -58,7 +61,8 @@ class SerperApiClient:
         payload = {"q": query}
         logger.info(f"[SerperAPI] Performing location search for query: '{query}'")
         try:
-            response = self.session.post(self.LOCATION_URL, json=payload, timeout=self.timeout)
+            async with httpx.AsyncClient(timeout=self.timeout) as client:
+                response = await provider_request(client, "serper", "POST", self.LOCATION_URL, timeout=self.timeout, json=payload, headers=self.headers)
             logger.info(f"[SerperAPI] Location response status: {response.status_code}")
             if response.status_code == 200:
                 logger.info(f"[SerperAPI] Location response: {response.json()}")
@@ -67,11 +71,11 @@ class SerperApiClient:
                 logger.warning("[SerperAPI] Rate limit exceeded (HTTP 429) on location endpoint.")
             else:
                 logger.error(f"[SerperAPI] Location error: {response.status_code} - {response.text}")
-        except requests.RequestException as e:
+        except httpx.HTTPError as e:
             logger.error(f"[SerperAPI] Location request failed: {e}")
         return None
 
-    def news(self, query: str) -> Optional[Dict[str, Any]]:
+    async def news(self, query: str) -> Optional[Dict[str, Any]]:
         """
         Perform a news search using SerperAPI.
         Returns parsed JSON results, or None on error.
@@ -80,7 +84,8 @@ class SerperApiClient:
         payload = {"q": query}
         logger.info(f"[SerperAPI] Performing news search for query: '{query}'")
         try:
-            response = self.session.post(self.NEWS_URL, json=payload, timeout=self.timeout)
+            async with httpx.AsyncClient(timeout=self.timeout) as client:
+                response = await provider_request(client, "serper", "POST", self.NEWS_URL, timeout=self.timeout, json=payload, headers=self.headers)
             logger.info(f"[SerperAPI] News response status: {response.status_code}")
             if response.status_code == 200:
                 logger.info(f"[SerperAPI] News response: {response.json()}")
@@ -89,16 +94,16 @@ class SerperApiClient:
                 logger.warning("[SerperAPI] Rate limit exceeded (HTTP 429) on news endpoint.")
             else:
                 logger.error(f"[SerperAPI] News error: {response.status_code} - {response.text}")
-        except requests.RequestException as e:
+        except httpx.HTTPError as e:
             logger.error(f"[SerperAPI] News request failed: {e}")
         return None
 
-    def get_first_url_for_query(self, query: str, expected_domain: Optional[str] = None) -> Optional[str]:
+    async def get_first_url_for_query(self, query: str, expected_domain: Optional[str] = None) -> Optional[str]:
         """
         Returns the first valid URL from the search results, optionally filtered by expected_domain.
         If expected_domain is provided, only URLs containing that domain are considered.
         """
-        results = self.search(query)
+        results = await self.search(query)
         if not results:
             logger.info(f"No results returned for query: {query}")
             return None
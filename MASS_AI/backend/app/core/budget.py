@@ -0,0 +1,152 @@
+"""
+Per-session budget control for paid provider calls.
+
+A session's budget is ICPConfig.stage_overrides.budget_cap_per_lead_usd times
+the number of leads the search is expected to produce, split across stages by
+the stage percentages (finder/research/contacts/verify/...). Every tracked API
+call is charged to its stage (track_api_call does this). Lower-value work asks
+allows() first and is skipped once its stage budget, or the session total,
+would be exceeded, so a session degrades instead of overspending. Core calls
+(Apollo, EnrichLayer, CoreSignal, Hunter domain search) are charged but never
+blocked.
+"""
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from .config import settings
+
+# Stage each tracked call_type is charged to
+CALL_TYPE_STAGES = {
+    "apollo_company_search": "finder",
+    "apollo_company_prefetch": "finder",
+    "apollo_people_search": "finder",
+    "enrichlayer_company": "research",
+    "enrichlayer_lookup": "research",
+    "coresignal_enrich": "research",
+    "coresignal_search": "research",
+    "serper_search": "research",
+    "serper_location": "research",
+    "serper_news": "research",
+    "hunter_domain_search": "contacts",
+    "hunter_email_finder": "contacts",
+    "hunter_enrichment": "contacts",
+    "hunter_email_verifier": "verify",
+}
+
+STAGES = ("finder", "research", "contacts", "verify", "synthesis", "intent")
+
+
+class SessionBudget:
+    """Stage budgets, spend and skip decisions for one session."""
+
+    MAX_DECISIONS = 100
+
+    def __init__(self, session_id: str, total_usd: float, stage_pcts: Dict[str, float]):
+        self.session_id = session_id
+        self.total_usd = total_usd
+        self.stage_budgets = {stage: total_usd * stage_pcts.get(stage, 0) / 100 for stage in STAGES}
+        self.spent: Dict[str, float] = {stage: 0.0 for stage in STAGES}
+        self.spent["other"] = 0.0
+        self.skipped: Dict[str, int] = {}
+        self.decisions: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    @property
+    def total_spent(self) -> float:
+        return sum(self.spent.values())
+
+    def charge(self, call_type: Optional[str], cost_usd: float) -> None:
+        """Charge a call's cost to the stage of its call_type."""
+        stage = CALL_TYPE_STAGES.get(call_type or "", "other")
+        with self._lock:
+            self.spent[stage] += cost_usd
+
+    def allows(self, activity: str, stage: str, estimated_cost_usd: float) -> bool:
+        """
+        True if `activity` may spend `estimated_cost_usd` from `stage`. A refusal
+        is counted, and the first refusal per activity is kept as a decision.
+        """
+        with self._lock:
+            if self.spent[stage] + estimated_cost_usd <= self.stage_budgets[stage] \
+                    and self.total_spent + estimated_cost_usd <= self.total_usd:
+                return True
+
+            if self.spent[stage] + estimated_cost_usd > self.stage_budgets[stage]:
+                reason = (f"{stage} budget exhausted (${self.spent[stage]:.4f} of "
+                          f"${self.stage_budgets[stage]:.4f} spent)")
+            else:
+                reason = f"session budget exhausted (${self.total_spent:.4f} of ${self.total_usd:.4f} spent)"
+
+            if activity not in self.skipped:
+                print(f"[Budget] Session {self.session_id}: skipping {activity} from now on: {reason}")
+                if len(self.decisions) < self.MAX_DECISIONS:
+                    self.decisions.append({"at": time.time(), "activity": activity, "stage": stage, "reason": reason})
+            self.skipped[activity] = self.skipped.get(activity, 0) + 1
+            return False
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "budget_usd": round(self.total_usd, 4),
+                "spent_usd": round(self.total_spent, 4),
+                "stages": {
+                    stage: {"budget_usd": round(self.stage_budgets[stage], 4), "spent_usd": round(self.spent[stage], 4)}
+                    for stage in STAGES
+                },
+                "skipped": dict(self.skipped),
+                "decisions": list(self.decisions),
+            }
+
+
+class BudgetRegistry:
+    """Budgets of active sessions, keyed by session_id."""
+
+    MAX_SESSIONS = 1000
+
+    def __init__(self):
+        self._budgets: Dict[str, SessionBudget] = {}
+        self._lock = threading.Lock()
+
+    def start(self, session_id: Optional[str], icp_config, expected_companies: int) -> Optional[SessionBudget]:
+        """
+        Create (or keep) the budget for a session from its ICP's stage_overrides.
+        The lead target is expected_companies x contact_persona_targets.per_company_min.
+        """
+        if not settings.BUDGET_CONTROL_ENABLED or not session_id or icp_config is None:
+            return None
+        with self._lock:
+            existing = self._budgets.get(session_id)
+            if existing is not None:
+                return existing
+
+            overrides = icp_config.stage_overrides
+            leads_per_company = max(1, icp_config.contact_persona_targets.per_company_min)
+            expected_leads = max(1, expected_companies) * leads_per_company
+            total = overrides.budget_cap_per_lead_usd * expected_leads
+            stage_pcts = {stage: getattr(overrides, f"{stage}_pct", 0) for stage in STAGES}
+
+            if len(self._budgets) >= self.MAX_SESSIONS:
+                self._budgets.pop(next(iter(self._budgets)))
+            budget = SessionBudget(session_id, total, stage_pcts)
+            self._budgets[session_id] = budget
+            print(f"[Budget] Session {session_id}: ${total:.2f} for {expected_leads} expected leads "
+                  f"(${overrides.budget_cap_per_lead_usd:.2f}/lead)")
+            return budget
+
+    def get(self, session_id: Optional[str]) -> Optional[SessionBudget]:
+        if not session_id:
+            return None
+        return self._budgets.get(session_id)
+
+    def summary(self, session_id: Optional[str]) -> Optional[Dict[str, Any]]:
+        budget = self.get(session_id)
+        return budget.summary() if budget else None
+
+    def discard(self, session_id: str) -> None:
+        with self._lock:
+            self._budgets.pop(session_id, None)
+
+
+# Global instance
+session_budgets = BudgetRegistry()
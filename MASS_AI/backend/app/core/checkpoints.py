@@ -0,0 +1,192 @@
+"""
+Durable per-company enrichment checkpoints.
+
+Each company's paid stage outputs (EnrichLayer, CoreSignal, Serper, Hunter) and
+its final mapped result are written to a local SQLite database in WAL mode,
+keyed by (session_id, company key, stage). When a run for the same session is
+retried after a worker died, completed stages are loaded instead of being
+called and paid for again.
+
+A checkpoint stores the track_api_call arguments of the calls it paid for. It
+is written *before* those calls are tracked, with cost_tracked=0, and flipped
+to 1 once track_api_call succeeded. A resumed stage whose cost was never
+recorded is tracked then; one that was recorded is not tracked again.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from .config import settings
+from .db_operations import track_api_call
+from .metrics import record_cache
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS company_checkpoints (
+    session_id TEXT NOT NULL,
+    company_key TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    cost TEXT,
+    cost_tracked INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (session_id, company_key, stage)
+)
+"""
+
+
+def company_key(company) -> Optional[str]:
+    """Stable key of a company within a session: Apollo id, else domain, else name."""
+    for value in (company.organization_id, company.id, company.domain):
+        if value:
+            return str(value).lower()
+    if company.name:
+        return f"name:{company.name.strip().lower()}"
+    return None
+
+
+class CheckpointStore:
+    """SQLite (WAL) store of company stage outputs."""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            path = self.path or settings.CHECKPOINT_DB_PATH
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            # WAL + NORMAL survives process crashes; only an OS crash can lose the last commits
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(_SCHEMA)
+            ttl = settings.CHECKPOINT_TTL_HOURS * 3600
+            conn.execute("DELETE FROM company_checkpoints WHERE created_at < ?", (time.time() - ttl,))
+            self._conn = conn
+        return self._conn
+
+    def load(self, session_id: str, key: str, stage: str) -> Optional[Dict[str, Any]]:
+        """The checkpoint as {"payload": ..., "cost": ..., "cost_tracked": bool}, or None."""
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT payload, cost, cost_tracked FROM company_checkpoints "
+                "WHERE session_id = ? AND company_key = ? AND stage = ?",
+                (session_id, key, stage),
+            ).fetchone()
+        if row is None:
+            return None
+        return {"payload": json.loads(row[0]), "cost": json.loads(row[1]) if row[1] else None,
+                "cost_tracked": bool(row[2])}
+
+    def save(self, session_id: str, key: str, stage: str, payload: Any,
+             cost: Optional[Dict[str, Any]] = None) -> None:
+        """Write a stage checkpoint; its cost (if any) starts out untracked."""
+        encoded = json.dumps(payload, default=str)
+        with self._lock:
+            self._connect().execute(
+                "INSERT OR REPLACE INTO company_checkpoints "
+                "(session_id, company_key, stage, payload, cost, cost_tracked, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (session_id, key, stage, encoded, json.dumps(cost) if cost else None, int(not cost), time.time()),
+            )
+
+    def mark_tracked(self, session_id: str, key: str, stage: str) -> None:
+        with self._lock:
+            self._connect().execute(
+                "UPDATE company_checkpoints SET cost_tracked = 1 "
+                "WHERE session_id = ? AND company_key = ? AND stage = ?",
+                (session_id, key, stage),
+            )
+
+    def stages(self, session_id: str) -> Dict[str, int]:
+        """Number of checkpoints per stage for a session."""
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT stage, COUNT(*) FROM company_checkpoints WHERE session_id = ? GROUP BY stage",
+                (session_id,),
+            ).fetchall()
+        return dict(rows)
+
+    def discard_session(self, session_id: str) -> None:
+        with self._lock:
+            self._connect().execute("DELETE FROM company_checkpoints WHERE session_id = ?", (session_id,))
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def for_company(self, session_id: Optional[str], company) -> "CompanyCheckpoints":
+        return CompanyCheckpoints(self, session_id, company_key(company))
+
+
+class CompanyCheckpoints:
+    """
+    Checkpoints of one company in one session. Inactive (loads nothing, saves
+    nothing) when checkpointing is disabled or there is no session or key;
+    costs are then tracked as usual.
+
+    `cost` arguments are track_api_call keyword arguments without session_id,
+    e.g. {"api_name": "CoreSignal", "endpoint": "company_clean/enrich",
+    "call_type": "coresignal_enrich", "calls_made": 1}.
+    """
+
+    def __init__(self, store: CheckpointStore, session_id: Optional[str], key: Optional[str]):
+        self.store = store
+        self.session_id = session_id
+        self.key = key
+        self.active = bool(settings.CHECKPOINTS_ENABLED and session_id and key)
+
+    def load(self, stage: str) -> Optional[Any]:
+        """Payload of a completed stage, or None. A cost that was never recorded is tracked now."""
+        if not self.active:
+            return None
+        try:
+            checkpoint = self.store.load(self.session_id, self.key, stage)
+        except sqlite3.Error as e:
+            print(f"[Checkpoints] Could not read {stage} checkpoint for {self.key}: {e}")
+            return None
+        record_cache("checkpoint", checkpoint is not None)
+        if checkpoint is None:
+            return None
+
+        print(f"[Checkpoints] Resuming {self.key} from {stage} checkpoint (session {self.session_id})")
+        if checkpoint["cost"] and not checkpoint["cost_tracked"]:
+            self._track(stage, checkpoint["cost"], mark=True)
+        return checkpoint["payload"]
+
+    def save(self, stage: str, payload: Any, cost: Optional[Dict[str, Any]] = None) -> None:
+        """Checkpoint a completed stage, then track the cost of the calls it made."""
+        saved = False
+        if self.active:
+            try:
+                self.store.save(self.session_id, self.key, stage, payload, cost)
+                saved = True
+            except sqlite3.Error as e:
+                print(f"[Checkpoints] Could not write {stage} checkpoint for {self.key}: {e}")
+        if cost and self.session_id:
+            self._track(stage, cost, mark=saved)
+
+    def _track(self, stage: str, cost: Dict[str, Any], mark: bool) -> None:
+        try:
+            track_api_call(session_id=self.session_id, success=True, **cost)
+        except Exception as e:
+            # Left untracked so a resumed run records it
+            print(f"[Cost Tracking] Error tracking {cost.get('api_name', stage)} call: {e}")
+            return
+        if not mark:
+            return
+        try:
+            self.store.mark_tracked(self.session_id, self.key, stage)
+        except sqlite3.Error as e:
+            print(f"[Checkpoints] Could not mark {stage} checkpoint for {self.key} as tracked: {e}")
+
+
+# Global checkpoint store
+checkpoint_store = CheckpointStore()
@@ -0,0 +1,181 @@
+"""
+Per-provider circuit breakers.
+
+A provider that is down or rate limiting us (errors, 429s, timeouts) would
+otherwise cost every company in a search the full timeout or error path.
+Each provider gets a breaker with the usual three states:
+
+- closed: requests flow; outcomes are recorded in a rolling window
+- open: requests are refused immediately for BREAKER_OPEN_SECONDS
+- half_open: one probe request is let through; success closes the breaker,
+  failure opens it again
+
+The breaker trips when the window's error rate reaches BREAKER_ERROR_RATE
+(after BREAKER_MIN_REQUESTS outcomes) or after BREAKER_CONSECUTIVE_TIMEOUTS
+timeouts in a row.
+"""
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+from .config import settings
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a provider whose breaker is open."""
+
+    def __init__(self, provider: str):
+        super().__init__(f"Circuit breaker open for provider '{provider}'")
+        self.provider = provider
+
+
+class CircuitBreaker:
+    """Breaker for one provider."""
+
+    MAX_TRANSITIONS = 50
+
+    def __init__(self, provider: str):
+        self.provider = provider
+        self.state = CLOSED
+        self.opened_at: Optional[float] = None
+        self.probe_in_flight = False
+        self.consecutive_timeouts = 0
+        self.rejected = 0
+        self._outcomes: Deque[bool] = deque(maxlen=max(1, settings.BREAKER_WINDOW_SIZE))
+        self.transitions: Deque[Dict[str, Any]] = deque(maxlen=self.MAX_TRANSITIONS)
+        self._lock = threading.Lock()
+
+    def _transition(self, new_state: str, reason: str) -> None:
+        if new_state == self.state:
+            return
+        print(f"[CircuitBreaker] {self.provider}: {self.state} -> {new_state} ({reason})")
+        self.transitions.append({
+            "at": time.time(),
+            "from": self.state,
+            "to": new_state,
+            "reason": reason,
+        })
+        self.state = new_state
+        if new_state == OPEN:
+            self.opened_at = time.monotonic()
+            self.probe_in_flight = False
+        elif new_state == CLOSED:
+            self.opened_at = None
+            self.probe_in_flight = False
+            self.consecutive_timeouts = 0
+            self._outcomes.clear()
+
+    def _cooldown_elapsed(self) -> bool:
+        return self.opened_at is not None and time.monotonic() - self.opened_at >= settings.BREAKER_OPEN_SECONDS
+
+    def is_open(self) -> bool:
+        """True while requests would be refused (does not use up the half-open probe)."""
+        if not settings.BREAKER_ENABLED:
+            return False
+        with self._lock:
+            if self.state == OPEN:
+                return not self._cooldown_elapsed()
+            return self.state == HALF_OPEN and self.probe_in_flight
+
+    def allow_request(self) -> bool:
+        """Admit one request, moving an expired open breaker to half-open for a probe."""
+        if not settings.BREAKER_ENABLED:
+            return True
+        with self._lock:
+            if self.state == OPEN and self._cooldown_elapsed():
+                self._transition(HALF_OPEN, "cooldown elapsed")
+            if self.state == HALF_OPEN and not self.probe_in_flight:
+                self.probe_in_flight = True
+                return True
+            if self.state == CLOSED:
+                return True
+            self.rejected += 1
+            return False
+
+    def release_probe(self) -> None:
+        """Give back the half-open probe slot when a probe ended without an outcome."""
+        with self._lock:
+            self.probe_in_flight = False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.consecutive_timeouts = 0
+            if self.state == HALF_OPEN:
+                self._transition(CLOSED, "probe succeeded")
+                return
+            self._outcomes.append(True)
+
+    def record_failure(self, reason: str, timed_out: bool = False) -> None:
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._transition(OPEN, f"probe failed: {reason}")
+                return
+            if self.state == OPEN:
+                return
+            self._outcomes.append(False)
+            self.consecutive_timeouts = self.consecutive_timeouts + 1 if timed_out else 0
+
+            if self.consecutive_timeouts >= settings.BREAKER_CONSECUTIVE_TIMEOUTS:
+                self._transition(OPEN, f"{self.consecutive_timeouts} consecutive timeouts")
+            elif len(self._outcomes) >= settings.BREAKER_MIN_REQUESTS:
+                error_rate = self._error_rate()
+                if error_rate >= settings.BREAKER_ERROR_RATE:
+                    self._transition(OPEN, f"error rate {error_rate:.0%} ({reason})")
+
+    def _error_rate(self) -> float:
+        if not self._outcomes:
+            return 0.0
+        return sum(1 for ok in self._outcomes if not ok) / len(self._outcomes)
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            retry_in = None
+            if self.state == OPEN and self.opened_at is not None:
+                retry_in = max(0.0, settings.BREAKER_OPEN_SECONDS - (time.monotonic() - self.opened_at))
+            return {
+                "state": self.state,
+                "error_rate": round(self._error_rate(), 4),
+                "window_requests": len(self._outcomes),
+                "consecutive_timeouts": self.consecutive_timeouts,
+                "rejected": self.rejected,
+                "retry_in_seconds": retry_in,
+                "transitions": list(self.transitions),
+            }
+
+
+class CircuitBreakerRegistry:
+    """Lazily created breaker per provider name."""
+
+    def __init__(self):
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def get(self, provider: str) -> CircuitBreaker:
+        key = provider.lower()
+        breaker = self._breakers.get(key)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.setdefault(key, CircuitBreaker(key))
+        return breaker
+
+    def is_open(self, provider: str) -> bool:
+        return self.get(provider).is_open()
+
+    def open_providers(self) -> List[str]:
+        return [name for name, breaker in self._breakers.items() if breaker.is_open()]
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        return {name: breaker.status() for name, breaker in sorted(self._breakers.items())}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._breakers.clear()
+
+
+# Global instance
+provider_breakers = CircuitBreakerRegistry()
@@ -0,0 +1,176 @@
+"""
+Single-flight coalescing of identical provider calls.
+
+When two sessions (or two companies of one run) make the same idempotent call
+at the same moment (same provider, method, URL and canonical parameters),
+only the first one is sent; the others wait for it and get the same response
+(or error). provider_request() (app/clients/http.py) coalesces every
+idempotent call, Serper and Hunter lookups included; a call that arrives after
+the first one finished is sent again as usual, so this never serves stale data.
+
+If the caller that sent the shared call is cancelled, the callers waiting on
+it send their own instead.
+
+A caller that joined someone else's call must not bill it again: cost
+tracking wraps provider calls in request_coalescer.tally() and leaves out the
+calls that were coalesced. Where a client makes a varying number of calls
+(paged searches, the research agent), the tally also counts the calls that
+were actually sent, per provider endpoint, so each one can be billed.
+
+Counts per provider are exposed on GET /health/coalescing and as
+mass_provider_coalesced_requests_total.
+"""
+import asyncio
+import hashlib
+import json
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Iterator, Optional, Tuple
+
+from .config import settings
+from .metrics import coalesced_requests
+from .tracing import tracer
+
+
+class _Abandoned(Exception):
+    """The caller that sent a shared call was cancelled before it finished."""
+
+
+def request_key(provider: str, method: str, url: str, **kwargs: Any) -> Optional[str]:
+    """
+    Canonical key of a request: provider, method, URL and the JSON form of its
+    params/json/data/headers with sorted keys. None if the request has a body
+    that cannot be compared (files, streams).
+    """
+    try:
+        canonical = json.dumps([provider, method.upper(), url, kwargs], sort_keys=True, separators=(",", ":"))
+    except (TypeError, ValueError):
+        return None
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class CallTally:
+    """
+    Provider calls inside a RequestCoalescer.tally() block: how many got
+    another caller's response, and how many were sent per (provider, endpoint).
+    Calls also count in the enclosing tally, if any.
+    """
+
+    def __init__(self, parent: Optional["CallTally"] = None):
+        self.coalesced = 0
+        self.sent: Dict[Tuple[str, str], int] = {}
+        self.parent = parent
+
+    def count(self, provider: str, endpoint: Optional[str] = None) -> int:
+        """Calls sent to `provider` (only to `endpoint`, an endpoint_label, if given)."""
+        return sum(n for (p, e), n in self.sent.items() if p == provider and endpoint in (None, e))
+
+
+_tally: ContextVar[Optional[CallTally]] = ContextVar("coalescing_tally", default=None)
+
+
+def _record_joined() -> None:
+    tally = _tally.get()
+    while tally is not None:
+        tally.coalesced += 1
+        tally = tally.parent
+
+
+def record_sent(provider: str, endpoint: str) -> None:
+    """Count a call that goes upstream (not joined) in the current tallies."""
+    tally = _tally.get()
+    while tally is not None:
+        tally.sent[(provider, endpoint)] = tally.sent.get((provider, endpoint), 0) + 1
+        tally = tally.parent
+
+
+class RequestCoalescer:
+    """In-flight calls by request key; later identical callers join the first."""
+
+    def __init__(self):
+        self._flights: Dict[str, asyncio.Future] = {}
+        self._lock = threading.Lock()
+        self._sent: Dict[str, int] = {}
+        self._coalesced: Dict[str, int] = {}
+
+    def _count(self, provider: str, coalesced: bool) -> None:
+        with self._lock:
+            counts = self._coalesced if coalesced else self._sent
+            counts[provider] = counts.get(provider, 0) + 1
+        if coalesced:
+            coalesced_requests.inc(provider)
+
+    async def run(self, provider: str, key: Optional[str], call: Callable[[], Awaitable[Any]]) -> Any:
+        """Await `call()`, or the identical call already in flight on this event loop."""
+        if not settings.COALESCING_ENABLED or key is None:
+            return await call()
+
+        loop = asyncio.get_running_loop()
+        flight = self._flights.get(key)
+        if flight is not None and flight.get_loop() is loop and not flight.done():
+            self._count(provider, coalesced=True)
+            try:
+                with tracer.span(provider, kind="coalesced", provider=provider):
+                    # shield: a cancelled waiter must not cancel the shared call
+                    result = await asyncio.shield(flight)
+            except _Abandoned:
+                return await self.run(provider, key, call)
+            _record_joined()
+            return result
+
+        flight = loop.create_future()
+        self._flights[key] = flight
+        self._count(provider, coalesced=False)
+        try:
+            result = await call()
+        except asyncio.CancelledError:
+            flight.set_exception(_Abandoned())
+            raise
+        except Exception as e:
+            flight.set_exception(e)
+            raise
+        else:
+            flight.set_result(result)
+            return result
+        finally:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+            # Nobody may have joined; don't let asyncio log an unretrieved exception
+            if flight.done():
+                flight.exception()
+
+    @staticmethod
+    @contextmanager
+    def tally() -> Iterator[CallTally]:
+        """
+        Count the provider calls made inside the block (and in tasks it
+        started): the ones answered by another caller's call, which are not
+        billed, and the ones sent.
+        """
+        tally = CallTally(_tally.get())
+        token = _tally.set(tally)
+        try:
+            yield tally
+        finally:
+            _tally.reset(token)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            providers = set(self._sent) | set(self._coalesced)
+            return {
+                provider: {
+                    "sent": self._sent.get(provider, 0),
+                    "coalesced": self._coalesced.get(provider, 0),
+                }
+                for provider in sorted(providers)
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._sent.clear()
+            self._coalesced.clear()
+
+
+# Global coalescer
+request_coalescer = RequestCoalescer()
@@ -22,24 +22,143 @@ class Settings:
     APOLLO_API_KEY = os.getenv("APOLLO_API_KEY")
     CORESIGNAL_API_KEY = os.getenv("CORESIGNAL_API_KEY")
     
-    # API URLs
-    MISTRAL_API_URL = "https://api.mistral.ai/v1/chat/completions"
-    APOLLO_SEARCH_URL = "https://api.apollo.io/api/v1/mixed_companies/search"
-    APOLLO_PEOPLE_URL = "https://api.apollo.io/api/v1/mixed_people/search"
+    # API URLs (overridable so benchmarks can point every provider at the offline stand-in server)
+    MISTRAL_API_URL = os.getenv("MISTRAL_API_URL", "https://api.mistral.ai/v1/chat/completions")
+    APOLLO_SEARCH_URL = os.getenv("APOLLO_SEARCH_URL", "https://api.apollo.io/api/v1/mixed_companies/search")
+    APOLLO_PEOPLE_URL = os.getenv("APOLLO_PEOPLE_URL", "https://api.apollo.io/api/v1/mixed_people/search")
+    ENRICHLAYER_API_URL = os.getenv("ENRICHLAYER_API_URL", "https://enrichlayer.com/api/v2/company")
 
     # CoreSignal URLs - All use cdapi/v2 for consistency
     # Note: Enrich and Collect work, Search/ES_DSL may need credits or different endpoint
-    CORESIGNAL_API_URL = "https://api.coresignal.com/cdapi/v2/company_clean/enrich"
-    CORESIGNAL_SEARCH_URL = "https://api.coresignal.com/cdapi/v2/company_clean/search"
-    CORESIGNAL_COLLECT_URL = "https://api.coresignal.com/cdapi/v2/company_clean/collect"
-    CORESIGNAL_ES_DSL_URL = "https://api.coresignal.com/cdapi/v2/company_clean/search/es_dsl"
+    CORESIGNAL_API_URL = os.getenv("CORESIGNAL_API_URL", "https://api.coresignal.com/cdapi/v2/company_clean/enrich")
+    CORESIGNAL_SEARCH_URL = os.getenv("CORESIGNAL_SEARCH_URL", "https://api.coresignal.com/cdapi/v2/company_clean/search")
+    CORESIGNAL_COLLECT_URL = os.getenv("CORESIGNAL_COLLECT_URL", "https://api.coresignal.com/cdapi/v2/company_clean/collect")
+    CORESIGNAL_ES_DSL_URL = os.getenv("CORESIGNAL_ES_DSL_URL", "https://api.coresignal.com/cdapi/v2/company_clean/search/es_dsl")
     
     # Rate Limiting
-    MISTRAL_RATE_LIMIT_SECONDS = 8  # Minimum seconds between calls (increased to avoid 429 errors on free tier)
+    MISTRAL_RATE_LIMIT_SECONDS = float(os.getenv("MISTRAL_RATE_LIMIT_SECONDS", "8"))  # Minimum seconds between calls (increased to avoid 429 errors on free tier)
     
     # Timeouts
     DEFAULT_TIMEOUT = 30.0
     CORESIGNAL_TIMEOUT = 10.0
+    ENRICHLAYER_TIMEOUT = 15.0
+
+    # Adaptive timeouts and hedged GETs from live per-provider latency (configured timeouts are the ceiling)
+    ADAPTIVE_TIMEOUTS_ENABLED = os.getenv("ADAPTIVE_TIMEOUTS_ENABLED", "true").lower() == "true"
+    LATENCY_WINDOW_SIZE = int(os.getenv("LATENCY_WINDOW_SIZE", "500"))
+    LATENCY_MIN_SAMPLES = int(os.getenv("LATENCY_MIN_SAMPLES", "20"))
+    ADAPTIVE_TIMEOUT_PERCENTILE = float(os.getenv("ADAPTIVE_TIMEOUT_PERCENTILE", "99"))
+    ADAPTIVE_TIMEOUT_MULTIPLIER = float(os.getenv("ADAPTIVE_TIMEOUT_MULTIPLIER", "1.5"))
+    ADAPTIVE_TIMEOUT_MIN_SECONDS = float(os.getenv("ADAPTIVE_TIMEOUT_MIN_SECONDS", "2.0"))
+    HEDGED_REQUESTS_ENABLED = os.getenv("HEDGED_REQUESTS_ENABLED", "false").lower() == "true"
+    HEDGE_PERCENTILE = float(os.getenv("HEDGE_PERCENTILE", "95"))
+    HEDGE_MAX_RATE = float(os.getenv("HEDGE_MAX_RATE", "0.05"))  # Max share of requests hedged per provider
+
+    # Enrichment planner: skip providers that cannot fill any missing field.
+    # ENRICHMENT_TARGET_FIELDS narrows the fields worth paying for (comma-separated
+    # Company fields); empty means every field some provider can supply.
+    ENRICHMENT_PLANNER_ENABLED = os.getenv("ENRICHMENT_PLANNER_ENABLED", "true").lower() == "true"
+    ENRICHMENT_TARGET_FIELDS = os.getenv("ENRICHMENT_TARGET_FIELDS", "")
+
+    # POST /companies/plan estimates
+    PLAN_MIN_HISTORY = int(os.getenv("PLAN_MIN_HISTORY", "20"))  # Enriched companies before metrics replace defaults
+    PLAN_TARGET_SECONDS = float(os.getenv("PLAN_TARGET_SECONDS", "300"))  # Longer runs get a smaller suggested limit
+
+    # Per-session budgets from ICP stage_overrides (lower-value stages stop when they run out)
+    BUDGET_CONTROL_ENABLED = os.getenv("BUDGET_CONTROL_ENABLED", "true").lower() == "true"
+
+    # Per-provider circuit breakers
+    BREAKER_ENABLED = os.getenv("BREAKER_ENABLED", "true").lower() == "true"
+    BREAKER_WINDOW_SIZE = int(os.getenv("BREAKER_WINDOW_SIZE", "20"))
+    BREAKER_MIN_REQUESTS = int(os.getenv("BREAKER_MIN_REQUESTS", "10"))
+    BREAKER_ERROR_RATE = float(os.getenv("BREAKER_ERROR_RATE", "0.5"))
+    BREAKER_CONSECUTIVE_TIMEOUTS = int(os.getenv("BREAKER_CONSECUTIVE_TIMEOUTS", "3"))
+    BREAKER_OPEN_SECONDS = float(os.getenv("BREAKER_OPEN_SECONDS", "30"))
+
+    # Provider retries (app/core/retry.py)
+    RETRY_ENABLED = os.getenv("RETRY_ENABLED", "true").lower() == "true"
+    RETRY_MAX_ATTEMPTS = int(os.getenv("RETRY_MAX_ATTEMPTS", "3"))  # Including the first attempt
+    RETRY_BASE_DELAY_SECONDS = float(os.getenv("RETRY_BASE_DELAY_SECONDS", "0.5"))
+    RETRY_MAX_DELAY_SECONDS = float(os.getenv("RETRY_MAX_DELAY_SECONDS", "30"))  # Longer Retry-After: give up
+    RETRY_BUDGET_RATIO = float(os.getenv("RETRY_BUDGET_RATIO", "0.2"))  # Retries per request, long-run
+    RETRY_BUDGET_MIN = int(os.getenv("RETRY_BUDGET_MIN", "10"))  # Retries available in a burst
+
+    # Identical concurrent idempotent provider calls share one upstream call
+    COALESCING_ENABLED = os.getenv("COALESCING_ENABLED", "true").lower() == "true"
+
+    # Company search scale
+    COMPANY_SEARCH_MAX_LIMIT = int(os.getenv("COMPANY_SEARCH_MAX_LIMIT", "5000"))
+    APOLLO_PER_PAGE = int(os.getenv("APOLLO_PER_PAGE", "100"))  # Apollo maximum page size
+    APOLLO_MAX_CONCURRENT_PAGES = int(os.getenv("APOLLO_MAX_CONCURRENT_PAGES", "4"))
+    APOLLO_REQUESTS_PER_SECOND = float(os.getenv("APOLLO_REQUESTS_PER_SECOND", "3"))
+    APOLLO_RATE_BURST = int(os.getenv("APOLLO_RATE_BURST", "3"))
+    ENRICHMENT_CONCURRENCY = int(os.getenv("ENRICHMENT_CONCURRENCY", "5"))
+
+    # Domain discovery: race strategies instead of running them strictly one after another
+    DOMAIN_DISCOVERY_HEDGED = os.getenv("DOMAIN_DISCOVERY_HEDGED", "true").lower() == "true"
+    DOMAIN_DISCOVERY_HEDGE_DELAY_SECONDS = float(os.getenv("DOMAIN_DISCOVERY_HEDGE_DELAY_SECONDS", "1.5"))
+
+    # Batched CoreSignal ES DSL resolution of domain-less Apollo rows
+    CORESIGNAL_BATCH_RESOLVE = os.getenv("CORESIGNAL_BATCH_RESOLVE", "true").lower() == "true"
+    CORESIGNAL_BATCH_SIZE = int(os.getenv("CORESIGNAL_BATCH_SIZE", "50"))
+    CORESIGNAL_BATCH_MIN_CONFIDENCE = float(os.getenv("CORESIGNAL_BATCH_MIN_CONFIDENCE", "0.8"))
+
+    # Batched Apollo people search (0 or 1 = one request per company)
+    APOLLO_PEOPLE_BATCH_SIZE = int(os.getenv("APOLLO_PEOPLE_BATCH_SIZE", "25"))
+    APOLLO_PEOPLE_MAX_PAGES_PER_BATCH = int(os.getenv("APOLLO_PEOPLE_MAX_PAGES_PER_BATCH", "5"))
+
+    # Dedupe and cheap guardrail rules before paying to enrich high-confidence contacts
+    LEAD_PREFILTER_ENABLED = os.getenv("LEAD_PREFILTER_ENABLED", "true").lower() == "true"
+
+    # Conversation turns
+    # One Mistral call per answer returns both the extracted fields and the next question
+    CONVERSATION_SINGLE_CALL_TURNS = os.getenv("CONVERSATION_SINGLE_CALL_TURNS", "true").lower() == "true"
+
+    # Start the Apollo company search in the background once the conversation's query is stable
+    APOLLO_PREFETCH_ENABLED = os.getenv("APOLLO_PREFETCH_ENABLED", "true").lower() == "true"
+
+    # Near-duplicate ICP reuse
+    # "offer" only reports a previous config above the threshold, "auto" reuses it (opt-in), "off" disables lookups
+    ICP_REUSE_MODE = os.getenv("ICP_REUSE_MODE", "offer")
+    ICP_SIMILARITY_THRESHOLD = float(os.getenv("ICP_SIMILARITY_THRESHOLD", "0.9"))
+    ICP_SIMILARITY_MAX_ENTRIES = int(os.getenv("ICP_SIMILARITY_MAX_ENTRIES", "100000"))
+
+    # Priority scheduling of provider calls (interactive > standard > bulk, fair between sessions)
+    SCHEDULER_ENABLED = os.getenv("SCHEDULER_ENABLED", "true").lower() == "true"
+    SCHEDULER_MAX_CONCURRENT = int(os.getenv("SCHEDULER_MAX_CONCURRENT", "8"))  # Slots per provider
+    SCHEDULER_PROVIDER_CONCURRENCY = os.getenv("SCHEDULER_PROVIDER_CONCURRENCY", "mistral:4")  # Per-provider overrides
+    SCHEDULER_CLASS_WEIGHTS = os.getenv("SCHEDULER_CLASS_WEIGHTS", "interactive:8,standard:4,bulk:1")
+    SCHEDULER_BULK_MAX_SHARE = float(os.getenv("SCHEDULER_BULK_MAX_SHARE", "0.5"))  # Max share of slots bulk may hold
+    SCHEDULER_INTERACTIVE_PATHS = os.getenv("SCHEDULER_INTERACTIVE_PATHS", "/icp/conversation,/normalize-icp")
+
+    # Durable per-company enrichment checkpoints (SQLite, WAL mode)
+    CHECKPOINTS_ENABLED = os.getenv("CHECKPOINTS_ENABLED", "true").lower() == "true"
+    CHECKPOINT_DB_PATH = os.getenv("CHECKPOINT_DB_PATH", "logs/enrichment_checkpoints.db")
+    CHECKPOINT_TTL_HOURS = float(os.getenv("CHECKPOINT_TTL_HOURS", "72"))
+
+    # Background jobs (POST /jobs runs ICP -> companies -> leads off the request)
+    JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+    JOB_MAX_STORED = int(os.getenv("JOB_MAX_STORED", "500"))  # Oldest finished jobs are dropped beyond this
+
+    # Prometheus-format /metrics endpoint and request instrumentation
+    METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+
+    # Per-session traces of stages and provider calls (GET /sessions/{id}/trace)
+    TRACING_ENABLED = os.getenv("TRACING_ENABLED", "true").lower() == "true"
+    TRACE_MAX_SESSIONS = int(os.getenv("TRACE_MAX_SESSIONS", "200"))  # Oldest traces are dropped beyond this
+    TRACE_MAX_SPANS_PER_SESSION = int(os.getenv("TRACE_MAX_SPANS_PER_SESSION", "5000"))
+    TRACE_EXPORT_PATH = os.getenv("TRACE_EXPORT_PATH", "")  # Also append finished spans here as JSON lines
+
+    # Operator-only request profiling (X-Profile: <token>); disabled when no token is set
+    PROFILING_TOKEN = os.getenv("PROFILING_TOKEN", "")
+    PROFILING_PATHS = os.getenv("PROFILING_PATHS", "/companies,/leads,/icp/conversation")
+    PROFILING_INTERVAL_MS = float(os.getenv("PROFILING_INTERVAL_MS", "5"))
+    PROFILE_DIR = os.getenv("PROFILE_DIR", "logs/profiles")
+
+    # Record/replay cassettes of provider calls (off | record | replay)
+    CASSETTE_MODE = os.getenv("CASSETTE_MODE", "off")
+    CASSETTE_PATH = os.getenv("CASSETTE_PATH", "logs/cassettes/providers.jsonl.gz")
+    CASSETTE_REPLAY_LATENCY = os.getenv("CASSETTE_REPLAY_LATENCY", "recorded")  # "recorded" or "zero"
 
 # Global settings instance
 settings = Settings()
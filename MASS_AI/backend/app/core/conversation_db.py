@@ -5,8 +5,10 @@ Integrates with existing Supabase setup.
 from typing import Dict, Any, List, Optional
 from datetime import datetime
 from .database import get_db
+from .metrics import timed_db_write
 
 
+@timed_db_write
 def create_conversation(
     conversation_id: str, 
     session_id: str, 
@@ -55,6 +57,7 @@ def get_conversation(conversation_id: str) -> Optional[Dict[str, Any]]:
     return result.data[0] if result.data else None
 
 
+@timed_db_write
 def update_conversation_state(
     conversation_id: str,
     state: Dict[str, Any],
@@ -85,6 +88,7 @@ def update_conversation_state(
     return result.data[0] if result.data else None
 
 
+@timed_db_write
 def finalize_conversation(conversation_id: str, final_icp_config: Dict[str, Any]) -> Dict[str, Any]:
     """Mark conversation as complete and save final ICP config."""
     db = get_db()
@@ -7,6 +7,10 @@ from app.core.database import get_db
 from app.schemas.company import Company
 from app.schemas.lead import Lead
 from app.schemas.icp import ICPConfig
+from app.core.icp_similarity import icp_similarity_index
+from app.core.budget import session_budgets
+from app.core.metrics import timed_db_write
+from app.core.tracing import tracer
 
 
 # API Cost Reference (2025 Pricing)
@@ -49,6 +53,7 @@ API_COSTS = {
 }
 
 
+@timed_db_write
 def save_icp_search(session_id: str, icp_text: str, icp_config: ICPConfig, routing_decision: Optional[Dict] = None):
     """Save ICP search to database."""
     db = get_db()
@@ -62,9 +67,15 @@ def save_icp_search(session_id: str, icp_text: str, icp_config: ICPConfig, routi
     }
     
     result = db.table("icp_searches").insert(data).execute()
+
+    # Keep the near-duplicate index in step with icp_searches
+    if icp_config:
+        icp_similarity_index.add(session_id, icp_text, icp_config, routing_decision)
+
     return result.data[0] if result.data else None
 
 
+@timed_db_write
 def update_icp_search(session_id: str, icp_config: ICPConfig, routing_decision: Optional[Dict] = None):
     """Update existing ICP search with finalized config."""
     db = get_db()
@@ -75,9 +86,16 @@ def update_icp_search(session_id: str, icp_config: ICPConfig, routing_decision:
     }
     
     result = db.table("icp_searches").update(update_data).eq("session_id", session_id).execute()
-    return result.data[0] if result.data else None
+    row = result.data[0] if result.data else None
+
+    # Conversations only get their final config here, so index them now
+    if icp_config and row and row.get("icp_text"):
+        icp_similarity_index.add(session_id, row["icp_text"], icp_config, routing_decision)
+
+    return row
 
 
+@timed_db_write
 def save_companies(companies: List[Company], session_id: str) -> List[str]:
     """Save companies to database and return their IDs."""
     db = get_db()
@@ -97,6 +115,7 @@ def save_companies(companies: List[Company], session_id: str) -> List[str]:
     return company_ids
 
 
+@timed_db_write
 def save_leads(leads: List[Lead], session_id: str, company_name_to_id: Dict[str, str]):
     """Save leads to database."""
     db = get_db()
@@ -115,6 +134,7 @@ def save_leads(leads: List[Lead], session_id: str, company_name_to_id: Dict[str,
         db.table("leads").insert(lead_dict).execute()
 
 
+@timed_db_write
 def track_api_call(session_id: str, api_name: str, endpoint: str = None, 
                    call_type: str = None, cost_per_call: float = 0, 
                    calls_made: int = 1, success: bool = True):
@@ -123,13 +143,19 @@ def track_api_call(session_id: str, api_name: str, endpoint: str = None,
     
     NOTE: If cost_per_call=0, will attempt to look up cost from API_COSTS dictionary above.
     Always review API_COSTS comments to understand which values are verified vs estimated.
+    The cost is also charged to the session's budget, if it has one.
     """
-    db = get_db()
-    
     # If no cost provided, try to look up from our reference
     if cost_per_call == 0 and call_type:
         cost_per_call = API_COSTS.get(call_type, 0)
     
+    budget = session_budgets.get(session_id)
+    if budget:
+        budget.charge(call_type, cost_per_call * calls_made)
+    tracer.add_cost(cost_per_call * calls_made, call_type or api_name)
+    
+    db = get_db()
+    
     data = {
         "session_id": session_id,
         "api_name": api_name,
@@ -145,6 +171,7 @@ def track_api_call(session_id: str, api_name: str, endpoint: str = None,
     db.table("api_costs").insert(data).execute()
 
 
+@timed_db_write
 def update_icp_search_results(session_id: str, companies_found: int, 
                                leads_generated: int, processing_time: int):
     """Update ICP search with final results and costs."""
@@ -179,5 +206,6 @@ def update_icp_search_results(session_id: str, companies_found: int,
     return {
         "total_cost": total_cost,
         "cost_per_lead": cost_per_lead,
-        "breakdown": api_breakdown
+        "breakdown": api_breakdown,
+        "budget": session_budgets.summary(session_id)
     }
\ No newline at end of file
@@ -1,9 +1,13 @@
 """
 Guardrails system for validating and filtering leads.
 Ensures data quality by applying business rules before displaying results.
+
+Rules that only look at fields lead enrichment never fills (PREFILTER_RULES)
+also run as a prefilter before any paid enrichment, so leads that would be
+dropped anyway are not enriched first.
 """
 
-from typing import List, Tuple
+from typing import Iterable, List, Optional, Tuple
 from ..schemas.lead import Lead
 import logging
 
@@ -13,6 +17,9 @@ logger = logging.getLogger(__name__)
 class LeadGuardrails:
     """Validation and filtering rules for leads."""
     
+    # Rules whose fields (names) Hunter, Serper and the research agent never fill
+    PREFILTER_RULES = ('required_name_fields',)
+    
     def __init__(self):
         self.validation_rules = {
             'required_name_fields': self._validate_required_name_fields,
@@ -27,17 +34,41 @@ class LeadGuardrails:
             'rules_failed': {}
         }
     
-    def apply_guardrails(self, leads: List[Lead]) -> Tuple[List[Lead], dict]:
+    def apply_guardrails(self, leads: List[Lead], prefilter_stats: Optional[dict] = None) -> Tuple[List[Lead], dict]:
         """
         Apply all validation rules to leads and filter out invalid ones.
         
         Args:
             leads: List of Lead objects to validate
+            prefilter_stats: Stats from prefilter() on these leads before enrichment;
+                folded in so the summary covers every lead the run started with
             
         Returns:
             Tuple of (valid_leads, stats_dict)
         """
-        self.stats = {
+        valid_leads, self.stats = self._filter(leads, self.validation_rules)
+        
+        if prefilter_stats:
+            self.stats['total_leads'] = prefilter_stats['total_leads']
+            self.stats['filtered_leads'] += prefilter_stats['filtered_leads']
+            self.stats['prefiltered_leads'] = prefilter_stats['filtered_leads']
+            for rule, count in prefilter_stats['rules_failed'].items():
+                self.stats['rules_failed'][rule] = self.stats['rules_failed'].get(rule, 0) + count
+        
+        return valid_leads, self.stats
+    
+    def prefilter(self, leads: List[Lead]) -> Tuple[List[Lead], dict]:
+        """
+        Apply only PREFILTER_RULES, before leads are enriched.
+        
+        Returns:
+            Tuple of (kept_leads, stats_dict) with the same stats keys as apply_guardrails
+        """
+        rules = {name: self.validation_rules[name] for name in self.PREFILTER_RULES if name in self.validation_rules}
+        return self._filter(leads, rules)
+    
+    def _filter(self, leads: List[Lead], rules: dict) -> Tuple[List[Lead], dict]:
+        stats = {
             'total_leads': len(leads),
             'filtered_leads': 0,
             'passed_leads': 0,
@@ -47,15 +78,15 @@ class LeadGuardrails:
         valid_leads = []
         
         for lead in leads:
-            is_valid, failed_rules = self._validate_lead(lead)
+            is_valid, failed_rules = self._validate_lead(lead, rules.items())
             
             if is_valid:
                 valid_leads.append(lead)
-                self.stats['passed_leads'] += 1
+                stats['passed_leads'] += 1
             else:
-                self.stats['filtered_leads'] += 1
+                stats['filtered_leads'] += 1
                 for rule in failed_rules:
-                    self.stats['rules_failed'][rule] = self.stats['rules_failed'].get(rule, 0) + 1
+                    stats['rules_failed'][rule] = stats['rules_failed'].get(rule, 0) + 1
                 
                 # Log filtered lead
                 logger.info(
@@ -64,18 +95,18 @@ class LeadGuardrails:
                     f"Failed rules: {', '.join(failed_rules)}"
                 )
         
-        return valid_leads, self.stats
+        return valid_leads, stats
     
-    def _validate_lead(self, lead: Lead) -> Tuple[bool, List[str]]:
+    def _validate_lead(self, lead: Lead, rules: Optional[Iterable] = None) -> Tuple[bool, List[str]]:
         """
-        Validate a single lead against all rules.
+        Validate a single lead against all rules (or the given (name, rule) pairs).
         
         Returns:
             Tuple of (is_valid, list_of_failed_rule_names)
         """
         failed_rules = []
         
-        for rule_name, rule_func in self.validation_rules.items():
+        for rule_name, rule_func in (rules if rules is not None else self.validation_rules.items()):
             if not rule_func(lead):
                 failed_rules.append(rule_name)
         
@@ -147,6 +178,10 @@ def log_guardrails_summary(stats: dict, session_id: str = None):
     logger.info(f"[Guardrails] Total Leads: {stats['total_leads']}")
     logger.info(f"[Guardrails] ✅ Passed: {stats['passed_leads']}")
     logger.info(f"[Guardrails] ❌ Filtered: {stats['filtered_leads']}")
+    if 'enrichment_calls_avoided' in stats:
+        logger.info(f"[Guardrails] Filtered before enrichment: {stats.get('prefiltered_leads', 0)} "
+                    f"(+{stats.get('duplicates_before_enrichment', 0)} duplicates), "
+                    f"enrichment calls avoided: {stats['enrichment_calls_avoided']}")
     
     if stats['rules_failed']:
         logger.info(f"[Guardrails] Rules Failed Breakdown:")
@@ -162,6 +197,10 @@ def log_guardrails_summary(stats: dict, session_id: str = None):
     print(f"  Total Leads Processed: {stats['total_leads']}")
     print(f"  ✅ Valid Leads: {stats['passed_leads']}")
     print(f"  ❌ Filtered Out: {stats['filtered_leads']}")
+    if 'enrichment_calls_avoided' in stats:
+        print(f"  ⏭️  Dropped Before Enrichment: {stats.get('prefiltered_leads', 0)} invalid, "
+              f"{stats.get('duplicates_before_enrichment', 0)} duplicates")
+        print(f"  💰 Enrichment Calls Avoided: {stats['enrichment_calls_avoided']}")
     
     if stats['rules_failed']:
         print(f"\n  Filtered Reasons:")
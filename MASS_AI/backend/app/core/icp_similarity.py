@@ -0,0 +1,274 @@
+"""
+Near-duplicate detection for ICP descriptions.
+
+Keeps a local MinHash/LSH index over past ICP texts and their final ICPConfig
+(the same rows that live in the icp_searches table) so that a resubmitted ICP
+with small wording changes can reuse an earlier normalization instead of paying
+for a fresh Mistral call plus a full Apollo/enrichment run.
+
+Signatures use one-permutation hashing (one hash per shingle, binned into
+NUM_BINS slots) so building a query signature is linear in the text length, and
+the LSH band lookup is a handful of dict probes regardless of corpus size.
+"""
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Set, Tuple
+
+from .config import settings
+
+
+NUM_BINS = 64
+BANDS = 16
+ROWS_PER_BAND = NUM_BINS // BANDS
+
+_MAX_HASH = (1 << 64) - 1
+_TOKEN_PATTERN = re.compile(r"[a-z0-9$]+")
+_NUMBER_PATTERN = re.compile(r"\d+(?:\.\d+)?")
+
+
+class _IndexedICP:
+    """A single past ICP stored in the index."""
+
+    __slots__ = ("entry_id", "session_id", "icp_text", "icp_config", "routing_decision",
+                 "shingles", "numbers", "band_keys", "normalized_text")
+
+    def __init__(self, entry_id: int, session_id: str, icp_text: str, icp_config: Dict[str, Any],
+                 routing_decision: Optional[Dict[str, Any]], normalized_text: str,
+                 shingles: Set[int], numbers: frozenset, band_keys: List[Tuple[int, int]]):
+        self.entry_id = entry_id
+        self.session_id = session_id
+        self.icp_text = icp_text
+        self.icp_config = icp_config
+        self.routing_decision = routing_decision
+        self.normalized_text = normalized_text
+        self.shingles = shingles
+        self.numbers = numbers
+        self.band_keys = band_keys
+
+
+class ICPSimilarityIndex:
+    """MinHash/LSH index over past ICP texts and their normalized configs."""
+
+    def __init__(self, max_entries: int = None):
+        self.max_entries = max_entries or settings.ICP_SIMILARITY_MAX_ENTRIES
+        self._entries: "OrderedDict[int, _IndexedICP]" = OrderedDict()
+        self._by_session: Dict[str, int] = {}
+        self._by_text: Dict[str, int] = {}
+        self._buckets: Dict[Tuple[int, int], Set[int]] = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self.warmed = False
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # ==================== PUBLIC API ====================
+
+    def add(self, session_id: str, icp_text: str, icp_config: Any,
+            routing_decision: Any = None) -> None:
+        """Index an ICP text with its final config (replaces any entry for the same session)."""
+        if not icp_text or not icp_config:
+            return
+
+        config_dict = icp_config.dict() if hasattr(icp_config, "dict") else dict(icp_config)
+        routing_dict = routing_decision.dict() if hasattr(routing_decision, "dict") else routing_decision
+
+        normalized = self._normalize(icp_text)
+        shingles = self._shingles(normalized)
+        if not shingles:
+            return
+        band_keys = self._band_keys(self._signature(shingles))
+
+        with self._lock:
+            if session_id and session_id in self._by_session:
+                self._remove(self._by_session[session_id])
+
+            entry = _IndexedICP(
+                entry_id=self._next_id,
+                session_id=session_id,
+                icp_text=icp_text,
+                icp_config=config_dict,
+                routing_decision=routing_dict,
+                normalized_text=normalized,
+                shingles=shingles,
+                numbers=self._numbers(normalized),
+                band_keys=band_keys,
+            )
+            self._next_id += 1
+
+            self._entries[entry.entry_id] = entry
+            if session_id:
+                self._by_session[session_id] = entry.entry_id
+            self._by_text[normalized] = entry.entry_id
+            for key in band_keys:
+                self._buckets.setdefault(key, set()).add(entry.entry_id)
+
+            while len(self._entries) > self.max_entries:
+                oldest_id = next(iter(self._entries))
+                self._remove(oldest_id)
+
+    def find_similar(self, icp_text: str, threshold: float = None) -> Optional[Dict[str, Any]]:
+        """
+        Find the most similar past ICP above the threshold.
+
+        Candidates come from LSH band collisions and are verified with the exact
+        Jaccard similarity of their shingle sets. A candidate whose numbers
+        (employee counts, revenue, years) differ from the query is never returned,
+        since a single changed number is a different ICP even when the wording is
+        otherwise identical.
+
+        Returns:
+            Dict with session_id, similarity, icp_text, icp_config and
+            routing_decision, or None if nothing qualifies.
+        """
+        if not icp_text or not self._entries:
+            return None
+
+        threshold = settings.ICP_SIMILARITY_THRESHOLD if threshold is None else threshold
+        normalized = self._normalize(icp_text)
+
+        with self._lock:
+            exact_id = self._by_text.get(normalized)
+            if exact_id is not None:
+                return self._match(self._entries[exact_id], 1.0)
+
+            shingles = self._shingles(normalized)
+            if not shingles:
+                return None
+            numbers = self._numbers(normalized)
+
+            candidate_ids: Set[int] = set()
+            for key in self._band_keys(self._signature(shingles)):
+                bucket = self._buckets.get(key)
+                if bucket:
+                    candidate_ids.update(bucket)
+
+            best_entry = None
+            best_score = 0.0
+            for entry_id in candidate_ids:
+                entry = self._entries[entry_id]
+                if entry.numbers != numbers:
+                    continue
+                score = len(shingles & entry.shingles) / len(shingles | entry.shingles)
+                if score > best_score:
+                    best_entry, best_score = entry, score
+
+        if best_entry is None or best_score < threshold:
+            return None
+        return self._match(best_entry, best_score)
+
+    def warm_from_db(self, page_size: int = 1000) -> int:
+        """
+        Rebuild the index from the icp_searches table (newest first, up to max_entries).
+
+        Returns:
+            Number of ICPs indexed.
+        """
+        from .database import get_db
+
+        db = get_db()
+        indexed = 0
+        offset = 0
+        while indexed < self.max_entries:
+            result = (
+                db.table("icp_searches")
+                .select("session_id,icp_text,icp_config,routing_decision")
+                .order("created_at", desc=True)
+                .range(offset, offset + page_size - 1)
+                .execute()
+            )
+            rows = result.data or []
+            # Oldest first so the most recent rows are the last to be evicted
+            for row in reversed(rows):
+                if row.get("icp_config") and row.get("icp_text"):
+                    self.add(row.get("session_id"), row["icp_text"], row["icp_config"], row.get("routing_decision"))
+                    indexed += 1
+            if len(rows) < page_size:
+                break
+            offset += page_size
+
+        self.warmed = True
+        print(f"[ICP Similarity] Indexed {indexed} past ICPs from icp_searches")
+        return indexed
+
+    # ==================== INTERNALS ====================
+
+    def _match(self, entry: _IndexedICP, similarity: float) -> Dict[str, Any]:
+        return {
+            "session_id": entry.session_id,
+            "similarity": round(similarity, 4),
+            "icp_text": entry.icp_text,
+            "icp_config": entry.icp_config,
+            "routing_decision": entry.routing_decision,
+        }
+
+    def _remove(self, entry_id: int) -> None:
+        """Remove an entry from every lookup structure (caller holds the lock)."""
+        entry = self._entries.pop(entry_id, None)
+        if entry is None:
+            return
+        if self._by_session.get(entry.session_id) == entry_id:
+            del self._by_session[entry.session_id]
+        if self._by_text.get(entry.normalized_text) == entry_id:
+            del self._by_text[entry.normalized_text]
+        for key in entry.band_keys:
+            bucket = self._buckets.get(key)
+            if bucket:
+                bucket.discard(entry_id)
+                if not bucket:
+                    del self._buckets[key]
+
+    @staticmethod
+    def _normalize(text: str) -> str:
+        return " ".join(_TOKEN_PATTERN.findall(text.lower()))
+
+    @staticmethod
+    def _numbers(normalized_text: str) -> frozenset:
+        return frozenset(_NUMBER_PATTERN.findall(normalized_text))
+
+    @staticmethod
+    def _shingles(normalized_text: str) -> Set[int]:
+        """Word unigrams and bigrams, hashed to 64-bit ints."""
+        tokens = normalized_text.split()
+        grams = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+        return {
+            int.from_bytes(hashlib.blake2b(gram.encode("utf-8"), digest_size=8).digest(), "big")
+            for gram in grams
+        }
+
+    @staticmethod
+    def _signature(shingles: Set[int]) -> List[int]:
+        """One-permutation MinHash signature with rotation densification."""
+        signature = [_MAX_HASH] * NUM_BINS
+        for value in shingles:
+            slot = value % NUM_BINS
+            rank = value // NUM_BINS
+            if rank < signature[slot]:
+                signature[slot] = rank
+
+        # Fill empty bins from the next non-empty bin to the right
+        if any(v == _MAX_HASH for v in signature):
+            filled = list(signature)
+            for i in range(NUM_BINS):
+                if signature[i] != _MAX_HASH:
+                    continue
+                for offset in range(1, NUM_BINS):
+                    donor = signature[(i + offset) % NUM_BINS]
+                    if donor != _MAX_HASH:
+                        filled[i] = donor + offset
+                        break
+            signature = filled
+        return signature
+
+    @staticmethod
+    def _band_keys(signature: List[int]) -> List[Tuple[int, int]]:
+        return [
+            (band, hash(tuple(signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND])))
+            for band in range(BANDS)
+        ]
+
+
+# Global index instance
+icp_similarity_index = ICPSimilarityIndex()
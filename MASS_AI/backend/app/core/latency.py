@@ -0,0 +1,141 @@
+"""
+Live latency tracking for outbound provider calls.
+
+Every provider keeps a rolling histogram of its recent response times. The
+histograms drive two decisions in the HTTP layer (app/clients/http.py):
+
+- the request timeout, taken from a high percentile instead of a fixed
+  constant, so a slow upstream gives up close to its real tail latency
+- the hedge delay for idempotent GETs: once a request has been outstanding
+  longer than the provider's p95, a second identical request is started and
+  the first response wins
+"""
+import math
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+from .config import settings
+
+
+class LatencyHistogram:
+    """Rolling window of the last `window` latency samples (seconds)."""
+
+    def __init__(self, window: int):
+        self._samples: Deque[float] = deque(maxlen=max(1, window))
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, p: float) -> Optional[float]:
+        """Nearest-rank percentile, None while the window is empty."""
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        rank = max(1, math.ceil(p / 100 * len(ordered)))
+        return ordered[min(rank, len(ordered)) - 1]
+
+
+class _ProviderStats:
+    def __init__(self):
+        self.histogram = LatencyHistogram(settings.LATENCY_WINDOW_SIZE)
+        self.requests = 0
+        self.timeouts = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.default_timeout: Optional[float] = None
+
+
+class ProviderLatencyTracker:
+    """Per-provider latency histograms plus timeout and hedge accounting."""
+
+    def __init__(self):
+        self._providers: Dict[str, _ProviderStats] = {}
+        self._lock = threading.Lock()
+
+    def _stats(self, provider: str) -> _ProviderStats:
+        key = provider.lower()
+        stats = self._providers.get(key)
+        if stats is None:
+            with self._lock:
+                stats = self._providers.setdefault(key, _ProviderStats())
+        return stats
+
+    def record(self, provider: str, seconds: float, timed_out: bool = False) -> None:
+        """
+        Record one finished request. Timed-out requests are recorded at the
+        timeout value so a provider that got slower pushes its timeout up.
+        """
+        stats = self._stats(provider)
+        stats.requests += 1
+        if timed_out:
+            stats.timeouts += 1
+        stats.histogram.record(seconds)
+
+    def timeout_for(self, provider: str, default: float) -> float:
+        """
+        Timeout for the next request: the configured percentile times a safety
+        multiplier, clamped to [ADAPTIVE_TIMEOUT_MIN_SECONDS, default]. Falls
+        back to `default` until the provider has enough samples.
+        """
+        stats = self._stats(provider)
+        stats.default_timeout = default
+        if not settings.ADAPTIVE_TIMEOUTS_ENABLED or len(stats.histogram) < settings.LATENCY_MIN_SAMPLES:
+            return default
+        tail = stats.histogram.percentile(settings.ADAPTIVE_TIMEOUT_PERCENTILE)
+        adaptive = tail * settings.ADAPTIVE_TIMEOUT_MULTIPLIER
+        return min(default, max(settings.ADAPTIVE_TIMEOUT_MIN_SECONDS, adaptive))
+
+    def hedge_delay(self, provider: str) -> Optional[float]:
+        """
+        Seconds to wait before hedging a request, or None if this request
+        should not be hedged (hedging off, too few samples, or the provider
+        already spent its share of hedged requests).
+        """
+        if not settings.HEDGED_REQUESTS_ENABLED:
+            return None
+        stats = self._stats(provider)
+        if len(stats.histogram) < settings.LATENCY_MIN_SAMPLES:
+            return None
+        if stats.hedged >= settings.HEDGE_MAX_RATE * max(1, stats.requests):
+            return None
+        return stats.histogram.percentile(settings.HEDGE_PERCENTILE)
+
+    def record_hedge(self, provider: str, won: bool) -> None:
+        """Count a hedged request and whether the hedge beat the original."""
+        stats = self._stats(provider)
+        stats.hedged += 1
+        if won:
+            stats.hedge_wins += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Current percentiles, chosen timeouts and hedge rates per provider."""
+        result = {}
+        for name, stats in sorted(self._providers.items()):
+            histogram = stats.histogram
+            default = stats.default_timeout
+            result[name] = {
+                "samples": len(histogram),
+                "p50_seconds": histogram.percentile(50),
+                "p95_seconds": histogram.percentile(95),
+                "p99_seconds": histogram.percentile(99),
+                "default_timeout_seconds": default,
+                "timeout_seconds": self.timeout_for(name, default) if default else None,
+                "requests": stats.requests,
+                "timeouts": stats.timeouts,
+                "hedged": stats.hedged,
+                "hedge_wins": stats.hedge_wins,
+                "hedge_rate": round(stats.hedged / stats.requests, 4) if stats.requests else 0.0,
+            }
+        return result
+
+    def reset(self) -> None:
+        with self._lock:
+            self._providers.clear()
+
+
+# Global instance
+provider_latency = ProviderLatencyTracker()
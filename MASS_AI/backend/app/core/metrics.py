@@ -0,0 +1,362 @@
+"""
+In-process metrics in the Prometheus text exposition format (GET /metrics).
+
+Counters, gauges and fixed-bucket histograms live in a process-wide registry.
+Recording is a dict lookup, a bisect into the bucket bounds and a few integer
+additions under an uncontended lock, so instrumenting hot paths (every
+provider call, every enrichment stage) costs on the order of a microsecond.
+Label values are passed positionally in the order the metric declares them.
+
+Gauges that mirror state owned elsewhere (active sessions, running jobs) are
+sampled by callbacks at scrape time instead of being updated on every change.
+"""
+import re
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from .config import settings
+
+# Leading path segments that only name the API or its version (/api/v1, /cdapi/v2)
+_VERSION_SEGMENT = re.compile(r"api|cdapi|v\d+", re.IGNORECASE)
+_ID_SEGMENT = re.compile(r"\d+|[0-9a-f]{16,}|[0-9a-f]{8}-[0-9a-f-]{27}", re.IGNORECASE)
+
+# Seconds; covers sub-millisecond DB writes up to multi-minute enrichment runs
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+    def render(self) -> List[str]:
+        raise NotImplementedError
+
+    def reset(self) -> None:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}" for labels, value in items]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                 callback: Optional[Callable[[], Dict[Tuple[str, ...], float]]] = None):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self.callback = callback
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, *labels: str, amount: float = 1) -> None:
+        self.inc(*labels, amount=-amount)
+
+    def set(self, value: float, *labels: str) -> None:
+        with self._lock:
+            self._values[labels] = value
+
+    def value(self, *labels: str) -> float:
+        if self.callback is not None:
+            return self.callback().get(labels, 0)
+        return self._values.get(labels, 0)
+
+    @contextmanager
+    def track(self, *labels: str):
+        """Count the enclosed block as in progress."""
+        self.inc(*labels)
+        try:
+            yield
+        finally:
+            self.dec(*labels)
+
+    def render(self) -> List[str]:
+        if self.callback is not None:
+            try:
+                values = self.callback()
+            except Exception as e:
+                print(f"[Metrics] Could not sample {self.name}: {e}")
+                values = {}
+        else:
+            with self._lock:
+                values = dict(self._values)
+        return [f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}" for labels, value in sorted(values.items())]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [per-bucket counts (+Inf last), sum, count]
+        self._series: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, *labels: str):
+        """Observe the duration of the enclosed block (also when it raises)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labels)
+
+    def count(self, *labels: str) -> int:
+        series = self._series.get(labels)
+        return series[2] if series else 0
+
+    def mean(self, *labels: str) -> Optional[float]:
+        series = self._series.get(labels)
+        return series[1] / series[2] if series and series[2] else None
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted((labels, [list(s[0]), s[1], s[2]]) for labels, s in self._series.items())
+        lines = []
+        for labels, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = 'le="%s"' % _number(bound)
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {count}")
+        return lines
+
+    def reset(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+
+class MetricsRegistry:
+    """All metrics of the process, rendered together for a scrape."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Iterable[str] = (), callback=None) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames, callback))
+
+    def histogram(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                  buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            samples = metric.render()
+            if samples:
+                lines.extend(metric.header())
+                lines.extend(samples)
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        for metric in self._metrics.values():
+            metric.reset()
+
+
+# Global registry and the metrics the backend records
+metrics = MetricsRegistry()
+
+http_requests = metrics.counter(
+    "mass_http_requests_total", "HTTP requests handled, by route template, method and status code.",
+    ("route", "method", "status"))
+http_request_duration = metrics.histogram(
+    "mass_http_request_duration_seconds", "HTTP request latency by route template.", ("route",))
+http_requests_in_flight = metrics.gauge(
+    "mass_http_requests_in_flight", "HTTP requests currently being handled.")
+
+provider_requests = metrics.counter(
+    "mass_provider_requests_total",
+    "Outbound provider calls by endpoint and outcome (2xx, 4xx, 429, 5xx, timeout, error).",
+    ("provider", "endpoint", "outcome"))
+provider_request_duration = metrics.histogram(
+    "mass_provider_request_duration_seconds", "Outbound provider call latency by endpoint.", ("provider", "endpoint"))
+provider_queue_wait = metrics.histogram(
+    "mass_provider_queue_wait_seconds", "Time provider calls waited for a scheduler slot.", ("provider",))
+provider_retries = metrics.counter(
+    "mass_provider_retries_total", "Provider call retries by reason (429, 5xx, connect, timeout).",
+    ("provider", "reason"))
+provider_retries_denied = metrics.counter(
+    "mass_provider_retries_denied_total",
+    "Retryable provider failures not retried, by cause (attempts, budget, retry_after).", ("provider", "cause"))
+coalesced_requests = metrics.counter(
+    "mass_provider_coalesced_requests_total",
+    "Provider calls that joined an identical call already in flight instead of sending their own.", ("provider",))
+mistral_queue_wait = metrics.histogram(
+    "mass_mistral_queue_wait_seconds", "Time Mistral calls waited (rate-limit spacing and scheduler slot) before sending.")
+
+enrichment_stage_duration = metrics.histogram(
+    "mass_enrichment_stage_duration_seconds", "Duration of each stage of a company enrichment.", ("stage",))
+enrichments_in_flight = metrics.gauge(
+    "mass_enrichments_in_flight", "Companies currently being enriched.")
+enrichments_completed = metrics.counter(
+    "mass_enrichments_total", "Company enrichments finished (successfully or not).")
+
+cache_lookups = metrics.counter(
+    "mass_cache_lookups_total", "Cache lookups by cache and result (hit or miss).", ("cache", "result"))
+
+supabase_writes = metrics.counter(
+    "mass_supabase_writes_total", "Supabase writes by operation and outcome.", ("operation", "outcome"))
+supabase_write_duration = metrics.histogram(
+    "mass_supabase_write_duration_seconds", "Supabase write latency by operation.", ("operation",))
+
+
+def status_outcome(status_code: int) -> str:
+    if status_code == 429:
+        return "429"
+    return f"{status_code // 100}xx"
+
+
+def endpoint_label(url: str) -> str:
+    """
+    Endpoint label for a provider URL: its path without the API/version prefix
+    or query, e.g. "mixed_companies/search" or "email-verifier". Numeric and
+    hex id segments become "{id}"; URLs with other values in the path (slugs)
+    should pass their own label.
+    """
+    segments = [s for s in urlsplit(url).path.split("/") if s]
+    while segments and _VERSION_SEGMENT.fullmatch(segments[0]):
+        segments.pop(0)
+    return "/".join("{id}" if _ID_SEGMENT.fullmatch(s) else s for s in segments) or "/"
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    cache_lookups.inc(cache, "hit" if hit else "miss")
+
+
+def timed_db_write(func):
+    """Record latency and outcome of a Supabase write function."""
+    operation = func.__name__
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        outcome = "error"
+        try:
+            result = func(*args, **kwargs)
+            outcome = "ok"
+            return result
+        finally:
+            supabase_write_duration.observe(time.perf_counter() - start, operation)
+            supabase_writes.inc(operation, outcome)
+
+    return wrapper
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware counting requests and their latency per route template
+    (e.g. /jobs/{job_id}), so label cardinality stays bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._route_paths: Optional[Dict[Callable, str]] = None
+
+    def _route_of(self, scope) -> str:
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return "unmatched"
+        if self._route_paths is None or endpoint not in self._route_paths:
+            routes = getattr(scope.get("app"), "routes", [])
+            self._route_paths = {getattr(r, "endpoint", None): getattr(r, "path", "") for r in routes}
+        return self._route_paths.get(endpoint, "unmatched")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        http_requests_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            http_requests_in_flight.dec()
+            # The router has filled in the endpoint by now
+            route = self._route_of(scope)
+            http_request_duration.observe(time.perf_counter() - start, route)
+            http_requests.inc(route, scope.get("method", ""), str(status["code"]))
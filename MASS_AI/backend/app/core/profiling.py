@@ -0,0 +1,267 @@
+"""
+On-demand sampling profiler for single requests.
+
+An operator sends X-Profile: <PROFILING_TOKEN> (or ?profile=<token>) with a
+request to one of PROFILING_PATHS. While that request runs, a background
+thread samples the event loop thread's stack every PROFILING_INTERVAL_MS and
+classifies each sample by what the loop was doing. A sample stands for the
+time since the previous one (CPU-bound code holding the GIL delays the
+sampler, so intervals are not uniform):
+
+    cpu          the request (or a task it started) was running Python code
+    blocking_io  the request was blocked in a socket/SSL call on the loop thread
+    other_tasks  the request was awaiting while another request's task ran
+    idle         the request was awaiting and the loop was waiting for I/O
+
+Tasks started by the request (asyncio.gather, create_task) are attributed to
+it through a task factory installed only while a profile is running.
+
+The result is stored as PROFILE_DIR/<profile_id>.json with the time breakdown,
+the hottest functions and all CPU stacks in collapsed ("folded") format, which
+flamegraph.pl and speedscope read directly. The response carries the id in
+an X-Profile-Id header; GET /health/profiles/{profile_id} returns it.
+
+Profiling is off unless PROFILING_TOKEN is set.
+"""
+import asyncio
+import contextvars
+import hmac
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Set
+from urllib.parse import parse_qs
+
+from .config import settings
+
+# Leaf functions that mean the loop thread is blocked on the network
+_BLOCKING_CALLS = {"recv", "recv_into", "send", "sendall", "connect", "getaddrinfo", "read", "write", "do_handshake"}
+_BLOCKING_FILES = ("socket.py", "ssl.py", "selectors.py", "connection.py", "connectionpool.py")
+# Frames below the request's own code (event loop, threads) are left out of stacks
+_RUNTIME_DIRS = tuple(
+    os.path.join(os.path.dirname(module.__file__), "") for module in (asyncio,)
+) + (threading.__file__,)
+
+_active_profile: contextvars.ContextVar = contextvars.ContextVar("active_profile", default=None)
+
+
+def _frame_name(code) -> str:
+    return f"{getattr(code, 'co_qualname', code.co_name)} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _stack(frame) -> List[str]:
+    """Root-first function names of a frame's stack, without event loop frames."""
+    names = []
+    while frame is not None:
+        if not frame.f_code.co_filename.startswith(_RUNTIME_DIRS):
+            names.append(_frame_name(frame.f_code))
+        frame = frame.f_back
+    names.reverse()
+    return names
+
+
+def _is_blocking(frame) -> bool:
+    code = frame.f_code
+    return code.co_name in _BLOCKING_CALLS and os.path.basename(code.co_filename) in _BLOCKING_FILES
+
+
+class RequestProfile:
+    """Samples of one request's event loop thread, taken on a background thread."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, task: asyncio.Task, interval: float):
+        self.profile_id = uuid.uuid4().hex[:12]
+        self.loop = loop
+        self.loop_thread = threading.get_ident()
+        self.tasks: Set[asyncio.Task] = {task}
+        self.interval = interval
+        # All weights in microseconds
+        self.breakdown = {"cpu": 0, "blocking_io": 0, "other_tasks": 0, "idle": 0}
+        self.stacks: Dict[str, int] = {}
+        self.self_time: Dict[str, int] = {}
+        self.total_time: Dict[str, int] = {}
+        self.samples = 0
+        self._last_sample = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"profiler-{self.profile_id}", daemon=True)
+        self.started = 0.0
+        self.elapsed = 0.0
+
+    def start(self) -> None:
+        self.started = time.time()
+        self._last_sample = time.perf_counter()
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.elapsed = time.time() - self.started
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def sample(self) -> None:
+        now = time.perf_counter()
+        weight = int((now - self._last_sample) * 1_000_000)
+        self._last_sample = now
+        frame = sys._current_frames().get(self.loop_thread)
+        if frame is None:
+            return
+        self.samples += 1
+        running = asyncio.current_task(self.loop)
+        if running is None or running not in self.tasks:
+            self.breakdown["other_tasks" if running is not None else "idle"] += weight
+            return
+
+        kind = "blocking_io" if _is_blocking(frame) else "cpu"
+        self.breakdown[kind] += weight
+        stack = _stack(frame)
+        if not stack:
+            return
+        key = ";".join(stack)
+        self.stacks[key] = self.stacks.get(key, 0) + weight
+        if kind == "cpu":
+            self.self_time[stack[-1]] = self.self_time.get(stack[-1], 0) + weight
+            for name in set(stack):
+                self.total_time[name] = self.total_time.get(name, 0) + weight
+
+    def _top(self, weights: Dict[str, int], limit: int = 25) -> List[Dict[str, Any]]:
+        cpu = self.breakdown["cpu"] or 1
+        ordered = sorted(weights.items(), key=lambda item: item[1], reverse=True)[:limit]
+        return [
+            {"function": name, "ms": round(us / 1000, 1), "pct_of_cpu": round(us / cpu * 100, 1)}
+            for name, us in ordered
+        ]
+
+    def to_dict(self, method: str, path: str, status: int) -> Dict[str, Any]:
+        return {
+            "profile_id": self.profile_id,
+            "method": method,
+            "path": path,
+            "status": status,
+            "started_at": self.started,
+            "wall_ms": round(self.elapsed * 1000, 1),
+            "interval_ms": round(self.interval * 1000, 2),
+            "samples": self.samples,
+            "breakdown_ms": {kind: round(us / 1000, 1) for kind, us in self.breakdown.items()},
+            "top_self_cpu": self._top(self.self_time),
+            "top_cumulative_cpu": self._top(self.total_time),
+            # Folded stacks weighted in microseconds
+            "collapsed": "\n".join(f"{stack} {us}" for stack, us in sorted(self.stacks.items())),
+        }
+
+
+class _TaskAttribution:
+    """Task factory adding tasks created inside a profiled request to its profile."""
+
+    def __init__(self):
+        self.active = 0
+        self.previous = None
+
+    def _factory(self, loop, coro, context=None):
+        if self.previous is not None:
+            task = self.previous(loop, coro) if context is None else self.previous(loop, coro, context=context)
+        else:
+            task = asyncio.Task(coro, loop=loop, context=context)
+        profile = _active_profile.get() if context is None else context.get(_active_profile)
+        if profile is not None:
+            profile.tasks.add(task)
+        return task
+
+    def acquire(self, loop: asyncio.AbstractEventLoop) -> None:
+        if self.active == 0:
+            self.previous = loop.get_task_factory()
+            loop.set_task_factory(self._factory)
+        self.active += 1
+
+    def release(self, loop: asyncio.AbstractEventLoop) -> None:
+        self.active -= 1
+        if self.active == 0:
+            loop.set_task_factory(self.previous)
+            self.previous = None
+
+
+_attribution = _TaskAttribution()
+
+
+def authorized(token: Optional[str]) -> bool:
+    """Whether a request carries the operator profiling token."""
+    expected = settings.PROFILING_TOKEN
+    return bool(expected and token) and hmac.compare_digest(token.encode(), expected.encode())
+
+
+def save_profile(profile: Dict[str, Any]) -> Optional[str]:
+    try:
+        os.makedirs(settings.PROFILE_DIR, exist_ok=True)
+        path = os.path.join(settings.PROFILE_DIR, f"{profile['profile_id']}.json")
+        with open(path, "w") as f:
+            json.dump(profile, f)
+        return path
+    except OSError as e:
+        print(f"[Profiler] Could not store profile {profile['profile_id']}: {e}")
+        return None
+
+
+def load_profile(profile_id: str) -> Optional[Dict[str, Any]]:
+    if not profile_id.isalnum():
+        return None
+    path = os.path.join(settings.PROFILE_DIR, f"{profile_id}.json")
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware running operator-flagged requests under the sampling profiler.
+    Requests without a valid token are passed through untouched.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    def _requested(self, scope) -> bool:
+        if not settings.PROFILING_TOKEN:
+            return False
+        paths = [p.strip() for p in settings.PROFILING_PATHS.split(",") if p.strip()]
+        if not any(scope.get("path", "").startswith(p) for p in paths):
+            return False
+        token = dict(scope.get("headers") or []).get(b"x-profile", b"").decode("latin-1").strip()
+        if not token:
+            token = (parse_qs(scope.get("query_string", b"").decode("latin-1")).get("profile") or [""])[0]
+        return authorized(token)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._requested(scope):
+            await self.app(scope, receive, send)
+            return
+
+        loop = asyncio.get_running_loop()
+        profile = RequestProfile(loop, asyncio.current_task(), settings.PROFILING_INTERVAL_MS / 1000)
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                message = {**message, "headers": list(message.get("headers", [])) + [
+                    (b"x-profile-id", profile.profile_id.encode())
+                ]}
+            await send(message)
+
+        token = _active_profile.set(profile)
+        _attribution.acquire(loop)
+        profile.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profile.stop()
+            _attribution.release(loop)
+            _active_profile.reset(token)
+            result = profile.to_dict(scope.get("method", ""), scope.get("path", ""), status["code"])
+            path = save_profile(result)
+            print(f"[Profiler] {result['method']} {result['path']}: {result['wall_ms']}ms wall, "
+                  f"{result['breakdown_ms']['cpu']}ms CPU -> {path}")
@@ -0,0 +1,36 @@
+"""
+Progress of a long-running stage, published while it runs.
+
+A background job runs each stage inside report_progress_to(job.progress);
+services update counters in that dict as they go (pages fetched, companies
+enriched), so GET /jobs/{id} shows them before the stage returns. The dict is
+carried in a contextvar, so tasks the stage starts report to it too. Outside a
+job the calls do nothing.
+"""
+import contextvars
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+
+_current_progress: contextvars.ContextVar = contextvars.ContextVar("stage_progress", default=None)
+
+
+@contextmanager
+def report_progress_to(progress: Dict[str, Any]):
+    """Publish progress of the enclosed calls (and tasks started inside) into `progress`."""
+    token = _current_progress.set(progress)
+    try:
+        yield
+    finally:
+        _current_progress.reset(token)
+
+
+def set_progress(**values: Any) -> None:
+    progress: Optional[Dict[str, Any]] = _current_progress.get()
+    if progress is not None:
+        progress.update(values)
+
+
+def increment_progress(key: str, amount: int = 1) -> None:
+    progress: Optional[Dict[str, Any]] = _current_progress.get()
+    if progress is not None:
+        progress[key] = progress.get(key, 0) + amount
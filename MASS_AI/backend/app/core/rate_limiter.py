@@ -0,0 +1,77 @@
+"""
+Async rate limiting for outbound provider calls.
+
+Each provider gets a token bucket shared by every request in the process, so
+concurrent fan-out (e.g. many Apollo pages at once) stays under the provider's
+request rate instead of tripping 429s. When a provider does answer 429, the
+retry policy (app/core/retry.py) pauses its limiter for the Retry-After
+period, so every caller backs off, not just the one that was rejected.
+"""
+import asyncio
+import time
+from typing import Dict
+
+from .config import settings
+
+
+class AsyncRateLimiter:
+    """
+    Token bucket: `rate` requests per second with bursts of up to `burst`.
+
+    acquire() reserves a slot synchronously and then sleeps until it is due, so
+    it needs no lock and works from any event loop. A rate of 0 means no limit,
+    but pause() still holds every caller back.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+
+    def pause(self, seconds: float) -> None:
+        """Hold back every acquire() for `seconds` (e.g. after a 429 with Retry-After)."""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def pause_remaining(self) -> float:
+        """Seconds left of the current pause (0 when not paused)."""
+        return max(0.0, self._paused_until - time.monotonic())
+
+    async def acquire(self) -> float:
+        """
+        Wait for the next slot.
+
+        Returns:
+            Seconds spent waiting
+        """
+        paused = self.pause_remaining()
+        if paused:
+            await asyncio.sleep(paused)
+        if self.rate <= 0:
+            return paused
+
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        self._tokens -= 1
+
+        if self._tokens >= 0:
+            return paused
+
+        wait = -self._tokens / self.rate
+        await asyncio.sleep(wait)
+        return paused + wait
+
+
+_rate_limiters: Dict[str, AsyncRateLimiter] = {
+    "apollo": AsyncRateLimiter(settings.APOLLO_REQUESTS_PER_SECOND, burst=settings.APOLLO_RATE_BURST),
+}
+
+
+def get_rate_limiter(provider: str) -> AsyncRateLimiter:
+    """
+    Get the shared rate limiter for a provider. Providers without a configured
+    rate get an unlimited one, which only the 429 pauses apply to.
+    """
+    return _rate_limiters.setdefault(provider.lower(), AsyncRateLimiter(0))
@@ -0,0 +1,219 @@
+"""
+Retry policy shared by every provider client.
+
+provider_request() (app/clients/http.py) and the Mistral client send each
+call through RetryPolicy.run(), which resends a failed call when that is both
+safe and useful:
+
+- Which failures: 429, 500/502/503/504, connection errors and timeouts. Other
+  statuses are returned to the client unchanged.
+- Idempotency: a 429, a 503 or a failed connect means the provider did no
+  work, so any request may be resent. Other failures are only retried for
+  idempotent requests: GET/HEAD/PUT/DELETE, and POSTs to the read-only search
+  APIs in READ_ONLY_POST_PROVIDERS.
+- Backoff: a provider's Retry-After (seconds or HTTP date) is honoured, plus a
+  little jitter; otherwise exponential backoff with full jitter. A Retry-After
+  longer than RETRY_MAX_DELAY_SECONDS is not waited for.
+- Rate limiting: a 429 pauses the provider's shared rate limiter
+  (app/core/rate_limiter.py) for the same period, so concurrent callers back
+  off too instead of collecting their own 429s.
+- Budget: each provider's retries are capped at RETRY_BUDGET_RATIO of its
+  requests (with RETRY_BUDGET_MIN available in a burst), so an outage costs a
+  bounded number of extra calls instead of multiplying the load.
+
+Failed attempts still count against the circuit breaker; once it opens, the
+last attempt's outcome is returned instead of retrying further.
+"""
+import asyncio
+import email.utils
+import random
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+import httpx
+
+from .circuit_breaker import CircuitOpenError
+from .config import settings
+from .metrics import provider_retries, provider_retries_denied
+from .rate_limiter import AsyncRateLimiter, get_rate_limiter
+from .tracing import tracer
+
+# Providers whose POST endpoints only search or read (the query is the body)
+READ_ONLY_POST_PROVIDERS = frozenset({"apollo", "coresignal", "serper", "mistral"})
+
+_IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+_RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+# Rejected before any work was done: safe to resend whatever the method
+_UNPROCESSED_STATUSES = {429, 503}
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date); None if absent or invalid."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when is None:
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+def _classify_error(error: BaseException) -> Tuple[Optional[str], bool]:
+    """(retry reason, whether the request certainly never reached the provider) for a transport error."""
+    if isinstance(error, (httpx.ConnectError, httpx.ConnectTimeout)):
+        return "connect", True
+    if isinstance(error, httpx.TimeoutException):
+        return "timeout", False
+    if isinstance(error, httpx.TransportError):
+        return "connect", False
+    return None, False
+
+
+class RetryBudget:
+    """Token bucket of retries: every request adds `ratio` tokens (up to `minimum`), every retry takes one."""
+
+    def __init__(self, ratio: float, minimum: int):
+        self.ratio = ratio
+        self.capacity = float(max(1, minimum))
+        self.tokens = self.capacity
+        self._lock = threading.Lock()
+
+    def deposit(self) -> None:
+        with self._lock:
+            self.tokens = min(self.capacity, self.tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        with self._lock:
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+
+class RetryPolicy:
+    """Decides whether and when to resend a provider call; one retry budget per provider."""
+
+    def __init__(self):
+        self._budgets: Dict[str, RetryBudget] = {}
+        self._lock = threading.Lock()
+
+    def budget(self, provider: str) -> RetryBudget:
+        with self._lock:
+            budget = self._budgets.get(provider)
+            if budget is None:
+                budget = self._budgets[provider] = RetryBudget(settings.RETRY_BUDGET_RATIO, settings.RETRY_BUDGET_MIN)
+            return budget
+
+    @staticmethod
+    def is_idempotent(provider: str, method: str) -> bool:
+        method = method.upper()
+        return method in _IDEMPOTENT_METHODS or (method == "POST" and provider in READ_ONLY_POST_PROVIDERS)
+
+    @staticmethod
+    def backoff(attempt: int, retry_after: Optional[float] = None) -> float:
+        """Seconds to wait before retry number `attempt + 1`."""
+        base = settings.RETRY_BASE_DELAY_SECONDS
+        if retry_after is not None:
+            # Spread callers told to come back at the same moment
+            return retry_after + random.uniform(0, base)
+        return random.uniform(0, min(settings.RETRY_MAX_DELAY_SECONDS, base * 2 ** attempt))
+
+    def delay_for(self, provider: str, attempt: int, idempotent: bool, limiter: AsyncRateLimiter,
+                  response: Any = None, error: Optional[BaseException] = None) -> Optional[float]:
+        """
+        Seconds to wait before resending after `attempt` (0-based) failed with
+        `response` or `error`, or None to give up. Pauses the provider's rate
+        limiter on a 429 either way.
+        """
+        retry_after = None
+        if response is not None:
+            status = response.status_code
+            if status not in _RETRYABLE_STATUSES:
+                return None
+            reason = "429" if status == 429 else "5xx"
+            unprocessed = status in _UNPROCESSED_STATUSES
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+        else:
+            reason, unprocessed = _classify_error(error)
+            if reason is None:
+                return None
+        if not (idempotent or unprocessed):
+            return None
+
+        delay = self.backoff(attempt, retry_after)
+        if reason == "429":
+            self._pause(limiter, delay)
+
+        if attempt + 1 >= settings.RETRY_MAX_ATTEMPTS:
+            cause = "attempts"
+        elif retry_after is not None and retry_after > settings.RETRY_MAX_DELAY_SECONDS:
+            cause = "retry_after"
+        elif not self.budget(provider).withdraw():
+            cause = "budget"
+        else:
+            provider_retries.inc(provider, reason)
+            span = tracer.current()
+            if span is not None:
+                span.set(retries=attempt + 1)
+            print(f"[Retry] {provider} failed ({reason}), retrying in {delay:.1f}s "
+                  f"(attempt {attempt + 2}/{settings.RETRY_MAX_ATTEMPTS})")
+            return delay
+
+        provider_retries_denied.inc(provider, cause)
+        return None
+
+    async def run(self, provider: str, send: Callable[[], Awaitable[Any]], *, idempotent: bool,
+                  limiter: Optional[AsyncRateLimiter] = None) -> Any:
+        """Await `send()` (one attempt, returning a response) until it succeeds or the policy gives up."""
+        if not settings.RETRY_ENABLED:
+            return await send()
+        limiter = limiter or get_rate_limiter(provider)
+        self.budget(provider).deposit()
+        last = None
+        attempt = 0
+        while True:
+            try:
+                response = await send()
+            except CircuitOpenError:
+                # The failed attempts opened the breaker: report what the last one got
+                if last is None:
+                    raise
+                return _outcome(last)
+            except Exception as e:
+                delay = self.delay_for(provider, attempt, idempotent, limiter, error=e)
+                if delay is None:
+                    raise
+                last = e
+            else:
+                delay = self.delay_for(provider, attempt, idempotent, limiter, response=response)
+                if delay is None:
+                    return response
+                last = response
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    @staticmethod
+    def _pause(limiter: AsyncRateLimiter, delay: float) -> None:
+        limiter.pause(min(delay, settings.RETRY_MAX_DELAY_SECONDS))
+
+    def reset(self) -> None:
+        with self._lock:
+            self._budgets.clear()
+
+
+def _outcome(last: Any) -> Any:
+    if isinstance(last, BaseException):
+        raise last
+    return last
+
+
+# Global retry policy
+retry_policy = RetryPolicy()
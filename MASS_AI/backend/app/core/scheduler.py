@@ -0,0 +1,276 @@
+"""
+Priority-aware scheduling of outbound provider calls.
+
+Every async provider call (provider_request, Mistral) takes a slot from its
+provider's ProviderScheduler first. Each provider has a fixed number of slots;
+when they are all busy, callers queue and are admitted by start-time fair
+queuing: every session accumulates virtual time at 1/weight of its priority
+class per call, and the waiter with the smallest finish tag goes next. A big
+run therefore gets its weighted share instead of the whole provider, and
+sessions of the same class share equally.
+
+Priority classes:
+    interactive - conversation turns and /normalize-icp
+    standard    - ad-hoc /companies and /leads calls
+    bulk        - background jobs
+
+Bulk work is preemptible: queued bulk calls are passed over while any
+interactive call is waiting, and bulk never holds more than
+SCHEDULER_BULK_MAX_SHARE of a provider's slots, so an interactive call never
+waits behind a full set of bulk requests. Calls already in flight are not
+interrupted.
+
+The class and session of the current request are carried in a contextvar:
+PriorityMiddleware sets the class from the request path, services attach the
+session with set_session(), and background jobs run inside priority("bulk").
+"""
+import asyncio
+import contextvars
+import itertools
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Dict, List, Optional, Tuple
+
+from .config import settings
+from .metrics import provider_queue_wait
+
+PRIORITY_CLASSES = ("interactive", "standard", "bulk")
+
+_current_priority: contextvars.ContextVar = contextvars.ContextVar("provider_priority", default=("standard", None))
+
+
+def _parse_mapping(value: str) -> Dict[str, float]:
+    """Parse "name:number,name:number" settings."""
+    mapping = {}
+    for item in value.split(","):
+        if ":" in item:
+            name, number = item.split(":", 1)
+            mapping[name.strip().lower()] = float(number)
+    return mapping
+
+
+def current_priority() -> Tuple[str, Optional[str]]:
+    """(priority class, session_id) of the running request."""
+    return _current_priority.get()
+
+
+@contextmanager
+def priority(priority_class: str, session_id: Optional[str] = None):
+    """Run the enclosed calls (and tasks started inside) under a priority class."""
+    if priority_class not in PRIORITY_CLASSES:
+        raise ValueError(f"Unknown priority class: {priority_class}")
+    token = _current_priority.set((priority_class, session_id))
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+def set_session(session_id: Optional[str]) -> None:
+    """Attribute the rest of the current request's calls to a session (keeps its class)."""
+    if session_id:
+        _current_priority.set((_current_priority.get()[0], session_id))
+
+
+class _Waiter:
+    __slots__ = ("future", "priority_class", "flow", "start", "finish", "seq", "enqueued_at")
+
+    def __init__(self, future, priority_class, flow, start, finish, seq):
+        self.future = future
+        self.priority_class = priority_class
+        self.flow = flow
+        self.start = start
+        self.finish = finish
+        self.seq = seq
+        self.enqueued_at = time.monotonic()
+
+
+class _ClassStats:
+    """Queue depth and wait time of one priority class."""
+
+    def __init__(self):
+        self.waiting = 0
+        self.in_flight = 0
+        self.granted = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "queue_depth": self.waiting,
+            "in_flight": self.in_flight,
+            "granted": self.granted,
+            "avg_wait_seconds": round(self.total_wait / self.granted, 4) if self.granted else 0.0,
+            "max_wait_seconds": round(self.max_wait, 4),
+        }
+
+
+class ProviderScheduler:
+    """Slots of one provider, handed out by class weight and per-session fairness."""
+
+    MAX_FLOWS = 10000
+
+    def __init__(self, provider: str, max_concurrent: int):
+        self.provider = provider
+        self.max_concurrent = max(1, max_concurrent)
+        self._waiters: List[_Waiter] = []
+        self._in_flight = 0
+        self._virtual_time = 0.0
+        self._last_finish: Dict[str, float] = {}
+        self._seq = itertools.count()
+        self.stats = {cls: _ClassStats() for cls in PRIORITY_CLASSES}
+
+    @property
+    def bulk_limit(self) -> int:
+        return max(1, int(self.max_concurrent * settings.SCHEDULER_BULK_MAX_SHARE))
+
+    @asynccontextmanager
+    async def slot(self):
+        """Hold one of the provider's slots for the enclosed call."""
+        priority_class, session_id = current_priority()
+        await self._acquire(priority_class, session_id)
+        try:
+            yield
+        finally:
+            self._release(priority_class)
+
+    async def _acquire(self, priority_class: str, session_id: Optional[str]) -> None:
+        weight = _class_weights().get(priority_class, 1.0)
+        flow = session_id or f"anonymous:{priority_class}"
+        start = max(self._virtual_time, self._last_finish.get(flow, 0.0))
+        finish = start + 1.0 / max(weight, 0.001)
+        self._remember(flow, finish)
+
+        waiter = _Waiter(asyncio.get_running_loop().create_future(), priority_class, flow, start, finish, next(self._seq))
+        self._waiters.append(waiter)
+        self.stats[priority_class].waiting += 1
+        self._dispatch()
+        if waiter.future.done():
+            return
+
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+                self.stats[priority_class].waiting -= 1
+            elif not waiter.future.cancelled():
+                # Granted just as we were cancelled: hand the slot on
+                self._release(priority_class)
+            raise
+
+    def _release(self, priority_class: str) -> None:
+        self._in_flight -= 1
+        self.stats[priority_class].in_flight -= 1
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        while self._in_flight < self.max_concurrent:
+            waiter = self._next_waiter()
+            if waiter is None:
+                return
+            self._waiters.remove(waiter)
+            self._virtual_time = max(self._virtual_time, waiter.start)
+            self._in_flight += 1
+
+            stats = self.stats[waiter.priority_class]
+            waited = time.monotonic() - waiter.enqueued_at
+            stats.waiting -= 1
+            stats.in_flight += 1
+            stats.granted += 1
+            stats.total_wait += waited
+            stats.max_wait = max(stats.max_wait, waited)
+            provider_queue_wait.observe(waited, self.provider)
+            waiter.future.set_result(None)
+
+    def _next_waiter(self) -> Optional[_Waiter]:
+        interactive_waiting = self.stats["interactive"].waiting > 0
+        bulk_full = self.stats["bulk"].in_flight >= self.bulk_limit
+        best = None
+        for waiter in self._waiters:
+            if waiter.future.done():
+                continue
+            if waiter.priority_class == "bulk" and (interactive_waiting or bulk_full):
+                continue
+            if best is None or (waiter.finish, waiter.seq) < (best.finish, best.seq):
+                best = waiter
+        return best
+
+    def _remember(self, flow: str, finish: float) -> None:
+        self._last_finish[flow] = finish
+        if len(self._last_finish) > self.MAX_FLOWS:
+            # Flows behind the virtual clock carry no credit; forget them
+            self._last_finish = {f: t for f, t in self._last_finish.items() if t > self._virtual_time}
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "max_concurrent": self.max_concurrent,
+            "in_flight": self._in_flight,
+            "classes": {cls: stats.snapshot() for cls, stats in self.stats.items()},
+        }
+
+
+def _class_weights() -> Dict[str, float]:
+    return _parse_mapping(settings.SCHEDULER_CLASS_WEIGHTS)
+
+
+class SchedulerRegistry:
+    """One ProviderScheduler per provider, created on first use."""
+
+    def __init__(self):
+        self._schedulers: Dict[str, ProviderScheduler] = {}
+
+    def get(self, provider: str) -> ProviderScheduler:
+        scheduler = self._schedulers.get(provider)
+        if scheduler is None:
+            concurrency = _parse_mapping(settings.SCHEDULER_PROVIDER_CONCURRENCY)
+            max_concurrent = int(concurrency.get(provider, settings.SCHEDULER_MAX_CONCURRENT))
+            scheduler = ProviderScheduler(provider, max_concurrent)
+            self._schedulers[provider] = scheduler
+        return scheduler
+
+    @asynccontextmanager
+    async def slot(self, provider: str):
+        """Hold a slot of the provider's scheduler (no-op when scheduling is disabled)."""
+        if not settings.SCHEDULER_ENABLED:
+            yield
+            return
+        async with self.get(provider).slot():
+            yield
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {provider: scheduler.snapshot() for provider, scheduler in self._schedulers.items()}
+
+    def reset(self) -> None:
+        self._schedulers.clear()
+
+
+class PriorityMiddleware:
+    """
+    ASGI middleware that runs each request under the priority class of its path.
+    An X-Priority header may lower the class (e.g. a batch client sending "bulk"),
+    never raise it.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        path = scope.get("path", "")
+        interactive_paths = [p.strip() for p in settings.SCHEDULER_INTERACTIVE_PATHS.split(",") if p.strip()]
+        priority_class = "interactive" if any(path.startswith(p) for p in interactive_paths) else "standard"
+
+        requested = dict(scope.get("headers") or []).get(b"x-priority", b"").decode("latin-1").strip().lower()
+        if requested in PRIORITY_CLASSES and PRIORITY_CLASSES.index(requested) > PRIORITY_CLASSES.index(priority_class):
+            priority_class = requested
+
+        with priority(priority_class):
+            await self.app(scope, receive, send)
+
+
+# Global scheduler registry
+provider_scheduler = SchedulerRegistry()
@@ -7,6 +7,9 @@ import time
 from typing import Dict, Any, List
 from datetime import datetime
 
+from .metrics import metrics
+from .tracing import tracer
+
 
 class ICPSession:
     """Tracks a single ICP processing session."""
@@ -59,6 +62,10 @@ class ICPSession:
         self.errors.append(error)
         print(f"[Session {self.session_id}] Error: {error}")
     
+    def trace(self):
+        """Waterfall of this session's traced stages and provider calls (None if nothing was traced)."""
+        return tracer.waterfall(self.session_id)
+    
     def get_processing_time(self) -> float:
         """Get the total processing time in seconds."""
         return time.time() - self.start_time
@@ -84,6 +91,9 @@ class ICPSession:
 # Global session storage (in production, use Redis or similar)
 _active_sessions: Dict[str, ICPSession] = {}
 
+metrics.gauge("mass_active_sessions", "ICP sessions currently held in memory.",
+              callback=lambda: {(): len(_active_sessions)})
+
 
 def create_session(raw_icp_text: str) -> ICPSession:
     """Create a new ICP processing session."""
@@ -0,0 +1,196 @@
+"""
+Per-session tracing of stages and provider calls.
+
+A span covers one unit of work: a phase of a session (company search, lead
+search), one company's enrichment, one enrichment stage or one provider call.
+Spans nest through a context variable, so a provider call made while a
+company's CoreSignal stage is running becomes a child of that stage, and
+tasks started with asyncio.gather() inherit their parent span.
+
+Traces are keyed by the ICPSession id (the one journey_logger writes). A span
+opened without an explicit session takes it from its parent or from the
+scheduler's set_session(); work outside any session is not traced.
+
+Finished spans go into a bounded in-memory ring per session (the oldest
+sessions are dropped beyond TRACE_MAX_SESSIONS) and, when TRACE_EXPORT_PATH
+is set, are appended to that file as JSON lines. GET /sessions/{id}/trace
+returns them as a waterfall.
+"""
+import asyncio
+import contextvars
+import itertools
+import json
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, List, Optional
+
+from .config import settings
+from .scheduler import current_priority
+
+
+class Span:
+    """One timed unit of work within a session's trace."""
+
+    def __init__(self, span_id: int, session_id: str, name: str, kind: str,
+                 parent_id: Optional[int], attributes: Dict[str, Any]):
+        self.span_id = span_id
+        self.session_id = session_id
+        self.name = name
+        self.kind = kind
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.start = time.time()
+        self.end: Optional[float] = None
+        self.status = "ok"
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    def add_cost(self, amount: float, source: str) -> None:
+        if amount:
+            self.attributes["cost"] = round(self.attributes.get("cost", 0) + amount, 6)
+            costs = self.attributes.setdefault("costs", {})
+            costs[source] = round(costs.get(source, 0) + amount, 6)
+
+    def to_dict(self) -> Dict[str, Any]:
+        end = self.end if self.end is not None else time.time()
+        return {
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "session_id": self.session_id,
+            "name": self.name,
+            "kind": self.kind,
+            "start": self.start,
+            "end": end,
+            "duration_ms": round((end - self.start) * 1000, 2),
+            "status": self.status,
+            "attributes": self.attributes,
+        }
+
+
+_current_span: contextvars.ContextVar = contextvars.ContextVar("trace_span", default=None)
+
+
+class Tracer:
+    """Records spans per session in a bounded ring, optionally exporting them to a file."""
+
+    def __init__(self, max_sessions: Optional[int] = None, max_spans: Optional[int] = None,
+                 export_path: Optional[str] = None):
+        self.max_sessions = max_sessions or settings.TRACE_MAX_SESSIONS
+        self.max_spans = max_spans or settings.TRACE_MAX_SPANS_PER_SESSION
+        self.export_path = export_path if export_path is not None else settings.TRACE_EXPORT_PATH
+        self._traces: "OrderedDict[str, Deque[Dict[str, Any]]]" = OrderedDict()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def current() -> Optional[Span]:
+        return _current_span.get()
+
+    @contextmanager
+    def span(self, name: str, kind: str = "stage", session_id: Optional[str] = None, **attributes: Any):
+        """
+        Trace the enclosed block. Yields the Span (or None when not tracing) so
+        the block can attach attributes such as status, bytes or cost.
+        """
+        parent = _current_span.get()
+        session_id = session_id or (parent.session_id if parent else None) or current_priority()[1]
+        if not settings.TRACING_ENABLED or not session_id:
+            yield None
+            return
+
+        span = Span(next(self._ids), session_id, name, kind,
+                    parent.span_id if parent and parent.session_id == session_id else None, attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.status = "cancelled" if isinstance(e, asyncio.CancelledError) else "error"
+            span.attributes.setdefault("error", f"{type(e).__name__}: {e}"[:200])
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end = time.time()
+            self._finish(span)
+
+    def add_cost(self, amount: float, source: str) -> None:
+        """Attribute a provider cost (USD, e.g. of call type "coresignal_enrich") to the innermost open span."""
+        span = _current_span.get()
+        if span is not None:
+            span.add_cost(amount, source)
+
+    def _finish(self, span: Span) -> None:
+        record = span.to_dict()
+        with self._lock:
+            spans = self._traces.get(span.session_id)
+            if spans is None:
+                spans = self._traces[span.session_id] = deque(maxlen=self.max_spans)
+                while len(self._traces) > self.max_sessions:
+                    self._traces.popitem(last=False)
+            else:
+                self._traces.move_to_end(span.session_id)
+            spans.append(record)
+        if self.export_path:
+            self._export(record)
+
+    def _export(self, record: Dict[str, Any]) -> None:
+        try:
+            directory = os.path.dirname(self.export_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            line = json.dumps(record, default=str) + "\n"
+            with self._lock, open(self.export_path, "a", encoding="utf-8") as f:
+                f.write(line)
+        except OSError as e:
+            print(f"[Tracing] Could not export span {record['name']}: {e}")
+
+    def spans(self, session_id: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(self._traces.get(session_id, ()))
+
+    def waterfall(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Spans of a session ordered by start time, each with its offset from the
+        first span and its depth in the span tree. None if nothing was traced.
+        """
+        spans = sorted((dict(s) for s in self.spans(session_id)), key=lambda s: (s["start"], s["span_id"]))
+        if not spans:
+            return None
+
+        started = spans[0]["start"]
+        ended = max(s["end"] for s in spans)
+        parents = {s["span_id"]: s["parent_id"] for s in spans}
+        cost_by_source: Dict[str, float] = {}
+        for s in spans:
+            depth, parent = 0, s["parent_id"]
+            while parent is not None and parent in parents:
+                depth, parent = depth + 1, parents[parent]
+            s["depth"] = depth
+            s["offset_ms"] = round((s["start"] - started) * 1000, 2)
+            for source, cost in s["attributes"].get("costs", {}).items():
+                cost_by_source[source] = round(cost_by_source.get(source, 0) + cost, 6)
+
+        provider_calls = [s for s in spans if s["kind"] == "provider"]
+        return {
+            "session_id": session_id,
+            "started_at": started,
+            "duration_ms": round((ended - started) * 1000, 2),
+            "span_count": len(spans),
+            "provider_calls": len(provider_calls),
+            "provider_time_ms": round(sum(s["duration_ms"] for s in provider_calls), 2),
+            "bytes_received": sum(s["attributes"].get("bytes", 0) for s in provider_calls),
+            "total_cost": round(sum(cost_by_source.values()), 6),
+            "cost_by_source": cost_by_source,
+            "spans": spans,
+        }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._traces.clear()
+
+
+# Global tracer
+tracer = Tracer()
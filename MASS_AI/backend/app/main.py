@@ -1,11 +1,18 @@
 """
 FastAPI application factory and configuration.
 """
+import asyncio
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from .core.config import settings
-from .routes import icp_router, company_router, lead_router, health_router, conversation_router
+from .core.icp_similarity import icp_similarity_index
+from .core.metrics import MetricsMiddleware
+from .core.profiling import ProfilingMiddleware
+from .core.scheduler import PriorityMiddleware
+from .routes import icp_router, company_router, lead_router, health_router, conversation_router, jobs_router, sessions_router
+from .services.job_service import job_service
 
 
 def create_application() -> FastAPI:
@@ -26,6 +33,12 @@ def create_application() -> FastAPI:
         allow_methods=["*"],
         allow_headers=["*"],
     )
+    # Priority class (interactive/standard) of each request's provider calls
+    app.add_middleware(PriorityMiddleware)
+    # Request counts and latency per route template for GET /metrics
+    app.add_middleware(MetricsMiddleware)
+    # Operator-flagged requests run under the sampling profiler
+    app.add_middleware(ProfilingMiddleware)
 
     # Include routers
     app.include_router(health_router)
@@ -33,6 +46,30 @@ def create_application() -> FastAPI:
     app.include_router(conversation_router)  # New conversational ICP collection
     app.include_router(company_router)
     app.include_router(lead_router)
+    app.include_router(jobs_router)
+    app.include_router(sessions_router)
+
+    @app.on_event("startup")
+    async def warm_icp_similarity_index():
+        """Load past ICPs into the near-duplicate index without blocking startup."""
+        if settings.ICP_REUSE_MODE == "off":
+            return
+
+        def _warm():
+            try:
+                icp_similarity_index.warm_from_db()
+            except Exception as e:
+                print(f"[ICP Similarity] Could not warm index from database: {e}")
+
+        asyncio.get_running_loop().run_in_executor(None, _warm)
+
+    @app.on_event("startup")
+    async def start_job_workers():
+        await job_service.start()
+
+    @app.on_event("shutdown")
+    async def stop_job_workers():
+        await job_service.stop()
 
     return app
 
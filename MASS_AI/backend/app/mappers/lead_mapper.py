@@ -5,13 +5,24 @@ from typing import Dict, Any, Optional
 
 from ..schemas.lead import Lead
 from ..schemas.company import SimpleCompany
+from .persona_matcher import PersonaMatcher
 
 
 class LeadMapper:
     """Mapper for lead data transformations."""
     
-    def map_apollo_person_to_lead(self, person_data: Dict[str, Any], company: SimpleCompany, matched_persona: Optional[str] = None) -> Lead:
-        """Map Apollo person data to Lead model with contact fields."""
+    def map_apollo_person_to_lead(self, person_data: Dict[str, Any], company: SimpleCompany, matched_persona: Optional[str] = None,
+                                  persona_matcher: Optional[PersonaMatcher] = None) -> Lead:
+        """
+        Map Apollo person data to Lead model with contact fields.
+        
+        Without an explicit matched_persona, the title is matched with persona_matcher (if given).
+        """
+        persona_confidence = 1.0 if matched_persona else None
+        if matched_persona is None and persona_matcher is not None:
+            match = persona_matcher.match(person_data.get("title"))
+            if match:
+                matched_persona, persona_confidence = match
         
         # Enhanced email extraction - try multiple fields
         contact_email = None
@@ -102,6 +113,6 @@ class LeadMapper:
             contact_published_content=contact_published_content,
             
             matched_persona=matched_persona,
-            persona_confidence=1.0 if matched_persona else None,
+            persona_confidence=persona_confidence,
             apollo_id=str(person_data.get("id")) if person_data.get("id") else None
         )
@@ -0,0 +1,116 @@
+"""
+Persona matching of job titles.
+
+A PersonaMatcher compiles every persona's title_regex into one alternation of
+named groups, so a title is matched with a single regex call instead of one
+re.match per persona and pattern. Matching keeps the original semantics: the
+personas are tried in order, each pattern with re.match (anchored at the start
+of the title), case-insensitively, and the first persona with a matching
+pattern wins.
+
+A pattern that does not compile falls back to "the persona name appears in the
+title", at its position in that order. That is decided once per persona set,
+not once per person. Patterns that cannot share an alternation (backreferences,
+their own named groups, inline flags) are compiled on their own.
+
+Matchers are cached per persona set (e.g. per ICP); use PersonaMatcher.for_personas().
+"""
+import re
+from functools import lru_cache
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+from ..schemas.icp import PersonaConfig
+
+# A regex match on the title is direct evidence; the name fallback is weaker
+REGEX_CONFIDENCE = 1.0
+FALLBACK_CONFIDENCE = 0.5
+
+# Constructs whose meaning depends on group numbering or position in the pattern
+_STANDALONE = re.compile(r"\\[1-9]|\(\?P[<=]|\(\?[aiLmsux]+\)")
+
+
+class PersonaMatch(NamedTuple):
+    persona: str
+    confidence: float
+
+
+class PersonaMatcher:
+    """Matches titles against a fixed list of personas."""
+
+    def __init__(self, personas: Sequence[PersonaConfig]):
+        # Ordered steps: ("regex", compiled, group -> persona) or ("name", lowercase name, persona)
+        self._steps: List[Tuple] = []
+        pending: List[Tuple[str, str]] = []
+
+        for persona in personas:
+            for pattern in persona.title_regex:
+                try:
+                    re.compile(pattern, re.IGNORECASE)
+                except re.error as e:
+                    print(f"[Personas] Invalid title_regex {pattern!r} for {persona.name}: {e}; "
+                          f"matching on the persona name instead")
+                    self._flush(pending)
+                    self._steps.append(("name", persona.name.lower(), persona.name))
+                    continue
+                if _STANDALONE.search(pattern):
+                    self._flush(pending)
+                    self._steps.append(("regex", re.compile(pattern, re.IGNORECASE), {None: persona.name}))
+                else:
+                    pending.append((persona.name, pattern))
+        self._flush(pending)
+
+    def _flush(self, pending: List[Tuple[str, str]]) -> None:
+        """Compile the consecutive shareable patterns collected so far into one alternation."""
+        if not pending:
+            return
+        groups = {}
+        branches = []
+        for name, pattern in pending:
+            group = f"p{len(groups)}"
+            groups[group] = name
+            branches.append(f"(?P<{group}>{pattern})")
+        try:
+            self._steps.append(("regex", re.compile("|".join(branches), re.IGNORECASE), groups))
+        except re.error:
+            # Patterns valid alone but not together: keep them separate, in order
+            for name, pattern in pending:
+                self._steps.append(("regex", re.compile(pattern, re.IGNORECASE), {None: name}))
+        pending.clear()
+
+    @classmethod
+    def for_personas(cls, personas: Optional[Sequence[PersonaConfig]]) -> Optional["PersonaMatcher"]:
+        """Cached matcher for a persona list (None when there are no personas)."""
+        if not personas:
+            return None
+        return _cached_matcher(tuple((p.name, tuple(p.title_regex)) for p in personas))
+
+    def match(self, title: Optional[str]) -> Optional[PersonaMatch]:
+        """The first persona matching a title, with its confidence; None if no persona matches."""
+        title = (title or "").strip()
+        if not title:
+            return None
+        lowered = None
+        for kind, matcher, target in self._steps:
+            if kind == "regex":
+                found = matcher.match(title)
+                if found:
+                    return PersonaMatch(self._persona(found, target), REGEX_CONFIDENCE)
+            else:
+                lowered = lowered if lowered is not None else title.lower()
+                if matcher in lowered:
+                    return PersonaMatch(target, FALLBACK_CONFIDENCE)
+        return None
+
+    @staticmethod
+    def _persona(found: "re.Match", groups: dict) -> str:
+        if None in groups:
+            return groups[None]
+        if found.lastgroup in groups:
+            return groups[found.lastgroup]
+        return next(groups[g] for g, value in found.groupdict().items() if value is not None and g in groups)
+
+
+@lru_cache(maxsize=256)
+def _cached_matcher(key: Tuple[Tuple[str, Tuple[str, ...]], ...]) -> PersonaMatcher:
+    return PersonaMatcher([PersonaConfig(name=name, title_regex=list(patterns), seniority=[], functions=[])
+                           for name, patterns in key])
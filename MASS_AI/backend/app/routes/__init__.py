@@ -6,11 +6,15 @@ from .icp import router as icp_router
 from .company import router as company_router
 from .lead import router as lead_router
 from .conversation import router as conversation_router
+from .jobs import router as jobs_router
+from .sessions import router as sessions_router
 
 __all__ = [
     "health_router",
     "icp_router", 
     "company_router",
     "lead_router",
-    "conversation_router"
+    "conversation_router",
+    "jobs_router",
+    "sessions_router"
 ]
\ No newline at end of file
@@ -3,34 +3,46 @@ Company routes.
 """
 from fastapi import APIRouter
 
-from ..schemas.company import CompaniesRequest, CompaniesResponse, EnrichRequest, SerperEnrichFieldsRequest
+from ..schemas.company import CompaniesPlan, CompaniesRequest, CompaniesResponse, EnrichRequest, SerperEnrichFieldsRequest
 from ..services.company_service import CompanyService
+from ..services.plan_service import CompanySearchPlanner
 from ..core.db_operations import save_companies, track_api_call
+from ..core.tracing import tracer
 
 router = APIRouter(prefix="", tags=["companies"])
 
 
+@router.post("/companies/plan", response_model=CompaniesPlan)
+async def plan_companies(req: CompaniesRequest):
+    """
+    Estimate provider calls, cache hits, cost and duration of a /companies
+    request without running it.
+    """
+    return CompanySearchPlanner().plan(req)
+
+
 @router.post("/companies", response_model=CompaniesResponse)
 async def get_companies(req: CompaniesRequest):
     """
     Search for companies using Apollo API and enrich with CoreSignal and EnrichLayer.
     """
     service = CompanyService()
-    result = await service.search_companies(req)
-    
-    # Track Apollo API call
-    if req.session_id and result.success:
-        try:
-            track_api_call(
-                session_id=req.session_id,
-                api_name="Apollo",
-                endpoint="mixed_companies/search",
-                call_type="apollo_company_search",
-                calls_made=1,
-                success=True
-            )
-        except Exception as e:
-            print(f"[Cost Tracking] Error tracking Apollo call: {e}")
+    with tracer.span("companies", kind="phase", session_id=req.session_id, limit=req.limit):
+        result = await service.search_companies(req)
+        
+        # Track Apollo API call
+        if req.session_id and result.success:
+            try:
+                track_api_call(
+                    session_id=req.session_id,
+                    api_name="Apollo",
+                    endpoint="mixed_companies/search",
+                    call_type="apollo_company_search",
+                    calls_made=max(1, result.apollo_pages_fetched),
+                    success=True
+                )
+            except Exception as e:
+                print(f"[Cost Tracking] Error tracking Apollo call: {e}")
     
     # Save to database if successful
     if result.success and req.session_id:
@@ -1,7 +1,11 @@
 """
 Conversational ICP collection routes.
 """
+import asyncio
+import json
+
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 
 from ..schemas.conversation import (
     ICPConversationStartRequest,
@@ -51,7 +55,8 @@ async def start_conversation(request: ICPConversationStartRequest):
             needs_conversation=result["needs_conversation"],
             message=result.get("message"),
             current_state=result["state"],
-            icp_config=result.get("icp_config")
+            icp_config=result.get("icp_config"),
+            similar_icp=result.get("similar_icp")
         )
     
     except Exception as e:
@@ -94,6 +99,68 @@ async def respond_to_conversation(conversation_id: str, request: ICPConversation
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/{conversation_id}/respond/stream")
+async def respond_to_conversation_stream(conversation_id: str, request: ICPConversationRespondRequest):
+    """
+    Streaming variant of /respond (Server-Sent Events).
+    
+    Events:
+    - token: {"text": "..."} - next chunk of the agent's question as Mistral generates it
+    - state: same body as /respond - sent once at the end; its "message" is the
+      final question and replaces the streamed text
+    - error: {"status_code": int, "detail": "..."}
+    """
+    service = ConversationalICPService()
+    queue: asyncio.Queue = asyncio.Queue()
+    
+    async def on_token(text: str):
+        await queue.put(("token", {"text": text}))
+    
+    async def run_turn():
+        try:
+            result = await service.respond_to_conversation(
+                conversation_id=conversation_id,
+                answer=request.answer,
+                on_token=on_token
+            )
+            response = ICPConversationRespondResponse(
+                conversation_id=result["conversation_id"],
+                needs_more_info=result["needs_more_info"],
+                message=result.get("message"),
+                current_state=result["state"],
+                progress_percentage=result["progress_percentage"],
+                icp_config=result.get("icp_config")
+            )
+            await queue.put(("state", response.dict()))
+        except ValueError as e:
+            await queue.put(("error", {"status_code": 404, "detail": str(e)}))
+        except Exception as e:
+            print(f"[Conversation Respond Stream] Error: {str(e)}")
+            await queue.put(("error", {"status_code": 500, "detail": str(e)}))
+        finally:
+            await queue.put(None)
+    
+    async def event_stream():
+        task = asyncio.create_task(run_turn())
+        try:
+            while True:
+                item = await queue.get()
+                if item is None:
+                    break
+                event, data = item
+                yield f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+        finally:
+            # Client disconnected mid-turn
+            if not task.done():
+                task.cancel()
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.get("/{conversation_id}/status", response_model=ICPConversationStatusResponse)
 async def get_conversation_status(conversation_id: str):
     """
@@ -1,9 +1,18 @@
 """
 Health check routes.
 """
-from fastapi import APIRouter
+from typing import Optional
 
+from fastapi import APIRouter, Header, HTTPException
+from fastapi.responses import PlainTextResponse
+
+from ..core.circuit_breaker import provider_breakers
+from ..core.coalescing import request_coalescer
 from ..core.config import settings
+from ..core.latency import provider_latency
+from ..core.metrics import metrics
+from ..core.profiling import authorized, load_profile
+from ..core.scheduler import provider_scheduler
 
 router = APIRouter(prefix="", tags=["health"])
 
@@ -23,3 +32,64 @@ async def health_check():
         "apollo_configured": bool(settings.APOLLO_API_KEY),
         "coresignal_configured": bool(settings.CORESIGNAL_API_KEY)
     }
+
+
+@router.get("/health/providers")
+async def provider_health():
+    """Live provider latency percentiles, chosen timeouts and hedge rates."""
+    return {
+        "adaptive_timeouts_enabled": settings.ADAPTIVE_TIMEOUTS_ENABLED,
+        "hedged_requests_enabled": settings.HEDGED_REQUESTS_ENABLED,
+        "providers": provider_latency.snapshot()
+    }
+
+
+@router.get("/health/breakers")
+async def breaker_status():
+    """Circuit breaker state and recent transitions per provider."""
+    return {
+        "enabled": settings.BREAKER_ENABLED,
+        "open_providers": provider_breakers.open_providers(),
+        "providers": provider_breakers.snapshot()
+    }
+
+
+@router.get("/health/scheduler")
+async def scheduler_status():
+    """Queue depth, in-flight calls and wait times per provider and priority class."""
+    return {
+        "enabled": settings.SCHEDULER_ENABLED,
+        "providers": provider_scheduler.snapshot()
+    }
+
+
+@router.get("/health/coalescing")
+async def coalescing_status():
+    """Provider calls sent vs. served by joining an identical call already in flight."""
+    return {
+        "enabled": settings.COALESCING_ENABLED,
+        "providers": request_coalescer.snapshot()
+    }
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Counters, gauges and latency histograms in the Prometheus text format."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@router.get("/health/profiles/{profile_id}")
+async def request_profile(profile_id: str, format: str = "json", profile: Optional[str] = None,
+                          x_profile: Optional[str] = Header(None)):
+    """
+    A stored request profile (operator token required). format=collapsed
+    returns the CPU stacks in folded format for flamegraph.pl or speedscope.
+    """
+    if not authorized(x_profile or profile):
+        raise HTTPException(status_code=403, detail="Profiling token required")
+    result = load_profile(profile_id)
+    if result is None:
+        raise HTTPException(status_code=404, detail=f"Profile {profile_id} not found")
+    if format == "collapsed":
+        return PlainTextResponse(result["collapsed"])
+    return result
@@ -38,5 +38,6 @@ async def normalize_icp(icp_input: ICPInput):
         icp_config=result["icp_config"],
         routing_decision=result.get("routing_decision"),
         error=result["error"],
-        session_id=result.get("session_id")
+        session_id=result.get("session_id"),
+        similar_icp=result.get("similar_icp")
     )
\ No newline at end of file
@@ -0,0 +1,40 @@
+"""
+Background job routes.
+"""
+from fastapi import APIRouter, HTTPException
+
+from ..schemas.job import JobRequest, JobStatus
+from ..services.job_service import job_service
+
+router = APIRouter(prefix="", tags=["jobs"])
+
+
+@router.post("/jobs", response_model=JobStatus, status_code=202)
+async def create_job(request: JobRequest) -> JobStatus:
+    """
+    Start a full ICP -> companies -> leads run in the background.
+    Poll GET /jobs/{job_id} for progress and results.
+    """
+    try:
+        job = await job_service.submit(request)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return job.to_status()
+
+
+@router.get("/jobs/{job_id}", response_model=JobStatus)
+async def get_job(job_id: str) -> JobStatus:
+    """Progress and partial results of a job."""
+    job = job_service.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job.to_status()
+
+
+@router.post("/jobs/{job_id}/cancel", response_model=JobStatus)
+async def cancel_job(job_id: str) -> JobStatus:
+    """Cancel a queued or running job."""
+    job = job_service.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job.to_status()
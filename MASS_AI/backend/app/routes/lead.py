@@ -10,6 +10,7 @@ from ..services.lead_service import LeadService
 from ..core.logger import journey_logger
 from ..core.session import get_session, complete_session
 from ..core.db_operations import save_leads, update_icp_search_results
+from ..core.tracing import tracer
 
 router = APIRouter(prefix="", tags=["leads"])
 
@@ -18,7 +19,8 @@ router = APIRouter(prefix="", tags=["leads"])
 async def get_leads(request: LeadsRequest) -> LeadsResponse:
     """Get leads from companies using Apollo People Search API."""
     service = LeadService()
-    result = await service.get_leads(request)
+    with tracer.span("leads", kind="phase", session_id=request.session_id, companies=len(request.companies)):
+        result = await service.get_leads(request)
     
     # Save leads to database if successful
     if result.success and request.session_id:
@@ -58,6 +60,9 @@ async def get_leads(request: LeadsRequest) -> LeadsResponse:
                     processing_time=processing_time
                 )
                 print(f"[Database] Cost Summary: ${cost_summary['total_cost']:.2f} total, ${cost_summary['cost_per_lead']:.4f} per lead")
+                budget = cost_summary.get("budget")
+                if budget:
+                    print(f"[Database] Budget: ${budget['spent_usd']:.2f} of ${budget['budget_usd']:.2f} spent, skipped: {budget['skipped'] or 'nothing'}")
         except Exception as e:
             print(f"[Database] Error saving leads: {e}")
     
@@ -0,0 +1,27 @@
+"""
+Session trace routes.
+"""
+from fastapi import APIRouter, HTTPException
+
+from ..core.session import get_session
+from ..core.tracing import tracer
+
+router = APIRouter(prefix="", tags=["sessions"])
+
+
+@router.get("/sessions/{session_id}/trace")
+async def get_session_trace(session_id: str):
+    """
+    Waterfall of a session's phases, company enrichments, stages and provider
+    calls, with timing, status, response bytes and cost per span.
+    """
+    session = get_session(session_id)
+    trace = session.trace() if session else tracer.waterfall(session_id)
+    if trace is None:
+        raise HTTPException(status_code=404, detail=f"No trace recorded for session {session_id}")
+    # Completed sessions are no longer held in memory, but their trace is
+    trace["session_active"] = session is not None
+    if session:
+        trace["icp_text"] = session.raw_icp_text
+        trace["processing_time_seconds"] = round(session.get_processing_time(), 2)
+    return trace
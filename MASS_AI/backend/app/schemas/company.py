@@ -55,6 +55,10 @@ class Company(BaseModel):
     coresignal_enriched: bool = False
     coresignal_data: Optional[Dict[str, Any]] = None
     enrichment_error: Optional[str] = None
+    # Providers skipped for this company because their circuit breaker was open
+    degraded_providers: Optional[List[str]] = None
+    # Providers the enrichment planner skipped because they could not fill any missing field
+    skipped_providers: Optional[List[str]] = None
     # Hunter.io enrichment fields
     contacts: Optional[List[Contact]] = None
     hunterio_pattern: Optional[str] = None
@@ -84,6 +88,40 @@ class CompaniesResponse(BaseModel):
     response_count: int = 0
     request_payload: Optional[Dict[str, Any]] = None
     raw_companies: Optional[List[Dict[str, Any]]] = None
+    apollo_pages_fetched: int = 0  # Apollo search calls used (one per page)
+    provider_calls_skipped: Dict[str, int] = {}  # Enrichment stages skipped by the planner, per provider
+    error: Optional[str] = None
+
+
+class ProviderCallEstimate(BaseModel):
+    calls: float  # Expected calls, before cache hits
+    cache_hits: float = 0  # Calls answered by a prefetch or checkpoint instead
+    cost_usd: float = 0  # Cost of the calls that are actually made
+
+
+class StageEstimate(BaseModel):
+    run_rate: float  # Share of companies the stage is expected to run for
+    seconds_per_run: float
+    basis: str  # "history" (this process's metrics) or "default"
+
+
+class CompaniesPlan(BaseModel):
+    """Estimate of what a /companies request would do (nothing is run)."""
+    success: bool
+    limit: int = 0
+    request_payload: Optional[Dict[str, Any]] = None
+    apollo_pages: int = 0
+    enrichment_enabled: bool = True
+    provider_calls: Dict[str, ProviderCallEstimate] = {}  # By API_COSTS call type
+    stages: Dict[str, StageEstimate] = {}
+    expected_cache_hits: Dict[str, float] = {}  # By cache (apollo_prefetch, checkpoint)
+    estimated_cost_usd: float = 0
+    estimated_cost_per_company_usd: float = 0
+    estimated_seconds: float = 0
+    enrichment_concurrency: int = 0
+    suggested_enrichment_concurrency: int = 0
+    suggested_limit: Optional[int] = None  # Largest limit expected to finish within PLAN_TARGET_SECONDS
+    notes: List[str] = []
     error: Optional[str] = None
 
 class SerperEnrichFieldsRequest(BaseModel):
@@ -5,6 +5,8 @@ from pydantic import BaseModel, Field
 from typing import List, Dict, Any, Optional
 from enum import Enum
 
+from .icp import SimilarICPMatch
+
 
 class ConversationMode(str, Enum):
     """Conversation mode options."""
@@ -52,6 +54,7 @@ class ICPConversationStartResponse(BaseModel):
     message: Optional[str] = None  # Agent's first question if needs_conversation=True
     current_state: ConversationState
     icp_config: Optional[Dict[str, Any]] = None  # If complete on first parse
+    similar_icp: Optional[SimilarICPMatch] = None  # Near-duplicate of a previous ICP, if any
 
 
 class ICPConversationRespondRequest(BaseModel):
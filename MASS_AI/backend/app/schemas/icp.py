@@ -109,9 +109,18 @@ class RoutingDecision(BaseModel):
     research_plan: ResearchPlan
 
 
+class SimilarICPMatch(BaseModel):
+    """A previously normalized ICP that is a near-duplicate of the current input."""
+    session_id: Optional[str] = None
+    similarity: float  # 0.0-1.0 Jaccard similarity of the ICP texts
+    icp_text: str
+    reused: bool = False  # True if its config was reused instead of calling Mistral
+
+
 class ICPResponse(BaseModel):
     success: bool
     icp_config: Optional[ICPConfig]
     routing_decision: Optional[RoutingDecision] = None
     error: Optional[str]
     session_id: Optional[str] = None
+    similar_icp: Optional[SimilarICPMatch] = None
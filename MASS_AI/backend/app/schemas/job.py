@@ -0,0 +1,37 @@
+"""
+Background job schemas.
+"""
+from pydantic import BaseModel
+from typing import List, Dict, Any, Optional
+
+from .icp import ICPConfig, PersonaConfig
+from .company import Company
+from .lead import Lead
+
+
+class JobRequest(BaseModel):
+    """A full ICP -> companies -> leads run. Give icp_text, or an already normalized icp_config."""
+    icp_text: Optional[str] = None
+    icp_config: Optional[ICPConfig] = None
+    session_id: Optional[str] = None
+    limit: Optional[int] = 10
+    personas: Optional[List[PersonaConfig]] = None  # Defaults to the ICP's personas
+    max_leads_per_company: Optional[int] = 25
+    include_leads: bool = True
+
+
+class JobStatus(BaseModel):
+    job_id: str
+    status: str  # queued, running, succeeded, failed, cancelled
+    stage: Optional[str] = None  # normalize, companies or leads while running
+    stages_completed: List[str] = []
+    session_id: Optional[str] = None
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    # Partial results, filled in as each stage completes
+    icp_config: Optional[ICPConfig] = None
+    companies: Optional[List[Company]] = None
+    leads: Optional[List[Lead]] = None
+    progress: Dict[str, Any] = {}
+    error: Optional[str] = None
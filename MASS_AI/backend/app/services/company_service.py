@@ -1,8 +1,21 @@
 """
 Company service for search and enrichment operations.
 """
-from typing import Dict, Any, List, Optional
-from ..core.db_operations import track_api_call
+import asyncio
+from contextlib import contextmanager
+from typing import Dict, Any, List, Optional, Set
+from ..core.config import settings
+from ..core.budget import session_budgets
+from ..core.checkpoints import checkpoint_store
+from ..core.coalescing import request_coalescer
+from ..core.scheduler import set_session
+from ..core.circuit_breaker import provider_breakers
+from ..core.db_operations import API_COSTS, track_api_call
+from ..core.metrics import (
+    endpoint_label, enrichment_stage_duration, enrichments_completed, enrichments_in_flight, record_cache,
+)
+from ..core.progress import increment_progress, set_progress
+from ..core.tracing import tracer
 from ..clients.apollo import ApolloClient
 from ..clients.coresignal import CoreSignalClient
 from ..clients.enrich_layer import EnrichLayerClient
@@ -13,6 +26,15 @@ import sys
 from ..core.session import get_session
 from ..core.logger import journey_logger
 from ..core.console_logger import console_logger
+from .prefetch_service import apollo_prefetch_service
+from .enrichment_planner import EnrichmentPlan
+
+
+@contextmanager
+def _stage(name: str):
+    """Time an enrichment stage for /metrics and trace it as a span of the company."""
+    with enrichment_stage_duration.time(name), tracer.span(name, kind="stage"):
+        yield
 
 
 class CompanyService:
@@ -241,7 +263,7 @@ class CompanyService:
         # 5. Hunter.io enrichment (contacts and pattern only)
         try:
             if mapped_company.domain:
-                hunterio_result = self.hunterio.domain_search(mapped_company.domain)
+                hunterio_result = await self.hunterio.domain_search(mapped_company.domain)
                 if hunterio_result and hunterio_result.get("data", {}).get("emails"):
                     mapped_company = mapper.apply_hunterio_enrichment(mapped_company, hunterio_result)
                     logger.info(f"[Orchestration] Hunter.io success for {mapped_company.name}")
@@ -289,7 +311,7 @@ class CompanyService:
             for field, domain in missing_socials:
                 query = f"site:{domain} {mapped_company.name}"
                 try:
-                    url = self.serper.get_first_url_for_query(query, expected_domain=domain)
+                    url = await self.serper.get_first_url_for_query(query, expected_domain=domain)
                     if url:
                         setattr(mapped_company, field, url)
                         logger.info(f"[Orchestration] Serper targeted search: set {field} to {url}")
@@ -399,14 +421,14 @@ class CompanyService:
         try:
             if needs_search:
                 logger.info(f"[Serper] Performing search for '{company_name}'")
-                search_result = self.serper.search(company_name)
+                search_result = await self.serper.search(company_name)
             if needs_news:
                 logger.info(f"[Serper] Performing news search for '{company_name}'")
-                news_result = self.serper.news(company_name)
+                news_result = await self.serper.news(company_name)
                 logger.info(f"[Serper] Raw news_result: {news_result}")
             if needs_location:
                 logger.info(f"[Serper] Performing location search for '{company_name}'")
-                location_result = self.serper.location(company_name)
+                location_result = await self.serper.location(company_name)
         except Exception as e:
             logger.error(f"[Serper] Error during Serper API calls: {str(e)}")
             return {"success": False, "enriched": {}, "error": str(e)}
@@ -511,23 +533,30 @@ class CompanyService:
         session = None
         if hasattr(request, 'session_id') and request.session_id:
             session = get_session(request.session_id)
+        # Provider calls below share the scheduler fairly with other sessions
+        set_session(request.session_id)
         
         limit = request.limit or 10
-        if limit > 50:
-            limit = 50
+        if limit > settings.COMPANY_SEARCH_MAX_LIMIT:
+            limit = settings.COMPANY_SEARCH_MAX_LIMIT
 
         # Build query payload
         if request.search_payload:
             query_payload = {**request.search_payload}
         elif request.icp_config:
-            query_payload = self.apollo.compose_query_from_icp(request.icp_config)
+            query_payload = self.apollo.compose_query_from_icp(
+                request.icp_config, per_page=min(limit, settings.APOLLO_PER_PAGE)
+            )
         else:
             if session:
                 session.add_error("No search payload or ICP config provided")
             return self._error_response(query_payload=None, error="Provide either search_payload or icp_config")
 
+        # Budget from the ICP's stage_overrides; enrichment stages charge against it
+        session_budgets.start(request.session_id, request.icp_config, limit)
+
         # Set pagination
-        query_payload.setdefault("per_page", limit)
+        query_payload.setdefault("per_page", min(limit, settings.APOLLO_PER_PAGE))
 
         # Check API key
         if not self.apollo.api_key:
@@ -538,17 +567,48 @@ class CompanyService:
         try:
             # Log Apollo search start
             console_logger.log_apollo_start(query_payload)
-            print(f"[Companies] Starting Apollo search with {len(query_payload)} filters...")
+            print(f"[Companies] Starting Apollo search with {len(query_payload)} filters for up to {limit} companies...")
             
-            # Search companies with Apollo
-            data = await self.apollo.search_companies(query_payload)
-            rows = data.get("companies") or data.get("organizations") or []
+            # Reuse the conversation's prefetched first page if it matches this query
+            first_page = await apollo_prefetch_service.take(getattr(request, "session_id", None), query_payload)
+            if getattr(request, "session_id", None):
+                record_cache("apollo_prefetch", first_page is not None)
             
-            if not isinstance(rows, list):
-                rows = []
+            rows: List[Dict[str, Any]] = []
+            apollo_companies: List[Company] = []
+            apollo_only_companies: List[Company] = []
+            enrichment_tasks: List[asyncio.Task] = []
+            enrich = bool(self.coresignal.api_key)
+            semaphore = asyncio.Semaphore(max(1, settings.ENRICHMENT_CONCURRENCY))
+            page_stats: Dict[str, int] = {}
+            
+            try:
+                # Enrichment of each page starts while later pages are still loading
+                async for page_rows in self.apollo.iterate_company_pages(
+                    query_payload, limit, first_page=first_page, stats=page_stats
+                ):
+                    page_companies = [self.mapper.map_apollo_to_company(r) for r in page_rows]
+                    rows.extend(page_rows)
+                    apollo_companies.extend(page_companies)
+                    # Keep a copy of original Apollo data
+                    apollo_only_companies.extend(Company(**company.dict()) for company in page_companies)
+                    set_progress(companies_found=len(apollo_companies), apollo_pages_fetched=page_stats.get("pages_fetched", 0))
+                    
+                    if enrich:
+                        batch_missed = await self._pre_resolve_domains(page_companies, session)
+                        if not enrichment_tasks:
+                            console_logger.log_enrichment_start(limit)
+                        for index, company in enumerate(page_companies):
+                            enrichment_tasks.append(asyncio.create_task(
+                                self._enrich_with_limit(company, len(enrichment_tasks) + 1, limit, semaphore, session,
+                                                        name_searched=index in batch_missed)
+                            ))
+            except Exception:
+                for task in enrichment_tasks:
+                    task.cancel()
+                raise
 
-            print(f"[Companies] Apollo returned {len(rows)} companies")
-            apollo_companies = [self.mapper.map_apollo_to_company(r) for r in rows][:query_payload.get("per_page", limit)]
+            print(f"[Companies] Apollo returned {len(apollo_companies)} companies")
             
             # Log Apollo results
             console_logger.log_apollo_result(True, [c.dict() for c in apollo_companies])
@@ -557,15 +617,10 @@ class CompanyService:
             if session:
                 session.set_apollo_results(len(apollo_companies))
             
-            # Keep a copy of original Apollo data
-            apollo_only_companies = [Company(**company.dict()) for company in apollo_companies]
-            
-            # Log enrichment start
-            console_logger.log_enrichment_start(len(apollo_companies))
-            print(f"[Companies] Starting enrichment for {len(apollo_companies)} companies...")
-            
-            # Enrich companies with multi-layer enrichment
-            enriched_companies = await self._enrich_companies(apollo_companies, session)
+            # Wait for multi-layer enrichment
+            print(f"[Companies] Waiting for enrichment of {len(enrichment_tasks)} companies...")
+            enriched_companies = await asyncio.gather(*enrichment_tasks) if enrichment_tasks else apollo_companies
+            enriched_companies = list(enriched_companies)
             print(f"[Companies] Enrichment complete. Returning {len(enriched_companies)} companies")
             
             # Calculate enrichment stats
@@ -580,6 +635,11 @@ class CompanyService:
                 len(enriched_companies) - enriched_count
             )
             
+            provider_calls_skipped: Dict[str, int] = {}
+            for c in enriched_companies:
+                for provider in c.skipped_providers or []:
+                    provider_calls_skipped[provider] = provider_calls_skipped.get(provider, 0) + 1
+            
             return CompaniesResponse(
                 success=True,
                 companies=enriched_companies,
@@ -587,7 +647,9 @@ class CompanyService:
                 used_mock=False,
                 response_count=len(enriched_companies),
                 request_payload=query_payload,
-                raw_companies=rows[: query_payload.get("per_page", limit)]
+                raw_companies=rows,
+                apollo_pages_fetched=page_stats.get("pages_fetched", 0),
+                provider_calls_skipped=provider_calls_skipped
             )
 
         except Exception as e:
@@ -631,14 +693,31 @@ class CompanyService:
             return companies
             
         print(f"[CoreSignal] Enriching {len(companies)} companies...")
-        enriched = []
-        for i, company in enumerate(companies, 1):
-            console_logger.log_company_enrichment(company.name, i, len(companies))
-            enriched_company = await self._enrich_single_company(company, session)
-            enriched.append(enriched_company)
-        return enriched
+        semaphore = asyncio.Semaphore(max(1, settings.ENRICHMENT_CONCURRENCY))
+        return list(await asyncio.gather(*[
+            self._enrich_with_limit(company, i, len(companies), semaphore, session)
+            for i, company in enumerate(companies, 1)
+        ]))
+    
+    async def _enrich_with_limit(
+        self, company: Company, company_num: int, total: int, semaphore: asyncio.Semaphore, session=None,
+        name_searched: bool = False
+    ) -> Company:
+        """Enrich one company, with at most ENRICHMENT_CONCURRENCY companies in flight."""
+        async with semaphore, enrichments_in_flight.track():
+            console_logger.log_company_enrichment(company.name, company_num, total)
+            try:
+                with tracer.span(company.name or "company", kind="company", domain=company.domain):
+                    return await self._enrich_single_company(company, session, name_searched=name_searched)
+            except Exception as e:
+                print(f"[Enrichment] Unexpected error for {company.name}: {str(e)}")
+                company.enrichment_error = str(e)
+                return company
+            finally:
+                enrichments_completed.inc()
+                increment_progress("companies_enriched")
     
-    async def _enrich_single_company(self, company: Company, session=None) -> Company:
+    async def _enrich_single_company(self, company: Company, session=None, name_searched: bool = False) -> Company:
         """
         Enrich a single company using EnrichLayer, CoreSignal, Serper, and Apollo (in that order).
         For each Company field, the mapping priority is:
@@ -649,6 +728,10 @@ class CompanyService:
         Each field is mapped from the most reliable/complete source available.
         Logging and comments clarify which source provided each mapped field.
         No schema changes are made to the Company model.
+        
+        name_searched: the page's batch domain lookup already tried (and
+        counted) this company without a match, so domain discovery skips the
+        name search and the attempt is not counted again.
         """
         import logging
 
@@ -657,6 +740,12 @@ class CompanyService:
         except Exception:
             safe_company_name = "Unknown"
 
+        # Stage outputs already paid for in this session (a resumed run) are reused
+        checkpoints = checkpoint_store.for_company(getattr(session, 'session_id', None), company)
+        finished = checkpoints.load("final")
+        if finished is not None:
+            return Company(**finished)
+
         apollo_company = Company(**company.dict())
         logger = logging.getLogger("company_enrichment")
         logger.info(f"\n=== [Enrichment] Processing Company: {safe_company_name} ===")
@@ -668,6 +757,12 @@ class CompanyService:
             logger.info(f"[Enrichment] Apollo LinkedIn URL: {linkedin}")
         logger.info(f"[Enrichment] Apollo location: {company.headquarters or company.location or 'Not provided'}")
 
+        # Providers skipped because their circuit breaker is open
+        degraded_providers: List[str] = []
+        # Tracks what is still missing so stages that cannot add anything are skipped
+        plan = EnrichmentPlan(company)
+        budget = session_budgets.get(session.session_id) if session else None
+
         # 1. EnrichLayer enrichment (highest priority)
         from ..core.console_logger import console_logger
         enrichlayer_success = False
@@ -675,35 +770,50 @@ class CompanyService:
         enrich_input = None
         try:
             linkedin_url = company.company_linkedin_url or company.linkedin_url
-            if linkedin_url:
+            enrich_result = checkpoints.load("enrichlayer")
+            if enrich_result is not None:
+                logger.info(f"[EnrichLayer] RESUMED: {safe_company_name} from checkpoint")
+            elif not plan.needs("enrichlayer"):
+                console_logger.log_enrichlayer_result(safe_company_name, False)
+            elif provider_breakers.is_open("enrichlayer"):
+                degraded_providers.append("enrichlayer")
+                logger.warning(f"[EnrichLayer] SKIP: circuit breaker open, not calling EnrichLayer")
+                console_logger.log_enrichlayer_result(safe_company_name, False)
+            elif linkedin_url:
                 enrich_input = {"url": linkedin_url}
-                enrich_result = await self.enrich_layer.enrich_company(enrich_input)
+                with _stage("enrichlayer"), request_coalescer.tally() as calls:
+                    enrich_result = await self.enrich_layer.enrich_company(enrich_input)
                 if enrich_result and enrich_result.get("success", True):
-                    enrichlayer_success = True
                     logger.info(f"[EnrichLayer] SUCCESS: Enriched {safe_company_name} with EnrichLayer")
-                    
-                    # Track EnrichLayer API call
-                    if session and hasattr(session, 'session_id'):
-                        try:
-                            track_api_call(
-                                session_id=session.session_id,
-                                api_name="EnrichLayer",
-                                endpoint="company",
-                                call_type="enrichlayer_company",
-                                calls_made=1,
-                                success=True
-                            )
-                        except Exception as e:
-                            logger.error(f"[Cost Tracking] Error tracking EnrichLayer call: {e}")
-                    
-                    # Log to console with details
-                    console_logger.log_enrichlayer_result(safe_company_name, True, enrich_result)
+                    # Checkpoint, then track the EnrichLayer API call (unless it joined another caller's)
+                    checkpoints.save("enrichlayer", enrich_result, cost={
+                        "api_name": "EnrichLayer", "endpoint": "company", "call_type": "enrichlayer_company", "calls_made": 1,
+                    } if not calls.coalesced else None)
                 else:
                     logger.warning(f"[EnrichLayer] ERROR: {enrich_result.get('error', 'Unknown error from EnrichLayer')}")
                     console_logger.log_enrichlayer_result(safe_company_name, False)
             else:
                 logger.warning(f"[EnrichLayer] SKIP: No LinkedIn/company URL available for EnrichLayer enrichment.")
                 console_logger.log_enrichlayer_result(safe_company_name, False)
+
+            if enrich_result and enrich_result.get("success", True):
+                enrichlayer_success = True
+                hq_city = (enrich_result.get("hq") or {}).get("city")
+                plan.add_filled({
+                    "name": enrich_result.get("name"),
+                    "description": enrich_result.get("description"),
+                    "domain": enrich_result.get("website"),
+                    "industry": enrich_result.get("industry"),
+                    "founded_year": enrich_result.get("founded_year"),
+                    "headquarters": hq_city,
+                    "location": hq_city,
+                    "company_linkedin_url": linkedin_url,
+                    "linkedin_url": linkedin_url,
+                    "employee_count": enrich_result.get("company_size_on_linkedin"),
+                    "specialities": enrich_result.get("specialities"),
+                })
+                # Log to console with details
+                console_logger.log_enrichlayer_result(safe_company_name, True, enrich_result)
         except Exception as e:
             logger.error(f"[EnrichLayer] EXCEPTION: {str(e)}")
             console_logger.log_enrichlayer_result(safe_company_name, False)
@@ -716,15 +826,28 @@ class CompanyService:
         original_domain = company.domain
         enriched_coresignal_company = None
         try:
-            if not self.coresignal.api_key:
+            resumed = checkpoints.load("coresignal")
+            if resumed is not None:
+                company = Company(**resumed["company"])
+                coresignal_data = resumed["coresignal_data"]
+                domain_source = resumed.get("domain_source") or ""
+                logger.info(f"[CoreSignal] RESUMED: {safe_company_name} from checkpoint")
+            elif not self.coresignal.api_key:
                 logger.warning(f"[CoreSignal] SKIP: {safe_company_name} - API key not configured")
+            elif not plan.needs("coresignal"):
+                console_logger.log_coresignal_result(safe_company_name, False)
+            elif provider_breakers.is_open("coresignal"):
+                degraded_providers.append("coresignal")
+                logger.warning(f"[CoreSignal] SKIP: {safe_company_name} - circuit breaker open")
+                console_logger.log_coresignal_result(safe_company_name, False)
             else:
                 # Try to find domain if missing
                 if not company.domain:
                     logger.info(f"[CoreSignal] DISCOVERY: No domain found for {safe_company_name}, attempting domain discovery...")
-                    if session:
+                    if session and not name_searched:
                         session.increment_domain_enrichment_attempt()
-                    company = await self._find_missing_domain(company, session)
+                    with _stage("domain_discovery"):
+                        company = await self._find_missing_domain(company, session, name_search=not name_searched)
                     if company.domain and not original_domain:
                         if hasattr(company, 'coresignal_data') and company.coresignal_data:
                             domain_source = company.coresignal_data.get('domain_source', '')
@@ -735,50 +858,50 @@ class CompanyService:
                     logger.info(f"[CoreSignal] USING APOLLO DOMAIN: {company.domain}")
                     if not hasattr(company, 'coresignal_data') or company.coresignal_data is None:
                         company.coresignal_data = {}
-                    company.coresignal_data['domain_source'] = 'apollo_original'
-                    domain_source = 'apollo_original'
+                    # Keep the source if the domain was pre-resolved for this page
+                    company.coresignal_data.setdefault('domain_source', 'apollo_original')
+                    domain_source = company.coresignal_data['domain_source']
 
                 if not company.domain:
                     logger.warning(f"[CoreSignal] SKIP: {safe_company_name} - no domain available after discovery attempts")
                     console_logger.log_coresignal_result(safe_company_name, False)
                 else:
                     logger.info(f"[CoreSignal] ENRICHING: {safe_company_name} with domain: {company.domain}")
-                    coresignal_data = await self.coresignal.enrich_by_domain(company.domain)
+                    with _stage("coresignal"), request_coalescer.tally() as calls:
+                        coresignal_data = await self.coresignal.enrich_by_domain(company.domain)
                     if coresignal_data:
-                        enriched_coresignal_company = self.mapper.apply_coresignal_enrichment(company, coresignal_data)
-                        
-                        # Track CoreSignal API call
-                        if session and hasattr(session, 'session_id'):
-                            try:
-                                track_api_call(
-                                    session_id=session.session_id,
-                                    api_name="CoreSignal",
-                                    endpoint="company_clean/enrich",
-                                    call_type="coresignal_enrich",
-                                    calls_made=1,
-                                    success=True
-                                )
-                            except Exception as e:
-                                logger.error(f"[Cost Tracking] Error tracking CoreSignal call: {e}")
-                        
-                        if not hasattr(enriched_coresignal_company, 'coresignal_data') or enriched_coresignal_company.coresignal_data is None:
-                            enriched_coresignal_company.coresignal_data = {}
-                        if domain_source:
-                            enriched_coresignal_company.coresignal_data['domain_source'] = domain_source
-                        if session:
-                            session.increment_coresignal_enriched()
-                        logger.info(f"[CoreSignal] SUCCESS: Successfully enriched {safe_company_name}")
-                        logger.info(f"[CoreSignal] DATA: Enhanced with {len(coresignal_data)} fields")
-                        coresignal_success = True
-                        # Log to console with details
-                        domain_found = bool(company.domain and not original_domain)
-                        console_logger.log_coresignal_result(safe_company_name, True, domain_found, domain_source, coresignal_data)
+                        # Checkpoint (with the discovered domain), then track the CoreSignal API call
+                        checkpoints.save(
+                            "coresignal",
+                            {"company": company.dict(), "coresignal_data": coresignal_data, "domain_source": domain_source},
+                            cost={
+                                "api_name": "CoreSignal", "endpoint": "company_clean/enrich",
+                                "call_type": "coresignal_enrich", "calls_made": 1,
+                            } if not calls.coalesced else None,
+                        )
                     else:
                         logger.warning(f"[CoreSignal] NO DATA: No enrichment data returned for {safe_company_name}")
                         console_logger.log_coresignal_result(safe_company_name, False)
+
+            if coresignal_data:
+                enriched_coresignal_company = self.mapper.apply_coresignal_enrichment(company, coresignal_data)
+                if not hasattr(enriched_coresignal_company, 'coresignal_data') or enriched_coresignal_company.coresignal_data is None:
+                    enriched_coresignal_company.coresignal_data = {}
+                if domain_source:
+                    enriched_coresignal_company.coresignal_data['domain_source'] = domain_source
+                if session:
+                    session.increment_coresignal_enriched()
+                logger.info(f"[CoreSignal] SUCCESS: Successfully enriched {safe_company_name}")
+                logger.info(f"[CoreSignal] DATA: Enhanced with {len(coresignal_data)} fields")
+                coresignal_success = True
+                # Log to console with details
+                domain_found = bool(company.domain and not original_domain)
+                console_logger.log_coresignal_result(safe_company_name, True, domain_found, domain_source, coresignal_data)
         except Exception as e:
             logger.error(f"[CoreSignal] ERROR: Enrichment failed for {safe_company_name}: {str(e)}")
             console_logger.log_coresignal_result(safe_company_name, False)
+        # Includes a domain found by discovery even when enrichment returned nothing
+        plan.add_company(enriched_coresignal_company if coresignal_success else company)
 
         
 
@@ -787,39 +910,49 @@ class CompanyService:
         serper_field_results = {}
         try:
             # Identify missing fields that are mapped to Serper endpoints
+            resumed = checkpoints.load("serper")
             missing_fields = []
             for field, endpoint in self.SERPER_FIELD_ENDPOINT_MAP.items():
                 if endpoint and getattr(company, field, None) in (None, [], ""):
                     missing_fields.append(field)
-            if missing_fields:
+            if resumed is not None:
+                missing_fields = []
+            elif missing_fields and not plan.needs("serper"):
+                missing_fields = []
+            elif settings.ENRICHMENT_PLANNER_ENABLED:
+                # Only ask Serper for fields EnrichLayer/CoreSignal did not already fill
+                missing_fields = [f for f in missing_fields if f in plan.missing]
+            serper_cost = API_COSTS["serper_search"] * len({self.SERPER_FIELD_ENDPOINT_MAP[f] for f in missing_fields})
+            if resumed is not None:
+                serper_field_results = resumed
+                serper_success = True
+                logger.info(f"[Serper] RESUMED: {safe_company_name} from checkpoint")
+                console_logger.log_serper_result(safe_company_name, serper_field_results)
+            elif missing_fields and provider_breakers.is_open("serper"):
+                degraded_providers.append("serper")
+                logger.warning(f"[Serper] SKIP: circuit breaker open")
+                console_logger.log_serper_result(safe_company_name, None)
+            elif missing_fields and budget and not budget.allows("serper", "research", serper_cost):
+                logger.warning(f"[Serper] SKIP: research budget exhausted")
+                console_logger.log_serper_result(safe_company_name, None)
+            elif missing_fields:
                 logger.info(f"[Serper] Attempting per-field enrichment for: {missing_fields}")
-                serper_result = await self.enrich_fields_with_serper(company.name, missing_fields)
+                with _stage("serper"), request_coalescer.tally() as calls:
+                    serper_result = await self.enrich_fields_with_serper(company.name, missing_fields)
                 if serper_result.get("success"):
                     serper_field_results = serper_result.get("enriched", {})
                     serper_success = True
                     
-                    # Track Serper API calls
-                    if session and hasattr(session, 'session_id'):
-                        try:
-                            # Count actual Serper calls made (search, news, location)
-                            serper_calls = 0
-                            if missing_fields:  # Only track if we actually called Serper
-                                # This was determined earlier in the code
-                                needs_search = any(self.SERPER_FIELD_ENDPOINT_MAP.get(f) == "search" for f in missing_fields)
-                                needs_news = any(self.SERPER_FIELD_ENDPOINT_MAP.get(f) == "news" for f in missing_fields)
-                                needs_location = any(self.SERPER_FIELD_ENDPOINT_MAP.get(f) == "location" for f in missing_fields)
-                                serper_calls = sum([needs_search, needs_news, needs_location])
-                                
-                                track_api_call(
-                                    session_id=session.session_id,
-                                    api_name="Serper",
-                                    endpoint="search",
-                                    call_type="serper_search",
-                                    calls_made=serper_calls,
-                                    success=True
-                                )
-                        except Exception as e:
-                            logger.error(f"[Cost Tracking] Error tracking Serper call: {e}")
+                    # Count actual Serper calls made (search, news, location), less those that joined another caller's
+                    needs_search = any(self.SERPER_FIELD_ENDPOINT_MAP.get(f) == "search" for f in missing_fields)
+                    needs_news = any(self.SERPER_FIELD_ENDPOINT_MAP.get(f) == "news" for f in missing_fields)
+                    needs_location = any(self.SERPER_FIELD_ENDPOINT_MAP.get(f) == "location" for f in missing_fields)
+                    serper_calls = max(0, sum([needs_search, needs_news, needs_location]) - calls.coalesced)
+                    
+                    # Checkpoint, then track the Serper API calls
+                    checkpoints.save("serper", serper_field_results, cost={
+                        "api_name": "Serper", "endpoint": "search", "call_type": "serper_search", "calls_made": serper_calls,
+                    } if serper_calls else None)
                     
                     # Log to console with details
                     console_logger.log_serper_result(safe_company_name, serper_field_results)
@@ -861,7 +994,7 @@ class CompanyService:
                 (company.description, "Apollo"),
                 field_name="description"),
             domain=pick_field(
-                ((enrich_result.get("website") or "").replace("https://", "").replace("http://", "").strip("/") if enrichlayer_success else None, "EnrichLayer"),
+                (((enrich_result.get("website") or "").replace("https://", "").replace("http://", "").strip("/") or None) if enrichlayer_success else None, "EnrichLayer"),
                 (getattr(enriched_coresignal_company, "domain", None) if coresignal_success else None, "CoreSignal"),
                 (serper_field_results.get("domain"), "Serper"),
                 (company.domain, "Apollo"),
@@ -1027,26 +1160,32 @@ class CompanyService:
 
         # 5. Hunter.io enrichment (contacts only, always applied if available)
         try:
-            if mapped_company.domain:
+            hunterio_result = checkpoints.load("hunter")
+            if hunterio_result is not None:
+                logger.info(f"[Hunter.io] RESUMED: {safe_company_name} from checkpoint")
+                mapped_company = self.mapper.apply_hunterio_enrichment(mapped_company, hunterio_result)
+                hunter_data = hunterio_result.get("data", {})
+                console_logger.log_hunterio_result(
+                    safe_company_name, True, len(hunter_data.get("emails", [])), hunter_data.get("pattern"), hunterio_result
+                )
+            elif mapped_company.domain and not plan.needs("hunter"):
+                console_logger.log_hunterio_result(safe_company_name, False)
+            elif mapped_company.domain and provider_breakers.is_open("hunter"):
+                degraded_providers.append("hunter")
+                logger.warning(f"[Hunter.io] SKIP: circuit breaker open")
+                console_logger.log_hunterio_result(safe_company_name, False)
+            elif mapped_company.domain:
                 logger.info(f"[Hunter.io] Attempting domain search for {mapped_company.domain}")
-                hunterio_result = self.hunterio.domain_search(mapped_company.domain)
+                with _stage("hunter"), request_coalescer.tally() as calls:
+                    hunterio_result = await self.hunterio.domain_search(mapped_company.domain)
                 logger.info(f"[Hunter.io] Response: {hunterio_result}")
                 if hunterio_result and hunterio_result.get("data", {}).get("emails"):
                     mapped_company = self.mapper.apply_hunterio_enrichment(mapped_company, hunterio_result)
                     
-                    # Track Hunter.io API call
-                    if session and hasattr(session, 'session_id'):
-                        try:
-                            track_api_call(
-                                session_id=session.session_id,
-                                api_name="Hunter",
-                                endpoint="domain-search",
-                                call_type="hunter_domain_search",
-                                calls_made=1,
-                                success=True
-                            )
-                        except Exception as e:
-                            logger.error(f"[Cost Tracking] Error tracking Hunter.io call: {e}")
+                    # Checkpoint, then track the Hunter.io API call
+                    checkpoints.save("hunter", hunterio_result, cost={
+                        "api_name": "Hunter", "endpoint": "domain-search", "call_type": "hunter_domain_search", "calls_made": 1,
+                    } if not calls.coalesced else None)
                     
                     logger.info(f"[Hunter.io] SUCCESS: Enriched {safe_company_name} with Hunter.io")
                     journey_logger.log_company_enrichment(
@@ -1077,16 +1216,28 @@ class CompanyService:
             console_logger.log_hunterio_result(safe_company_name, False)
 
         # 7. Agent 3: Research Agent - Fill remaining N/A fields
-        try:
-            from .research_agent_service import ResearchAgentService
-            research_agent = ResearchAgentService()
+        plan.add_company(mapped_company)
+        # Admitted on roughly one Serper query per researched field, billed per query sent
+        research_cost = API_COSTS["serper_search"] * len(plan.useful_fields("research_agent"))
+        if plan.needs("research_agent") and (not budget or budget.allows("research_agent", "research", research_cost)):
+            with request_coalescer.tally() as calls:
+                try:
+                    from .research_agent_service import ResearchAgentService
+                    research_agent = ResearchAgentService()
 
-            print(f"[Enrichment] Starting Agent 3 (Research Agent) for {safe_company_name}")
-            mapped_company = await research_agent.research_company(mapped_company)
-            print(f"[Enrichment] Agent 3 (Research Agent) complete for {safe_company_name}")
-        except Exception as e:
-            print(f"[Enrichment] Agent 3 (Research Agent) exception: {str(e)}")
+                    print(f"[Enrichment] Starting Agent 3 (Research Agent) for {safe_company_name}")
+                    with _stage("research"):
+                        mapped_company = await research_agent.research_company(mapped_company)
+                    print(f"[Enrichment] Agent 3 (Research Agent) complete for {safe_company_name}")
+                except Exception as e:
+                    print(f"[Enrichment] Agent 3 (Research Agent) exception: {str(e)}")
+            self._track_calls(session, "Serper", "search", "serper_search", calls.count("serper"))
 
+        if degraded_providers:
+            mapped_company.degraded_providers = degraded_providers
+        if plan.skipped:
+            mapped_company.skipped_providers = plan.skipped
+        checkpoints.save("final", mapped_company.dict())
         return mapped_company
 
     async def _enrich_with_serper(self, company: Company) -> Optional[Company]:
@@ -1106,7 +1257,7 @@ class CompanyService:
             query += f" {company.headquarters}"
 
         # 1. Search for main company info
-        search_result = self.serper.search(query)
+        search_result = await self.serper.search(query)
         logger.info(f"[Serper] Search result for '{query}': {search_result}")
 
         website = None
@@ -1157,7 +1308,7 @@ class CompanyService:
 
         # 2. Get recent news
         recent_news = []
-        news_result = self.serper.news(company.name)
+        news_result = await self.serper.news(company.name)
         logger.info(f"[Serper] News result for '{company.name}': {news_result}")
         if news_result and "news" in news_result:
             for news_item in news_result["news"]:
@@ -1211,7 +1362,7 @@ class CompanyService:
                 print(f"[Hunter.io] Attempting domain search for {company.domain}")
                 import logging
                 logger = logging.getLogger("hunterio_enrichment")
-                hunterio_result = self.hunterio.domain_search(company.domain)
+                hunterio_result = await self.hunterio.domain_search(company.domain)
                 logger.info(f"[Hunter.io] Called for domain: {company.domain}")
                 logger.info(f"[Hunter.io] Response: {hunterio_result}")
                 print(f"[Hunter.io] Response: {hunterio_result}")
@@ -1249,8 +1400,17 @@ class CompanyService:
             )
         return company
     
-    async def _find_missing_domain(self, company: Company, session=None) -> Company:
-        """Find domain for company using LinkedIn URL or name search."""
+    async def _find_missing_domain(self, company: Company, session=None, name_search: bool = True) -> Company:
+        """
+        Find domain for company using LinkedIn URL or name search.
+        
+        Strategies, cheapest first: LinkedIn slug collect, LinkedIn URL search
+        (ES DSL), company name search (skipped with name_search=False, e.g. when
+        the batch lookup already searched the name). Sequentially, each one waits for the
+        previous to fail. In hedged mode (DOMAIN_DISCOVERY_HEDGED) the next
+        strategy also starts after DOMAIN_DISCOVERY_HEDGE_DELAY_SECONDS; the
+        first validated domain wins and the remaining calls are cancelled.
+        """
         # Safely log company name
         try:
             safe_company_name = str(company.name).encode('ascii', 'replace').decode('ascii') if company.name else "Unknown"
@@ -1259,167 +1419,251 @@ class CompanyService:
             
         print(f"\n--- [Domain Discovery] Starting for {safe_company_name} ---")
         
-        # Strategy 1: Try LinkedIn slug lookup first
         linkedin_url = company.company_linkedin_url or company.linkedin_url
+        strategies = []
         if linkedin_url:
-            print(f"\n[Domain Discovery] ===== STRATEGY 1: LinkedIn Slug Lookup =====")
-            print(f"[Domain Discovery] LinkedIn URL: {linkedin_url}")
-            try:
-                # Extract slug from LinkedIn URL
-                slug = self._extract_linkedin_slug(linkedin_url)
-                if slug:
-                    print(f"[Domain Discovery] ✅ Extracted slug: {slug}")
-                    print(f"[Domain Discovery] 🔍 Calling CoreSignal collect endpoint...")
-                    data = await self.coresignal.collect_by_slug(slug)
-                    if data:
-                        print(f"[Domain Discovery] ✅ CoreSignal returned data: {len(data)} fields")
-                        
-                        # Try multiple website field names that CoreSignal might return
-                        website = (data.get("websites_main") or 
-                                 data.get("websites_resolved") or 
-                                 data.get("unique_website") or 
-                                 data.get("unique_domain"))
-                        
-                        print(f"[Domain Discovery] 🔍 Checking for website fields:")
-                        print(f"[Domain Discovery]   - websites_main: {data.get('websites_main', 'NOT FOUND')}")
-                        print(f"[Domain Discovery]   - websites_resolved: {data.get('websites_resolved', 'NOT FOUND')}")
-                        print(f"[Domain Discovery]   - unique_website: {data.get('unique_website', 'NOT FOUND')}")
-                        print(f"[Domain Discovery]   - unique_domain: {data.get('unique_domain', 'NOT FOUND')}")
-                        
-                        if website:
-                            found_domain = self._clean_domain(website)
-                            print(f"[Domain Discovery] ✅ Found website: {website} -> cleaned to: {found_domain}")
-                            company.domain = found_domain
-                            
-                            print(f"[Domain Discovery] 🔄 Applying CoreSignal enrichment...")
-                            # Apply CoreSignal enrichment data immediately
-                            enriched_company = self.mapper.apply_coresignal_enrichment(company, data)
-                            enriched_company.coresignal_data = enriched_company.coresignal_data or {}
-                            enriched_company.coresignal_data["domain_source"] = "linkedin_slug_lookup"
-                            
-                            if session:
-                                session.increment_domain_enrichment_success()
-                                session.increment_coresignal_enriched()
-                            
-                            print(f"[Domain Discovery] 🎉 SUCCESS via LinkedIn slug: {found_domain}")
-                            print(f"[Domain Discovery] 📊 Company enriched with {len(data)} CoreSignal fields")
-                            print(f"[Domain Discovery] 🏷️  Domain source: linkedin_slug_lookup")
-                            print(f"[Domain Discovery] ===== STRATEGY 1 COMPLETED SUCCESSFULLY =====")
-                            return enriched_company
-                        else:
-                            print(f"[Domain Discovery] ❌ No website field found in CoreSignal response")
-                            if data:
-                                available_fields = list(data.keys()) if isinstance(data, dict) else []
-                                print(f"[Domain Discovery] 📋 Available fields: {available_fields[:10]}...")
-                    else:
-                        print(f"[Domain Discovery] ❌ CoreSignal collect returned no data")
-                else:
-                    print(f"[Domain Discovery] ❌ Could not extract slug from LinkedIn URL")
-            except Exception as e:
-                print(f"[Domain Discovery] ❌ LinkedIn slug lookup failed: {str(e)}")
+            strategies.append(("linkedin_slug_lookup", lambda: self._discover_domain_by_linkedin_slug(linkedin_url)))
+            strategies.append(("linkedin_url_search", lambda: self._discover_domain_by_linkedin_url(linkedin_url)))
         else:
-            print(f"[Domain Discovery] ⏭️  Skipping LinkedIn strategy - no LinkedIn URL provided")
-        
-        # Strategy 2: Try direct LinkedIn URL search
-        if linkedin_url:
-            print(f"\n[Domain Discovery] ===== STRATEGY 2: Direct LinkedIn URL Search =====")
-            print(f"[Domain Discovery] LinkedIn URL: {linkedin_url}")
-            try:
-                print(f"[Domain Discovery] 🔍 Calling CoreSignal ES DSL search endpoint...")
-                search_result = await self.coresignal.search_by_linkedin_url(linkedin_url)
-                if search_result and search_result.get("website"):
-                    found_domain = self._clean_domain(search_result["website"])
-                    print(f"[Domain Discovery] ✅ Found website: {search_result['website']} -> cleaned to: {found_domain}")
-                    company.domain = found_domain
-                    
-                    print(f"[Domain Discovery] 🔄 Applying CoreSignal enrichment...")
-                    # Apply CoreSignal enrichment data immediately
-                    enriched_company = self.mapper.apply_coresignal_enrichment(company, search_result)
-                    enriched_company.coresignal_data = enriched_company.coresignal_data or {}
-                    enriched_company.coresignal_data["domain_source"] = "linkedin_url_search"
-                    
-                    if session:
-                        session.increment_domain_enrichment_success()
-                        session.increment_coresignal_enriched()
-                    
-                    print(f"[Domain Discovery] 🎉 SUCCESS via LinkedIn URL search: {found_domain}")
-                    print(f"[Domain Discovery] 📊 Company enriched with CoreSignal data")
-                    print(f"[Domain Discovery] 🏷️  Domain source: linkedin_url_search")
-                    
-                    # Log match details
-                    matched_name = search_result.get("name", "N/A")
-                    print(f"[Domain Discovery] 🏢 Matched company: {matched_name}")
-                    print(f"[Domain Discovery] ===== STRATEGY 2 COMPLETED SUCCESSFULLY =====")
-                    return enriched_company
-                else:
-                    print(f"[Domain Discovery] ❌ LinkedIn URL search returned no website field")
-                    if search_result:
-                        available_fields = list(search_result.keys()) if isinstance(search_result, dict) else []
-                        print(f"[Domain Discovery] 📋 Available fields: {available_fields}")
-                    else:
-                        print(f"[Domain Discovery] ❌ No search results returned")
-            except Exception as e:
-                print(f"[Domain Discovery] ❌ LinkedIn URL search failed: {str(e)}")
+            print(f"[Domain Discovery] ⏭️  Skipping LinkedIn strategies - no LinkedIn URL provided")
+        if name_search:
+            strategies.append(("company_name_search", lambda: self._discover_domain_by_name(company)))
         else:
-            print(f"[Domain Discovery] ⏭️  Skipping LinkedIn URL search - no LinkedIn URL provided")
+            print(f"[Domain Discovery] ⏭️  Skipping name search - already tried by the batch lookup")
         
-        # Strategy 3: Try company name search
-        print(f"\n[Domain Discovery] ===== STRATEGY 3: Company Name Search =====")
-        location = company.headquarters or company.location
-        search_query = f"'{company.name}'"
-        if location:
-            search_query += f" in '{location}'"
-        print(f"[Domain Discovery] 🔍 Search query: {search_query}")
-        print(f"[Domain Discovery] 📍 Location: {location or 'Not provided'}")
-        
-        try:
-            print(f"[Domain Discovery] 🔍 Calling CoreSignal name search endpoint...")
-            search_result = await self.coresignal.search_by_name(company.name, location)
-            if search_result and search_result.get("website"):
-                found_domain = self._clean_domain(search_result["website"])
-                print(f"[Domain Discovery] ✅ Found website: {search_result['website']} -> cleaned to: {found_domain}")
-                company.domain = found_domain
-                
-                print(f"[Domain Discovery] 🔄 Applying CoreSignal enrichment...")
-                # Apply CoreSignal enrichment data immediately
-                enriched_company = self.mapper.apply_coresignal_enrichment(company, search_result)
-                enriched_company.coresignal_data = enriched_company.coresignal_data or {}
-                enriched_company.coresignal_data["domain_source"] = "company_name_search"
-                
-                if session:
-                    session.increment_domain_enrichment_success()
-                    session.increment_coresignal_enriched()
-                
-                print(f"[Domain Discovery] 🎉 SUCCESS via name search: {found_domain}")
-                print(f"[Domain Discovery] 📊 Company enriched with CoreSignal data")
-                print(f"[Domain Discovery] 🏷️  Domain source: company_name_search")
-                
-                # Log match details
-                matched_name = search_result.get("name", "N/A")
-                print(f"[Domain Discovery] 🏢 Matched company: {matched_name}")
-                print(f"[Domain Discovery] ===== STRATEGY 3 COMPLETED SUCCESSFULLY =====")
-                return enriched_company
+        with request_coalescer.tally() as calls:
+            if settings.DOMAIN_DISCOVERY_HEDGED and len(strategies) > 1:
+                found = await self._race_domain_strategies(strategies, settings.DOMAIN_DISCOVERY_HEDGE_DELAY_SECONDS)
             else:
-                print(f"[Domain Discovery] ❌ Name search returned no website field")
-                if search_result:
-                    available_fields = list(search_result.keys()) if isinstance(search_result, dict) else []
-                    print(f"[Domain Discovery] 📋 Available fields: {available_fields}")
-                else:
-                    print(f"[Domain Discovery] ❌ No search results returned")
-        except Exception as e:
-            print(f"[Domain Discovery] ❌ Name search failed: {str(e)}")
+                found = None
+                for source, strategy in strategies:
+                    found = await self._run_domain_strategy(source, strategy)
+                    if found:
+                        break
+        self._track_coresignal_calls(session, calls)
         
+        if found:
+            source, data, website = found
+            return self._apply_discovered_domain(company, data, website, source, session)
         
         print(f"\n[Domain Discovery] ===== ALL STRATEGIES FAILED =====")
         print(f"[Domain Discovery] ❌ Could not find domain for {safe_company_name}")
         print(f"[Domain Discovery] 📊 Attempted strategies summary:")
         print(f"[Domain Discovery]   1️⃣  LinkedIn slug lookup: {'✅ Available' if linkedin_url else '❌ Not provided'}")
         print(f"[Domain Discovery]   2️⃣  LinkedIn URL search: {'✅ Available' if linkedin_url else '❌ Not provided'}")
-        print(f"[Domain Discovery]   3️⃣  Company name search: ✅ Attempted")
+        print(f"[Domain Discovery]   3️⃣  Company name search: {'✅ Attempted' if name_search else '⏭️  Batch lookup'}")
         print(f"[Domain Discovery] ===== DOMAIN DISCOVERY COMPLETE - NO DOMAIN FOUND =====")
         print(f"--- [Domain Discovery] Complete ---\n")
         return company
     
+    async def _pre_resolve_domains(self, companies: List[Company], session=None) -> Set[int]:
+        """
+        Resolve domains for every domain-less company of a page with one batched
+        CoreSignal ES DSL query, before per-company enrichment starts. Matched
+        companies are replaced in the list; the rest go through
+        _find_missing_domain, without repeating the name search.
+        
+        Each company searched counts as one domain enrichment attempt here.
+        
+        Returns:
+            Positions in `companies` that were searched without a match
+        """
+        if not settings.CORESIGNAL_BATCH_RESOLVE:
+            return set()
+        missing = [i for i, c in enumerate(companies) if not c.domain]
+        if len(missing) < 2:
+            # A single company gains nothing from batching
+            return set()
+        
+        print(f"[Domain Discovery] Batch resolving {len(missing)} companies without a domain...")
+        with request_coalescer.tally() as calls:
+            matches = await self.coresignal.resolve_companies_batch([
+                {
+                    "name": c.name,
+                    "linkedin_url": c.company_linkedin_url or c.linkedin_url,
+                    "location": c.headquarters or c.location,
+                }
+                for c in (companies[i] for i in missing)
+            ])
+        self._track_coresignal_calls(session, calls)
+        
+        missed = set()
+        for index, match in zip(missing, matches):
+            company = companies[index]
+            if session:
+                session.increment_domain_enrichment_attempt()
+            if not match or not self._is_valid_domain(self._clean_domain(match["website"])):
+                missed.add(index)
+                continue
+            print(f"[Domain Discovery] Batch match for {company.name}: {match['website']} "
+                  f"(by {match['matched_by']}, confidence {match['confidence']:.2f})")
+            enriched = self._apply_discovered_domain(company, match["data"], match["website"], "batch_es_dsl_search", session)
+            enriched.coresignal_data["domain_confidence"] = match["confidence"]
+            companies[index] = enriched
+        return missed
+    
+    def _track_calls(self, session, api_name: str, endpoint: str, call_type: str, calls_made: int) -> None:
+        """Record paid calls (also charges the session budget); nothing to record without a session."""
+        session_id = getattr(session, "session_id", None)
+        if not session_id or not calls_made:
+            return
+        try:
+            track_api_call(session_id=session_id, api_name=api_name, endpoint=endpoint,
+                           call_type=call_type, calls_made=calls_made, success=True)
+        except Exception as e:
+            print(f"[Cost Tracking] Error tracking {api_name} call: {e}")
+    
+    def _track_coresignal_calls(self, session, calls) -> None:
+        """Bill the CoreSignal searches (name, ES DSL) and slug collects counted in `calls`."""
+        if not calls.sent:
+            return
+        searches = (calls.count("coresignal", endpoint_label(self.coresignal.search_url))
+                    + calls.count("coresignal", endpoint_label(self.coresignal.es_dsl_url)))
+        self._track_calls(session, "CoreSignal", "search", "coresignal_search", searches)
+        self._track_calls(session, "CoreSignal", "collect", "coresignal_enrich",
+                          calls.count("coresignal", endpoint_label(self.coresignal.collect_url)))
+    
+    async def _run_domain_strategy(self, source: str, strategy) -> Optional[tuple]:
+        """
+        Run one discovery strategy.
+        
+        Returns:
+            (source, coresignal_data, website) if it produced a valid domain, else None
+        """
+        try:
+            result = await strategy()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"[Domain Discovery] ❌ {source} failed: {str(e)}")
+            return None
+        
+        if not result:
+            return None
+        data, website = result
+        if not self._is_valid_domain(self._clean_domain(website)):
+            print(f"[Domain Discovery] ❌ {source} returned an invalid website: {website}")
+            return None
+        return source, data, website
+    
+    async def _race_domain_strategies(self, strategies: List[tuple], delay: float) -> Optional[tuple]:
+        """
+        Hedged discovery: start strategies in order, each one `delay` seconds
+        after the previous (or immediately when everything running has failed).
+        The first valid result wins and the other calls are cancelled.
+        """
+        pending = set()
+        next_index = 0
+        
+        def start_next():
+            nonlocal next_index
+            source, strategy = strategies[next_index]
+            next_index += 1
+            print(f"[Domain Discovery] 🏁 Starting {source}")
+            pending.add(asyncio.create_task(self._run_domain_strategy(source, strategy)))
+        
+        start_next()
+        try:
+            while pending:
+                timeout = delay if next_index < len(strategies) else None
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    # Hedge: the running strategies are slow, start the next one as well
+                    start_next()
+                    continue
+                
+                pending.difference_update(done)
+                for task in done:
+                    found = task.result()
+                    if found:
+                        if pending:
+                            print(f"[Domain Discovery] ✂️  {found[0]} won, cancelling {len(pending)} slower strategies")
+                        return found
+                
+                if next_index < len(strategies):
+                    start_next()
+            return None
+        finally:
+            for task in pending:
+                task.cancel()
+    
+    def _apply_discovered_domain(self, company: Company, data: Dict[str, Any], website: str, source: str, session=None) -> Company:
+        """Set the discovered domain and apply the CoreSignal data that came with it."""
+        found_domain = self._clean_domain(website)
+        print(f"[Domain Discovery] ✅ Found website: {website} -> cleaned to: {found_domain}")
+        company.domain = found_domain
+        
+        print(f"[Domain Discovery] 🔄 Applying CoreSignal enrichment...")
+        # Apply CoreSignal enrichment data immediately
+        enriched_company = self.mapper.apply_coresignal_enrichment(company, data)
+        enriched_company.coresignal_data = enriched_company.coresignal_data or {}
+        enriched_company.coresignal_data["domain_source"] = source
+        
+        if session:
+            session.increment_domain_enrichment_success()
+            session.increment_coresignal_enriched()
+        
+        print(f"[Domain Discovery] 🎉 SUCCESS via {source}: {found_domain}")
+        if data.get("name"):
+            print(f"[Domain Discovery] 🏢 Matched company: {data.get('name')}")
+        print(f"--- [Domain Discovery] Complete ---\n")
+        return enriched_company
+    
+    async def _discover_domain_by_linkedin_slug(self, linkedin_url: str) -> Optional[tuple]:
+        """Strategy 1: CoreSignal collect by LinkedIn slug."""
+        print(f"\n[Domain Discovery] ===== STRATEGY 1: LinkedIn Slug Lookup =====")
+        print(f"[Domain Discovery] LinkedIn URL: {linkedin_url}")
+        slug = self._extract_linkedin_slug(linkedin_url)
+        if not slug:
+            print(f"[Domain Discovery] ❌ Could not extract slug from LinkedIn URL")
+            return None
+        
+        print(f"[Domain Discovery] 🔍 Calling CoreSignal collect endpoint for slug: {slug}")
+        data = await self.coresignal.collect_by_slug(slug)
+        if not data:
+            print(f"[Domain Discovery] ❌ CoreSignal collect returned no data")
+            return None
+        
+        # Try multiple website field names that CoreSignal might return
+        website = (data.get("websites_main") or 
+                 data.get("websites_resolved") or 
+                 data.get("unique_website") or 
+                 data.get("unique_domain"))
+        if not website:
+            available_fields = list(data.keys()) if isinstance(data, dict) else []
+            print(f"[Domain Discovery] ❌ No website field found in CoreSignal response")
+            print(f"[Domain Discovery] 📋 Available fields: {available_fields[:10]}...")
+            return None
+        return data, website
+    
+    async def _discover_domain_by_linkedin_url(self, linkedin_url: str) -> Optional[tuple]:
+        """Strategy 2: CoreSignal ES DSL search by LinkedIn URL."""
+        print(f"\n[Domain Discovery] ===== STRATEGY 2: Direct LinkedIn URL Search =====")
+        print(f"[Domain Discovery] 🔍 Calling CoreSignal ES DSL search endpoint...")
+        search_result = await self.coresignal.search_by_linkedin_url(linkedin_url)
+        if not search_result or not search_result.get("website"):
+            print(f"[Domain Discovery] ❌ LinkedIn URL search returned no website field")
+            return None
+        return search_result, search_result["website"]
+    
+    async def _discover_domain_by_name(self, company: Company) -> Optional[tuple]:
+        """Strategy 3: CoreSignal search by company name (and location)."""
+        print(f"\n[Domain Discovery] ===== STRATEGY 3: Company Name Search =====")
+        location = company.headquarters or company.location
+        print(f"[Domain Discovery] 🔍 Search query: '{company.name}'" + (f" in '{location}'" if location else ""))
+        search_result = await self.coresignal.search_by_name(company.name, location)
+        if not search_result or not search_result.get("website"):
+            print(f"[Domain Discovery] ❌ Name search returned no website field")
+            return None
+        return search_result, search_result["website"]
+    
+    @staticmethod
+    def _is_valid_domain(domain: str) -> bool:
+        """A discovered domain must look like a hostname (e.g. 'acme.com')."""
+        if not domain or " " in domain or "." not in domain:
+            return False
+        return "linkedin.com" not in domain.lower()
+    
     def _clean_domain(self, url: str) -> str:
         """
         Clean URL to extract just the base domain.
@@ -56,12 +56,14 @@ At max turns, we DON'T auto-finalize. Instead:
         
 This prevents accidental low-quality briefs.
 """
+import copy
 import uuid
-from typing import Dict, Any, List, Optional, TypedDict, Annotated
+from typing import Dict, Any, List, Optional, TypedDict, Annotated, Awaitable, Callable
 from langgraph.graph import StateGraph, END
 from langgraph.graph.message import add_messages
 
 from ..clients.mistral import MistralClient
+from ..core.config import settings
 from ..schemas.icp import ICPConfig
 from ..schemas.conversation import ConversationState, ConversationMode
 from ..core.conversation_db import (
@@ -72,6 +74,12 @@ from ..core.conversation_db import (
 )
 from ..core.session import create_session
 from ..core.db_operations import save_icp_search, update_icp_search
+from .icp_service import ICPService
+from .prefetch_service import apollo_prefetch_service
+
+
+# Receives streamed question text as it is generated
+TokenCallback = Optional[Callable[[str], Awaitable[None]]]
 
 
 class ICPGraphState(TypedDict):
@@ -97,6 +105,7 @@ class ConversationalICPService:
     
     def __init__(self):
         self.mistral = MistralClient()
+        self.icp_service = ICPService()
         self.graph = self._build_graph()
     
     def _build_graph(self) -> StateGraph:
@@ -479,16 +488,21 @@ class ConversationalICPService:
         
         return state
     
-    async def _ask_node(self, state: ICPGraphState) -> ICPGraphState:
+    async def _ask_node(self, state: ICPGraphState, on_token: TokenCallback = None) -> ICPGraphState:
         """
         Generate next question for the user.
         
+        If on_token is given, the question text is streamed to it as Mistral
+        generates it.
+        
         At max turns: Don't auto-finalize. Instead offer:
         (A) Proceed with partial brief
         (B) Ask 2 more targeted questions
         (C) Cancel and start over
         """
         print(f"[Ask Node] Generating question for turn {state['turn_count']}")
+
+        proposed_question = state.get("metadata", {}).pop("proposed_question", None)
         
         # === AT MAX TURNS: Offer Options ===
         if state["turn_count"] >= state["max_turns"]:
@@ -579,6 +593,16 @@ Reply with A, B, or C."""
             print(f"[Ask Node] Max turns reached - offering options")
             print(f"[Ask Node] Required OK: {required_ok}, Coverage: {coverage:.2f}")
             
+        elif self._proposed_question_fits(proposed_question, state["missing_fields"]):
+            # === QUESTION ALREADY DRAFTED DURING COLLECT ===
+            state["last_agent_message"] = proposed_question["message"].strip()
+            print(f"[Ask Node] Using question drafted in collect call: {state['last_agent_message']}")
+
+        elif settings.CONVERSATION_SINGLE_CALL_TURNS and proposed_question is not None:
+            # Draft was unusable; don't pay for a second call this turn
+            print(f"[Ask Node] Drafted question doesn't match missing fields {state['missing_fields']}, using fallback")
+            state["last_agent_message"] = self._get_fallback_question(state["missing_fields"])
+
         else:
             # === NORMAL QUESTION GENERATION ===
             try:
@@ -589,7 +613,7 @@ Reply with A, B, or C."""
                     state["turn_count"]
                 )
                 
-                response = await self.mistral.call_api(prompt)
+                response = await self._call_mistral(prompt, on_token)
                 
                 state["last_agent_message"] = response.get("message", self._get_fallback_question(state["missing_fields"]))
                 
@@ -605,13 +629,15 @@ Reply with A, B, or C."""
         
         return state
     
-    async def _collect_node(self, state: ICPGraphState) -> ICPGraphState:
+    async def _collect_node(self, state: ICPGraphState, on_token: TokenCallback = None) -> ICPGraphState:
         """
         Collect and parse user's answer.
         
         Handles special cases:
         - At max_turns: Process A/B/C options
         - Normal: Extract fields from answer
+        
+        In single-call mode the drafted question is streamed to on_token (if given).
         """
         print(f"[Collect Node] Processing answer: {state['last_user_input']}")
         
@@ -647,13 +673,23 @@ Reply with A, B, or C."""
         
         # === NORMAL FIELD EXTRACTION ===
         try:
-            # Extract fields from user's answer
-            prompt = self.mistral.create_field_extraction_prompt(
-                state["last_user_input"],
-                state["known_fields"]
-            )
-            
-            extracted = await self.mistral.call_api(prompt)
+            if settings.CONVERSATION_SINGLE_CALL_TURNS:
+                # Extract fields and draft the next question in one call;
+                # _ask_node uses the draft only if it matches what _evaluate_node decides
+                prompt = self.mistral.create_conversation_turn_prompt(
+                    state["last_user_input"],
+                    state["known_fields"]
+                )
+                response = await self._call_mistral(prompt, on_token)
+                extracted = response.get("extracted") or {}
+                state["metadata"]["proposed_question"] = response.get("question")
+            else:
+                # Extract fields from user's answer
+                prompt = self.mistral.create_field_extraction_prompt(
+                    state["last_user_input"],
+                    state["known_fields"]
+                )
+                extracted = await self.mistral.call_api(prompt)
             
             # Merge extracted fields with known fields
             if not extracted.get("_no_new_fields"):
@@ -700,6 +736,8 @@ Reply with A, B, or C."""
                 routing_decision=None  # Routing can be added later if needed
             )
             
+            self._observe_prefetch(state, icp_config)
+            
             print(f"[Finalize Node] ICP config created successfully")
             print(f"[Finalize Node] Updated icp_searches table for session: {state['session_id']}")
             
@@ -830,6 +868,47 @@ Reply with A, B, or C."""
         
         return config
     
+    def _observe_prefetch(self, state: ICPGraphState, final_config: Optional[ICPConfig] = None):
+        """
+        Let the prefetch service see the Apollo query implied by the current fields.
+        
+        Mid-conversation the query is built from known fields plus defaults; the
+        prefetch only starts once it stays the same for a turn. A finalized
+        config starts (or keeps) the prefetch immediately.
+        """
+        try:
+            if final_config is not None:
+                apollo_prefetch_service.observe(state["session_id"], final_config, final=True)
+            else:
+                config = ICPConfig(**self._fill_defaults(copy.deepcopy(state["known_fields"])))
+                apollo_prefetch_service.observe(state["session_id"], config)
+        except Exception as e:
+            print(f"[Prefetch] Skipping prefetch for session {state['session_id']}: {e}")
+    
+    async def _call_mistral(self, prompt: str, on_token: TokenCallback = None) -> Dict[str, Any]:
+        """Call Mistral, streaming the "message" field to on_token when given."""
+        if on_token is None:
+            return await self.mistral.call_api(prompt)
+        return await self.mistral.call_api_streaming(prompt, on_token, stream_field="message")
+    
+    def _proposed_question_fits(self, proposed_question: Any, missing_fields: List[str]) -> bool:
+        """
+        Check a question drafted by the single-call turn prompt against the
+        deterministic evaluation: it must be non-empty and ask about every
+        field that is still missing.
+        """
+        if not isinstance(proposed_question, dict) or not missing_fields:
+            return False
+
+        message = proposed_question.get("message")
+        asks_about = proposed_question.get("asks_about")
+        if not isinstance(message, str) or not message.strip():
+            return False
+        if not isinstance(asks_about, list):
+            return False
+
+        return set(missing_fields).issubset(set(asks_about))
+
     def _get_fallback_question(self, missing_fields: List[str]) -> str:
         """
         Generate fallback question with examples when AI fails.
@@ -924,13 +1003,21 @@ Reply with A, B, or C."""
         # Run through parse and evaluate manually
         # (Graph is only used for validation, actual flow is manual)
         state = initial_state
-        state = await self._parse_node(state)
+        
+        # Near-duplicate of a previous ICP: start from its final config instead of parsing
+        similar = self.icp_service.find_similar_icp(initial_text)
+        if similar and similar["reused"]:
+            print(f"[Conversation] Reusing ICP config from session {similar['session_id']} (similarity {similar['similarity']:.2f})")
+            state["known_fields"] = copy.deepcopy(similar["icp_config"])
+        else:
+            state = await self._parse_node(state)
         state = await self._evaluate_node(state)
 
         # If complete, finalize; otherwise ask questions
         if state["is_complete"]:
             state = await self._finalize_node(state)
         else:
+            self._observe_prefetch(state)
             state = await self._ask_node(state)
 
         return {
@@ -946,11 +1033,24 @@ Reply with A, B, or C."""
                 confidence_score=state["confidence_score"],
                 max_turns=state["max_turns"]
             ),
-            "icp_config": state.get("icp_config")
+            "icp_config": state.get("icp_config"),
+            "similar_icp": self.icp_service.summarize_similar_icp(similar)
         }
     
-    async def respond_to_conversation(self, conversation_id: str, answer: str) -> Dict[str, Any]:
-        """Process user's answer and continue conversation."""
+    async def respond_to_conversation(
+        self,
+        conversation_id: str,
+        answer: str,
+        on_token: TokenCallback = None
+    ) -> Dict[str, Any]:
+        """
+        Process user's answer and continue conversation.
+        
+        If on_token is given, the next question is streamed to it token by
+        token. The streamed text is a preview: the returned "message" is the
+        authoritative question (it differs when a drafted question is replaced
+        by a fallback).
+        """
         # Get current conversation from database
         conversation = get_conversation(conversation_id)
         if not conversation:
@@ -977,14 +1077,15 @@ Reply with A, B, or C."""
         }
         
         # Run collect → evaluate → ask/finalize
-        state = await self._collect_node(state)
+        state = await self._collect_node(state, on_token)
         state = await self._evaluate_node(state)
         
         if state["is_complete"] or state["turn_count"] >= state["max_turns"]:
             state = await self._finalize_node(state)
             needs_more = False
         else:
-            state = await self._ask_node(state)
+            self._observe_prefetch(state)
+            state = await self._ask_node(state, on_token)
             needs_more = True
         
         # Calculate progress
@@ -0,0 +1,114 @@
+"""
+Field-need planner for the company enrichment chain.
+
+PROVIDER_CAPABILITIES declares which Company fields each enrichment provider
+can supply and which API_COSTS entries one run of it is billed as. Before
+each stage, the planner compares the provider's fields with what is still
+missing and skips providers that cannot add anything, so a company that
+Apollo already covers well does not pay for the whole chain.
+"""
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from ..core.config import settings
+from ..core.db_operations import API_COSTS
+from ..schemas.company import Company
+
+PROVIDER_CAPABILITIES: Dict[str, Dict[str, Any]] = {
+    "enrichlayer": {
+        "fields": {
+            "name", "description", "domain", "industry", "founded_year", "headquarters", "location",
+            "company_linkedin_url", "linkedin_url", "employee_count", "specialities",
+        },
+        "call_types": ("enrichlayer_company",),
+    },
+    "coresignal": {
+        # domain comes from CoreSignal domain discovery when Apollo had none
+        "fields": {
+            "domain", "description", "industry", "founded_year", "headquarters", "location", "employee_count",
+            "revenue_range", "technologies", "twitter_url", "facebook_url", "instagram_url", "youtube_url",
+        },
+        "call_types": ("coresignal_enrich",),
+    },
+    "serper": {
+        "fields": {
+            "name", "domain", "headquarters", "location", "description", "company_linkedin_url", "recent_news",
+            "linkedin_url", "twitter_url", "facebook_url", "instagram_url", "youtube_url", "github_url",
+        },
+        "call_types": ("serper_search",),
+    },
+    "hunter": {
+        "fields": {"contacts", "hunterio_pattern"},
+        "call_types": ("hunter_domain_search",),
+    },
+    "research_agent": {
+        "fields": {
+            "technologies", "tech_spend", "it_budget", "job_openings", "growth_signals",
+            "ai_org_signals", "ai_tech_signals", "ai_hiring_signals", "signal_evidence",
+        },
+        # One Serper query per researched field
+        "call_types": ("serper_search",),
+    },
+}
+
+
+def provider_cost(provider: str) -> float:
+    """Estimated cost in USD of one run of a provider stage."""
+    capability = PROVIDER_CAPABILITIES[provider]
+    return sum(API_COSTS.get(call_type, 0) for call_type in capability["call_types"])
+
+
+def target_fields() -> Set[str]:
+    """Fields enrichment should fill: ENRICHMENT_TARGET_FIELDS, or everything some provider can supply."""
+    configured = [f.strip() for f in settings.ENRICHMENT_TARGET_FIELDS.split(",") if f.strip()]
+    if configured:
+        return set(configured)
+    return set().union(*(c["fields"] for c in PROVIDER_CAPABILITIES.values()))
+
+
+def _has_value(value: Any) -> bool:
+    return value not in (None, "", [], {})
+
+
+class EnrichmentPlan:
+    """
+    What is still missing for one company as the enrichment stages run.
+    Stages report what they filled with add_filled(); needs() decides whether
+    the next provider is worth calling.
+    """
+
+    def __init__(self, company: Company, targets: Optional[Set[str]] = None):
+        self.targets = targets if targets is not None else target_fields()
+        self.filled: Set[str] = {field for field in self.targets if _has_value(getattr(company, field, None))}
+        self.skipped: List[str] = []
+
+    @property
+    def missing(self) -> Set[str]:
+        return self.targets - self.filled
+
+    def add_filled(self, values: Dict[str, Any]) -> None:
+        """Mark fields with a non-empty value as filled."""
+        self.filled.update(field for field, value in values.items() if _has_value(value))
+
+    def add_company(self, company: Optional[Company], fields: Optional[Iterable[str]] = None) -> None:
+        """Mark the (given) fields a provider-enriched company now has as filled."""
+        if company is None:
+            return
+        self.add_filled({field: getattr(company, field, None) for field in (fields or self.targets)})
+
+    def useful_fields(self, provider: str) -> Set[str]:
+        """Missing fields this provider could fill."""
+        return PROVIDER_CAPABILITIES[provider]["fields"] & self.missing
+
+    def needs(self, provider: str) -> bool:
+        """
+        True if the provider can fill at least one missing field. When planning is
+        disabled every provider runs. Skipped providers are recorded on the plan.
+        """
+        if not settings.ENRICHMENT_PLANNER_ENABLED:
+            return True
+        if self.useful_fields(provider):
+            return True
+        self.skipped.append(provider)
+        print(f"[Planner] Skipping {provider}: nothing it supplies is missing "
+              f"(saves ~${provider_cost(provider):.4f})")
+        return False
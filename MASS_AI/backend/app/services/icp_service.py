@@ -1,12 +1,16 @@
 """
 ICP (Ideal Customer Profile) service for normalization and fallback logic.
 """
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 from ..clients.mistral import MistralClient
 from ..schemas.icp import ICPConfig, RoutingDecision
+from ..core.config import settings
+from ..core.scheduler import set_session
 from ..core.session import create_session
 from ..core.console_logger import console_logger
+from ..core.icp_similarity import icp_similarity_index
+from ..core.metrics import record_cache
 
 
 class ICPService:
@@ -62,9 +66,36 @@ class ICPService:
         """Normalize ICP text using MISTRAL with fallback, then route with LLM Router."""
         # Create session for journey tracking
         session = create_session(icp_text)
+        # Provider calls below are scheduled and traced under this session
+        set_session(session.session_id)
         
         # Start console logging
         console_logger.start_session(session.session_id, icp_text)
+
+        # STEP 0: Reuse an earlier normalization for near-duplicate ICP text
+        similar = self.find_similar_icp(icp_text)
+        if similar and similar["reused"]:
+            try:
+                icp_config = ICPConfig(**similar["icp_config"])
+                routing_data = similar.get("routing_decision")
+                routing_decision = RoutingDecision(**routing_data) if routing_data else None
+                session.set_normalized_icp(icp_config)
+                print(f"[ICP] Reusing normalization from session {similar['session_id']} (similarity {similar['similarity']:.2f})")
+                console_logger.log_mistral_result(True, icp_config.dict())
+
+                return {
+                    "success": True,
+                    "icp_config": icp_config,
+                    "routing_decision": routing_decision,
+                    "error": None,
+                    "session_id": session.session_id,
+                    "similar_icp": self.summarize_similar_icp(similar)
+                }
+            except Exception as reuse_error:
+                # Stored config no longer validates - fall through to a fresh normalization
+                print(f"[ICP] Could not reuse similar ICP: {str(reuse_error)}")
+                similar["reused"] = False
+
         console_logger.log_mistral_start()
         
         try:
@@ -102,7 +133,8 @@ class ICPService:
                     "icp_config": icp_config,
                     "routing_decision": routing_decision,
                     "error": None,
-                    "session_id": session.session_id
+                    "session_id": session.session_id,
+                    "similar_icp": self.summarize_similar_icp(similar)
                 }
                 
             except Exception as routing_error:
@@ -115,7 +147,8 @@ class ICPService:
                     "icp_config": icp_config,
                     "routing_decision": None,
                     "error": f"Warning: Routing failed ({str(routing_error)}), proceeding with structured route",
-                    "session_id": session.session_id
+                    "session_id": session.session_id,
+                    "similar_icp": self.summarize_similar_icp(similar)
                 }
             
         except Exception as e:
@@ -132,3 +165,33 @@ class ICPService:
                 "error": f"NO DATA AVAILABLE - ICP normalization failed: {str(e)}",
                 "session_id": session.session_id
             }
+    
+    def find_similar_icp(self, icp_text: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a near-duplicate of this ICP text among past normalizations.
+        
+        Returns the match with a "reused" flag set when ICP_REUSE_MODE is "auto",
+        or None when nothing is above the similarity threshold.
+        """
+        if settings.ICP_REUSE_MODE == "off":
+            return None
+        
+        similar = icp_similarity_index.find_similar(icp_text)
+        if not similar:
+            record_cache("icp_reuse", False)
+            return None
+        
+        similar["reused"] = settings.ICP_REUSE_MODE == "auto"
+        record_cache("icp_reuse", similar["reused"])
+        return similar
+    
+    def summarize_similar_icp(self, similar: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Strip a similarity match down to what the API returns."""
+        if not similar:
+            return None
+        return {
+            "session_id": similar["session_id"],
+            "similarity": similar["similarity"],
+            "icp_text": similar["icp_text"],
+            "reused": similar["reused"]
+        }
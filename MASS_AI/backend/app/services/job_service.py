@@ -0,0 +1,241 @@
+"""
+Background jobs for full ICP -> companies -> leads runs.
+
+POST /jobs queues a run and returns at once; a pool of JOB_WORKERS worker
+tasks executes the stages (normalize, companies, leads) through the same
+handlers as the blocking /normalize-icp, /companies and /leads endpoints, so
+database writes, cost tracking and journey logging are identical. Each stage's
+result is stored on the job as soon as it completes, so GET /jobs/{id} shows
+progress and partial results while later stages are still running; the
+companies stage also publishes its counters (companies found and enriched so
+far) while it runs. A job is
+cancelled by cancelling its task; a queued job is simply never started.
+Jobs run in the "bulk" scheduling class, behind interactive and ad-hoc calls.
+"""
+import asyncio
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from ..core.config import settings
+from ..core.metrics import metrics
+from ..core.progress import report_progress_to
+from ..core.scheduler import priority
+from ..schemas.company import CompaniesRequest, SimpleCompany
+from ..schemas.icp import ICPInput
+from ..schemas.job import JobRequest, JobStatus
+from ..schemas.lead import LeadsRequest
+
+FINISHED_STATES = ("succeeded", "failed", "cancelled")
+
+
+class JobError(Exception):
+    """A stage of a job failed."""
+
+
+class Job:
+    """State and partial results of one run."""
+
+    def __init__(self, request: JobRequest):
+        self.job_id = uuid.uuid4().hex[:12]
+        self.request = request
+        self.status = "queued"
+        self.stage: Optional[str] = None
+        self.stages_completed: List[str] = []
+        self.session_id = request.session_id
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.icp_config = request.icp_config
+        self.companies = None
+        self.leads = None
+        self.progress: Dict[str, Any] = {}
+        self.error: Optional[str] = None
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATES
+
+    def finish(self, status: str, error: Optional[str] = None) -> None:
+        self.status = status
+        self.stage = None
+        self.error = error
+        self.finished_at = time.time()
+        print(f"[Jobs] Job {self.job_id} {status}" + (f": {error}" if error else ""))
+
+    def to_status(self) -> JobStatus:
+        return JobStatus(
+            job_id=self.job_id,
+            status=self.status,
+            stage=self.stage,
+            stages_completed=list(self.stages_completed),
+            session_id=self.session_id,
+            created_at=self.created_at,
+            started_at=self.started_at,
+            finished_at=self.finished_at,
+            icp_config=self.icp_config,
+            companies=self.companies,
+            leads=self.leads,
+            progress=dict(self.progress),
+            error=self.error,
+        )
+
+
+class JobService:
+    """Queue, worker pool and store of background jobs."""
+
+    def __init__(self):
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def start(self) -> None:
+        """Start the worker pool on the running event loop (no-op if already running there)."""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._workers:
+            return
+        self._loop = loop
+        self._queue = asyncio.Queue()
+        workers = max(1, settings.JOB_WORKERS)
+        self._workers = [loop.create_task(self._worker(i)) for i in range(workers)]
+        # Jobs queued on a previous loop (e.g. before a restart of the app's loop) are requeued
+        for job in self._jobs.values():
+            if job.status == "queued":
+                self._queue.put_nowait(job.job_id)
+        print(f"[Jobs] Started {workers} job workers")
+
+    async def stop(self) -> None:
+        """Cancel the workers and any running job."""
+        workers, self._workers = self._workers, []
+        for job in self._jobs.values():
+            if job.task is not None and not job.task.done():
+                job.task.cancel()
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+    async def submit(self, request: JobRequest) -> Job:
+        """Queue a run. Raises ValueError when neither icp_text nor icp_config is given."""
+        if not (request.icp_text and request.icp_text.strip()) and request.icp_config is None:
+            raise ValueError("icp_text or icp_config is required")
+
+        await self.start()
+        self._evict()
+        job = Job(request)
+        self._jobs[job.job_id] = job
+        self._queue.put_nowait(job.job_id)
+        print(f"[Jobs] Queued job {job.job_id} ({self._queue.qsize()} waiting)")
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """Cancel a queued or running job. Finished jobs are returned unchanged."""
+        job = self._jobs.get(job_id)
+        if job is None or job.finished:
+            return job
+        if job.task is not None and not job.task.done():
+            job.task.cancel()
+        else:
+            job.finish("cancelled")
+        return job
+
+    def _evict(self) -> None:
+        """Keep at most JOB_MAX_STORED jobs by dropping the oldest finished ones."""
+        excess = len(self._jobs) - settings.JOB_MAX_STORED + 1
+        if excess <= 0:
+            return
+        for job_id in [job_id for job_id, job in self._jobs.items() if job.finished][:excess]:
+            del self._jobs[job_id]
+
+    async def _worker(self, index: int) -> None:
+        while True:
+            job_id = await self._queue.get()
+            job = self._jobs.get(job_id)
+            if job is None or job.status != "queued":
+                continue
+
+            job.status = "running"
+            job.started_at = time.time()
+            with priority("bulk", job.session_id):
+                job.task = asyncio.get_running_loop().create_task(self._run(job))
+            try:
+                # wait() does not propagate the job's own cancellation into the worker
+                await asyncio.wait([job.task])
+            except asyncio.CancelledError:
+                job.task.cancel()
+                raise
+
+            if job.task.cancelled():
+                job.finish("cancelled")
+            elif job.task.exception() is not None:
+                job.finish("failed", str(job.task.exception()))
+            else:
+                job.finish("succeeded")
+
+    async def _run(self, job: Job) -> None:
+        # The stage handlers live in the route modules; imported here to avoid an import cycle
+        from ..routes.company import get_companies
+        from ..routes.icp import normalize_icp
+        from ..routes.lead import get_leads
+
+        request = job.request
+        print(f"[Jobs] Running job {job.job_id} on a worker")
+
+        if job.icp_config is None:
+            job.stage = "normalize"
+            result = await normalize_icp(ICPInput(icp_text=request.icp_text))
+            if not result.success or result.icp_config is None:
+                raise JobError(f"ICP normalization failed: {result.error}")
+            job.icp_config = result.icp_config
+            job.session_id = result.session_id or job.session_id
+            job.stages_completed.append("normalize")
+
+        job.stage = "companies"
+        with report_progress_to(job.progress):
+            companies_result = await get_companies(CompaniesRequest(
+                icp_config=job.icp_config, limit=request.limit, session_id=job.session_id,
+            ))
+        if not companies_result.success:
+            raise JobError(f"Company search failed: {companies_result.error}")
+        job.companies = companies_result.companies
+        job.progress["companies_found"] = len(job.companies)
+        job.stages_completed.append("companies")
+
+        if not request.include_leads or not job.companies:
+            return
+
+        job.stage = "leads"
+        leads_result = await get_leads(LeadsRequest(
+            companies=[
+                SimpleCompany(id=c.id, organization_id=c.organization_id, name=c.name, domain=c.domain, contacts=c.contacts)
+                for c in job.companies
+            ],
+            personas=request.personas or job.icp_config.personas,
+            max_leads_per_company=request.max_leads_per_company,
+            session_id=job.session_id,
+        ))
+        if not leads_result.success:
+            raise JobError(f"Lead search failed: {leads_result.error}")
+        job.leads = leads_result.leads
+        job.progress["leads_found"] = leads_result.total_leads
+        job.progress["companies_processed"] = leads_result.companies_processed
+        job.stages_completed.append("leads")
+
+
+# Global job service (jobs must outlive the request that started them)
+job_service = JobService()
+
+
+def _jobs_by_status():
+    counts = {}
+    for job in list(job_service._jobs.values()):
+        counts[(job.status,)] = counts.get((job.status,), 0) + 1
+    return counts
+
+
+metrics.gauge("mass_jobs", "Stored background jobs by status.", ("status",), callback=_jobs_by_status)
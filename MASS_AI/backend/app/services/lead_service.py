@@ -7,9 +7,16 @@ import asyncio
 import time
 
 from ..clients.apollo import ApolloClient
+from ..core.budget import session_budgets
+from ..core.coalescing import request_coalescer
+from ..core.config import settings
+from ..core.scheduler import set_session
+from ..core.db_operations import API_COSTS, track_api_call
+from ..core.metrics import endpoint_label
 from ..schemas.lead import Lead, LeadsRequest, LeadsResponse
 from ..schemas.icp import PersonaConfig
 from ..mappers.lead_mapper import LeadMapper
+from ..mappers.persona_matcher import PersonaMatcher
 from ..core.session import get_session
 from ..core.logger import journey_logger
 from ..core.console_logger import console_logger
@@ -30,6 +37,8 @@ class LeadService:
         session = None
         if hasattr(request, 'session_id') and request.session_id:
             session = get_session(request.session_id)
+        # Provider calls below share the scheduler fairly with other sessions
+        set_session(request.session_id)
         
         # Log leads generation start
         personas_list = [p.dict() for p in request.personas] if request.personas else []
@@ -44,22 +53,36 @@ class LeadService:
 
             print(f"[Leads] Processing {len(request.companies)} companies")
 
-            # 1. Collect Apollo leads as before
+            # 1. Collect Apollo leads
+            max_leads = request.max_leads_per_company or 5
+            if settings.APOLLO_PEOPLE_BATCH_SIZE > 1:
+                # Many organization_ids per Apollo request
+                searchable = [c for c in request.companies if c.domain]
+                with request_coalescer.tally() as apollo_calls:
+                    people_per_company = await self.apollo.search_people_batch(searchable, request.personas, max_leads)
+                self._track_apollo_calls(request.session_id, apollo_calls)
+                people_by_company = {id(c): people for c, people in zip(searchable, people_per_company)}
+            
             for i, company in enumerate(request.companies, 1):
                 if company.domain:
-                    # Validate and log organization_id
-                    org_id = company.organization_id or company.id
-                    if org_id:
-                        print(f"[Leads] ✅ Company '{company.name}' has organization_id: {org_id}")
+                    if settings.APOLLO_PEOPLE_BATCH_SIZE > 1:
+                        leads = self._map_people_to_leads(company, people_by_company[id(company)], request.personas)
                     else:
-                        print(f"[Leads] ⚠️  WARNING: Company '{company.name}' missing organization_id - Apollo search may be inaccurate")
+                        # Validate and log organization_id
+                        org_id = company.organization_id or company.id
+                        if org_id:
+                            print(f"[Leads] ✅ Company '{company.name}' has organization_id: {org_id}")
+                        else:
+                            print(f"[Leads] ⚠️  WARNING: Company '{company.name}' missing organization_id - Apollo search may be inaccurate")
 
-                    leads = await self._get_company_leads(company, request.personas, request.max_leads_per_company or 5)
+                        with request_coalescer.tally() as apollo_calls:
+                            leads = await self._get_company_leads(company, request.personas, max_leads)
+                        self._track_apollo_calls(request.session_id, apollo_calls)
+                        await asyncio.sleep(0.5)  # Rate limiting
                     all_leads.extend(leads)
                     apollo_lead_count += len(leads)
                     companies_processed += 1
                     console_logger.log_company_leads(company.name, len(leads), i, len(request.companies))
-                    await asyncio.sleep(0.5)  # Rate limiting
                 else:
                     print(f"[Leads] Skipping {company.name} - no domain")
                     console_logger.log_company_leads(company.name, 0, i, len(request.companies))
@@ -92,33 +115,48 @@ class LeadService:
                             high_conf_contacts.append(lead)
                             print(f"[Leads] [High-Confidence] Added contact {contact.first_name} {contact.last_name} ({contact.email}) from {company.name} with confidence {contact.confidence}")
 
-            # 3. Enrich high-confidence contacts (Hunter.io, Serper, etc.)
-            enriched_high_conf_leads = []
-            for lead in high_conf_contacts:
-                enriched_lead = await self._enrich_lead(lead)
-                enriched_high_conf_leads.append(enriched_lead)
-                print(f"[Leads] [Enrichment] Enriched high-confidence contact: {lead.contact_first_name} {lead.contact_last_name} ({lead.contact_email})")
-
-            # 4. Merge Apollo and high-confidence leads
-            all_leads.extend(enriched_high_conf_leads)
-
-            if not all_leads:
+            # 3. Drop duplicates and leads the cheap guardrail rules reject before paying to enrich them
+            candidates = all_leads + high_conf_contacts
+            if not candidates:
                 return self._no_leads_response(companies_processed)
+            prefilter_stats = None
+            if settings.LEAD_PREFILTER_ENABLED:
+                unique_leads = self._deduplicate_leads(candidates)
+                kept_leads, prefilter_stats = lead_guardrails.prefilter(unique_leads)
+                prefilter_stats['duplicates'] = len(candidates) - len(unique_leads)
+                kept_ids = {id(lead) for lead in kept_leads}
+                calls_avoided = sum(self._enrichment_calls(lead) for lead in high_conf_contacts if id(lead) not in kept_ids)
+                print(f"[Leads] Prefilter before enrichment: {len(candidates)} → {len(kept_leads)} leads, "
+                      f"{calls_avoided} enrichment calls avoided")
+            else:
+                kept_leads, calls_avoided = candidates, 0
+
+            # 4. Enrich the remaining high-confidence contacts (Hunter.io, Serper, etc.)
+            high_conf_ids = {id(lead) for lead in high_conf_contacts}
+            all_leads = []
+            hunterio_lead_count = 0
+            for lead in kept_leads:
+                if id(lead) in high_conf_ids:
+                    lead = await self._enrich_lead(lead, request.session_id)
+                    hunterio_lead_count += 1
+                    print(f"[Leads] [Enrichment] Enriched high-confidence contact: {lead.contact_first_name} {lead.contact_last_name} ({lead.contact_email})")
+                all_leads.append(lead)
 
             # 5. Deduplicate leads (across Apollo, Hunter.io, etc.)
             deduplicated_leads = self._deduplicate_leads(all_leads)
             print(f"[Leads] Deduplication complete: {len(all_leads)} → {len(deduplicated_leads)} leads")
             
-            hunterio_lead_count = len(enriched_high_conf_leads)
-            
             # 6. Apply guardrails to filter invalid leads
             print(f"[Leads] Applying guardrails to validate {len(deduplicated_leads)} leads...")
-            validated_leads, guardrails_stats = lead_guardrails.apply_guardrails(deduplicated_leads)
-            print(f"[Leads] Guardrails filtering complete: {len(deduplicated_leads)} → {len(validated_leads)} leads")
+            validated_leads, guardrails_stats = lead_guardrails.apply_guardrails(deduplicated_leads, prefilter_stats)
+            if prefilter_stats is not None:
+                guardrails_stats['duplicates_before_enrichment'] = prefilter_stats['duplicates']
+                guardrails_stats['enrichment_calls_avoided'] = calls_avoided
+            print(f"[Leads] Guardrails filtering complete: {guardrails_stats['total_leads']} → {len(validated_leads)} leads")
             
             # Log guardrails to console and file
             console_logger.log_guardrails_filtering(
-                len(deduplicated_leads),
+                guardrails_stats['total_leads'],
                 len(validated_leads),
                 guardrails_stats['filtered_leads']
             )
@@ -177,23 +215,28 @@ class LeadService:
             print(f"[Leads] Processing {company_name}")
             
             people_data = await self.apollo.search_people(company, personas, max_leads)
-            
-            leads = []
-            for person_data in people_data:
-                try:
-                    matched_persona = self._match_person_to_personas(person_data, personas) if personas else None
-                    lead = self.mapper.map_apollo_person_to_lead(person_data, company, matched_persona)
-                    leads.append(lead)
-                except Exception as e:
-                    print(f"[Leads] Error processing person data: {str(e)}")
-                    continue
-            
-            print(f"[Leads] Got {len(leads)} leads for {company_name}")
-            return leads
+            return self._map_people_to_leads(company, people_data, personas)
         except Exception as e:
             print(f"[Leads] Error getting leads for company: {str(e)}")
             return []
     
+    def _map_people_to_leads(self, company, people_data: List[dict], personas: Optional[List[PersonaConfig]]) -> List[Lead]:
+        """Map Apollo people records for one company to leads."""
+        company_name = str(company.name).encode('ascii', 'replace').decode('ascii') if company.name else "Unknown"
+        leads = []
+        # Compiled once per persona set and reused across companies and requests
+        matcher = PersonaMatcher.for_personas(personas)
+        for person_data in people_data:
+            try:
+                lead = self.mapper.map_apollo_person_to_lead(person_data, company, persona_matcher=matcher)
+                leads.append(lead)
+            except Exception as e:
+                print(f"[Leads] Error processing person data: {str(e)}")
+                continue
+        
+        print(f"[Leads] Got {len(leads)} leads for {company_name}")
+        return leads
+    
     def _no_leads_response(self, companies_processed: int) -> LeadsResponse:
         """Create response when no leads are found."""
         if not self.apollo.api_key:
@@ -239,27 +282,41 @@ class LeadService:
 
         return deduplicated
     
-    def _match_person_to_personas(self, person_data: dict, personas: List[PersonaConfig]) -> Optional[str]:
-        """Match a person to personas based on title regex."""
-        import re
-        
-        title = person_data.get("title", "").strip()
-        if not title:
-            return None
-        
-        for persona in personas:
-            for regex_pattern in persona.title_regex:
-                try:
-                    if re.match(regex_pattern, title, re.IGNORECASE):
-                        return persona.name
-                except re.error:
-                    if persona.name.lower() in title.lower():
-                        return persona.name
-        return None
+    def _enrichment_calls(self, lead: Lead) -> int:
+        """
+        Paid calls _enrich_lead would make for a lead: Hunter verification, the
+        LinkedIn and Twitter Serper searches, and at least one research agent query.
+        """
+        calls = 1 if lead.contact_email else 0
+        if lead.contact_first_name and lead.contact_last_name and lead.contact_company:
+            calls += (not lead.contact_linkedin_url) + (not lead.contact_twitter)
+        return calls + 1
+    
+    def _track_call(self, session_id: Optional[str], api_name: str, endpoint: str, call_type: str, calls_made: int = 1):
+        """Record paid calls (also charges the session budget); calls that joined another caller's are free."""
+        if not session_id or not calls_made:
+            return
+        try:
+            track_api_call(session_id=session_id, api_name=api_name, endpoint=endpoint,
+                           call_type=call_type, calls_made=calls_made, success=True)
+        except Exception as e:
+            print(f"[Cost Tracking] Error tracking {api_name} call: {e}")
 
-    async def _enrich_lead(self, lead: Lead) -> Lead:
+    def _track_apollo_calls(self, session_id: Optional[str], calls) -> None:
+        """Bill the Apollo people-search pages and organization lookups counted in `calls`."""
+        self._track_call(session_id, "Apollo", "mixed_people/search", "apollo_people_search",
+                         calls.count("apollo", endpoint_label(self.apollo.people_url)))
+        self._track_call(session_id, "Apollo", "mixed_companies/search", "apollo_company_search",
+                         calls.count("apollo", endpoint_label(self.apollo.companies_url)))
+
+    def _budget_allows(self, budget, activity: str, stage: str, call_type: str) -> bool:
+        return budget is None or budget.allows(activity, stage, API_COSTS[call_type])
+
+    async def _enrich_lead(self, lead: Lead, session_id: Optional[str] = None) -> Lead:
         """
         Enrich a lead using Hunter.io and Serper (email verification, LinkedIn, etc.).
+        Verification and Serper lookups are skipped once the session's budget for
+        them runs out.
         """
         # Example enrichment: verify email with Hunter.io, supplement with Serper if needed
         # (Extend this as needed for your enrichment stack)
@@ -268,11 +325,16 @@ class LeadService:
 
         hunter = HunterIoClient()
         serper = SerperApiClient()
+        budget = session_budgets.get(session_id)
 
         # 1. Email verification (Hunter.io)
-        if lead.contact_email:
+        if lead.contact_email and not self._budget_allows(budget, "email_verification", "verify", "hunter_email_verifier"):
+            print(f"[Enrich] Skipping Hunter.io verification for {lead.contact_email}: verify budget exhausted")
+        elif lead.contact_email:
             try:
-                result = hunter.email_verifier(lead.contact_email)
+                with request_coalescer.tally() as calls:
+                    result = await hunter.email_verifier(lead.contact_email)
+                self._track_call(session_id, "Hunter", "email-verifier", "hunter_email_verifier", 1 - calls.coalesced)
                 if result and result.get("data", {}).get("result") == "deliverable":
                     print(f"[Enrich] Hunter.io verified deliverable email: {lead.contact_email}")
                 else:
@@ -281,10 +343,13 @@ class LeadService:
                 print(f"[Enrich] Hunter.io verification error: {str(e)}")
 
         # 2. Supplement LinkedIn/Twitter with Serper if missing
-        if not lead.contact_linkedin_url and lead.contact_first_name and lead.contact_last_name and lead.contact_company:
+        if not lead.contact_linkedin_url and lead.contact_first_name and lead.contact_last_name and lead.contact_company \
+                and self._budget_allows(budget, "lead_serper", "research", "serper_search"):
             query = f"{lead.contact_first_name} {lead.contact_last_name} {lead.contact_company} linkedin"
             try:
-                search_result = serper.search(query)
+                with request_coalescer.tally() as calls:
+                    search_result = await serper.search(query)
+                self._track_call(session_id, "Serper", "search", "serper_search", 1 - calls.coalesced)
                 if search_result and "organic" in search_result:
                     for result in search_result["organic"]:
                         url = result.get("link", "")
@@ -296,10 +361,13 @@ class LeadService:
                 print(f"[Enrich] Serper LinkedIn enrichment error: {str(e)}")
 
         # 3. Supplement Twitter with Serper if missing
-        if not lead.contact_twitter and lead.contact_first_name and lead.contact_last_name and lead.contact_company:
+        if not lead.contact_twitter and lead.contact_first_name and lead.contact_last_name and lead.contact_company \
+                and self._budget_allows(budget, "lead_serper", "research", "serper_search"):
             query = f"{lead.contact_first_name} {lead.contact_last_name} {lead.contact_company} twitter"
             try:
-                search_result = serper.search(query)
+                with request_coalescer.tally() as calls:
+                    search_result = await serper.search(query)
+                self._track_call(session_id, "Serper", "search", "serper_search", 1 - calls.coalesced)
                 if search_result and "organic" in search_result:
                     for result in search_result["organic"]:
                         url = result.get("link", "")
@@ -311,14 +379,19 @@ class LeadService:
                 print(f"[Enrich] Serper Twitter enrichment error: {str(e)}")
 
         # 4. Agent 3: Research Agent - Fill remaining N/A lead fields
-        try:
-            from ..services.research_agent_service import ResearchAgentService
-            research_agent = ResearchAgentService()
+        if not self._budget_allows(budget, "research_agent", "research", "serper_search"):
+            print(f"[Enrich] Skipping Agent 3 (Research Agent) for lead: research budget exhausted")
+            return lead
+        with request_coalescer.tally() as calls:
+            try:
+                from ..services.research_agent_service import ResearchAgentService
+                research_agent = ResearchAgentService()
 
-            print(f"[Enrich] Starting Agent 3 (Research Agent) for lead: {lead.contact_email}")
-            lead = await research_agent.research_lead(lead)
-            print(f"[Enrich] Agent 3 (Research Agent) complete for lead")
-        except Exception as e:
-            print(f"[Enrich] Agent 3 (Research Agent) exception: {str(e)}")
+                print(f"[Enrich] Starting Agent 3 (Research Agent) for lead: {lead.contact_email}")
+                lead = await research_agent.research_lead(lead)
+                print(f"[Enrich] Agent 3 (Research Agent) complete for lead")
+            except Exception as e:
+                print(f"[Enrich] Agent 3 (Research Agent) exception: {str(e)}")
+        self._track_call(session_id, "Serper", "search", "serper_search", calls.count("serper"))
 
         return lead
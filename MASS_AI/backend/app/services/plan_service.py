@@ -0,0 +1,225 @@
+"""
+Explain-plan for company searches (POST /companies/plan).
+
+Estimates what a /companies request would do without calling any provider:
+Apollo pages from the composed query, enrichment stage runs per company,
+provider calls by API_COSTS call type, cache hits (a matching Apollo prefetch,
+checkpoints of a resumed session), dollar cost and wall-clock time.
+
+How often each stage runs and how long it takes come from this process's
+metrics once enough companies have been enriched (PLAN_MIN_HISTORY); before
+that, per-stage defaults are used: every stage whose provider can fill a
+target field runs, which makes a fresh process's estimate an upper bound.
+"""
+import math
+from typing import Dict, List, Optional, Tuple
+
+from ..clients.apollo import ApolloClient
+from ..clients.coresignal import CoreSignalClient
+from ..core.checkpoints import checkpoint_store
+from ..core.circuit_breaker import provider_breakers
+from ..core.config import settings
+from ..core.db_operations import API_COSTS
+from ..core.latency import provider_latency
+from ..core.metrics import enrichment_stage_duration, enrichments_completed
+from ..core.scheduler import provider_scheduler
+from ..schemas.company import CompaniesPlan, CompaniesRequest, ProviderCallEstimate, StageEstimate
+from .enrichment_planner import PROVIDER_CAPABILITIES, target_fields
+from .prefetch_service import apollo_prefetch_service
+
+# stage -> (capability / breaker provider, call type, calls per run, default run rate, default seconds per run)
+# Domain discovery only runs for companies Apollo returned without a domain.
+STAGE_PROFILES: Dict[str, Tuple[str, str, Optional[int], float, float]] = {
+    "enrichlayer": ("enrichlayer", "enrichlayer_company", 1, 1.0, 2.0),
+    "domain_discovery": ("coresignal", "coresignal_search", 1, 0.2, 2.0),
+    "coresignal": ("coresignal", "coresignal_enrich", 1, 1.0, 1.5),
+    "serper": ("serper", "serper_search", 2, 1.0, 1.5),
+    "hunter": ("hunter", "hunter_domain_search", 1, 1.0, 1.0),
+    # One Serper query per researched field
+    "research": ("research_agent", "serper_search", None, 1.0, 6.0),
+}
+# Breaker name of each capability provider
+_BREAKERS = {"research_agent": "serper"}
+# Default seconds per Apollo page when no latency has been recorded yet
+_APOLLO_PAGE_SECONDS = 1.5
+
+
+class CompanySearchPlanner:
+    """Builds a CompaniesPlan for a CompaniesRequest."""
+
+    def __init__(self):
+        self.apollo = ApolloClient()
+        self.coresignal = CoreSignalClient()
+
+    def plan(self, request: CompaniesRequest) -> CompaniesPlan:
+        limit = min(request.limit or 10, settings.COMPANY_SEARCH_MAX_LIMIT)
+        notes = []
+        if (request.limit or 10) > limit:
+            notes.append(f"limit is capped at COMPANY_SEARCH_MAX_LIMIT={limit}")
+
+        if request.search_payload:
+            query_payload = {**request.search_payload}
+        elif request.icp_config:
+            query_payload = self.apollo.compose_query_from_icp(
+                request.icp_config, per_page=min(limit, settings.APOLLO_PER_PAGE)
+            )
+        else:
+            return CompaniesPlan(success=False, error="Provide either search_payload or icp_config")
+        query_payload.setdefault("per_page", min(limit, settings.APOLLO_PER_PAGE))
+
+        provider_calls: Dict[str, ProviderCallEstimate] = {}
+        cache_hits: Dict[str, float] = {}
+
+        # Apollo search pages (the first may already be prefetched for this session)
+        pages = math.ceil(limit / max(1, query_payload["per_page"]))
+        prefetch = apollo_prefetch_service.peek(request.session_id, query_payload)
+        prefetched = 1 if prefetch else 0
+        if prefetch:
+            cache_hits["apollo_prefetch"] = 1
+            notes.append(f"the first Apollo page is prefetched for this session ({prefetch})")
+        self._add_calls(provider_calls, "apollo_company_search", pages, prefetched)
+
+        # Companies already enriched in this session (resumed run) and stage checkpoints
+        checkpointed = self._checkpointed_stages(request.session_id)
+        finished = min(limit, checkpointed.get("final", 0))
+        if finished:
+            notes.append(f"{finished} companies are already enriched for this session and will be resumed")
+        remaining = limit - finished
+
+        enrich = bool(self.coresignal.api_key)
+        if not enrich:
+            notes.append("CoreSignal is not configured, so companies are returned without enrichment")
+
+        stages: Dict[str, StageEstimate] = {}
+        seconds_per_company = 0.0
+        provider_seconds: Dict[str, float] = {}
+        targets = target_fields()
+        for stage, (provider, call_type, calls_per_run, default_rate, default_seconds) in STAGE_PROFILES.items():
+            estimate = self._stage_estimate(stage, provider, targets, default_rate, default_seconds)
+            if not enrich:
+                estimate.run_rate = 0.0
+            breaker = _BREAKERS.get(provider, provider)
+            if estimate.run_rate and provider_breakers.is_open(breaker):
+                estimate.run_rate = 0.0
+                notes.append(f"{breaker} circuit breaker is open; the {stage} stage would be skipped")
+            stages[stage] = estimate
+
+            runs = limit * estimate.run_rate
+            if calls_per_run is None:
+                calls_per_run = len(PROVIDER_CAPABILITIES[provider]["fields"] & targets)
+            # Finished companies have stage checkpoints too; don't count them twice
+            hits = min(runs, max(finished * estimate.run_rate, checkpointed.get(stage, 0)))
+            self._add_calls(provider_calls, call_type, runs * calls_per_run, hits * calls_per_run)
+            if hits:
+                cache_hits["checkpoint"] = round(cache_hits.get("checkpoint", 0) + hits, 2)
+
+            seconds_per_company += estimate.run_rate * estimate.seconds_per_run
+            provider_seconds[breaker] = (provider_seconds.get(breaker, 0)
+                                         + (runs - hits) * estimate.seconds_per_run)
+
+        cost = sum(c.cost_usd for c in provider_calls.values())
+
+        # Wall clock: Apollo pages (rate limited), then enrichment bounded by the
+        # enrichment semaphore or by the busiest provider's scheduler slots
+        apollo_seconds = max(
+            (pages - prefetched) / max(settings.APOLLO_REQUESTS_PER_SECOND, 0.1),
+            (pages - prefetched) * self._apollo_page_seconds() / max(1, settings.APOLLO_MAX_CONCURRENT_PAGES),
+        )
+        concurrency = max(1, settings.ENRICHMENT_CONCURRENCY)
+        work = remaining * seconds_per_company
+        slot_bound = max(
+            (seconds / self._slots(provider) for provider, seconds in provider_seconds.items()), default=0.0
+        )
+        enrichment_seconds = max(work / min(concurrency, max(1, remaining)), slot_bound) if enrich else 0.0
+        total_seconds = apollo_seconds + enrichment_seconds
+
+        # More concurrency only helps until the providers' slots are the bottleneck
+        suggested_concurrency = concurrency
+        if enrich and remaining:
+            needed = math.ceil(work / slot_bound) if slot_bound else remaining
+            suggested_concurrency = max(1, min(needed, remaining, settings.SCHEDULER_MAX_CONCURRENT))
+            if suggested_concurrency > concurrency:
+                notes.append(f"ENRICHMENT_CONCURRENCY={suggested_concurrency} would cut enrichment time "
+                             f"to ~{max(work / suggested_concurrency, slot_bound):.0f}s")
+
+        suggested_limit = None
+        if total_seconds > settings.PLAN_TARGET_SECONDS and limit:
+            per_company = total_seconds / limit
+            suggested_limit = max(1, int(settings.PLAN_TARGET_SECONDS / per_company))
+            notes.append(f"expected to take ~{total_seconds:.0f}s; use limit={suggested_limit} to stay under "
+                         f"{settings.PLAN_TARGET_SECONDS:.0f}s, or run it as a background job (POST /jobs)")
+
+        self._check_budget(request, limit, cost, notes)
+
+        return CompaniesPlan(
+            success=True,
+            limit=limit,
+            request_payload=query_payload,
+            apollo_pages=pages,
+            enrichment_enabled=enrich,
+            provider_calls=provider_calls,
+            stages=stages,
+            expected_cache_hits=cache_hits,
+            estimated_cost_usd=round(cost, 4),
+            estimated_cost_per_company_usd=round(cost / limit, 4) if limit else 0,
+            estimated_seconds=round(total_seconds, 1),
+            enrichment_concurrency=concurrency,
+            suggested_enrichment_concurrency=suggested_concurrency,
+            suggested_limit=suggested_limit,
+            notes=notes,
+        )
+
+    @staticmethod
+    def _add_calls(provider_calls: Dict[str, ProviderCallEstimate], call_type: str, calls: float, hits: float) -> None:
+        estimate = provider_calls.setdefault(call_type, ProviderCallEstimate(calls=0))
+        estimate.calls = round(estimate.calls + calls, 2)
+        estimate.cache_hits = round(estimate.cache_hits + hits, 2)
+        estimate.cost_usd = round(estimate.cost_usd + (calls - hits) * API_COSTS.get(call_type, 0), 4)
+
+    @staticmethod
+    def _stage_estimate(stage: str, provider: str, targets, default_rate: float, default_seconds: float) -> StageEstimate:
+        enriched = enrichments_completed.value()
+        runs = enrichment_stage_duration.count(stage)
+        if enriched >= settings.PLAN_MIN_HISTORY:
+            rate = min(1.0, runs / enriched)
+            seconds = enrichment_stage_duration.mean(stage) or default_seconds
+            return StageEstimate(run_rate=round(rate, 3), seconds_per_run=round(seconds, 3), basis="history")
+
+        rate = default_rate
+        if settings.ENRICHMENT_PLANNER_ENABLED and not PROVIDER_CAPABILITIES[provider]["fields"] & targets:
+            rate = 0.0
+        p50 = provider_latency.snapshot().get(_BREAKERS.get(provider, provider), {}).get("p50_seconds")
+        seconds = p50 if p50 and stage not in ("serper", "research") else default_seconds
+        return StageEstimate(run_rate=rate, seconds_per_run=round(seconds, 3), basis="default")
+
+    @staticmethod
+    def _checkpointed_stages(session_id: Optional[str]) -> Dict[str, int]:
+        if not settings.CHECKPOINTS_ENABLED or not session_id:
+            return {}
+        try:
+            return checkpoint_store.stages(session_id)
+        except Exception as e:
+            print(f"[Plan] Could not read checkpoints for session {session_id}: {e}")
+            return {}
+
+    @staticmethod
+    def _apollo_page_seconds() -> float:
+        return provider_latency.snapshot().get("apollo", {}).get("p50_seconds") or _APOLLO_PAGE_SECONDS
+
+    @staticmethod
+    def _slots(provider: str) -> int:
+        if not settings.SCHEDULER_ENABLED:
+            return max(1, settings.ENRICHMENT_CONCURRENCY)
+        return provider_scheduler.get(provider).max_concurrent
+
+    @staticmethod
+    def _check_budget(request: CompaniesRequest, limit: int, cost: float, notes: List[str]) -> None:
+        """Compare the estimate with the budget the ICP's stage_overrides would give the run."""
+        if not settings.BUDGET_CONTROL_ENABLED or request.icp_config is None:
+            return
+        overrides = request.icp_config.stage_overrides
+        leads_per_company = max(1, request.icp_config.contact_persona_targets.per_company_min)
+        budget = overrides.budget_cap_per_lead_usd * max(1, limit) * leads_per_company
+        if cost > budget:
+            notes.append(f"estimated ${cost:.2f} exceeds the ICP budget of ${budget:.2f}; "
+                         f"budget control will skip research calls once it is spent")
@@ -0,0 +1,168 @@
+"""
+Speculative Apollo prefetch for ICP conversations.
+
+While the conversation is still collecting persona/revenue details, the company
+filters that determine the Apollo query (industries, employee count, locations,
+technologies, ARR) are often already settled. Once the composed query has been
+stable for a turn, a background Apollo search is started so the first
+/companies call after finalization can reuse the in-flight or finished result.
+
+Prefetches are keyed by session_id and by a fingerprint of the exact Apollo
+payload: if a later turn changes the query, the running task is cancelled and
+any result is discarded. The page size is left out of the fingerprint: the
+prefetch asks for a full APOLLO_PER_PAGE page, which also answers a /companies
+call with a smaller limit (and so a smaller per_page) for the same query.
+"""
+import asyncio
+import hashlib
+import json
+from typing import Dict, Any, Optional
+
+from ..clients.apollo import ApolloClient
+from ..core.config import settings
+from ..core.db_operations import track_api_call
+from ..schemas.icp import ICPConfig
+
+
+def query_fingerprint(query_payload: Dict[str, Any]) -> str:
+    """Stable fingerprint of an Apollo search payload, page size excluded."""
+    query = {k: v for k, v in query_payload.items() if k != "per_page"}
+    encoded = json.dumps(query, sort_keys=True, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()[:16]
+
+
+class _Prefetch:
+    """State of the prefetch for one session."""
+
+    def __init__(self):
+        self.candidate: Optional[str] = None  # fingerprint seen on the last turn
+        self.fingerprint: Optional[str] = None  # fingerprint of the running/finished task
+        self.task: Optional[asyncio.Task] = None
+
+
+class ApolloPrefetchService:
+    """Starts, cancels and hands over speculative Apollo company searches."""
+
+    MAX_SESSIONS = 1000
+
+    def __init__(self):
+        self.apollo = ApolloClient()
+        self._prefetches: Dict[str, _Prefetch] = {}
+
+    def observe(self, session_id: str, icp_config: ICPConfig, final: bool = False) -> Optional[str]:
+        """
+        Record the query implied by the current conversation state.
+
+        A prefetch starts when the same query is observed on two consecutive
+        turns, or immediately when `final` is set. A different query cancels
+        any prefetch for the session.
+
+        Returns:
+            Fingerprint of the running prefetch, or None if none is running
+        """
+        if not settings.APOLLO_PREFETCH_ENABLED or not session_id or not self.apollo.api_key:
+            return None
+
+        try:
+            query_payload = self.apollo.compose_query_from_icp(icp_config)
+        except Exception as e:
+            print(f"[Prefetch] Could not compose Apollo query for session {session_id}: {e}")
+            return None
+
+        fingerprint = query_fingerprint(query_payload)
+        if session_id not in self._prefetches and len(self._prefetches) >= self.MAX_SESSIONS:
+            # Drop the oldest session that never reached /companies
+            self.cancel(next(iter(self._prefetches)))
+        prefetch = self._prefetches.setdefault(session_id, _Prefetch())
+
+        if prefetch.fingerprint == fingerprint:
+            return fingerprint
+
+        if prefetch.task is not None:
+            print(f"[Prefetch] Query changed for session {session_id}, discarding prefetch {prefetch.fingerprint}")
+            self._discard(session_id, prefetch)
+
+        stable = prefetch.candidate == fingerprint
+        prefetch.candidate = fingerprint
+        if not (stable or final):
+            return None
+
+        print(f"[Prefetch] Starting Apollo prefetch {fingerprint} for session {session_id}")
+        prefetch.fingerprint = fingerprint
+        prefetch.task = asyncio.get_running_loop().create_task(self.apollo.search_companies(query_payload))
+        return fingerprint
+
+    async def take(self, session_id: Optional[str], query_payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Hand over the prefetched Apollo response if it was made for exactly this payload.
+
+        Waits for a prefetch that is still in flight. Returns None (and drops the
+        prefetch) when there is no usable result, so the caller searches normally.
+        """
+        prefetch = self._prefetches.get(session_id) if session_id else None
+        if prefetch is None or prefetch.task is None:
+            return None
+
+        if prefetch.fingerprint != query_fingerprint(query_payload):
+            print(f"[Prefetch] Payload differs from prefetch {prefetch.fingerprint}, discarding")
+            self._discard(session_id, prefetch)
+            self._prefetches.pop(session_id, None)
+            return None
+
+        self._prefetches.pop(session_id, None)
+        try:
+            data = await prefetch.task
+        except asyncio.CancelledError:
+            return None
+        except Exception as e:
+            print(f"[Prefetch] Prefetched Apollo search failed, searching again: {e}")
+            return None
+
+        print(f"[Prefetch] Using prefetched Apollo results {prefetch.fingerprint} for session {session_id}")
+        return data
+
+    def peek(self, session_id: Optional[str], query_payload: Dict[str, Any]) -> Optional[str]:
+        """State ("running" or "ready") of a usable prefetch for this payload, without taking it."""
+        prefetch = self._prefetches.get(session_id) if session_id else None
+        if prefetch is None or prefetch.task is None or prefetch.fingerprint != query_fingerprint(query_payload):
+            return None
+        if not prefetch.task.done():
+            return "running"
+        if prefetch.task.cancelled() or prefetch.task.exception() is not None:
+            return None
+        return "ready"
+
+    def cancel(self, session_id: str) -> None:
+        """Cancel and forget any prefetch for the session."""
+        prefetch = self._prefetches.pop(session_id, None)
+        if prefetch is not None and prefetch.task is not None:
+            self._discard(session_id, prefetch)
+
+    def _discard(self, session_id: str, prefetch: _Prefetch) -> None:
+        """Cancel the prefetch task; a search that already completed is still tracked as a cost."""
+        task = prefetch.task
+        prefetch.task = None
+        prefetch.fingerprint = None
+
+        if task.done():
+            if not task.cancelled() and task.exception() is None:
+                self._track_wasted_call(session_id)
+        else:
+            task.cancel()
+
+    def _track_wasted_call(self, session_id: str) -> None:
+        try:
+            track_api_call(
+                session_id=session_id,
+                api_name="Apollo",
+                endpoint="mixed_companies/search",
+                call_type="apollo_company_prefetch",
+                calls_made=1,
+                success=True
+            )
+        except Exception as e:
+            print(f"[Cost Tracking] Error tracking discarded Apollo prefetch: {e}")
+
+
+# Global prefetch service (prefetches must outlive a single request)
+apollo_prefetch_service = ApolloPrefetchService()
@@ -146,7 +146,7 @@ class ResearchAgentService:
         try:
             query = f"site:linkedin.com/jobs {company.name} required skills"
             print(f"[Research Agent]   Strategy 1: LinkedIn jobs search...")
-            result = self.serper.search(query)
+            result = await self.serper.search(query)
 
             if result and "organic" in result:
                 for item in result["organic"][:5]:
@@ -164,7 +164,7 @@ class ResearchAgentService:
         try:
             query = f"\"{company.name}\" tech stack OR \"built with\" OR \"powered by\" OR \"uses\""
             print(f"[Research Agent]   Strategy 2: Tech stack mentions search...")
-            result = self.serper.search(query)
+            result = await self.serper.search(query)
 
             if result and "organic" in result:
                 for item in result["organic"][:5]:
@@ -184,7 +184,7 @@ class ResearchAgentService:
             try:
                 query = f"site:stackshare.io {company.name} OR site:builtwith.com {company.domain}"
                 print(f"[Research Agent]   Strategy 3: StackShare/BuiltWith search...")
-                result = self.serper.search(query)
+                result = await self.serper.search(query)
 
                 if result and "organic" in result:
                     for item in result["organic"][:3]:
@@ -247,7 +247,7 @@ class ResearchAgentService:
             # Strategy 1: Search LinkedIn jobs
             if company.company_linkedin_url:
                 query = f"site:linkedin.com/jobs {company.name}"
-                result = self.serper.search(query)
+                result = await self.serper.search(query)
 
                 if result and "organic" in result:
                     # Count number of job listing results
@@ -258,7 +258,7 @@ class ResearchAgentService:
             # Strategy 2: Search for career page mentions
             if company.domain:
                 query = f"{company.name} careers OR jobs hiring"
-                result = self.serper.search(query)
+                result = await self.serper.search(query)
 
                 if result and "organic" in result:
                     # Look for job count mentions in snippets
@@ -295,7 +295,7 @@ class ResearchAgentService:
         try:
             query = f"\"{company.name}\" (raised OR funding OR investment OR Series A OR Series B OR Series C OR seed)"
             print(f"[Research Agent]   Checking funding announcements...")
-            result = self.serper.search(query)
+            result = await self.serper.search(query)
 
             if result and "organic" in result:
                 for item in result["organic"][:5]:
@@ -343,7 +343,7 @@ class ResearchAgentService:
         try:
             query = f"\"{company.name}\" (launched OR announces OR unveils OR releases OR expands OR new product)"
             print(f"[Research Agent]   Checking product launches/expansion...")
-            result = self.serper.search(query)
+            result = await self.serper.search(query)
 
             if result and "organic" in result:
                 for item in result["organic"][:3]:
@@ -375,7 +375,7 @@ class ResearchAgentService:
         try:
             query = f"\"{company.name}\" (award OR recognition OR ranked OR named OR best)"
             print(f"[Research Agent]   Checking awards/recognition...")
-            result = self.serper.search(query)
+            result = await self.serper.search(query)
 
             if result and "organic" in result:
                 for item in result["organic"][:2]:
@@ -412,7 +412,7 @@ class ResearchAgentService:
 
             for keyword in ai_keywords[:3]:  # Check top 3 keywords
                 query = f"site:linkedin.com/jobs {company.name} {keyword}"
-                result = self.serper.search(query)
+                result = await self.serper.search(query)
 
                 if result and "organic" in result:
                     count = len(result["organic"])
@@ -443,7 +443,7 @@ class ResearchAgentService:
         try:
             # Search for AI usage mentions
             query = f"{company.name} using AI OR AI implementation OR adopted AI"
-            result = self.serper.search(query)
+            result = await self.serper.search(query)
 
             if result and "organic" in result:
                 for item in result["organic"][:3]:
@@ -477,7 +477,7 @@ class ResearchAgentService:
         try:
             # Search for AI products
             query = f"{company.name} AI product OR AI platform OR AI feature OR machine learning"
-            result = self.serper.search(query)
+            result = await self.serper.search(query)
 
             if result and "organic" in result:
                 for item in result["organic"][:3]:
@@ -644,7 +644,7 @@ class ResearchAgentService:
 
         try:
             query = f"site:twitter.com \"{lead.contact_first_name} {lead.contact_last_name}\" {lead.contact_company or ''}"
-            result = self.serper.search(query)
+            result = await self.serper.search(query)
 
             if result and "organic" in result:
                 for item in result["organic"][:2]:
@@ -664,7 +664,7 @@ class ResearchAgentService:
 
         try:
             query = f"\"{lead.contact_first_name} {lead.contact_last_name}\" {lead.contact_company or ''} location"
-            result = self.serper.search(query)
+            result = await self.serper.search(query)
 
             if result and "organic" in result:
                 snippet = result["organic"][0].get("snippet", "")
@@ -686,7 +686,7 @@ class ResearchAgentService:
 
         try:
             query = f"\"{lead.contact_first_name} {lead.contact_last_name}\" {lead.contact_company or ''} LinkedIn post"
-            result = self.serper.search(query)
+            result = await self.serper.search(query)
 
             if result and "organic" in result:
                 for item in result["organic"][:2]:
@@ -705,7 +705,7 @@ class ResearchAgentService:
 
         try:
             query = f"\"{lead.contact_first_name} {lead.contact_last_name}\" article OR blog OR talk OR speaking"
-            result = self.serper.search(query)
+            result = await self.serper.search(query)
 
             if result and "organic" in result:
                 content_items = []
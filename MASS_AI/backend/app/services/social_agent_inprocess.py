@@ -85,7 +85,7 @@ async def _research_social_profiles(self, lead) -> Optional[dict]:
     try:
         if lead.contact_email and hasattr(self, "hunter"):
             try:
-                hv = self.hunter.email_verifier(lead.contact_email)
+                hv = await self.hunter.email_verifier(lead.contact_email)
                 # FakeHunter returns {"result":"deliverable"} in tests; real Hunter returns more structured JSON
                 deliverable = False
                 if isinstance(hv, dict):
@@ -192,7 +192,7 @@ async def _research_social_profiles(self, lead) -> Optional[dict]:
             q = None
 
         if q:
-            result = self.serper.search(q)
+            result = await self.serper.search(q)
             await _sleep_brief()
             if result and "organic" in result:
                 for item in result["organic"][:4]:
@@ -222,7 +222,7 @@ async def _research_social_profiles(self, lead) -> Optional[dict]:
             local = lead.contact_email.split("@", 1)[0]
             q = f'site:github.com "{local}" {company or ""}'
         if q:
-            result = self.serper.search(q)
+            result = await self.serper.search(q)
             await _sleep_brief()
             if result and "organic" in result:
                 for item in result["organic"][:4]:
@@ -249,7 +249,7 @@ async def _research_social_profiles(self, lead) -> Optional[dict]:
             q = f'"{local}" {company or ""} (article OR blog OR talk OR medium.com OR youtube.com)'
 
         if q:
-            result = self.serper.search(q)
+            result = await self.serper.search(q)
             await _sleep_brief()
             if result and "organic" in result:
                 content_items = []
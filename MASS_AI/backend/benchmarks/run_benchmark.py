@@ -0,0 +1,266 @@
+"""
+End-to-end load benchmark against the offline provider stand-in.
+
+Drives N concurrent sessions through the backend's public API. Each session
+runs the conversation endpoints (start, respond, finalize), then
+/normalize-icp, /companies and /leads. The report gives:
+
+    - per-endpoint latency (p50/p95/p99, errors)
+    - sessions and leads per second
+    - provider calls per lead (read from the stand-in's /_stats)
+
+With --launch the stand-in and the backend are started as subprocesses (the
+backend pointed at the stand-in through environment overrides) and stopped
+afterwards; otherwise both must already be running at --backend-url and
+--standin-url.
+
+Results are written as JSON. --save-baseline stores them as
+benchmarks/baseline.json; later runs print their change against it.
+
+Run from backend/:
+    python -m benchmarks.run_benchmark --launch --sessions 10 --concurrency 5
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from .standin_server import backend_environment
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(HERE)
+BASELINE_PATH = os.path.join(HERE, "baseline.json")
+
+ICP_TEXTS = [
+    "CTOs and VPs of Engineering at US SaaS companies with 50-500 employees",
+    "Heads of engineering at B2B software companies in the United States, 100 to 400 staff",
+    "Technical leaders (CTO, VP Engineering) at mid-sized American SaaS vendors",
+    "Engineering executives at venture-backed US software firms with 50+ employees",
+]
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile (same definition as app.core.latency)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+class Recorder:
+    """Latency and status of every call, per endpoint."""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+
+    async def call(self, client: httpx.AsyncClient, endpoint: str, method: str, url: str, **kwargs) -> Optional[Dict[str, Any]]:
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.HTTPError as e:
+            print(f"[Benchmark] {endpoint} failed: {e}")
+            response = None
+        self.latencies.setdefault(endpoint, []).append(time.perf_counter() - started)
+        if response is None or response.status_code >= 400:
+            self.errors[endpoint] = self.errors.get(endpoint, 0) + 1
+            return None
+        return response.json()
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            endpoint: {
+                "requests": len(values),
+                "errors": self.errors.get(endpoint, 0),
+                "p50_ms": round(percentile(values, 50) * 1000, 1),
+                "p95_ms": round(percentile(values, 95) * 1000, 1),
+                "p99_ms": round(percentile(values, 99) * 1000, 1),
+            }
+            for endpoint, values in self.latencies.items()
+        }
+
+
+async def run_session(client: httpx.AsyncClient, recorder: Recorder, index: int, args) -> int:
+    """One user's journey; returns the number of leads it produced."""
+    icp_text = f"{ICP_TEXTS[index % len(ICP_TEXTS)]} (benchmark session {index})"
+
+    started = await recorder.call(client, "conversation_start", "POST", "/icp/conversation/start",
+                                  json={"initial_text": icp_text, "mode": "conversational", "max_turns": 3})
+    if started:
+        conversation_id = started["conversation_id"]
+        await recorder.call(client, "conversation_respond", "POST", f"/icp/conversation/{conversation_id}/respond",
+                            json={"answer": "Revenue between $1M and $50M, mostly Series A and B"})
+        await recorder.call(client, "conversation_finalize", "POST", f"/icp/conversation/{conversation_id}/finalize",
+                            json={"force_complete": True})
+
+    normalized = await recorder.call(client, "normalize_icp", "POST", "/normalize-icp", json={"icp_text": icp_text})
+    if not normalized or not normalized.get("icp_config"):
+        return 0
+    session_id = normalized.get("session_id")
+
+    companies = await recorder.call(client, "companies", "POST", "/companies", json={
+        "icp_config": normalized["icp_config"], "limit": args.companies, "session_id": session_id,
+    })
+    if not companies or not companies.get("companies"):
+        return 0
+
+    leads = await recorder.call(client, "leads", "POST", "/leads", json={
+        "companies": [
+            {key: c.get(key) for key in ("id", "organization_id", "name", "domain")}
+            for c in companies["companies"]
+        ],
+        "personas": normalized["icp_config"].get("personas"),
+        "max_leads_per_company": args.leads_per_company,
+        "session_id": session_id,
+    })
+    return (leads or {}).get("total_leads", 0)
+
+
+async def run(args) -> Dict[str, Any]:
+    recorder = Recorder()
+    semaphore = asyncio.Semaphore(args.concurrency)
+    timeout = httpx.Timeout(args.timeout)
+
+    async with httpx.AsyncClient(base_url=args.standin_url, timeout=timeout) as standin:
+        await standin.post("/_stats/reset")
+
+    async with httpx.AsyncClient(base_url=args.backend_url, timeout=timeout) as client:
+        async def limited(index: int) -> int:
+            async with semaphore:
+                return await run_session(client, recorder, index, args)
+
+        started = time.perf_counter()
+        leads = await asyncio.gather(*(limited(i) for i in range(args.sessions)))
+        elapsed = time.perf_counter() - started
+
+    async with httpx.AsyncClient(base_url=args.standin_url, timeout=timeout) as standin:
+        provider_stats = (await standin.get("/_stats")).json()
+
+    total_leads = sum(leads)
+    provider_calls = {name: count for name, count in provider_stats["calls"].items() if name != "supabase"}
+    return {
+        "config": {
+            "sessions": args.sessions, "concurrency": args.concurrency,
+            "companies_per_session": args.companies, "leads_per_company": args.leads_per_company,
+            "profile": os.path.relpath(args.profile, BACKEND_DIR) if args.profile else None,
+        },
+        "elapsed_seconds": round(elapsed, 2),
+        "sessions_per_second": round(args.sessions / elapsed, 3),
+        "total_leads": total_leads,
+        "leads_per_second": round(total_leads / elapsed, 2),
+        "endpoints": recorder.summary(),
+        "provider_calls": provider_calls,
+        "provider_statuses": provider_stats["statuses"],
+        "provider_calls_per_lead": {
+            name: round(count / total_leads, 3) for name, count in provider_calls.items()
+        } if total_leads else {},
+    }
+
+
+def compare(result: Dict[str, Any], baseline: Dict[str, Any]) -> List[str]:
+    """Human-readable change of the headline numbers against a baseline."""
+    def change(new, old) -> str:
+        if not old:
+            return f"{new}"
+        return f"{new} ({(new - old) / old * 100:+.1f}%)"
+
+    lines = [
+        f"leads/s        {change(result['leads_per_second'], baseline.get('leads_per_second'))}",
+        f"sessions/s     {change(result['sessions_per_second'], baseline.get('sessions_per_second'))}",
+    ]
+    for endpoint, stats in result["endpoints"].items():
+        old = baseline.get("endpoints", {}).get(endpoint, {})
+        lines.append(f"{endpoint:<22} p95 {change(stats['p95_ms'], old.get('p95_ms'))} ms")
+    for name, per_lead in result["provider_calls_per_lead"].items():
+        old = baseline.get("provider_calls_per_lead", {}).get(name)
+        lines.append(f"{name:<12} calls/lead {change(per_lead, old)}")
+    return lines
+
+
+def _wait_until_up(url: str, deadline: float) -> None:
+    while time.time() < deadline:
+        try:
+            if httpx.get(url, timeout=1.0).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"{url} did not come up")
+
+
+def launch(args) -> List[subprocess.Popen]:
+    """Start the stand-in and a backend pointed at it."""
+    standin_port = args.standin_url.rsplit(":", 1)[-1].rstrip("/")
+    backend_port = args.backend_url.rsplit(":", 1)[-1].rstrip("/")
+    log = open(os.path.join(HERE, "benchmark_servers.log"), "w")
+
+    standin_cmd = [sys.executable, "-m", "benchmarks.standin_server", "--port", standin_port]
+    if args.profile:
+        standin_cmd += ["--profile", args.profile]
+    env = {**os.environ, **backend_environment(args.standin_url), **dict(args.env or [])}
+    processes = [
+        subprocess.Popen(standin_cmd, cwd=BACKEND_DIR, stdout=log, stderr=subprocess.STDOUT),
+        subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "main:app", "--port", backend_port, "--log-level", "warning"],
+            cwd=BACKEND_DIR, env=env, stdout=log, stderr=subprocess.STDOUT,
+        ),
+    ]
+    deadline = time.time() + 60
+    _wait_until_up(f"{args.standin_url}/_stats", deadline)
+    _wait_until_up(f"{args.backend_url}/health", deadline)
+    return processes
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="End-to-end load benchmark against the provider stand-in")
+    parser.add_argument("--backend-url", default="http://127.0.0.1:8800")
+    parser.add_argument("--standin-url", default="http://127.0.0.1:8900")
+    parser.add_argument("--launch", action="store_true", help="start the stand-in and backend as subprocesses")
+    parser.add_argument("--profile", default=os.path.join(HERE, "profiles", "default.json"))
+    parser.add_argument("--env", nargs=2, action="append", metavar=("NAME", "VALUE"),
+                        help="extra backend environment variable (with --launch)")
+    parser.add_argument("--sessions", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=5)
+    parser.add_argument("--companies", type=int, default=10, help="companies requested per session")
+    parser.add_argument("--leads-per-company", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=300.0)
+    parser.add_argument("--output", default=os.path.join(HERE, "results", "latest.json"))
+    parser.add_argument("--save-baseline", action="store_true", help=f"also write the results to {BASELINE_PATH}")
+    args = parser.parse_args()
+
+    processes = launch(args) if args.launch else []
+    try:
+        result = asyncio.run(run(args))
+    finally:
+        for process in processes:
+            process.terminate()
+            process.wait(timeout=10)
+
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(result, f, indent=2)
+    print(json.dumps(result, indent=2))
+    print(f"[Benchmark] Results written to {args.output}")
+
+    if os.path.exists(BASELINE_PATH) and not args.save_baseline:
+        with open(BASELINE_PATH) as f:
+            baseline = json.load(f)
+        print("[Benchmark] Against baseline:")
+        for line in compare(result, baseline):
+            print(f"  {line}")
+    if args.save_baseline:
+        with open(BASELINE_PATH, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"[Benchmark] Baseline saved to {BASELINE_PATH}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,517 @@
+"""
+Offline stand-in for every external provider the backend calls.
+
+One FastAPI app serves Apollo (companies/people search), CoreSignal (enrich,
+collect, search, es_dsl), EnrichLayer, Hunter, Serper, Mistral (plain and
+streamed chat completions) and the small part of Supabase's REST API the
+backend uses, so a full ICP -> companies -> leads run can be load-tested
+without network access or paid calls.
+
+Each provider's behaviour comes from a JSON profile (see profiles/default.json):
+
+    latency_ms       {"p50": 150, "p99": 900} - log-normal latency per call
+    error_rate       share of calls answered with a 500
+    rate_per_second  token-bucket limit; calls beyond it get a 429
+    burst            bucket size (defaults to rate_per_second)
+    retry_after      Retry-After seconds sent with a 429
+
+Responses are deterministic for a given request so runs are comparable.
+GET /_stats returns per-provider call counts (POST /_stats/reset clears them)
+for the benchmark's provider-calls-per-lead figures.
+
+Run from backend/:
+    python -m benchmarks.standin_server --port 8900 --profile benchmarks/profiles/default.json
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import random
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+DEFAULT_PROFILE: Dict[str, Any] = {
+    "seed": 7,
+    "apollo_total_companies": 500,
+    "people_per_company": 6,
+    "providers": {
+        "apollo": {"latency_ms": {"p50": 250, "p99": 1200}, "error_rate": 0.0, "rate_per_second": 20},
+        "coresignal": {"latency_ms": {"p50": 300, "p99": 1500}, "error_rate": 0.01},
+        "enrichlayer": {"latency_ms": {"p50": 400, "p99": 2000}, "error_rate": 0.01},
+        "hunter": {"latency_ms": {"p50": 200, "p99": 900}, "error_rate": 0.0},
+        "serper": {"latency_ms": {"p50": 150, "p99": 700}, "error_rate": 0.0},
+        "mistral": {"latency_ms": {"p50": 900, "p99": 3500}, "error_rate": 0.0, "rate_per_second": 10},
+        "supabase": {"latency_ms": {"p50": 5, "p99": 30}, "error_rate": 0.0},
+    },
+}
+
+TITLES = [
+    "Chief Technology Officer", "VP of Engineering", "Head of Sales", "Director of Marketing",
+    "Chief Executive Officer", "Engineering Manager", "VP Sales", "Chief Financial Officer",
+]
+FIRST_NAMES = ["Alex", "Sam", "Jordan", "Taylor", "Morgan", "Casey", "Riley", "Jamie"]
+LAST_NAMES = ["Rivera", "Chen", "Okafor", "Novak", "Silva", "Larsen", "Haddad", "Kim"]
+INDUSTRIES = ["Computer Software", "Information Technology & Services", "Financial Services", "Marketing & Advertising"]
+
+ICP_CONFIG = {
+    "personas": [
+        {"name": "CTO", "title_regex": ["^(Chief Technology Officer|CTO).*$"], "seniority": ["Executive"], "functions": ["Engineering"]},
+        {"name": "VP Engineering", "title_regex": ["^(VP|Vice President).*Engineering.*$"], "seniority": ["Executive"], "functions": ["Engineering"]},
+    ],
+    "company_filters": {
+        "employee_count": {"min": 50, "max": 500}, "arr_usd": {"min": None, "max": None},
+        "industries": ["Computer Software"], "locations": None, "cities": None, "states": None,
+        "countries": ["United States"], "founded_year_min": None, "founded_year_max": None,
+        "company_types": None, "technologies": None, "funding_stage": None, "total_funding_min": None,
+        "total_funding_max": None, "company_size": None, "keywords": ["SaaS"], "exclude_keywords": None,
+    },
+    "signals_required": [],
+    "negative_keywords": [],
+    "required_fields_for_qualify": ["domain", "industry", "employee_count_band", "revenue_band", "company_linkedin_url"],
+    "contact_persona_targets": {"per_company_min": 3, "per_company_max": 5, "persona_order": ["CTO", "VP Engineering"]},
+    "stage_overrides": {
+        "budget_cap_per_lead_usd": 1.5, "finder_pct": 10, "research_pct": 35, "contacts_pct": 25,
+        "verify_pct": 20, "synthesis_pct": 5, "intent_pct": 5,
+    },
+}
+
+ROUTING_DECISION = {
+    "scores": {"specificity": 0.85, "mappability": 0.8, "stability": 0.2},
+    "route": "structured",
+    "route_reason": "Firmographic filters map directly to structured APIs",
+    "research_plan": {
+        "themes": ["SaaS"], "hard_filters": {"employee_count": {"min": 50, "max": 500}, "countries": ["United States"]},
+        "time_windows": {"recency_months_default": 12, "jobs_months": 3, "tech_adoption_months": 18},
+        "evidence_requirements": ["headcount|source:any|required"],
+        "seed_strategies": ["events_news"], "personas": ["CTO", "VP Engineering"], "notes": "",
+    },
+}
+
+
+def _stable_int(*parts: Any) -> int:
+    digest = hashlib.sha1("|".join(str(p) for p in parts).encode()).hexdigest()
+    return int(digest[:12], 16)
+
+
+def _company(index: int) -> Dict[str, Any]:
+    """Apollo organization row number `index` (same data every run)."""
+    rng = random.Random(index)
+    slug = f"standin-{index}"
+    domain = f"{slug}.example.com"
+    return {
+        "id": f"org-{index}",
+        "organization_id": f"org-{index}",
+        "name": f"Standin Systems {index}",
+        "primary_domain": domain,
+        "website_url": f"https://{domain}",
+        "linkedin_url": f"https://www.linkedin.com/company/{slug}",
+        "industry": INDUSTRIES[index % len(INDUSTRIES)],
+        "estimated_num_employees": rng.randint(50, 500),
+        "organization_revenue_printed": f"{rng.randint(5, 90)}M",
+        "founded_year": rng.randint(1995, 2021),
+        "city": "Austin", "state": "Texas", "country": "United States",
+        "keywords": ["saas", "b2b"],
+    }
+
+
+def _person(org_id: str, index: int) -> Dict[str, Any]:
+    n = _stable_int(org_id, index)
+    first, last = FIRST_NAMES[n % len(FIRST_NAMES)], LAST_NAMES[(n // 7) % len(LAST_NAMES)]
+    domain = org_id.replace("org-", "standin-") + ".example.com"
+    return {
+        "id": f"{org_id}-p{index}",
+        "first_name": first,
+        "last_name": last,
+        "title": TITLES[(n // 13) % len(TITLES)],
+        "email": f"{first.lower()}.{last.lower()}@{domain}",
+        "linkedin_url": f"https://www.linkedin.com/in/{first.lower()}-{last.lower()}-{n % 10000}",
+        "organization_id": org_id,
+        "organization": {"id": org_id, "name": f"Standin Systems {org_id.split('-')[-1]}"},
+        "city": "Austin", "state": "Texas", "country": "United States",
+    }
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.capacity = max(1.0, burst)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def take(self) -> bool:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+
+class ProviderBehaviour:
+    """Latency, error and 429 behaviour of one stand-in provider."""
+
+    def __init__(self, name: str, config: Dict[str, Any], rng: random.Random):
+        self.name = name
+        latency = config.get("latency_ms") or {}
+        p50 = max(0.0, float(latency.get("p50", 0)))
+        p99 = max(p50, float(latency.get("p99", p50)))
+        self.mu = math.log(p50) if p50 > 0 else None
+        # p99 of a log-normal is exp(mu + 2.326 * sigma)
+        self.sigma = math.log(p99 / p50) / 2.326 if p50 > 0 else 0.0
+        self.error_rate = float(config.get("error_rate", 0.0))
+        rate = config.get("rate_per_second")
+        self.bucket = TokenBucket(float(rate), float(config.get("burst", rate))) if rate else None
+        self.retry_after = config.get("retry_after", 1)
+        self.rng = rng
+
+    async def apply(self) -> Optional[JSONResponse]:
+        """Sleep for a sampled latency; return an error response when the call should fail."""
+        if self.bucket is not None and not self.bucket.take():
+            return JSONResponse({"error": "rate limited"}, status_code=429, headers={"Retry-After": str(self.retry_after)})
+        if self.mu is not None:
+            await asyncio.sleep(self.rng.lognormvariate(self.mu, self.sigma) / 1000.0)
+        if self.error_rate and self.rng.random() < self.error_rate:
+            return JSONResponse({"error": "stand-in injected failure"}, status_code=500)
+        return None
+
+
+def _mistral_content(prompt: str) -> Dict[str, Any]:
+    """Answer a backend prompt with the JSON shape its caller parses."""
+    if "routing judge" in prompt:
+        return ROUTING_DECISION
+    if "converting natural language Ideal Customer Profile" in prompt:
+        return ICP_CONFIG
+    if "In ONE response" in prompt:
+        return {
+            "extracted": {"company_filters": {"arr_usd": {"min": 1000000, "max": 50000000}}},
+            "question": {"message": "", "asks_about": []},
+        }
+    if "Extract ICP fields" in prompt:
+        return {"company_filters": {"arr_usd": {"min": 1000000, "max": 50000000}}}
+    if "Evaluate if this ICP configuration is complete" in prompt:
+        return {"is_complete": True, "confidence_score": 0.9, "critical_missing": [], "important_missing": [], "reason": "ok"}
+    if "You still need" in prompt:
+        return {"message": "Great start! Roughly what revenue range should these companies have?"}
+    return {}
+
+
+def create_app(profile: Optional[Dict[str, Any]] = None) -> FastAPI:
+    profile = {**DEFAULT_PROFILE, **(profile or {})}
+    providers_config = {**DEFAULT_PROFILE["providers"], **(profile.get("providers") or {})}
+    rng = random.Random(profile.get("seed"))
+    behaviour = {name: ProviderBehaviour(name, config, rng) for name, config in providers_config.items()}
+    total_companies = int(profile["apollo_total_companies"])
+    people_per_company = int(profile["people_per_company"])
+
+    calls: Dict[str, int] = defaultdict(int)
+    statuses: Dict[str, Dict[int, int]] = defaultdict(lambda: defaultdict(int))
+    tables: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+
+    app = FastAPI(title="Provider stand-in")
+
+    async def handle(provider: str, build) -> Any:
+        calls[provider] += 1
+        failure = await behaviour[provider].apply()
+        if failure is not None:
+            statuses[provider][failure.status_code] += 1
+            return failure
+        statuses[provider][200] += 1
+        return build()
+
+    # --- Apollo -------------------------------------------------------------
+
+    @app.post("/apollo/api/v1/mixed_companies/search")
+    async def apollo_companies(request: Request):
+        body = await request.json()
+
+        def build():
+            domains = body.get("q_organization_domains")
+            if domains:
+                rows = [_company(int(d.split(".")[0].split("-")[-1])) for d in domains if d.startswith("standin-")]
+                return {"organizations": rows, "pagination": {"page": 1, "per_page": len(rows), "total_entries": len(rows), "total_pages": 1}}
+            per_page = int(body.get("per_page") or 25)
+            page = int(body.get("page") or 1)
+            start = (page - 1) * per_page
+            rows = [_company(i) for i in range(start, min(start + per_page, total_companies))]
+            return {
+                "organizations": rows,
+                "pagination": {
+                    "page": page, "per_page": per_page, "total_entries": total_companies,
+                    "total_pages": math.ceil(total_companies / per_page),
+                },
+            }
+
+        return await handle("apollo", build)
+
+    @app.post("/apollo/api/v1/mixed_people/search")
+    async def apollo_people(request: Request):
+        body = await request.json()
+
+        def build():
+            org_ids = body.get("organization_ids") or []
+            per_page = int(body.get("per_page") or 25)
+            page = int(body.get("page") or 1)
+            everyone = [_person(org_id, i) for i in range(people_per_company) for org_id in org_ids]
+            start = (page - 1) * per_page
+            return {
+                "people": everyone[start:start + per_page],
+                "contacts": [],
+                "pagination": {
+                    "page": page, "per_page": per_page, "total_entries": len(everyone),
+                    "total_pages": math.ceil(len(everyone) / per_page) if per_page else 0,
+                },
+            }
+
+        return await handle("apollo", build)
+
+    # --- CoreSignal ---------------------------------------------------------
+
+    def coresignal_company(website: str) -> Dict[str, Any]:
+        name = website.split("//")[-1].split("/")[0].replace("www.", "")
+        return {
+            "id": _stable_int(name) % 10_000_000,
+            "name": name.split(".")[0].replace("-", " ").title(),
+            "websites_main": f"https://{name}",
+            "website": f"https://{name}",
+            "industry": "Software Development",
+            "size_range": "51-200 employees",
+            "employees_count": 120,
+            "founded": "2012",
+            "description": f"{name} builds software for modern revenue teams.",
+            "hq_city": "Austin", "hq_country": "United States",
+        }
+
+    @app.get("/coresignal/cdapi/v2/company_clean/enrich")
+    async def coresignal_enrich(website: str = ""):
+        return await handle("coresignal", lambda: coresignal_company(website or "unknown.example.com"))
+
+    @app.get("/coresignal/cdapi/v2/company_clean/collect/{company_id}")
+    async def coresignal_collect(company_id: str):
+        return await handle("coresignal", lambda: coresignal_company(f"{company_id}.example.com"))
+
+    async def coresignal_hits(request: Request):
+        body = json.dumps(await request.json())
+        linkedin = [part for part in body.split('"') if "linkedin.com/company/" in part]
+
+        def build():
+            hits = []
+            for url in linkedin:
+                source = coresignal_company(url.rstrip("/").split("/")[-1] + ".example.com")
+                source["websites_professional_network"] = url
+                hits.append({"_source": source, "_score": 12.5})
+            return {"hits": {"hits": hits}}
+
+        return await handle("coresignal", build)
+
+    app.post("/coresignal/cdapi/v2/company_clean/search")(coresignal_hits)
+    app.post("/coresignal/cdapi/v2/company_clean/search/es_dsl")(coresignal_hits)
+
+    # --- EnrichLayer --------------------------------------------------------
+
+    @app.get("/enrichlayer/api/v2/company")
+    async def enrichlayer(url: str = ""):
+        slug = url.rstrip("/").split("/")[-1] or "unknown"
+
+        def build():
+            return {
+                "name": slug.replace("-", " ").title(),
+                "description": f"{slug} helps B2B teams grow.",
+                "website": f"https://{slug}.example.com",
+                "industry": "Software Development",
+                "hq": {"city": "Austin", "country": "US"},
+                "company_size_on_linkedin": 140,
+                "follower_count": 2300,
+            }
+
+        return await handle("enrichlayer", build)
+
+    # --- Hunter -------------------------------------------------------------
+
+    @app.get("/hunter/v2/domain-search")
+    async def hunter_domain_search(domain: str = ""):
+        def build():
+            emails = []
+            for i in range(3):
+                person = _person("org-" + domain.split(".")[0].split("-")[-1], i)
+                emails.append({
+                    "value": f"{person['first_name'].lower()}@{domain}", "first_name": person["first_name"],
+                    "last_name": person["last_name"], "position": person["title"], "confidence": 90,
+                })
+            return {"data": {"domain": domain, "pattern": "{first}", "emails": emails}}
+
+        return await handle("hunter", build)
+
+    @app.get("/hunter/v2/email-finder")
+    async def hunter_email_finder(domain: str = "", first_name: str = "", last_name: str = ""):
+        return await handle("hunter", lambda: {"data": {"email": f"{first_name.lower()}@{domain}", "score": 88}})
+
+    @app.get("/hunter/v2/email-verifier")
+    async def hunter_email_verifier(email: str = ""):
+        return await handle("hunter", lambda: {"data": {"email": email, "status": "valid", "result": "deliverable", "score": 92}})
+
+    # --- Serper -------------------------------------------------------------
+
+    async def serper(request: Request, key: str):
+        query = (await request.json()).get("q", "")
+
+        def build():
+            items = [{
+                "title": f"{query} - result {i}", "link": f"https://news.example.com/{_stable_int(query, i) % 100000}",
+                "snippet": f"{query} announced a new product line and expanded its team.", "date": "2 days ago",
+            } for i in range(3)]
+            return {"searchParameters": {"q": query}, key: items}
+
+        return await handle("serper", build)
+
+    @app.post("/serper/search")
+    async def serper_search(request: Request):
+        return await serper(request, "organic")
+
+    @app.post("/serper/news")
+    async def serper_news(request: Request):
+        return await serper(request, "news")
+
+    @app.post("/serper/location")
+    async def serper_location(request: Request):
+        return await serper(request, "places")
+
+    # --- Mistral ------------------------------------------------------------
+
+    @app.post("/mistral/v1/chat/completions")
+    async def mistral(request: Request):
+        body = await request.json()
+        prompt = body["messages"][-1]["content"]
+        content = json.dumps(_mistral_content(prompt))
+
+        if not body.get("stream"):
+            return await handle("mistral", lambda: {
+                "id": "standin", "object": "chat.completion",
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            })
+
+        result = await handle("mistral", lambda: None)
+        if result is not None:
+            return result
+
+        async def events():
+            for start in range(0, len(content), 24):
+                chunk = {"choices": [{"index": 0, "delta": {"content": content[start:start + 24]}}]}
+                yield f"data: {json.dumps(chunk)}\n\n"
+                await asyncio.sleep(0.005)
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    # --- Supabase (PostgREST subset: insert, select/eq/order/limit, update/eq) --
+
+    def matches(row: Dict[str, Any], filters: Dict[str, str]) -> bool:
+        return all(str(row.get(column)) == value[3:] for column, value in filters.items() if value.startswith("eq."))
+
+    def filters_of(request: Request) -> Dict[str, str]:
+        return {k: v for k, v in request.query_params.items() if k not in ("select", "order", "limit", "offset")}
+
+    @app.post("/supabase/rest/v1/{table}")
+    async def supabase_insert(table: str, request: Request):
+        body = await request.json()
+        rows = body if isinstance(body, list) else [body]
+
+        def build():
+            for row in rows:
+                row.setdefault("id", len(tables[table]) + 1)
+                tables[table].append(row)
+            return JSONResponse(rows, status_code=201)
+
+        return await handle("supabase", build)
+
+    @app.get("/supabase/rest/v1/{table}")
+    async def supabase_select(table: str, request: Request):
+        def build():
+            rows = [row for row in tables[table] if matches(row, filters_of(request))]
+            order = request.query_params.get("order")
+            if order:
+                column, _, direction = order.partition(".")
+                rows.sort(key=lambda r: str(r.get(column)), reverse=direction.startswith("desc"))
+            limit = request.query_params.get("limit")
+            return rows[:int(limit)] if limit else rows
+
+        return await handle("supabase", build)
+
+    @app.patch("/supabase/rest/v1/{table}")
+    async def supabase_update(table: str, request: Request):
+        changes = await request.json()
+
+        def build():
+            updated = []
+            for row in tables[table]:
+                if matches(row, filters_of(request)):
+                    row.update(changes)
+                    updated.append(row)
+            return updated
+
+        return await handle("supabase", build)
+
+    # --- Stats --------------------------------------------------------------
+
+    @app.get("/_stats")
+    async def stats():
+        return {
+            "calls": dict(calls),
+            "statuses": {provider: dict(codes) for provider, codes in statuses.items()},
+        }
+
+    @app.post("/_stats/reset")
+    async def reset_stats():
+        calls.clear()
+        statuses.clear()
+        return {"ok": True}
+
+    return app
+
+
+def backend_environment(base_url: str) -> Dict[str, str]:
+    """Environment that points the backend at a stand-in served from base_url."""
+    return {
+        "MISTRAL_API_KEY": "standin", "APOLLO_API_KEY": "standin", "CORESIGNAL_API_KEY": "standin",
+        "ENRICH_LAYER": "standin", "HUNTER_IO_API_KEY": "standin", "SERPER_API_KEY": "standin",
+        "SUPABASE_URL": f"{base_url}/supabase", "SUPABASE_KEY": "standin",
+        "MISTRAL_API_URL": f"{base_url}/mistral/v1/chat/completions",
+        "APOLLO_SEARCH_URL": f"{base_url}/apollo/api/v1/mixed_companies/search",
+        "APOLLO_PEOPLE_URL": f"{base_url}/apollo/api/v1/mixed_people/search",
+        "CORESIGNAL_API_URL": f"{base_url}/coresignal/cdapi/v2/company_clean/enrich",
+        "CORESIGNAL_SEARCH_URL": f"{base_url}/coresignal/cdapi/v2/company_clean/search",
+        "CORESIGNAL_COLLECT_URL": f"{base_url}/coresignal/cdapi/v2/company_clean/collect",
+        "CORESIGNAL_ES_DSL_URL": f"{base_url}/coresignal/cdapi/v2/company_clean/search/es_dsl",
+        "ENRICHLAYER_API_URL": f"{base_url}/enrichlayer/api/v2/company",
+        "HUNTER_API_URL": f"{base_url}/hunter/v2",
+        "SERPER_API_URL": f"{base_url}/serper",
+        "MISTRAL_RATE_LIMIT_SECONDS": "0",
+    }
+
+
+def load_profile(path: Optional[str]) -> Dict[str, Any]:
+    if not path:
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Offline provider stand-in server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--profile", help="JSON latency/error profile")
+    args = parser.parse_args()
+
+    uvicorn.run(create_app(load_profile(args.profile)), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -22,6 +22,17 @@ def set_env_vars():
     os.environ.pop("SUPABASE_KEY", None)
 
 
+@pytest.fixture(scope="session", autouse=True)
+def journey_log_dir(tmp_path_factory):
+    """Write the journey CSVs to a temp dir, not the tracked files under logs/."""
+    from app.core.logger import ICPJourneyLogger, journey_logger
+    scratch = ICPJourneyLogger(log_dir=str(tmp_path_factory.mktemp("logs")))
+    with pytest.MonkeyPatch.context() as mp:
+        for attr in ("log_dir", "icp_log_file", "companies_log_file", "leads_log_file"):
+            mp.setattr(journey_logger, attr, getattr(scratch, attr))
+        yield
+
+
 @pytest.fixture(scope="session")
 def app():
     """ 
@@ -54,6 +65,9 @@ def clean_test_env(monkeypatch):
     for all tests to avoid live requests.
     """
     monkeypatch.setenv("ENV", "test")
+    # Tests that exercise checkpoints enable them with their own store
+    from app.core.config import settings
+    monkeypatch.setattr(settings, "CHECKPOINTS_ENABLED", False)
     # Example patch: disable analytics, external logging, etc.
     # monkeypatch.setattr("app.utils.analytics.track_event", lambda *_, **__: None)
     yield
@@ -0,0 +1,100 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.clients.http import provider_request
+from app.core.config import settings
+from app.core.latency import provider_latency
+
+
+@pytest.fixture(autouse=True)
+def latency(monkeypatch):
+    monkeypatch.setattr(settings, "ADAPTIVE_TIMEOUTS_ENABLED", True)
+    monkeypatch.setattr(settings, "LATENCY_MIN_SAMPLES", 5)
+    monkeypatch.setattr(settings, "ADAPTIVE_TIMEOUT_MIN_SECONDS", 0.5)
+    provider_latency.reset()
+    yield provider_latency
+    provider_latency.reset()
+
+
+def _warm(provider, seconds, count=10):
+    for _ in range(count):
+        provider_latency.record(provider, seconds)
+
+
+def test_timeout_follows_tail_latency_within_bounds():
+    assert provider_latency.timeout_for("coresignal", 10.0) == 10.0  # not enough samples yet
+
+    _warm("coresignal", 1.0)
+    assert provider_latency.timeout_for("coresignal", 10.0) == pytest.approx(1.5)
+
+    _warm("slow", 20.0)
+    assert provider_latency.timeout_for("slow", 10.0) == 10.0  # never above the configured timeout
+
+    _warm("fast", 0.01)
+    assert provider_latency.timeout_for("fast", 10.0) == 0.5
+
+
+def test_timeouts_push_the_histogram_up():
+    _warm("coresignal", 1.0)
+    for _ in range(5):
+        provider_latency.record("coresignal", 10.0, timed_out=True)
+
+    assert provider_latency.timeout_for("coresignal", 10.0) == 10.0
+    snapshot = provider_latency.snapshot()["coresignal"]
+    assert snapshot["timeouts"] == 5
+    assert snapshot["timeout_seconds"] == 10.0
+
+
+def _slow_first_handler():
+    calls = []
+
+    async def handler(request):
+        calls.append(request.method)
+        if len(calls) == 1:
+            await asyncio.sleep(1.0)
+        return httpx.Response(200, json={"attempt": len(calls)})
+
+    return handler, calls
+
+
+def test_slow_get_is_hedged(monkeypatch):
+    monkeypatch.setattr(settings, "HEDGED_REQUESTS_ENABLED", True)
+    monkeypatch.setattr(settings, "HEDGE_MAX_RATE", 1.0)
+    _warm("coresignal", 0.02)
+    handler, calls = _slow_first_handler()
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await provider_request(client, "coresignal", "GET", "https://api.test/x", timeout=5.0, hedge=True)
+
+    response = asyncio.run(run())
+
+    assert response.json() == {"attempt": 2}
+    snapshot = provider_latency.snapshot()["coresignal"]
+    assert (snapshot["hedged"], snapshot["hedge_wins"]) == (1, 1)
+
+
+def test_posts_and_unhedged_providers_send_once(monkeypatch):
+    monkeypatch.setattr(settings, "HEDGED_REQUESTS_ENABLED", True)
+    monkeypatch.setattr(settings, "HEDGE_MAX_RATE", 1.0)
+    _warm("coresignal", 0.02)
+    handler, calls = _slow_first_handler()
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await provider_request(client, "coresignal", "POST", "https://api.test/x", timeout=5.0, hedge=True)
+
+    assert asyncio.run(run()).json() == {"attempt": 1}
+    assert calls == ["POST"]
+
+
+def test_provider_health_endpoint(client):
+    _warm("apollo", 0.3)
+    provider_latency.timeout_for("apollo", 30.0)
+
+    body = client.get("/health/providers").json()
+
+    assert body["providers"]["apollo"]["p95_seconds"] == 0.3
+    assert body["providers"]["apollo"]["timeout_seconds"] == pytest.approx(0.5)
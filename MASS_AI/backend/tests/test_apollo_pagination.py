@@ -0,0 +1,90 @@
+import asyncio
+import time
+
+import pytest
+
+from app.clients.apollo import ApolloClient
+from app.core.config import settings
+from app.core.rate_limiter import AsyncRateLimiter
+
+
+def _page(page, per_page, total_pages, duplicate_of=None):
+    rows = [
+        {"id": f"org_{page}_{i}", "name": f"Company {page}-{i}", "primary_domain": f"c{page}-{i}.com"}
+        for i in range(per_page)
+    ]
+    if duplicate_of is not None:
+        # Same organization as the first row of an earlier page, under a different id
+        rows[0] = {"id": f"other_{page}", "name": "Dup", "website_url": f"https://www.c{duplicate_of}-0.com/about"}
+    return {"companies": rows, "pagination": {"page": page, "per_page": per_page, "total_pages": total_pages}}
+
+
+@pytest.fixture
+def apollo(monkeypatch):
+    monkeypatch.setattr(settings, "APOLLO_MAX_CONCURRENT_PAGES", 2)
+    client = ApolloClient()
+    client.calls = []
+    client.in_flight = 0
+    client.max_in_flight = 0
+
+    async def fake_search(payload):
+        client.calls.append(payload["page"])
+        client.in_flight += 1
+        client.max_in_flight = max(client.max_in_flight, client.in_flight)
+        await asyncio.sleep(0.01)
+        client.in_flight -= 1
+        page = payload["page"]
+        return _page(page, payload["per_page"], total_pages=6, duplicate_of=1 if page == 3 else None)
+
+    monkeypatch.setattr(client, "search_companies", fake_search)
+    return client
+
+
+def _collect(apollo, payload, max_results, **kwargs):
+    async def run():
+        return [rows async for rows in apollo.iterate_company_pages(payload, max_results, **kwargs)]
+    return asyncio.run(run())
+
+
+def test_pages_are_fetched_concurrently_and_deduped(apollo):
+    stats = {}
+    pages = _collect(apollo, {"page": 1, "per_page": 5}, 20, stats=stats)
+
+    rows = [row for page in pages for row in page]
+    assert len(rows) == 19  # page 3 repeats an organization from page 1
+    assert len({row["id"] for row in rows}) == 19
+    assert sorted(apollo.calls) == [1, 2, 3, 4]
+    assert apollo.max_in_flight == 2
+    assert stats["pages_fetched"] == 4
+
+
+def test_stops_at_total_pages_and_max_results(apollo):
+    pages = _collect(apollo, {"page": 1, "per_page": 5}, 1000)
+    assert sorted(apollo.calls) == [1, 2, 3, 4, 5, 6]
+
+    apollo.calls.clear()
+    pages = _collect(apollo, {"page": 1, "per_page": 5}, 7)
+    assert sum(len(p) for p in pages) == 7
+    assert sorted(apollo.calls) == [1, 2]
+
+
+def test_prefetched_first_page_is_not_fetched_again(apollo):
+    stats = {}
+    pages = _collect(apollo, {"page": 1, "per_page": 5}, 10, first_page=_page(1, 5, 6), stats=stats)
+
+    assert apollo.calls == [2]
+    assert sum(len(p) for p in pages) == 10
+    assert stats["pages_fetched"] == 2
+
+
+def test_rate_limiter_paces_bursts():
+    limiter = AsyncRateLimiter(rate=50, burst=2)
+
+    async def run():
+        start = time.monotonic()
+        for _ in range(4):
+            await limiter.acquire()
+        return time.monotonic() - start
+
+    # Two requests pass immediately, the next two wait ~20ms each
+    assert asyncio.run(run()) >= 0.035
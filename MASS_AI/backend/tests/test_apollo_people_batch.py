@@ -0,0 +1,167 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from app.clients import apollo as apollo_module
+from app.clients.apollo import ApolloClient
+from app.core.coalescing import request_coalescer
+from app.core.config import settings
+from app.schemas.company import SimpleCompany
+from app.services import lead_service as lead_service_module
+from app.services.lead_service import LeadService
+
+
+@pytest.fixture
+def people_api():
+    """How many people each organization has (3 unless set), organizations whose searches fail, and unlisted domains."""
+    return {"counts": {}, "broken": set(), "unlisted": set()}
+
+
+@pytest.fixture
+def apollo_api(monkeypatch, people_api):
+    """Route the Apollo client's HTTP calls to an in-memory handler."""
+    requests = []
+    real_client = httpx.AsyncClient
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        requests.append((request.url.path, body))
+
+        if request.url.path.endswith("mixed_companies/search"):
+            orgs = [{"id": f"org_{d.split('.')[0]}", "primary_domain": d} for d in body["q_organization_domains"]
+                    if d not in people_api["unlisted"]]
+            return httpx.Response(200, json={"companies": orgs})
+
+        if people_api["broken"] & set(body["organization_ids"]):
+            return httpx.Response(200, content=b"<html>upstream error</html>")
+        people = [{"id": f"{d}_p{n}", "first_name": "P"} for d in body.get("q_organization_domains", []) for n in range(3)]
+        for org_id in body["organization_ids"]:
+            for n in range(people_api["counts"].get(org_id, 3)):
+                people.append({"id": f"{org_id}_p{n}", "first_name": "P", "organization_id": org_id})
+        start = (body["page"] - 1) * body["per_page"]
+        return httpx.Response(200, json={"people": people[start:start + body["per_page"]]})
+
+    def client_factory(*args, **kwargs):
+        kwargs["transport"] = httpx.MockTransport(handler)
+        return real_client(*args, **kwargs)
+
+    monkeypatch.setattr(apollo_module.httpx, "AsyncClient", client_factory)
+    monkeypatch.setattr(settings, "APOLLO_PEOPLE_BATCH_SIZE", 2)
+    client = ApolloClient()
+    client.api_key = "test"
+    client.rate_limiter = None
+    return client, requests
+
+
+def test_batched_people_search_splits_people_by_organization(apollo_api):
+    client, requests = apollo_api
+    companies = [
+        SimpleCompany(name="A", domain="a.com", organization_id="org_a"),
+        SimpleCompany(name="B", domain="b.com", organization_id="org_b"),
+        SimpleCompany(name="C", domain="c.com", organization_id="org_c"),
+    ]
+
+    results = asyncio.run(client.search_people_batch(companies, max_leads=2))
+
+    assert [[p["id"] for p in people] for people in results] == [
+        ["org_a_p0", "org_a_p1"], ["org_b_p0", "org_b_p1"], ["org_c_p0", "org_c_p1"],
+    ]
+    people_calls = [body for path, body in requests if path.endswith("mixed_people/search")]
+    # Batch one pages on until org_b also has max_leads people
+    assert [(body["organization_ids"], body["page"]) for body in people_calls] == [
+        (["org_a", "org_b"], 1), (["org_a", "org_b"], 2), (["org_c"], 1),
+    ]
+
+
+def test_missing_organization_ids_are_resolved_in_one_lookup(apollo_api):
+    client, requests = apollo_api
+    companies = [
+        SimpleCompany(name="A", domain="www.a.com"),
+        SimpleCompany(name="B", domain="b.com"),
+        SimpleCompany(name="NoDomain"),
+    ]
+
+    results = asyncio.run(client.search_people_batch(companies, max_leads=1))
+
+    lookups = [body for path, body in requests if path.endswith("mixed_companies/search")]
+    assert len(lookups) == 1
+    assert lookups[0]["q_organization_domains"] == ["a.com", "b.com"]
+    assert [len(people) for people in results] == [1, 1, 0]
+
+
+def test_organizations_crowded_out_by_a_large_one_are_searched_again(apollo_api, people_api, monkeypatch):
+    client, requests = apollo_api
+    monkeypatch.setattr(settings, "APOLLO_PEOPLE_BATCH_SIZE", 3)
+    monkeypatch.setattr(settings, "APOLLO_PEOPLE_MAX_PAGES_PER_BATCH", 2)
+    people_api["counts"]["org_big"] = 50
+    companies = [
+        SimpleCompany(name="Big", domain="big.com", organization_id="org_big"),
+        SimpleCompany(name="A", domain="a.com", organization_id="org_a"),
+        SimpleCompany(name="B", domain="b.com", organization_id="org_b"),
+    ]
+
+    results = asyncio.run(client.search_people_batch(companies, max_leads=2))
+
+    assert [[p["id"] for p in people] for people in results] == [
+        ["org_big_p0", "org_big_p1"], ["org_a_p0", "org_a_p1"], ["org_b_p0", "org_b_p1"],
+    ]
+    people_calls = [body for path, body in requests if path.endswith("mixed_people/search")]
+    # Both pages hold only org_big's people; the others are then searched one by one
+    assert [(body["organization_ids"], body["page"]) for body in people_calls] == [
+        (["org_big", "org_a", "org_b"], 1), (["org_big", "org_a", "org_b"], 2),
+        (["org_a"], 1), (["org_b"], 1),
+    ]
+
+
+def test_companies_without_an_organization_fall_back_to_a_domain_search(apollo_api, people_api):
+    client, requests = apollo_api
+    people_api["unlisted"].add("new.com")
+    companies = [
+        SimpleCompany(name="A", domain="a.com", organization_id="org_a"),
+        SimpleCompany(name="New", domain="new.com"),
+    ]
+
+    results = asyncio.run(client.search_people_batch(companies, max_leads=2))
+
+    assert [[p["id"] for p in people] for people in results] == [["org_a_p0", "org_a_p1"], ["new.com_p0", "new.com_p1"]]
+    fallback = [body for path, body in requests if path.endswith("mixed_people/search") and not body["organization_ids"]]
+    assert [body["q_organization_domains"] for body in fallback] == [["new.com"]]
+
+
+def test_a_failing_batch_only_loses_its_own_organizations(apollo_api, people_api):
+    client, _ = apollo_api
+    people_api["broken"].add("org_a")
+    companies = [
+        SimpleCompany(name="A", domain="a.com", organization_id="org_a"),
+        SimpleCompany(name="B", domain="b.com", organization_id="org_b"),
+        SimpleCompany(name="C", domain="c.com", organization_id="org_c"),
+    ]
+
+    results = asyncio.run(client.search_people_batch(companies, max_leads=2))
+
+    assert [[p["id"] for p in people] for people in results] == [[], [], ["org_c_p0", "org_c_p1"]]
+
+
+def test_people_search_pages_and_lookups_are_billed(apollo_api, monkeypatch):
+    client, requests = apollo_api
+    tracked = []
+    monkeypatch.setattr(lead_service_module, "track_api_call", lambda **kwargs: tracked.append((kwargs["call_type"], kwargs["calls_made"])))
+    service = LeadService()
+    service.apollo = client
+    companies = [
+        SimpleCompany(name="A", domain="a.com", organization_id="org_a"),
+        SimpleCompany(name="B", domain="b.com"),
+    ]
+
+    async def run():
+        with request_coalescer.tally() as calls:
+            await client.search_people_batch(companies, max_leads=2)
+        service._track_apollo_calls("sess", calls)
+
+    asyncio.run(run())
+
+    pages = sum(1 for path, _ in requests if path.endswith("mixed_people/search"))
+    assert pages == 2
+    assert tracked == [("apollo_people_search", pages), ("apollo_company_search", 1)]
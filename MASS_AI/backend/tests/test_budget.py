@@ -0,0 +1,130 @@
+import asyncio
+
+import pytest
+
+from app.clients import hunter_io as hunter_module
+from app.clients import serper_api as serper_module
+from app.core import db_operations
+from app.core.budget import SessionBudget, session_budgets
+from app.core.config import settings
+from app.schemas.icp import ICPConfig
+from app.schemas.lead import Lead
+from app.services.lead_service import LeadService
+
+
+def _icp(cap=1.0, per_company_min=2):
+    return ICPConfig(
+        personas=[{"name": "CTO", "title_regex": ["^CTO.*$"], "seniority": ["Executive"], "functions": []}],
+        company_filters={
+            "industries": ["SaaS"],
+            "employee_count": {"min": 50, "max": 200},
+            "arr_usd": {"min": None, "max": None},
+        },
+        signals_required=[],
+        negative_keywords=[],
+        required_fields_for_qualify=[],
+        contact_persona_targets={"per_company_min": per_company_min, "per_company_max": 3, "persona_order": ["CTO"]},
+        stage_overrides={
+            "budget_cap_per_lead_usd": cap, "finder_pct": 10, "research_pct": 35, "contacts_pct": 25,
+            "verify_pct": 20, "synthesis_pct": 5, "intent_pct": 5,
+        },
+    )
+
+
+class FakeDB:
+    """Just enough of the Supabase client for api_costs and icp_searches."""
+
+    def __init__(self):
+        self.rows = []
+
+    def table(self, name):
+        return self
+
+    def insert(self, row):
+        self.rows.append(row)
+        return self
+
+    def select(self, *args):
+        return self
+
+    def update(self, data):
+        return self
+
+    def eq(self, *args):
+        return self
+
+    def execute(self):
+        return type("Result", (), {"data": self.rows})()
+
+
+@pytest.fixture
+def db(monkeypatch):
+    monkeypatch.setattr(settings, "BUDGET_CONTROL_ENABLED", True)
+    fake = FakeDB()
+    monkeypatch.setattr(db_operations, "get_db", lambda: fake)
+    yield fake
+    session_budgets.discard("sess")
+
+
+def test_budget_is_split_by_stage_percentages(db):
+    budget = session_budgets.start("sess", _icp(cap=1.0, per_company_min=2), expected_companies=5)
+
+    # 5 companies x 2 leads x $1/lead
+    assert budget.total_usd == pytest.approx(10.0)
+    assert budget.stage_budgets["research"] == pytest.approx(3.5)
+    assert budget.stage_budgets["verify"] == pytest.approx(2.0)
+    assert session_budgets.start("sess", _icp(cap=99), 5) is budget
+
+
+def test_tracked_calls_are_charged_to_their_stage(db):
+    budget = session_budgets.start("sess", _icp(), expected_companies=5)
+
+    db_operations.track_api_call("sess", "CoreSignal", call_type="coresignal_enrich", calls_made=2)
+    db_operations.track_api_call("sess", "Hunter", call_type="hunter_email_verifier")
+
+    assert budget.spent["research"] == pytest.approx(0.5)
+    assert budget.spent["verify"] == pytest.approx(0.05)
+    assert len(db.rows) == 2
+
+
+def test_exhausted_stage_refuses_and_records_one_decision():
+    budget = SessionBudget("s", total_usd=1.0, stage_pcts={"research": 50, "verify": 10})
+    budget.charge("coresignal_enrich", 0.45)
+
+    assert budget.allows("serper", "research", 0.05)
+    budget.charge("serper_search", 0.05)
+    assert not budget.allows("serper", "research", 0.01)
+    assert not budget.allows("serper", "research", 0.01)
+    assert budget.allows("email_verification", "verify", 0.05)
+
+    summary = budget.summary()
+    assert summary["skipped"] == {"serper": 2}
+    assert len(summary["decisions"]) == 1
+    assert summary["decisions"][0]["reason"].startswith("research budget exhausted")
+
+
+def test_lead_enrichment_degrades_when_budgets_run_out(db, monkeypatch):
+    calls = []
+
+    class Hunter:
+        async def email_verifier(self, email):
+            calls.append("verify")
+            return {"data": {"result": "deliverable"}}
+
+    class Serper:
+        async def search(self, query):
+            calls.append("serper")
+            return {"organic": []}
+
+    monkeypatch.setattr(hunter_module, "HunterIoClient", Hunter)
+    monkeypatch.setattr(serper_module, "SerperApiClient", Serper)
+    budget = session_budgets.start("sess", _icp(cap=0.1, per_company_min=1), expected_companies=1)
+    budget.charge("hunter_email_verifier", budget.stage_budgets["verify"])
+    budget.charge("coresignal_enrich", budget.stage_budgets["research"])
+
+    lead = Lead(contact_first_name="Jane", contact_last_name="Doe", contact_company="Acme", contact_email="jane@acme.com")
+    asyncio.run(LeadService()._enrich_lead(lead, "sess"))
+
+    assert calls == []
+    summary = db_operations.update_icp_search_results("sess", companies_found=1, leads_generated=1, processing_time=1)
+    assert summary["budget"]["skipped"] == {"email_verification": 1, "lead_serper": 2, "research_agent": 1}
@@ -0,0 +1,116 @@
+import asyncio
+import gzip
+import json
+
+import httpx
+import pytest
+
+from app.clients import mistral as mistral_module
+from app.clients.cassette import Cassette, CassetteMissError
+from app.clients.http import provider_request
+from app.clients.mistral import MistralClient
+from app.core.circuit_breaker import provider_breakers
+from app.core.config import settings
+
+
+@pytest.fixture
+def tape(tmp_path, monkeypatch):
+    tape = Cassette(str(tmp_path / "providers.jsonl.gz"))
+    for module in ("app.clients.http", "app.clients.mistral"):
+        monkeypatch.setattr(f"{module}.cassette", tape)
+    monkeypatch.setattr(settings, "CASSETTE_REPLAY_LATENCY", "zero")
+    provider_breakers.reset()
+    return tape
+
+
+def _mode(monkeypatch, mode):
+    monkeypatch.setattr(settings, "CASSETTE_MODE", mode)
+
+
+def _offline(request):
+    raise AssertionError(f"replay went to the network: {request.url}")
+
+
+def test_async_call_replays_without_network(tape, monkeypatch):
+    def live(request):
+        return httpx.Response(200, json={"organizations": [{"id": "org-1"}], "page": json.loads(request.content)["page"]})
+
+    async def call(handler, page):
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await provider_request(client, "apollo", "POST", "https://apollo.test/search",
+                                          timeout=5, json={"page": page}, headers={"X-Api-Key": "secret"})
+
+    _mode(monkeypatch, "record")
+    recorded = [asyncio.run(call(live, page)).json() for page in (1, 2)]
+
+    _mode(monkeypatch, "replay")
+    tape.reset()
+    replayed = [asyncio.run(call(_offline, page)).json() for page in (2, 1)]
+
+    assert replayed == recorded[::-1]
+    with pytest.raises(CassetteMissError):
+        asyncio.run(call(_offline, 3))
+
+
+def test_credentials_stay_out_of_the_cassette(tape, monkeypatch):
+    def live(request):
+        return httpx.Response(200, json={"data": {"emails": []}})
+
+    async def call(handler, key):
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await provider_request(client, "hunter", "GET", "https://hunter.test/domain-search", timeout=5,
+                                          params={"domain": "acme.com", "api_key": key})
+
+    _mode(monkeypatch, "record")
+    asyncio.run(call(live, "secret"))
+
+    _mode(monkeypatch, "replay")
+    tape.reset()
+    replayed = asyncio.run(call(_offline, "other-key"))
+
+    assert replayed.json() == {"data": {"emails": []}}
+    with gzip.open(tape.path, "rt") as f:
+        assert "secret" not in f.read()
+
+
+def test_repeated_request_replays_in_recorded_order(tape, monkeypatch):
+    _mode(monkeypatch, "record")
+    for status in (429, 200):
+        tape.record("serper", "POST", "https://serper.test/search", status, {}, "{}", 0.2, json_body={"q": "acme"})
+
+    _mode(monkeypatch, "replay")
+    tape.reset()
+    statuses = [tape.lookup("serper", "POST", "https://serper.test/search", json_body={"q": "acme"})["status"] for _ in range(3)]
+
+    assert statuses == [429, 200, 200]
+
+
+def test_mistral_stream_records_and_replays(tape, monkeypatch):
+    events = "".join(
+        f"data: {json.dumps({'choices': [{'delta': {'content': part}}]})}\n\n" for part in ['{"message": "Hi ', 'there"}']
+    ) + "data: [DONE]\n\n"
+    transport = {"handler": lambda request: httpx.Response(200, text=events, headers={"content-type": "text/event-stream"})}
+    real_client = httpx.AsyncClient
+    monkeypatch.setattr(mistral_module.httpx, "AsyncClient",
+                        lambda **kwargs: real_client(transport=httpx.MockTransport(transport["handler"]), **kwargs))
+    monkeypatch.setattr(settings, "MISTRAL_API_KEY", "secret")
+
+    def stream():
+        tokens = []
+
+        async def on_token(text):
+            tokens.append(text)
+
+        client = MistralClient()
+        client.rate_limit_seconds = 0
+        result = asyncio.run(client.call_api_streaming("Say hi", on_token))
+        return result, "".join(tokens)
+
+    _mode(monkeypatch, "record")
+    recorded = stream()
+
+    _mode(monkeypatch, "replay")
+    tape.reset()
+    transport["handler"] = _offline
+
+    assert stream() == recorded == ({"message": "Hi there"}, "Hi there")
@@ -0,0 +1,163 @@
+import asyncio
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+from app.core import db_operations
+from app.core.checkpoints import CheckpointStore
+from app.core.circuit_breaker import provider_breakers
+from app.core.config import settings
+from app.schemas.company import Company
+from app.services import company_service as company_service_module
+from app.services.company_service import CompanyService
+
+HUNTER_RESULT = {"data": {"emails": [{"value": "jane@acme.com", "first_name": "Jane"}], "pattern": "{first}"}}
+
+
+class WorkerDied(BaseException):
+    """Stands in for the process dying mid-enrichment."""
+
+
+class FakeDB:
+    def __init__(self):
+        self.rows = []
+        self.fail = False
+
+    def table(self, name):
+        return self
+
+    def insert(self, row):
+        if self.fail:
+            raise RuntimeError("database unavailable")
+        self.rows.append(row)
+        return self
+
+    def execute(self):
+        return self
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "CHECKPOINTS_ENABLED", True)
+    monkeypatch.setattr(settings, "ENRICHMENT_PLANNER_ENABLED", False)
+    store = CheckpointStore(str(tmp_path / "checkpoints.db"))
+    monkeypatch.setattr(company_service_module, "checkpoint_store", store)
+    provider_breakers.reset()
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def db(monkeypatch):
+    fake = FakeDB()
+    monkeypatch.setattr(db_operations, "get_db", lambda: fake)
+    return fake
+
+
+def _service(monkeypatch, calls, hunter=lambda domain: HUNTER_RESULT):
+    monkeypatch.setenv("SERPER_API_KEY", "dummy")
+
+    class Research:
+        async def research_company(self, company):
+            calls.append("research_agent")
+            return company
+
+    monkeypatch.setitem(sys.modules, "app.services.research_agent_service", SimpleNamespace(ResearchAgentService=Research))
+    service = CompanyService()
+
+    async def enrich_layer(data):
+        calls.append("enrichlayer")
+        return {"name": "Acme", "industry": "Software"}
+
+    async def enrich_by_domain(domain):
+        calls.append("coresignal")
+        return {"description": "Makes things"}
+
+    async def serper(name, fields):
+        calls.append("serper")
+        return {"success": True, "enriched": {"recent_news": ["Acme raises"]}}
+
+    async def domain_search(domain):
+        calls.append("hunter")
+        return hunter(domain)
+
+    monkeypatch.setattr(service.enrich_layer, "enrich_company", enrich_layer)
+    monkeypatch.setattr(service.coresignal, "api_key", "test")
+    monkeypatch.setattr(service.coresignal, "enrich_by_domain", enrich_by_domain)
+    monkeypatch.setattr(service, "enrich_fields_with_serper", serper)
+    monkeypatch.setattr(service.hunterio, "domain_search", domain_search)
+    return service
+
+
+def _session():
+    return SimpleNamespace(session_id="sess", increment_coresignal_enriched=lambda: None)
+
+
+def _company():
+    return Company(
+        organization_id="org-1", name="Acme", domain="acme.com",
+        company_linkedin_url="https://linkedin.com/company/acme",
+    )
+
+
+def _call_types(db):
+    return [row["call_type"] for row in db.rows]
+
+
+def test_resumed_run_skips_paid_stages_without_double_counting(store, db, monkeypatch):
+    calls = []
+
+    def die(domain):
+        raise WorkerDied()
+
+    with pytest.raises(WorkerDied):
+        asyncio.run(_service(monkeypatch, calls, hunter=die)._enrich_single_company(_company(), _session()))
+    assert calls == ["enrichlayer", "coresignal", "serper", "hunter"]
+    assert _call_types(db) == ["enrichlayer_company", "coresignal_enrich", "serper_search"]
+
+    calls.clear()
+    result = asyncio.run(_service(monkeypatch, calls)._enrich_single_company(_company(), _session()))
+
+    assert calls == ["hunter", "research_agent"]
+    assert _call_types(db) == ["enrichlayer_company", "coresignal_enrich", "serper_search", "hunter_domain_search"]
+    assert result.industry == "Software"
+    assert result.description == "Makes things"
+    assert result.recent_news == ["Acme raises"]
+    assert result.contacts[0].email == "jane@acme.com"
+
+    calls.clear()
+    again = asyncio.run(_service(monkeypatch, calls)._enrich_single_company(_company(), _session()))
+    assert calls == []
+    assert again == result
+    assert len(db.rows) == 4
+    assert store.stages("sess") == {"enrichlayer": 1, "coresignal": 1, "serper": 1, "hunter": 1, "final": 1}
+
+
+def test_untracked_cost_is_recorded_once_on_resume(store, db, monkeypatch):
+    calls = []
+    checkpoints = store.for_company("sess", _company())
+
+    db.fail = True
+    checkpoints.save("coresignal", {"company": _company().dict(), "coresignal_data": {"description": "x"}}, cost={
+        "api_name": "CoreSignal", "endpoint": "company_clean/enrich", "call_type": "coresignal_enrich", "calls_made": 1,
+    })
+    assert db.rows == []
+
+    db.fail = False
+    asyncio.run(_service(monkeypatch, calls)._enrich_single_company(_company(), _session()))
+    asyncio.run(_service(monkeypatch, calls)._enrich_single_company(_company(), _session()))
+
+    assert "coresignal" not in calls
+    assert _call_types(db).count("coresignal_enrich") == 1
+
+
+def test_checkpoints_are_per_session_and_use_wal(store):
+    store.for_company("a", _company()).save("hunter", HUNTER_RESULT)
+
+    assert store.for_company("a", _company()).load("hunter") == HUNTER_RESULT
+    assert store.for_company("b", _company()).load("hunter") is None
+    assert store._connect().execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+    store.discard_session("a")
+    assert store.stages("a") == {}
@@ -0,0 +1,125 @@
+import asyncio
+import sys
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from app.clients.http import provider_request
+from app.core.circuit_breaker import CircuitOpenError, provider_breakers
+from app.core.config import settings
+from app.schemas.company import Company
+from app.services.company_service import CompanyService
+
+
+@pytest.fixture(autouse=True)
+def breakers(monkeypatch):
+    monkeypatch.setattr(settings, "BREAKER_ENABLED", True)
+    monkeypatch.setattr(settings, "BREAKER_MIN_REQUESTS", 4)
+    monkeypatch.setattr(settings, "BREAKER_ERROR_RATE", 0.5)
+    monkeypatch.setattr(settings, "BREAKER_CONSECUTIVE_TIMEOUTS", 2)
+    monkeypatch.setattr(settings, "BREAKER_OPEN_SECONDS", 60)
+    # One attempt per call, so each outcome reaches the breaker once
+    monkeypatch.setattr(settings, "RETRY_ENABLED", False)
+    provider_breakers.reset()
+    yield provider_breakers
+    provider_breakers.reset()
+
+
+def _send(handler, count):
+    """Send `count` GETs to a mock enrichlayer; returns status codes, "open" or "timeout"."""
+    async def run():
+        outcomes = []
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            for _ in range(count):
+                try:
+                    response = await provider_request(client, "enrichlayer", "GET", "https://api.test/", timeout=5.0)
+                    outcomes.append(response.status_code)
+                except CircuitOpenError:
+                    outcomes.append("open")
+                except httpx.TimeoutException:
+                    outcomes.append("timeout")
+        return outcomes
+
+    return asyncio.run(run())
+
+
+def _cycle(statuses, sent):
+    def handler(request):
+        sent.append(request)
+        return httpx.Response(statuses[(len(sent) - 1) % len(statuses)])
+    return handler
+
+
+def test_error_rate_trips_breaker_and_skips_calls():
+    sent = []
+    outcomes = _send(_cycle([200, 429, 503], sent), 7)
+
+    # 3 failures out of 5 (429 and 5xx count) opens the breaker
+    assert outcomes == [200, 429, 503, 200, 429, "open", "open"]
+    assert len(sent) == 5
+    status = provider_breakers.snapshot()["enrichlayer"]
+    assert status["state"] == "open"
+    assert status["rejected"] == 2
+    assert status["transitions"][-1]["to"] == "open"
+
+
+def test_client_errors_do_not_count():
+    sent = []
+    assert "open" not in _send(_cycle([404], sent), 6)
+
+
+def test_consecutive_timeouts_trip_breaker():
+    def handler(request):
+        raise httpx.ReadTimeout("slow", request=request)
+
+    assert _send(handler, 3) == ["timeout", "timeout", "open"]
+
+
+def test_half_open_probe_closes_breaker(monkeypatch):
+    sent = []
+    _send(_cycle([503], sent), 4)
+    assert provider_breakers.is_open("enrichlayer")
+
+    monkeypatch.setattr(settings, "BREAKER_OPEN_SECONDS", 0)
+    assert _send(_cycle([200], sent), 2) == [200, 200]
+    states = [t["to"] for t in provider_breakers.snapshot()["enrichlayer"]["transitions"]]
+    assert states == ["open", "half_open", "closed"]
+
+
+def test_open_breaker_skips_provider_and_marks_company_degraded(monkeypatch):
+    monkeypatch.setenv("SERPER_API_KEY", "dummy")
+
+    class NoResearch:
+        async def research_company(self, company):
+            return company
+
+    monkeypatch.setitem(sys.modules, "app.services.research_agent_service", SimpleNamespace(ResearchAgentService=NoResearch))
+    service = CompanyService()
+    calls = []
+
+    async def enrich_company(data):
+        calls.append(data)
+        return {"success": False}
+
+    monkeypatch.setattr(service.enrich_layer, "enrich_company", enrich_company)
+    monkeypatch.setattr(service.coresignal, "api_key", None)
+    monkeypatch.setattr(service, "SERPER_FIELD_ENDPOINT_MAP", {})
+    breaker = provider_breakers.get("enrichlayer")
+    for _ in range(4):
+        breaker.record_failure("HTTP 503")
+
+    company = Company(name="Acme", company_linkedin_url="https://linkedin.com/company/acme")
+    result = asyncio.run(service._enrich_single_company(company))
+
+    assert calls == []
+    assert result.degraded_providers == ["enrichlayer"]
+
+
+def test_breaker_status_endpoint(client):
+    provider_breakers.get("hunter").record_success()
+
+    body = client.get("/health/breakers").json()
+
+    assert body["open_providers"] == []
+    assert body["providers"]["hunter"]["state"] == "closed"
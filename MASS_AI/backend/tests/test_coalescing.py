@@ -0,0 +1,174 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.clients import hunter_io as hunter_module
+from app.clients.http import provider_request
+from app.clients.hunter_io import HunterIoClient
+from app.core.circuit_breaker import provider_breakers
+from app.core.coalescing import request_coalescer
+from app.core.metrics import coalesced_requests, metrics
+from app.services import lead_service as lead_service_module
+from app.services.lead_service import LeadService
+
+
+@pytest.fixture(autouse=True)
+def clean_state():
+    request_coalescer.reset()
+    provider_breakers.reset()
+    metrics.reset()
+    yield
+    request_coalescer.reset()
+
+
+def _slow_transport(sent, delay=0.05):
+    async def handler(request):
+        sent.append(str(request.url))
+        await asyncio.sleep(delay)
+        return httpx.Response(200, json={"url": str(request.url)})
+    return httpx.MockTransport(handler)
+
+
+async def _call(transport, provider="coresignal", method="GET", **kwargs):
+    # A client per call, as the provider clients open one per request
+    async with httpx.AsyncClient(transport=transport) as client:
+        return await provider_request(client, provider, method, "https://api.test/enrich", timeout=5, **kwargs)
+
+
+def test_identical_concurrent_calls_share_one_upstream_call():
+    sent = []
+    transport = _slow_transport(sent)
+
+    async def run():
+        return await asyncio.gather(*(_call(transport, params={"website": "acme.com"}) for _ in range(3)))
+
+    responses = asyncio.run(run())
+
+    assert len(sent) == 1
+    assert [r.json() for r in responses] == [responses[0].json()] * 3
+    assert request_coalescer.snapshot()["coresignal"] == {"sent": 1, "coalesced": 2}
+    assert coalesced_requests.value("coresignal") == 2
+
+
+def test_different_params_and_non_idempotent_calls_are_sent_separately():
+    sent = []
+    transport = _slow_transport(sent)
+
+    async def run():
+        await asyncio.gather(
+            _call(transport, params={"website": "acme.com"}),
+            _call(transport, params={"website": "globex.com"}),
+            _call(transport, provider="supabase", method="POST", json={"row": 1}),
+            _call(transport, provider="supabase", method="POST", json={"row": 1}),
+        )
+
+    asyncio.run(run())
+
+    assert len(sent) == 4
+
+
+def test_calls_after_the_shared_one_finished_are_sent_again():
+    sent = []
+    transport = _slow_transport(sent, delay=0)
+
+    async def run():
+        await _call(transport, params={"website": "acme.com"})
+        await _call(transport, params={"website": "acme.com"})
+
+    asyncio.run(run())
+
+    assert len(sent) == 2
+
+
+def test_waiters_send_their_own_call_when_the_first_caller_is_cancelled():
+    sent = []
+    transport = _slow_transport(sent, delay=0.1)
+
+    async def run():
+        first = asyncio.ensure_future(_call(transport, params={"website": "acme.com"}))
+        await asyncio.sleep(0.01)
+        second = asyncio.ensure_future(_call(transport, params={"website": "acme.com"}))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(run()).status_code == 200
+    assert len(sent) == 2
+
+
+def test_concurrent_hunter_lookups_share_one_call(monkeypatch):
+    sent = []
+    transport = _slow_transport(sent)
+    real_client = httpx.AsyncClient
+    monkeypatch.setattr(hunter_module.httpx, "AsyncClient", lambda **kwargs: real_client(transport=transport, **kwargs))
+    hunter = HunterIoClient(api_key="key")
+
+    async def run():
+        return await asyncio.gather(*(hunter.domain_search("acme.com") for _ in range(3)))
+
+    results = asyncio.run(run())
+
+    assert len(sent) == 1
+    assert results == [results[0]] * 3
+
+
+def test_joined_calls_are_tallied_so_they_are_not_billed():
+    sent = []
+    transport = _slow_transport(sent)
+
+    async def tallied():
+        with request_coalescer.tally() as calls:
+            await _call(transport, params={"website": "acme.com"})
+        return calls.coalesced
+
+    async def run():
+        return await asyncio.gather(tallied(), tallied())
+
+    assert asyncio.run(run()) == [0, 1]
+    assert len(sent) == 1
+
+
+def test_tally_counts_calls_sent_per_endpoint():
+    sent = []
+    transport = _slow_transport(sent, delay=0)
+
+    async def run():
+        with request_coalescer.tally() as outer:
+            with request_coalescer.tally() as inner:
+                await _call(transport, params={"website": "acme.com"})
+                await _call(transport, params={"website": "globex.com"})
+            await _call(transport, provider="apollo")
+        return outer, inner
+
+    outer, inner = asyncio.run(run())
+
+    assert inner.count("coresignal") == inner.count("coresignal", "enrich") == 2
+    assert inner.count("coresignal", "search") == 0
+    assert outer.count("coresignal") == 2 and outer.count("apollo") == 1
+
+
+def test_lead_enrichment_only_tracks_calls_it_sent(monkeypatch):
+    tracked = []
+    monkeypatch.setattr(lead_service_module, "track_api_call", lambda **kwargs: tracked.append(kwargs["calls_made"]))
+    service = LeadService()
+
+    service._track_call("sess", "Hunter", "email-verifier", "hunter_email_verifier", 1)
+    service._track_call("sess", "Hunter", "email-verifier", "hunter_email_verifier", 0)
+
+    assert tracked == [1]
+
+
+def test_coalescing_status_endpoint(client):
+    sent = []
+    transport = _slow_transport(sent)
+
+    async def run():
+        await asyncio.gather(_call(transport, params={"website": "acme.com"}), _call(transport, params={"website": "acme.com"}))
+
+    asyncio.run(run())
+
+    body = client.get("/health/coalescing").json()
+
+    assert body["enabled"] is True
+    assert body["providers"]["coresignal"] == {"sent": 1, "coalesced": 1}
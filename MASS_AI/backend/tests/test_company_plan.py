@@ -0,0 +1,77 @@
+import pytest
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.services import plan_service
+from app.services.plan_service import CompanySearchPlanner
+from app.schemas.company import CompaniesRequest
+from app.schemas.icp import ICPConfig
+
+
+@pytest.fixture(autouse=True)
+def planner_env(monkeypatch):
+    metrics.reset()
+    monkeypatch.setattr(settings, "CORESIGNAL_API_KEY", "test-key")
+    monkeypatch.setattr(settings, "ENRICHMENT_TARGET_FIELDS", "")
+    yield
+    metrics.reset()
+
+
+def _request(limit=250, session_id=None):
+    return CompaniesRequest(search_payload={"organization_locations": ["United States"]}, limit=limit, session_id=session_id)
+
+
+def test_plan_counts_pages_calls_and_cost_without_calling_providers(client, monkeypatch):
+    def no_network(*args, **kwargs):
+        raise AssertionError("the plan must not call providers")
+
+    monkeypatch.setattr("httpx.AsyncClient.send", no_network)
+
+    plan = client.post("/companies/plan", json=_request().dict()).json()
+
+    assert plan["success"] and plan["apollo_pages"] == 3
+    assert plan["provider_calls"]["apollo_company_search"]["calls"] == 3
+    assert plan["provider_calls"]["coresignal_enrich"]["calls"] == 250
+    assert plan["estimated_cost_usd"] == pytest.approx(sum(c["cost_usd"] for c in plan["provider_calls"].values()), abs=1e-3)
+    assert plan["stages"]["coresignal"]["basis"] == "default"
+    assert plan["estimated_seconds"] > 0
+
+
+def test_plan_counts_prefetch_and_checkpoint_hits(monkeypatch):
+    monkeypatch.setattr(settings, "CHECKPOINTS_ENABLED", True)
+    monkeypatch.setattr(plan_service.checkpoint_store, "stages", lambda session_id: {"final": 4, "coresignal": 6})
+    monkeypatch.setattr(plan_service.apollo_prefetch_service, "peek", lambda session_id, payload: "ready")
+
+    plan = CompanySearchPlanner().plan(_request(limit=10, session_id="sess-plan"))
+
+    assert plan.expected_cache_hits["apollo_prefetch"] == 1
+    assert plan.provider_calls["apollo_company_search"].cost_usd == 0
+    assert plan.provider_calls["coresignal_enrich"].cache_hits == 6
+    assert plan.provider_calls["enrichlayer_company"].cache_hits == 4
+
+
+def test_plan_suggests_smaller_limit_for_long_runs(monkeypatch):
+    monkeypatch.setattr(settings, "PLAN_TARGET_SECONDS", 60)
+
+    plan = CompanySearchPlanner().plan(_request(limit=500))
+
+    assert plan.suggested_limit is not None and plan.suggested_limit < 500
+    assert any("POST /jobs" in note for note in plan.notes)
+
+
+def test_icp_search_asks_for_no_more_rows_than_the_limit():
+    icp = ICPConfig(
+        personas=[{"name": "CTO", "title_regex": ["^CTO.*$"], "seniority": ["Executive"], "functions": []}],
+        company_filters={"industries": ["SaaS"], "employee_count": {"min": 50, "max": 200}, "arr_usd": {"min": None, "max": None}},
+        signals_required=[], negative_keywords=[], required_fields_for_qualify=[],
+        contact_persona_targets={"per_company_min": 1, "per_company_max": 3, "persona_order": ["CTO"]},
+        stage_overrides={
+            "budget_cap_per_lead_usd": 1.5, "finder_pct": 10, "research_pct": 35, "contacts_pct": 25,
+            "verify_pct": 20, "synthesis_pct": 5, "intent_pct": 5,
+        },
+    )
+
+    plan = CompanySearchPlanner().plan(CompaniesRequest(icp_config=icp, limit=10))
+
+    assert plan.request_payload["per_page"] == 10
+    assert plan.apollo_pages == 1
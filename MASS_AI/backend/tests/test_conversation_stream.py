@@ -0,0 +1,68 @@
+import json
+
+from app.clients.mistral import JSONFieldStreamReader
+from app.schemas.conversation import ConversationState
+
+
+def test_reader_emits_field_value_across_chunks():
+    reader = JSONFieldStreamReader("message")
+    chunks = ['{"extracted": {"a": 1}, "question": {"mes', 'sage": "Hi', ' there,\\', 'n what\\u0027', 's next?", "asks_about": []}}']
+
+    streamed = "".join(reader.feed(chunk) for chunk in chunks)
+
+    assert streamed == "Hi there,\n what's next?"
+
+
+def test_reader_ignores_documents_without_field():
+    reader = JSONFieldStreamReader("message")
+    assert reader.feed('{"_no_new_fields": true}') == ""
+
+
+def _parse_sse(body: str):
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_respond_stream_sends_tokens_then_state(client, monkeypatch):
+    from app.services.conversational_icp_service import ConversationalICPService
+
+    async def fake_respond(self, conversation_id, answer, on_token=None):
+        await on_token("What revenue ")
+        await on_token("range?")
+        return {
+            "conversation_id": conversation_id,
+            "needs_more_info": True,
+            "message": "What revenue range?",
+            "state": ConversationState(known_fields={"personas": []}, missing_fields=["revenue_range"], turn_count=2),
+            "progress_percentage": 40.0,
+            "icp_config": None,
+        }
+
+    monkeypatch.setattr(ConversationalICPService, "respond_to_conversation", fake_respond)
+
+    resp = client.post("/icp/conversation/conv_1/respond/stream", json={"answer": "50-200 employees"})
+
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/event-stream")
+    events = _parse_sse(resp.text)
+    assert events[:2] == [("token", {"text": "What revenue "}), ("token", {"text": "range?"})]
+    assert events[-1][0] == "state"
+    assert events[-1][1]["message"] == "What revenue range?"
+    assert events[-1][1]["current_state"]["missing_fields"] == ["revenue_range"]
+    assert events[-1][1]["progress_percentage"] == 40.0
+
+
+def test_respond_stream_reports_missing_conversation(client, monkeypatch):
+    from app.services.conversational_icp_service import ConversationalICPService
+
+    async def fake_respond(self, conversation_id, answer, on_token=None):
+        raise ValueError(f"Conversation {conversation_id} not found")
+
+    monkeypatch.setattr(ConversationalICPService, "respond_to_conversation", fake_respond)
+
+    resp = client.post("/icp/conversation/missing/respond/stream", json={"answer": "hi"})
+
+    assert _parse_sse(resp.text) == [("error", {"status_code": 404, "detail": "Conversation missing not found"})]
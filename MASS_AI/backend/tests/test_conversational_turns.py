@@ -0,0 +1,92 @@
+import asyncio
+import copy
+
+import pytest
+
+from app.core.config import settings
+from app.services import conversational_icp_service as conv_module
+from app.services.conversational_icp_service import ConversationalICPService
+
+
+KNOWN_FIELDS = {
+    "personas": [{"name": "CTO", "title_regex": ["^CTO.*$"], "seniority": ["Executive"]}],
+    "company_filters": {"countries": ["United States of America"]},
+}
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setattr(settings, "CONVERSATION_SINGLE_CALL_TURNS", True)
+    monkeypatch.setattr(conv_module, "get_conversation", lambda conversation_id: {
+        "session_id": "sess_conv",
+        "initial_input": "CTOs at US companies",
+        "max_turns": 5,
+        "current_state": {
+            "known_fields": copy.deepcopy(KNOWN_FIELDS),
+            "missing_fields": ["company_size", "revenue_range"],
+            "invalid_fields": [],
+            "turn_count": 1,
+            "confidence_score": 0.5,
+        },
+    })
+    svc = ConversationalICPService()
+    monkeypatch.setattr(svc, "_save_state", lambda *args, **kwargs: None)
+    return svc
+
+
+def _fake_mistral(monkeypatch, svc, response):
+    calls = []
+
+    async def fake_call_api(prompt):
+        calls.append(prompt)
+        return response
+
+    monkeypatch.setattr(svc.mistral, "call_api", fake_call_api)
+    return calls
+
+
+def test_single_call_turn_uses_drafted_question(service, monkeypatch):
+    calls = _fake_mistral(monkeypatch, service, {
+        "extracted": {"company_filters": {"employee_count": {"min": 50, "max": 200}}},
+        "question": {"message": "Nice! What revenue range are you after?", "asks_about": ["revenue_range"]},
+    })
+
+    result = asyncio.run(service.respond_to_conversation("conv_1", "50 to 200 employees"))
+
+    assert len(calls) == 1
+    assert result["message"] == "Nice! What revenue range are you after?"
+    assert result["state"].missing_fields == ["revenue_range"]
+    assert result["state"].known_fields["company_filters"]["employee_count"] == {"min": 50, "max": 200}
+
+
+def test_single_call_turn_falls_back_when_draft_misses_fields(service, monkeypatch):
+    calls = _fake_mistral(monkeypatch, service, {
+        "extracted": {"_no_new_fields": True},
+        "question": {"message": "What technologies do they use?", "asks_about": ["technologies"]},
+    })
+
+    result = asyncio.run(service.respond_to_conversation("conv_1", "not sure"))
+
+    assert len(calls) == 1
+    assert result["state"].missing_fields == ["company_size", "revenue_range"]
+    assert result["message"] == service._get_fallback_question(["company_size", "revenue_range"])
+
+
+def test_two_call_mode_still_asks_separately(service, monkeypatch):
+    monkeypatch.setattr(settings, "CONVERSATION_SINGLE_CALL_TURNS", False)
+    responses = iter([
+        {"company_filters": {"employee_count": {"min": 50, "max": 200}}},
+        {"message": "What revenue range?"},
+    ])
+    calls = []
+
+    async def fake_call_api(prompt):
+        calls.append(prompt)
+        return next(responses)
+
+    monkeypatch.setattr(service.mistral, "call_api", fake_call_api)
+
+    result = asyncio.run(service.respond_to_conversation("conv_1", "50 to 200 employees"))
+
+    assert len(calls) == 2
+    assert result["message"] == "What revenue range?"
@@ -0,0 +1,155 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from app.clients import coresignal as coresignal_module
+from app.clients.coresignal import CoreSignalClient
+from app.core.config import settings
+from app.schemas.company import Company
+from app.services import company_service as company_service_module
+from app.services.company_service import CompanyService
+
+HITS = [
+    {"name": "Acme Inc.", "website": "https://acme.com", "location": "Berlin, Germany",
+     "websites_professional_network": "https://www.linkedin.com/company/acme-hq"},
+    {"name": "Globex", "website": "https://globex.io", "location": "Austin, Texas"},
+    {"name": "Initech Software", "website": "https://initech.dev", "location": "Paris, France"},
+]
+
+
+@pytest.fixture
+def coresignal_api(monkeypatch):
+    """Route CoreSignal ES DSL calls to an in-memory index."""
+    requests = []
+    real_client = httpx.AsyncClient
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(json.loads(request.content))
+        return httpx.Response(200, json={"hits": {"hits": [{"_source": hit} for hit in HITS]}})
+
+    def client_factory(*args, **kwargs):
+        kwargs["transport"] = httpx.MockTransport(handler)
+        return real_client(*args, **kwargs)
+
+    monkeypatch.setattr(coresignal_module.httpx, "AsyncClient", client_factory)
+    monkeypatch.setattr(settings, "CORESIGNAL_BATCH_RESOLVE", True)
+    monkeypatch.setattr(settings, "CORESIGNAL_BATCH_MIN_CONFIDENCE", 0.8)
+    client = CoreSignalClient()
+    client.api_key = "test"
+    return client, requests
+
+
+def test_batch_maps_hits_back_by_linkedin_and_name(coresignal_api):
+    client, requests = coresignal_api
+    results = asyncio.run(client.resolve_companies_batch([
+        {"name": "Acme", "linkedin_url": "https://linkedin.com/company/acme-hq/", "location": None},
+        {"name": "Globex", "linkedin_url": None, "location": "Austin, TX"},
+        {"name": "Initech", "linkedin_url": None, "location": None},
+    ]))
+
+    assert results[0]["website"] == "https://acme.com"
+    assert results[0]["matched_by"] == "linkedin_url"
+    assert results[0]["confidence"] == 1.0
+    assert results[1]["website"] == "https://globex.io"
+    assert results[1]["confidence"] == pytest.approx(0.95)
+    # "Initech" vs "Initech Software" is only a partial name match
+    assert results[2] is None
+    assert len(requests) == 1
+    assert len(requests[0]["query"]["bool"]["should"]) == 4
+
+
+def test_bare_name_match_needs_corroboration(coresignal_api):
+    client, requests = coresignal_api
+    results = asyncio.run(client.resolve_companies_batch([
+        {"name": "Globex", "linkedin_url": None, "location": None},
+        {"name": "Globex", "linkedin_url": None, "location": "Lyon, France"},
+        {"name": "Acme", "linkedin_url": "https://linkedin.com/company/acme-labs", "location": "Berlin"},
+    ]))
+
+    assert results == [None, None, None]
+    assert requests[0]["size"] == 3 * CoreSignalClient._BATCH_HITS_PER_COMPANY
+
+
+def test_batch_sends_one_request_per_chunk(coresignal_api, monkeypatch):
+    client, requests = coresignal_api
+    monkeypatch.setattr(settings, "CORESIGNAL_BATCH_SIZE", 2)
+
+    asyncio.run(client.resolve_companies_batch([{"name": f"Company {i}"} for i in range(5)]))
+
+    assert len(requests) == 3
+
+
+def test_page_pre_resolution_replaces_matched_companies(coresignal_api, monkeypatch):
+    client, _ = coresignal_api
+    monkeypatch.setenv("SERPER_API_KEY", "dummy")
+    service = CompanyService()
+    service.coresignal = client
+    page = [
+        Company(name="Acme", company_linkedin_url="https://www.linkedin.com/company/acme-hq"),
+        Company(name="Unknown Co"),
+        Company(name="Has Domain", domain="has.com"),
+    ]
+
+    missed = asyncio.run(service._pre_resolve_domains(page))
+
+    assert missed == {1}
+    assert page[0].domain == "acme.com"
+    assert page[0].coresignal_data["domain_source"] == "batch_es_dsl_search"
+    assert page[1].domain is None
+    assert page[2].domain == "has.com"
+
+
+def test_batch_search_is_billed_per_request(coresignal_api, monkeypatch):
+    client, _ = coresignal_api
+    monkeypatch.setenv("SERPER_API_KEY", "dummy")
+    monkeypatch.setattr(settings, "CORESIGNAL_BATCH_SIZE", 2)
+    tracked = []
+    monkeypatch.setattr(company_service_module, "track_api_call", lambda **kwargs: tracked.append(kwargs))
+    service = CompanyService()
+    service.coresignal = client
+    session = SimpleNamespace(session_id="sess", increment_domain_enrichment_attempt=lambda: None,
+                              increment_domain_enrichment_success=lambda: None,
+                              increment_coresignal_enriched=lambda: None)
+
+    asyncio.run(service._pre_resolve_domains([Company(name=f"Company {i}") for i in range(3)], session))
+
+    assert [(t["session_id"], t["call_type"], t["calls_made"]) for t in tracked] == [("sess", "coresignal_search", 2)]
+
+
+def test_batch_misses_are_counted_once_and_skip_the_name_search(coresignal_api, monkeypatch):
+    client, _ = coresignal_api
+    monkeypatch.setenv("SERPER_API_KEY", "dummy")
+    service = CompanyService()
+    service.coresignal = client
+    attempts = []
+    session = SimpleNamespace(increment_domain_enrichment_attempt=lambda: attempts.append(1),
+                              increment_domain_enrichment_success=lambda: None,
+                              increment_coresignal_enriched=lambda: None)
+    strategies = []
+
+    async def by_name(company):
+        strategies.append("name")
+
+    async def by_slug(url):
+        strategies.append("slug")
+
+    async def by_url(url):
+        strategies.append("url")
+
+    monkeypatch.setattr(service, "_discover_domain_by_name", by_name)
+    monkeypatch.setattr(service, "_discover_domain_by_linkedin_slug", by_slug)
+    monkeypatch.setattr(service, "_discover_domain_by_linkedin_url", by_url)
+    page = [
+        Company(name="Acme", company_linkedin_url="https://www.linkedin.com/company/acme-hq"),
+        Company(name="Unknown Co", company_linkedin_url="https://www.linkedin.com/company/unknown-co"),
+    ]
+
+    missed = asyncio.run(service._pre_resolve_domains(page, session))
+    asyncio.run(service._find_missing_domain(page[1], session, name_search=False))
+
+    assert missed == {1}
+    assert len(attempts) == 2
+    assert strategies == ["slug", "url"]
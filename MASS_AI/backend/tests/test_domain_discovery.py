@@ -0,0 +1,91 @@
+import asyncio
+
+import pytest
+
+from app.core.config import settings
+from app.schemas.company import Company
+from app.services.company_service import CompanyService
+
+
+class FakeCoreSignal:
+    """CoreSignal stub where each strategy has a scripted delay and result."""
+
+    api_key = "test"
+
+    def __init__(self, slug=(0.0, None), url=(0.0, None), name=(0.0, None)):
+        self.script = {"slug": slug, "url": url, "name": name}
+        self.started = []
+        self.cancelled = []
+
+    async def _run(self, key):
+        self.started.append(key)
+        delay, result = self.script[key]
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            self.cancelled.append(key)
+            raise
+        return result
+
+    async def collect_by_slug(self, slug):
+        return await self._run("slug")
+
+    async def search_by_linkedin_url(self, url):
+        return await self._run("url")
+
+    async def search_by_name(self, name, location=None):
+        return await self._run("name")
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setenv("SERPER_API_KEY", "dummy")
+    monkeypatch.setattr(settings, "DOMAIN_DISCOVERY_HEDGED", True)
+    monkeypatch.setattr(settings, "DOMAIN_DISCOVERY_HEDGE_DELAY_SECONDS", 0.05)
+    return CompanyService()
+
+
+def _discover(service, coresignal):
+    service.coresignal = coresignal
+    company = Company(name="Acme", company_linkedin_url="https://www.linkedin.com/company/acme")
+    return asyncio.run(service._find_missing_domain(company))
+
+
+def test_slow_first_strategy_is_hedged_and_cancelled(service):
+    coresignal = FakeCoreSignal(
+        slug=(1.0, {"websites_main": "https://slow.com"}),
+        url=(0.0, {"website": "https://www.acme.com/about", "name": "Acme"}),
+    )
+
+    company = _discover(service, coresignal)
+
+    assert company.domain == "www.acme.com"
+    assert company.coresignal_data["domain_source"] == "linkedin_url_search"
+    assert coresignal.started == ["slug", "url"]
+    assert coresignal.cancelled == ["slug"]
+
+
+def test_failure_starts_next_strategy_without_waiting(service, monkeypatch):
+    monkeypatch.setattr(settings, "DOMAIN_DISCOVERY_HEDGE_DELAY_SECONDS", 10)
+    coresignal = FakeCoreSignal(url=(0.0, {"website": "not a domain"}), name=(0.0, {"website": "acme.io"}))
+
+    company = _discover(service, coresignal)
+
+    assert company.domain == "acme.io"
+    assert company.coresignal_data["domain_source"] == "company_name_search"
+    assert coresignal.started == ["slug", "url", "name"]
+
+
+def test_sequential_mode_runs_one_strategy_at_a_time(service, monkeypatch):
+    monkeypatch.setattr(settings, "DOMAIN_DISCOVERY_HEDGED", False)
+    coresignal = FakeCoreSignal(slug=(0.1, {"unique_domain": "acme.com"}), url=(0.0, {"website": "other.com"}))
+
+    company = _discover(service, coresignal)
+
+    assert company.domain == "acme.com"
+    assert coresignal.started == ["slug"]
+
+
+def test_no_strategy_finds_a_domain(service):
+    company = _discover(service, FakeCoreSignal())
+    assert company.domain is None
@@ -0,0 +1,106 @@
+import asyncio
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.circuit_breaker import provider_breakers
+from app.core.config import settings
+from app.schemas.company import Company
+from app.services.company_service import CompanyService
+from app.services.enrichment_planner import EnrichmentPlan, provider_cost
+
+CORE_FIELDS = "name,domain,description,industry,employee_count,company_linkedin_url"
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setenv("SERPER_API_KEY", "dummy")
+    monkeypatch.setattr(settings, "ENRICHMENT_PLANNER_ENABLED", True)
+    provider_breakers.reset()
+    calls = []
+
+    class Research:
+        async def research_company(self, company):
+            calls.append("research_agent")
+            return company
+
+    monkeypatch.setitem(sys.modules, "app.services.research_agent_service", SimpleNamespace(ResearchAgentService=Research))
+    svc = CompanyService()
+
+    async def enrich_layer(data):
+        calls.append("enrichlayer")
+        return {"name": "Acme", "industry": "Software", "company_size_on_linkedin": 120}
+
+    async def enrich_by_domain(domain):
+        calls.append("coresignal")
+        return None
+
+    async def serper(name, fields):
+        calls.append(("serper", sorted(fields)))
+        return {"success": False, "error": "stub"}
+
+    async def hunter(domain):
+        calls.append("hunter")
+        return None
+
+    monkeypatch.setattr(svc.enrich_layer, "enrich_company", enrich_layer)
+    monkeypatch.setattr(svc.coresignal, "api_key", "test")
+    monkeypatch.setattr(svc.coresignal, "enrich_by_domain", enrich_by_domain)
+    monkeypatch.setattr(svc, "enrich_fields_with_serper", serper)
+    monkeypatch.setattr(svc.hunterio, "domain_search", hunter)
+    svc.calls = calls
+    return svc
+
+
+def _apollo_company(**overrides):
+    fields = dict(
+        name="Acme", domain="acme.com", description="Makes things", industry="Software",
+        employee_count=120, company_linkedin_url="https://linkedin.com/company/acme",
+    )
+    fields.update(overrides)
+    return Company(**fields)
+
+
+def test_well_covered_company_skips_every_enrichment_provider(service, monkeypatch):
+    monkeypatch.setattr(settings, "ENRICHMENT_TARGET_FIELDS", CORE_FIELDS)
+
+    result = asyncio.run(service._enrich_single_company(_apollo_company()))
+
+    assert service.calls == []
+    assert result.skipped_providers == ["enrichlayer", "coresignal", "serper", "hunter", "research_agent"]
+
+
+def test_serper_is_only_asked_for_fields_still_missing(service, monkeypatch):
+    monkeypatch.setattr(settings, "ENRICHMENT_TARGET_FIELDS", CORE_FIELDS + ",headquarters,recent_news")
+
+    asyncio.run(service._enrich_single_company(_apollo_company(industry=None, description=None)))
+
+    # EnrichLayer filled industry; description/headquarters remain for CoreSignal and Serper
+    assert service.calls == [
+        "enrichlayer", "coresignal", ("serper", ["description", "headquarters", "recent_news"]),
+    ]
+
+
+def test_disabled_planner_runs_the_full_chain(service, monkeypatch):
+    monkeypatch.setattr(settings, "ENRICHMENT_PLANNER_ENABLED", False)
+    monkeypatch.setattr(settings, "ENRICHMENT_TARGET_FIELDS", CORE_FIELDS)
+
+    result = asyncio.run(service._enrich_single_company(_apollo_company()))
+
+    assert [c if isinstance(c, str) else c[0] for c in service.calls] == [
+        "enrichlayer", "coresignal", "serper", "hunter", "research_agent",
+    ]
+    assert result.skipped_providers is None
+
+
+def test_plan_tracks_missing_fields_and_costs():
+    plan = EnrichmentPlan(Company(name="Acme"), targets={"name", "domain", "contacts"})
+    assert plan.missing == {"domain", "contacts"}
+    assert plan.needs("coresignal") and plan.needs("hunter")
+
+    plan.add_filled({"domain": "acme.com", "contacts": []})
+    assert plan.missing == {"contacts"}
+    assert not plan.needs("coresignal")
+    assert plan.skipped == ["coresignal"]
+    assert provider_cost("coresignal") == 0.25
@@ -0,0 +1,72 @@
+import pytest
+
+from app.core.icp_similarity import ICPSimilarityIndex
+
+
+BASE_TEXT = (
+    "B2B SaaS companies in Germany and France with 50 to 200 employees, "
+    "selling HR software to mid-market customers, targeting the VP of People and HR Directors"
+)
+CONFIG = {"industries": ["SaaS"], "locations": ["Germany", "France"]}
+
+
+@pytest.fixture
+def index():
+    idx = ICPSimilarityIndex(max_entries=10)
+    idx.add("sess_base", BASE_TEXT, CONFIG, {"target": "companies"})
+    return idx
+
+
+def test_exact_text_is_reused_regardless_of_case_and_punctuation(index):
+    match = index.find_similar(BASE_TEXT.upper().replace(",", " ;"))
+    assert match is not None
+    assert match["session_id"] == "sess_base"
+    assert match["similarity"] == 1.0
+    assert match["icp_config"] == CONFIG
+    assert match["routing_decision"] == {"target": "companies"}
+
+
+def test_small_wording_change_matches(index):
+    edited = BASE_TEXT.replace("targeting the VP", "targeting a VP")
+    match = index.find_similar(edited, threshold=0.8)
+    assert match is not None
+    assert match["session_id"] == "sess_base"
+    assert 0.8 <= match["similarity"] < 1.0
+
+
+def test_changed_number_is_never_a_match(index):
+    edited = BASE_TEXT.replace("200 employees", "500 employees")
+    assert index.find_similar(edited, threshold=0.5) is None
+
+
+def test_unrelated_icp_is_not_matched(index):
+    assert index.find_similar("Fintech startups in Brazil hiring data engineers") is None
+
+
+def test_re_adding_a_session_replaces_its_entry(index):
+    index.add("sess_base", "Logistics companies in Spain", {"industries": ["Logistics"]})
+    assert len(index) == 1
+    assert index.find_similar(BASE_TEXT) is None
+    assert index.find_similar("logistics companies in spain")["icp_config"] == {"industries": ["Logistics"]}
+
+
+def test_oldest_entries_are_evicted_past_max_entries():
+    idx = ICPSimilarityIndex(max_entries=3)
+    for i in range(5):
+        idx.add(f"sess_{i}", f"Companies in region {i} selling product {i}", {"industries": [str(i)]})
+
+    assert len(idx) == 3
+    assert idx.find_similar("Companies in region 0 selling product 0") is None
+    assert idx.find_similar("Companies in region 4 selling product 4")["session_id"] == "sess_4"
+
+
+def test_matches_are_only_offered_unless_reuse_is_enabled(index, monkeypatch):
+    from app.services import icp_service as icp_service_module
+    from app.services.icp_service import ICPService
+
+    monkeypatch.setattr(icp_service_module, "icp_similarity_index", index)
+    service = ICPService()
+
+    assert service.find_similar_icp(BASE_TEXT)["reused"] is False
+    monkeypatch.setattr(icp_service_module.settings, "ICP_REUSE_MODE", "auto")
+    assert service.find_similar_icp(BASE_TEXT)["reused"] is True
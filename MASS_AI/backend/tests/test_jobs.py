@@ -0,0 +1,204 @@
+import asyncio
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.core.progress import increment_progress, set_progress
+from app.main import create_application
+from app.routes import company as company_routes
+from app.routes import icp as icp_routes
+from app.routes import lead as lead_routes
+from app.schemas.company import CompaniesResponse, Company
+from app.schemas.icp import ICPResponse
+from app.schemas.job import JobRequest
+from app.schemas.lead import Lead, LeadsResponse
+from app.services.job_service import JobService
+
+ICP_CONFIG = {
+    "personas": [{"name": "CTO", "title_regex": ["^CTO.*$"], "seniority": ["Executive"], "functions": []}],
+    "company_filters": {
+        "industries": ["SaaS"],
+        "employee_count": {"min": 50, "max": 200},
+        "arr_usd": {"min": None, "max": None},
+    },
+    "signals_required": [],
+    "negative_keywords": [],
+    "required_fields_for_qualify": [],
+    "contact_persona_targets": {"per_company_min": 1, "per_company_max": 3, "persona_order": ["CTO"]},
+    "stage_overrides": {
+        "budget_cap_per_lead_usd": 1.0, "finder_pct": 10, "research_pct": 35, "contacts_pct": 25,
+        "verify_pct": 20, "synthesis_pct": 5, "intent_pct": 5,
+    },
+}
+
+
+@pytest.fixture
+def stages(monkeypatch):
+    """Stub the stage handlers; `release_leads` must be set for the leads stage to finish."""
+    calls = []
+    state = {"release_leads": None}
+
+    async def normalize_icp(icp_input):
+        calls.append(("normalize", icp_input.icp_text))
+        return ICPResponse(success=True, icp_config=ICP_CONFIG, error=None, session_id="sess1")
+
+    async def get_companies(req):
+        calls.append(("companies", req.session_id, req.limit))
+        return CompaniesResponse(success=True, companies=[Company(name="Acme", domain="acme.com")])
+
+    async def get_leads(req):
+        calls.append(("leads", req.session_id, [c.name for c in req.companies], [p.name for p in req.personas]))
+        if state["release_leads"] is not None:
+            await state["release_leads"].wait()
+        return LeadsResponse(success=True, leads=[Lead(contact_first_name="Jane")], total_leads=1, companies_processed=1)
+
+    monkeypatch.setattr(icp_routes, "normalize_icp", normalize_icp)
+    monkeypatch.setattr(company_routes, "get_companies", get_companies)
+    monkeypatch.setattr(lead_routes, "get_leads", get_leads)
+    state["calls"] = calls
+    return state
+
+
+async def _wait_for(service, job_id, predicate):
+    for _ in range(200):
+        job = service.get(job_id)
+        if predicate(job):
+            return job
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"job {job_id} stuck in {service.get(job_id).status}")
+
+
+def test_job_runs_all_stages_in_the_background(stages):
+    async def run():
+        service = JobService()
+        job = await service.submit(JobRequest(icp_text="SaaS CTOs", limit=5))
+        assert job.status == "queued"
+        job = await _wait_for(service, job.job_id, lambda j: j.finished)
+        await service.stop()
+        return job.to_status()
+
+    status = asyncio.run(run())
+
+    assert status.status == "succeeded"
+    assert status.stages_completed == ["normalize", "companies", "leads"]
+    assert status.session_id == "sess1"
+    assert [c.name for c in status.companies] == ["Acme"]
+    assert status.progress == {"companies_found": 1, "leads_found": 1, "companies_processed": 1}
+    assert stages["calls"] == [
+        ("normalize", "SaaS CTOs"), ("companies", "sess1", 5), ("leads", "sess1", ["Acme"], ["CTO"]),
+    ]
+
+
+def test_running_job_can_be_cancelled_keeping_partial_results(stages):
+    async def run():
+        stages["release_leads"] = asyncio.Event()
+        service = JobService()
+        job = await service.submit(JobRequest(icp_config=ICP_CONFIG, session_id="given"))
+        await _wait_for(service, job.job_id, lambda j: j.stage == "leads")
+        service.cancel(job.job_id)
+        job = await _wait_for(service, job.job_id, lambda j: j.finished)
+        await service.stop()
+        return job.to_status()
+
+    status = asyncio.run(run())
+
+    assert status.status == "cancelled"
+    assert status.stages_completed == ["companies"]
+    assert [c.name for c in status.companies] == ["Acme"]
+    assert status.leads is None
+    assert stages["calls"][0] == ("companies", "given", 10)
+
+
+def test_companies_stage_publishes_progress_while_it_runs(stages, monkeypatch):
+    release = asyncio.Event()
+
+    async def get_companies(req):
+        # Like search_companies: a page arrived, one of its companies is enriched in a task
+        set_progress(companies_found=2)
+        await asyncio.create_task(_enrich_one())
+        await release.wait()
+        return CompaniesResponse(success=True, companies=[Company(name="Acme"), Company(name="Globex")])
+
+    async def _enrich_one():
+        increment_progress("companies_enriched")
+
+    monkeypatch.setattr(company_routes, "get_companies", get_companies)
+
+    async def run():
+        service = JobService()
+        job = await service.submit(JobRequest(icp_config=ICP_CONFIG, include_leads=False))
+        running = await _wait_for(service, job.job_id, lambda j: j.progress.get("companies_enriched"))
+        during = running.to_status()
+        release.set()
+        job = await _wait_for(service, job.job_id, lambda j: j.finished)
+        await service.stop()
+        return during, job.to_status()
+
+    during, done = asyncio.run(run())
+
+    assert during.stage == "companies"
+    assert during.progress == {"companies_found": 2, "companies_enriched": 1}
+    assert done.status == "succeeded"
+    assert done.progress == {"companies_found": 2, "companies_enriched": 1}
+
+
+def test_worker_count_limits_concurrent_jobs(stages, monkeypatch):
+    monkeypatch.setattr(settings, "JOB_WORKERS", 1)
+
+    async def run():
+        stages["release_leads"] = asyncio.Event()
+        service = JobService()
+        first = await service.submit(JobRequest(icp_config=ICP_CONFIG))
+        second = await service.submit(JobRequest(icp_config=ICP_CONFIG))
+        await _wait_for(service, first.job_id, lambda j: j.stage == "leads")
+        await asyncio.sleep(0.05)
+        assert service.get(second.job_id).status == "queued"
+
+        service.cancel(second.job_id)
+        stages["release_leads"].set()
+        await _wait_for(service, first.job_id, lambda j: j.finished)
+        await asyncio.sleep(0.05)
+        await service.stop()
+        return service.get(first.job_id).status, service.get(second.job_id).status
+
+    assert asyncio.run(run()) == ("succeeded", "cancelled")
+    assert len(stages["calls"]) == 2
+
+
+def test_failed_stage_fails_the_job(stages, monkeypatch):
+    async def get_companies(req):
+        return CompaniesResponse(success=False, companies=[], error="Apollo down")
+
+    monkeypatch.setattr(company_routes, "get_companies", get_companies)
+
+    async def run():
+        service = JobService()
+        job = await service.submit(JobRequest(icp_config=ICP_CONFIG))
+        job = await _wait_for(service, job.job_id, lambda j: j.finished)
+        await service.stop()
+        return job
+
+    job = asyncio.run(run())
+    assert job.status == "failed"
+    assert job.error == "Company search failed: Apollo down"
+
+
+def test_job_routes(stages):
+    with TestClient(create_application()) as client:
+        assert client.post("/jobs", json={}).status_code == 400
+        assert client.get("/jobs/missing").status_code == 404
+
+        response = client.post("/jobs", json={"icp_config": ICP_CONFIG, "include_leads": False})
+        assert response.status_code == 202
+        job_id = response.json()["job_id"]
+
+        for _ in range(200):
+            body = client.get(f"/jobs/{job_id}").json()
+            if body["status"] not in ("queued", "running"):
+                break
+            time.sleep(0.01)
+        assert body["status"] == "succeeded"
+        assert body["stages_completed"] == ["companies"]
+        assert client.post(f"/jobs/{job_id}/cancel").json()["status"] == "succeeded"
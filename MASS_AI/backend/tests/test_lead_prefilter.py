@@ -0,0 +1,74 @@
+import asyncio
+
+import pytest
+
+from app.core import guardrails as guardrails_module
+from app.core.config import settings
+from app.schemas.company import Contact, SimpleCompany
+from app.schemas.lead import Lead, LeadsRequest
+from app.services import lead_service as lead_service_module
+from app.services.lead_service import LeadService
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setattr(lead_service_module.journey_logger, "log_lead_generation", lambda **kwargs: None)
+    service = LeadService()
+    enriched = []
+
+    async def enrich(lead, session_id=None):
+        enriched.append(lead.contact_email)
+        return lead
+
+    monkeypatch.setattr(service, "_enrich_lead", enrich)
+    service.enriched = enriched
+    return service
+
+
+def _request():
+    contacts = [
+        Contact(email="jane@acme.com", first_name="Jane", last_name="Doe", confidence=95),
+        Contact(email="JANE@acme.com", first_name="Jane", last_name="Doe", confidence=97),
+        Contact(email="info@acme.com", first_name="Info", confidence=99),
+        Contact(email="bob@acme.com", first_name="Bob", last_name="Roe", confidence=50),
+    ]
+    # No domain: no Apollo search, only the company's high-confidence contacts
+    return LeadsRequest(companies=[SimpleCompany(name="Acme", contacts=contacts)])
+
+
+def test_duplicates_and_nameless_contacts_are_not_enriched(service, monkeypatch):
+    summaries = []
+    monkeypatch.setattr(lead_service_module, "log_guardrails_summary", lambda stats, session_id=None: summaries.append(dict(stats)))
+
+    response = asyncio.run(service.get_leads(_request()))
+
+    assert service.enriched == ["jane@acme.com"]
+    assert [lead.contact_email for lead in response.leads] == ["jane@acme.com"]
+    stats = summaries[0]
+    assert stats["total_leads"] == 2
+    assert stats["filtered_leads"] == 1
+    assert stats["prefiltered_leads"] == 1
+    assert stats["duplicates_before_enrichment"] == 1
+    assert stats["rules_failed"] == {"required_name_fields": 1}
+    # Duplicate: Hunter verify + 2 Serper + research; nameless: Hunter verify + research
+    assert stats["enrichment_calls_avoided"] == 6
+
+
+def test_prefilter_can_be_disabled(service, monkeypatch):
+    monkeypatch.setattr(settings, "LEAD_PREFILTER_ENABLED", False)
+
+    response = asyncio.run(service.get_leads(_request()))
+
+    assert len(service.enriched) == 3
+    assert [lead.contact_email for lead in response.leads] == ["jane@acme.com"]
+
+
+def test_prefilter_only_runs_rules_enrichment_cannot_fix():
+    guardrails = guardrails_module.LeadGuardrails()
+    guardrails.validation_rules["has_linkedin"] = lambda lead: bool(lead.contact_linkedin_url)
+    leads = [Lead(contact_first_name="Jane", contact_last_name="Doe"), Lead(contact_first_name="Info")]
+
+    kept, stats = guardrails.prefilter(leads)
+
+    assert [lead.contact_first_name for lead in kept] == ["Jane"]
+    assert stats["rules_failed"] == {"required_name_fields": 1}
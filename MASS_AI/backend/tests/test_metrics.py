@@ -0,0 +1,87 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.clients.http import provider_request
+from app.core.circuit_breaker import provider_breakers
+from app.core.metrics import (
+    MetricsRegistry, endpoint_label, metrics, provider_request_duration, provider_requests, supabase_writes,
+    timed_db_write,
+)
+
+
+@pytest.fixture(autouse=True)
+def clean_metrics():
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+def test_histogram_and_counter_render_in_text_format():
+    registry = MetricsRegistry()
+    calls = registry.counter("calls_total", "Calls.", ("provider",))
+    latency = registry.histogram("latency_seconds", "Latency.", ("provider",), buckets=(0.1, 1.0))
+
+    calls.inc("apollo")
+    calls.inc("apollo")
+    for value in (0.05, 0.5, 3.0):
+        latency.observe(value, "apollo")
+
+    text = registry.render()
+
+    assert "# TYPE calls_total counter" in text
+    assert 'calls_total{provider="apollo"} 2' in text
+    assert 'latency_seconds_bucket{provider="apollo",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{provider="apollo",le="1.0"} 2' in text
+    assert 'latency_seconds_bucket{provider="apollo",le="+Inf"} 3' in text
+    assert 'latency_seconds_count{provider="apollo"} 3' in text
+
+
+def test_db_write_decorator_counts_failures():
+    @timed_db_write
+    def save_things():
+        raise RuntimeError("supabase down")
+
+    with pytest.raises(RuntimeError):
+        save_things()
+
+    assert supabase_writes.value("save_things", "error") == 1
+
+
+def test_metrics_endpoint_labels_requests_by_route_template(client):
+    client.get("/health")
+    client.get("/jobs/does-not-exist")
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'mass_http_requests_total{route="/health",method="GET",status="200"} 1' in response.text
+    assert 'route="/jobs/{job_id}",method="GET",status="404"' in response.text
+    assert "does-not-exist" not in response.text
+
+
+def test_endpoint_label_is_the_path_template():
+    assert endpoint_label("https://api.apollo.io/api/v1/mixed_companies/search") == "mixed_companies/search"
+    assert endpoint_label("https://api.coresignal.com/cdapi/v2/company_clean/enrich?website=acme.com") == "company_clean/enrich"
+    assert endpoint_label("https://api.hunter.io/v2/email-verifier") == "email-verifier"
+    assert endpoint_label("https://api.test/v1/companies/12345") == "companies/{id}"
+
+
+def test_provider_calls_are_recorded_per_endpoint():
+    provider_breakers.reset()
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, json={}))
+
+    async def run():
+        async with httpx.AsyncClient(transport=transport) as client:
+            await provider_request(client, "hunter", "GET", "https://api.hunter.io/v2/email-verifier",
+                                   timeout=5, params={"email": "jane@acme.com"})
+            await provider_request(client, "hunter", "GET", "https://api.hunter.io/v2/domain-search",
+                                   timeout=5, params={"domain": "acme.com"})
+
+    asyncio.run(run())
+
+    assert provider_requests.value("hunter", "email-verifier", "2xx") == 1
+    assert provider_requests.value("hunter", "domain-search", "2xx") == 1
+    assert provider_request_duration.count("hunter", "email-verifier") == 1
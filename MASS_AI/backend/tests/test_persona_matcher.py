@@ -0,0 +1,74 @@
+import re
+
+from app.mappers.lead_mapper import LeadMapper
+from app.mappers.persona_matcher import FALLBACK_CONFIDENCE, PersonaMatch, PersonaMatcher
+from app.schemas.company import SimpleCompany
+from app.schemas.icp import PersonaConfig
+
+
+def _persona(name, *patterns):
+    return PersonaConfig(name=name, title_regex=list(patterns), seniority=[], functions=[])
+
+
+PERSONAS = [
+    _persona("CTO", "^(Chief Technology Officer|CTO|Chief Technical Officer).*$"),
+    _persona("Head", "(\\w+) of \\1"),  # Backreference: compiled on its own
+    _persona("Broken", "(unclosed"),  # Invalid: falls back to the name
+    _persona("VP", "^(VP|Vice President|V\\.P\\.).*$", "SVP"),
+    _persona("Director", "(?i)director"),
+]
+
+
+def _naive(title, personas):
+    """The per-person loop LeadService used to run."""
+    title = title.strip()
+    if not title:
+        return None
+    for persona in personas:
+        for pattern in persona.title_regex:
+            try:
+                if re.match(pattern, title, re.IGNORECASE):
+                    return persona.name
+            except re.error:
+                if persona.name.lower() in title.lower():
+                    return persona.name
+    return None
+
+
+def test_matches_like_the_per_pattern_loop():
+    matcher = PersonaMatcher(PERSONAS)
+    titles = ["CTO & Co-founder", "chief technology officer", "Sales of Sales", "Broken Windows Lead",
+              "vp engineering", "SVP Sales", "Director of Product", "Engineer", "  ", "V.P. Marketing"]
+
+    for title in titles:
+        match = matcher.match(title)
+        assert (match.persona if match else None) == _naive(title, PERSONAS), title
+
+
+def test_name_fallback_has_lower_confidence():
+    matcher = PersonaMatcher(PERSONAS)
+
+    assert matcher.match("CTO") == PersonaMatch("CTO", 1.0)
+    assert matcher.match("Head of Broken Things") == PersonaMatch("Broken", FALLBACK_CONFIDENCE)
+    assert matcher.match(None) is None
+
+
+def test_matchers_are_cached_per_persona_set():
+    same = [_persona("CTO", "^CTO.*$")]
+
+    assert PersonaMatcher.for_personas(same) is PersonaMatcher.for_personas([_persona("CTO", "^CTO.*$")])
+    assert PersonaMatcher.for_personas(same) is not PersonaMatcher.for_personas([_persona("CEO", "^CEO.*$")])
+    assert PersonaMatcher.for_personas([]) is None
+
+
+def test_lead_mapper_uses_the_matcher():
+    matcher = PersonaMatcher.for_personas(PERSONAS)
+    company = SimpleCompany(name="Acme")
+
+    lead = LeadMapper().map_apollo_person_to_lead({"first_name": "Ada", "title": "Broken Systems Lead"}, company,
+                                                  persona_matcher=matcher)
+    unmatched = LeadMapper().map_apollo_person_to_lead({"first_name": "Bob", "title": None}, company,
+                                                       persona_matcher=matcher)
+
+    assert (lead.matched_persona, lead.persona_confidence) == ("Broken", FALLBACK_CONFIDENCE)
+    assert (unmatched.matched_persona, unmatched.persona_confidence) == (None, None)
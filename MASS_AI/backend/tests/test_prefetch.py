@@ -0,0 +1,105 @@
+import asyncio
+
+import pytest
+
+from app.core.config import settings
+from app.schemas.icp import ICPConfig
+from app.services import prefetch_service as prefetch_module
+from app.services.prefetch_service import ApolloPrefetchService
+
+
+def _icp(industries, employees=(50, 200)):
+    return ICPConfig(
+        personas=[{"name": "CTO", "title_regex": ["^CTO.*$"], "seniority": ["Executive"], "functions": []}],
+        company_filters={
+            "industries": industries,
+            "employee_count": {"min": employees[0], "max": employees[1]},
+            "arr_usd": {"min": None, "max": None},
+        },
+        signals_required=[],
+        negative_keywords=[],
+        required_fields_for_qualify=[],
+        contact_persona_targets={"per_company_min": 1, "per_company_max": 3, "persona_order": ["CTO"]},
+        stage_overrides={
+            "budget_cap_per_lead_usd": 1.5, "finder_pct": 10, "research_pct": 35, "contacts_pct": 25,
+            "verify_pct": 20, "synthesis_pct": 5, "intent_pct": 5,
+        },
+    )
+
+
+@pytest.fixture
+def prefetcher(monkeypatch):
+    monkeypatch.setattr(settings, "APOLLO_PREFETCH_ENABLED", True)
+    tracked = []
+    monkeypatch.setattr(prefetch_module, "track_api_call", lambda **kwargs: tracked.append(kwargs))
+    svc = ApolloPrefetchService()
+    svc.apollo.api_key = "test"
+    svc.searches = []
+    svc.tracked = tracked
+
+    async def fake_search(payload):
+        svc.searches.append(payload)
+        await asyncio.sleep(0)
+        return {"companies": [{"name": "Acme"}], "payload": payload}
+
+    monkeypatch.setattr(svc.apollo, "search_companies", fake_search)
+    return svc
+
+
+def test_prefetch_starts_once_query_is_stable_and_is_handed_over(prefetcher):
+    async def scenario():
+        icp = _icp(["SaaS"])
+        assert prefetcher.observe("sess", icp) is None
+        assert prefetcher.observe("sess", icp) is not None
+        payload = prefetcher.apollo.compose_query_from_icp(icp)
+        return await prefetcher.take("sess", payload)
+
+    data = asyncio.run(scenario())
+    assert data["companies"] == [{"name": "Acme"}]
+    assert len(prefetcher.searches) == 1
+
+
+def test_changed_filters_discard_the_prefetch(prefetcher):
+    async def scenario():
+        prefetcher.observe("sess", _icp(["SaaS"]), final=True)
+        await asyncio.sleep(0.01)
+        prefetcher.observe("sess", _icp(["FinTech"]))
+        payload = prefetcher.apollo.compose_query_from_icp(_icp(["FinTech"]))
+        return await prefetcher.take("sess", payload)
+
+    assert asyncio.run(scenario()) is None
+    # The completed but discarded search is still recorded as a cost
+    assert [t["call_type"] for t in prefetcher.tracked] == ["apollo_company_prefetch"]
+
+
+def test_in_flight_prefetch_is_cancelled_on_change(prefetcher):
+    async def scenario():
+        prefetcher.observe("sess", _icp(["SaaS"]), final=True)
+        task = prefetcher._prefetches["sess"].task
+        prefetcher.observe("sess", _icp(["SaaS"], employees=(10, 50)))
+        await asyncio.sleep(0)
+        return task
+
+    task = asyncio.run(scenario())
+    assert task.cancelled()
+    assert prefetcher.tracked == []
+
+
+def test_take_ignores_other_payloads(prefetcher):
+    async def scenario():
+        prefetcher.observe("sess", _icp(["SaaS"]), final=True)
+        return await prefetcher.take("sess", {"page": 1, "per_page": 10})
+
+    assert asyncio.run(scenario()) is None
+    assert "sess" not in prefetcher._prefetches
+
+
+def test_full_prefetched_page_serves_a_smaller_limit(prefetcher):
+    async def scenario():
+        icp = _icp(["SaaS"])
+        prefetcher.observe("sess", icp, final=True)
+        payload = prefetcher.apollo.compose_query_from_icp(icp, per_page=10)
+        return await prefetcher.take("sess", payload)
+
+    data = asyncio.run(scenario())
+    assert data["payload"]["per_page"] == settings.APOLLO_PER_PAGE
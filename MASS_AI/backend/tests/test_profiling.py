@@ -0,0 +1,55 @@
+import asyncio
+import time
+
+import pytest
+
+from app.core.config import settings
+from app.core.profiling import RequestProfile, _TaskAttribution, _active_profile
+
+
+def _busy(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def test_profile_separates_cpu_from_await_and_follows_child_tasks():
+    async def child():
+        _busy(0.05)
+
+    async def handler():
+        loop = asyncio.get_running_loop()
+        profile = RequestProfile(loop, asyncio.current_task(), 0.002)
+        attribution = _TaskAttribution()
+        token = _active_profile.set(profile)
+        attribution.acquire(loop)
+        profile.start()
+        try:
+            _busy(0.05)
+            await asyncio.sleep(0.05)
+            await asyncio.gather(child())
+        finally:
+            profile.stop()
+            attribution.release(loop)
+            _active_profile.reset(token)
+        return profile.to_dict("POST", "/companies", 200)
+
+    result = asyncio.run(handler())
+
+    assert result["breakdown_ms"]["cpu"] > 40
+    assert result["breakdown_ms"]["idle"] > 20
+    assert "_busy" in result["top_self_cpu"][0]["function"]
+    assert any("child" in line for line in result["collapsed"].splitlines())
+
+
+def test_profiling_requires_operator_token(client, monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "PROFILING_TOKEN", "op-secret")
+    monkeypatch.setattr(settings, "PROFILING_PATHS", "/health")
+    monkeypatch.setattr(settings, "PROFILE_DIR", str(tmp_path))
+
+    assert "x-profile-id" not in client.get("/health", headers={"X-Profile": "wrong"}).headers
+    profile_id = client.get("/health?profile=op-secret").headers["x-profile-id"]
+
+    assert client.get(f"/health/profiles/{profile_id}").status_code == 403
+    stored = client.get(f"/health/profiles/{profile_id}", headers={"X-Profile": "op-secret"}).json()
+    assert stored["path"] == "/health" and stored["status"] == 200
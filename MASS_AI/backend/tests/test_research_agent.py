@@ -17,7 +17,7 @@ class FakeSerper:
         # script: optional dict[str->callable(query)->dict]
         self.script = script or {}
 
-    def search(self, query: str):
+    async def search(self, query: str):
         # Route via explicit script first
         for key, handler in self.script.items():
             if key in query:
@@ -0,0 +1,156 @@
+import asyncio
+import email.utils
+import time
+
+import httpx
+import pytest
+
+from app.clients import mistral as mistral_module
+from app.clients import serper_api as serper_module
+from app.clients.http import provider_request
+from app.clients.mistral import MistralClient
+from app.clients.serper_api import SerperApiClient
+from app.core.circuit_breaker import provider_breakers
+from app.core.config import settings
+from app.core.metrics import metrics, provider_retries, provider_retries_denied
+from app.core.rate_limiter import AsyncRateLimiter
+from app.core.retry import parse_retry_after, retry_policy
+
+
+@pytest.fixture(autouse=True)
+def fast_retries(monkeypatch):
+    monkeypatch.setattr(settings, "RETRY_ENABLED", True)
+    monkeypatch.setattr(settings, "RETRY_MAX_ATTEMPTS", 3)
+    monkeypatch.setattr(settings, "RETRY_BASE_DELAY_SECONDS", 0.01)
+    monkeypatch.setattr(settings, "RETRY_MAX_DELAY_SECONDS", 5)
+    monkeypatch.setattr(settings, "RETRY_BUDGET_MIN", 10)
+    monkeypatch.setattr(settings, "RETRY_BUDGET_RATIO", 0.2)
+    retry_policy.reset()
+    provider_breakers.reset()
+    metrics.reset()
+    yield
+    retry_policy.reset()
+    provider_breakers.reset()
+
+
+def _send(statuses, method="GET", provider="enrichlayer", limiter=None, headers=None):
+    """Send one request through provider_request to a mock answering `statuses` in turn."""
+    sent = []
+
+    def handler(request):
+        sent.append(request)
+        return httpx.Response(statuses[min(len(sent), len(statuses)) - 1], headers=headers or {})
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await provider_request(client, provider, method, "https://api.test/", timeout=5,
+                                          rate_limiter=limiter or AsyncRateLimiter(0))
+
+    return asyncio.run(run()).status_code, len(sent)
+
+
+def test_parse_retry_after():
+    later = email.utils.formatdate(time.time() + 30, usegmt=True)
+
+    assert parse_retry_after("2") == 2.0
+    assert 28 <= parse_retry_after(later) <= 30
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
+
+
+def test_429_is_retried_after_retry_after():
+    limiter = AsyncRateLimiter(0)
+
+    assert _send([429, 200], limiter=limiter, headers={"Retry-After": "0.05"}) == (200, 2)
+    assert provider_retries.value("enrichlayer", "429") == 1
+
+
+def test_long_retry_after_is_not_waited_for_but_holds_back_other_callers():
+    limiter = AsyncRateLimiter(0)
+
+    assert _send([429], limiter=limiter, headers={"Retry-After": "120"}) == (429, 1)
+    assert provider_retries_denied.value("enrichlayer", "retry_after") == 1
+    assert limiter.pause_remaining() > 4
+
+
+def test_server_errors_only_retried_for_idempotent_requests():
+    assert _send([500, 200], method="GET") == (200, 2)
+    # A POST to a provider that is not read-only may have done its work
+    assert _send([500, 200], method="POST", provider="supabase") == (500, 1)
+    # A 503 means it did not
+    assert _send([503, 200], method="POST", provider="supabase") == (200, 2)
+    # Search POSTs are safe to resend
+    assert _send([502, 200], method="POST", provider="serper") == (200, 2)
+
+
+def test_attempts_are_capped():
+    assert _send([503]) == (503, 3)
+    assert provider_retries_denied.value("enrichlayer", "attempts") == 1
+
+
+def test_retry_budget_limits_retries_during_an_outage(monkeypatch):
+    monkeypatch.setattr(settings, "RETRY_BUDGET_MIN", 2)
+    monkeypatch.setattr(settings, "RETRY_BUDGET_RATIO", 0)
+
+    assert _send([503]) == (503, 3)
+    assert _send([503]) == (503, 1)
+    assert provider_retries_denied.value("enrichlayer", "budget") == 1
+
+
+def test_connect_errors_are_retried():
+    sent = []
+
+    def handler(request):
+        sent.append(request)
+        if len(sent) == 1:
+            raise httpx.ConnectError("refused", request=request)
+        return httpx.Response(200)
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await provider_request(client, "coresignal", "POST", "https://api.test/", timeout=5)
+
+    assert asyncio.run(run()).status_code == 200
+    assert provider_retries.value("coresignal", "connect") == 1
+
+
+def test_serper_waits_out_retry_after_and_retries(monkeypatch):
+    sent = []
+
+    def handler(request):
+        sent.append(request)
+        if len(sent) == 1:
+            return httpx.Response(429, headers={"Retry-After": "0"})
+        return httpx.Response(200, json={"organic": [{"link": "https://acme.com"}]})
+
+    real_client = httpx.AsyncClient
+    monkeypatch.setattr(serper_module.httpx, "AsyncClient",
+                        lambda **kwargs: real_client(transport=httpx.MockTransport(handler), **kwargs))
+
+    result = asyncio.run(SerperApiClient(api_key="key").search("acme"))
+
+    assert result == {"organic": [{"link": "https://acme.com"}]}
+    assert len(sent) == 2
+    assert provider_retries.value("serper", "429") == 1
+
+
+def test_mistral_uses_the_shared_policy(monkeypatch):
+    sent = []
+
+    def handler(request):
+        sent.append(request)
+        if len(sent) == 1:
+            return httpx.Response(429, headers={"Retry-After": "0"})
+        return httpx.Response(200, json={"choices": [{"message": {"content": '{"ok": true}'}}]})
+
+    real_client = httpx.AsyncClient
+    monkeypatch.setattr(mistral_module.httpx, "AsyncClient",
+                        lambda **kwargs: real_client(transport=httpx.MockTransport(handler), **kwargs))
+    monkeypatch.setattr(settings, "MISTRAL_API_KEY", "secret")
+    client = MistralClient()
+    client.rate_limit_seconds = 0
+
+    start = time.monotonic()
+    assert asyncio.run(client.call_api("hi")) == {"ok": True}
+    assert len(sent) == 2
+    assert time.monotonic() - start < 2
@@ -0,0 +1,149 @@
+import asyncio
+
+import pytest
+
+from app.core.config import settings
+from app.core.scheduler import (
+    PriorityMiddleware, ProviderScheduler, current_priority, priority, provider_scheduler,
+)
+
+
+@pytest.fixture(autouse=True)
+def scheduler_settings(monkeypatch):
+    monkeypatch.setattr(settings, "SCHEDULER_ENABLED", True)
+    monkeypatch.setattr(settings, "SCHEDULER_CLASS_WEIGHTS", "interactive:8,standard:4,bulk:1")
+    monkeypatch.setattr(settings, "SCHEDULER_BULK_MAX_SHARE", 0.5)
+    provider_scheduler.reset()
+    yield
+    provider_scheduler.reset()
+
+
+def _run_calls(scheduler, calls, hold=None):
+    """
+    Queue (name, class, session) calls behind `hold` busy slots and return the
+    order in which they were admitted.
+    """
+    async def run():
+        order = []
+        release = asyncio.Event()
+
+        async def blocker():
+            with priority("standard", "blocker"):
+                async with scheduler.slot():
+                    await release.wait()
+
+        async def call(name, priority_class, session_id):
+            with priority(priority_class, session_id):
+                async with scheduler.slot():
+                    order.append(name)
+                    await asyncio.sleep(0)
+
+        blockers = [asyncio.create_task(blocker()) for _ in range(hold or scheduler.max_concurrent)]
+        await asyncio.sleep(0)
+        tasks = []
+        for name, priority_class, session_id in calls:
+            tasks.append(asyncio.create_task(call(name, priority_class, session_id)))
+            await asyncio.sleep(0)
+        release.set()
+        await asyncio.gather(*blockers, *tasks)
+        return order
+
+    return asyncio.run(run())
+
+
+def test_interactive_calls_jump_queued_bulk_work():
+    scheduler = ProviderScheduler("apollo", 1)
+
+    order = _run_calls(scheduler, [
+        ("bulk-1", "bulk", "job"), ("bulk-2", "bulk", "job"), ("std", "standard", "s1"), ("chat", "interactive", "c1"),
+    ])
+
+    assert order == ["chat", "std", "bulk-1", "bulk-2"]
+    stats = scheduler.snapshot()["classes"]
+    assert stats["bulk"]["granted"] == 2
+    assert stats["bulk"]["queue_depth"] == 0
+    assert stats["bulk"]["max_wait_seconds"] >= stats["interactive"]["max_wait_seconds"]
+
+
+def test_sessions_of_one_class_share_fairly():
+    scheduler = ProviderScheduler("serper", 1)
+
+    big_run = [(f"a{i}", "standard", "a") for i in range(4)]
+    order = _run_calls(scheduler, big_run + [("b0", "standard", "b"), ("b1", "standard", "b")])
+
+    assert order == ["a0", "b0", "a1", "b1", "a2", "a3"]
+
+
+def test_classes_share_by_weight():
+    scheduler = ProviderScheduler("serper", 1)
+
+    calls = [(f"s{i}", "standard", "s") for i in range(4)] + [(f"i{i}", "interactive", "i") for i in range(4)]
+    order = _run_calls(scheduler, calls)
+
+    # interactive (weight 8) is admitted twice as often as standard (weight 4)
+    assert order[:6] == ["i0", "s0", "i1", "i2", "s1", "i3"]
+
+
+def test_bulk_never_holds_more_than_its_share():
+    scheduler = ProviderScheduler("apollo", 4)
+    peak = {"bulk": 0}
+
+    async def run():
+        async def call():
+            with priority("bulk", "job"):
+                async with scheduler.slot():
+                    peak["bulk"] = max(peak["bulk"], scheduler.stats["bulk"].in_flight)
+                    await asyncio.sleep(0.01)
+
+        await asyncio.gather(*(call() for _ in range(6)))
+
+    asyncio.run(run())
+    assert peak["bulk"] == 2
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    scheduler = ProviderScheduler("apollo", 1)
+
+    async def run():
+        async with scheduler.slot():
+            waiter = asyncio.create_task(scheduler.slot().__aenter__())
+            await asyncio.sleep(0)
+            assert scheduler.stats["standard"].waiting == 1
+            waiter.cancel()
+            await asyncio.gather(waiter, return_exceptions=True)
+        assert scheduler.stats["standard"].waiting == 0
+        assert scheduler.snapshot()["in_flight"] == 0
+
+    asyncio.run(run())
+
+
+def test_middleware_sets_class_from_path_and_header(monkeypatch):
+    monkeypatch.setattr(settings, "SCHEDULER_INTERACTIVE_PATHS", "/icp/conversation")
+    seen = []
+
+    async def app(scope, receive, send):
+        seen.append(current_priority()[0])
+
+    middleware = PriorityMiddleware(app)
+
+    async def run():
+        await middleware({"type": "http", "path": "/icp/conversation/start", "headers": []}, None, None)
+        await middleware({"type": "http", "path": "/companies", "headers": []}, None, None)
+        await middleware({"type": "http", "path": "/companies", "headers": [(b"x-priority", b"bulk")]}, None, None)
+        # A header cannot raise the class
+        await middleware({"type": "http", "path": "/companies", "headers": [(b"x-priority", b"interactive")]}, None, None)
+
+    asyncio.run(run())
+    assert seen == ["interactive", "standard", "bulk", "standard"]
+
+
+def test_scheduler_status_endpoint(client):
+    async def use():
+        async with provider_scheduler.slot("hunter"):
+            pass
+
+    asyncio.run(use())
+    body = client.get("/health/scheduler").json()
+
+    assert body["enabled"] is True
+    assert body["providers"]["hunter"]["classes"]["standard"]["granted"] == 1
@@ -0,0 +1,72 @@
+import json
+
+from fastapi.testclient import TestClient
+
+from app.clients.mistral import MistralClient
+from benchmarks.run_benchmark import percentile
+from benchmarks.standin_server import create_app
+
+FAST = {"latency_ms": {"p50": 0}}
+
+
+def _client(**providers):
+    profile = {"apollo_total_companies": 30, "providers": {name: FAST for name in ("apollo", "mistral", "supabase")}}
+    profile["providers"].update(providers)
+    return TestClient(create_app(profile))
+
+
+def test_apollo_pages_and_people_are_stable():
+    client = _client()
+
+    page = client.post("/apollo/api/v1/mixed_companies/search", json={"page": 2, "per_page": 25}).json()
+    assert [row["id"] for row in page["organizations"]] == [f"org-{i}" for i in range(25, 30)]
+    assert page["pagination"]["total_pages"] == 2
+
+    people = client.post("/apollo/api/v1/mixed_people/search", json={"organization_ids": ["org-1"], "per_page": 100}).json()
+    again = client.post("/apollo/api/v1/mixed_people/search", json={"organization_ids": ["org-1"], "per_page": 100}).json()
+    assert people == again
+    assert {person["organization_id"] for person in people["people"]} == {"org-1"}
+
+
+def test_rate_limit_answers_429_with_retry_after():
+    client = _client(apollo={"latency_ms": {"p50": 0}, "rate_per_second": 0.001, "burst": 1, "retry_after": 3})
+
+    assert client.post("/apollo/api/v1/mixed_companies/search", json={}).status_code == 200
+    limited = client.post("/apollo/api/v1/mixed_companies/search", json={})
+
+    assert limited.status_code == 429
+    assert limited.headers["retry-after"] == "3"
+    assert client.get("/_stats").json()["statuses"]["apollo"] == {"200": 1, "429": 1}
+
+
+def test_mistral_answers_backend_prompts():
+    client = _client()
+    mistral = MistralClient()
+
+    def ask(prompt, stream=False):
+        body = {"messages": [{"role": "user", "content": prompt}], "stream": stream}
+        return client.post("/mistral/v1/chat/completions", json=body)
+
+    icp = json.loads(ask(mistral.create_icp_normalization_prompt("CTOs at SaaS")).json()["choices"][0]["message"]["content"])
+    assert icp["personas"][0]["name"] == "CTO"
+
+    streamed = ask(mistral.create_conversation_turn_prompt("revenue 1-50M", {}), stream=True).text
+    assert streamed.rstrip().endswith("data: [DONE]")
+    assert client.get("/_stats").json()["calls"]["mistral"] == 2
+
+
+def test_supabase_insert_select_update():
+    client = _client()
+
+    client.post("/supabase/rest/v1/sessions", json={"session_id": "s1", "status": "active"})
+    client.patch("/supabase/rest/v1/sessions?session_id=eq.s1", json={"status": "done"})
+
+    assert client.get("/supabase/rest/v1/sessions?select=*&session_id=eq.s1").json()[0]["status"] == "done"
+
+
+def test_percentile_uses_nearest_rank():
+    values = [float(v) for v in range(1, 101)]
+
+    assert percentile(values, 50) == 50
+    assert percentile(values, 99) == 99
+    assert percentile([], 95) is None
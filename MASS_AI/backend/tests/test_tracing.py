@@ -0,0 +1,74 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from app.clients.http import provider_request
+from app.core.circuit_breaker import provider_breakers
+from app.core.scheduler import priority
+from app.core.tracing import Tracer, tracer
+
+
+@pytest.fixture(autouse=True)
+def clean_tracer():
+    tracer.reset()
+    yield
+    tracer.reset()
+
+
+def test_spans_nest_and_carry_costs(tmp_path):
+    local = Tracer(max_sessions=5, max_spans=100, export_path=str(tmp_path / "spans.jsonl"))
+
+    with local.span("companies", kind="phase", session_id="sess-1"):
+        with local.span("Acme", kind="company"):
+            with local.span("coresignal"):
+                local.add_cost(0.2, "coresignal_enrich")
+        local.add_cost(0.1, "apollo_company_search")
+    with local.span("outside"):
+        pass  # No session: not traced
+
+    trace = local.waterfall("sess-1")
+
+    assert [(s["name"], s["depth"]) for s in trace["spans"]] == [("companies", 0), ("Acme", 1), ("coresignal", 2)]
+    assert trace["cost_by_source"] == {"coresignal_enrich": 0.2, "apollo_company_search": 0.1}
+    assert trace["total_cost"] == pytest.approx(0.3)
+    with open(tmp_path / "spans.jsonl") as f:
+        assert [json.loads(line)["name"] for line in f] == ["coresignal", "Acme", "companies"]
+
+
+def test_ring_is_bounded_per_session_and_across_sessions():
+    local = Tracer(max_sessions=2, max_spans=3, export_path="")
+    for session_id in ("a", "b", "c"):
+        for i in range(5):
+            with local.span(f"call-{i}", session_id=session_id):
+                pass
+
+    assert local.waterfall("a") is None
+    assert [s["name"] for s in local.waterfall("c")["spans"]] == ["call-2", "call-3", "call-4"]
+
+
+def test_provider_calls_are_traced_under_the_scheduler_session():
+    provider_breakers.reset()
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, content=b"x" * 42))
+
+    async def call():
+        with priority("interactive", "sess-2"), tracer.span("Acme", kind="company"):
+            async with httpx.AsyncClient(transport=transport) as client:
+                await provider_request(client, "coresignal", "GET", "https://coresignal.test/company", timeout=5)
+
+    asyncio.run(call())
+
+    company, call_span = tracer.waterfall("sess-2")["spans"]
+    assert call_span["parent_id"] == company["span_id"]
+    assert call_span["kind"] == "provider"
+    assert call_span["attributes"]["status_code"] == 200
+    assert call_span["attributes"]["bytes"] == 42
+
+
+def test_trace_endpoint(client):
+    with tracer.span("leads", kind="phase", session_id="sess-3"):
+        pass
+
+    assert client.get("/sessions/sess-3/trace").json()["spans"][0]["name"] == "leads"
+    assert client.get("/sessions/unknown/trace").status_code == 404